@@ -40,7 +40,8 @@ export const GameProvider = ({ children }) => {
 
   // Get a game by ID
   const handleGetGame = async (gameId) => {
-    if (games[gameId]) {
+    // Newly created games only hold their summary until fetched in full
+    if (games[gameId] && games[gameId].payoff_matrix) {
       setCurrentGameId(gameId);
       return games[gameId];
     }
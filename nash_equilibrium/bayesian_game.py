@@ -0,0 +1,281 @@
+"""
+Bayesian Games
+
+This module provides 2-player Bayesian games: each player privately learns a
+type drawn from a common prior, and the payoffs of the game played depend on
+both types.
+
+A pure strategy of the induced normal form picks an action for every type, so
+a player with k types and m actions has m ** k of them and the induced normal
+form quickly becomes too large to build. Equilibria are therefore computed over
+type-contingent strategies directly: the game is an extensive form game in
+which chance draws the types and each type is an information set, and its
+sequence form is only as large as the type-dependent payoff matrices. The
+induced normal form is still available, evaluated lazily cell by cell or as a
+StrategicGame for small games.
+"""
+
+import numpy as np
+
+from nash_equilibrium.extensive_game import ChanceNode, DecisionNode, ExtensiveFormGame, TerminalNode
+
+
+class BayesianGame:
+    """A 2-player game with privately known types and a common prior."""
+
+    def __init__(self, p1_types, p2_types, prior, payoffs):
+        """Initialize a Bayesian game.
+
+        Arguments:
+            p1_types: Names of player 1's types
+            p2_types: Names of player 2's types
+            prior: Joint probability of each pair of types, as an array-like of shape
+                   (len(p1_types), len(p2_types)). Use np.outer(p1_prior, p2_prior)
+                   for independent types.
+            payoffs: Dictionary mapping (p1_type, p2_type) to the payoffs played by those
+                     types, either a StrategicGame or a payoff matrix of (p1, p2) tuples.
+                     Pairs of types with zero probability may be left out.
+
+        Raises:
+            ValueError: If the prior is not a probability distribution, payoffs are
+                        missing or the payoff matrices have different shapes
+        """
+        self.p1_types = list(p1_types)
+        self.p2_types = list(p2_types)
+        prior = np.asarray(prior, dtype=float)
+        if prior.shape != (len(self.p1_types), len(self.p2_types)):
+            raise ValueError("prior must have one row per type of player 1 and one column per type of player 2")
+        if prior.min() < 0 or abs(prior.sum() - 1.0) > 1e-6:
+            raise ValueError("prior must be non-negative and sum to 1")
+        self.prior = prior
+
+        arrays = {}
+        for (t1, t2), matrix in payoffs.items():
+            if hasattr(matrix, "payoff_arrays"):
+                A, B = matrix.payoff_arrays()
+            else:
+                grid = np.asarray(matrix, dtype=float)
+                A, B = grid[:, :, 0], grid[:, :, 1]
+            arrays[(self.p1_types.index(t1), self.p2_types.index(t2))] = (A, B)
+        shapes = {A.shape for A, _ in arrays.values()}
+        if len(shapes) != 1:
+            raise ValueError("Every pair of types must play a game of the same shape")
+        self.actions = shapes.pop()
+
+        # A[i, j] and B[i, j] are the payoff arrays of types i and j
+        self.A = np.zeros((len(self.p1_types), len(self.p2_types)) + self.actions)
+        self.B = np.zeros_like(self.A)
+        for i, j in zip(*np.nonzero(prior)):
+            if (i, j) not in arrays:
+                raise ValueError(f"Missing payoffs for types ({self.p1_types[i]}, {self.p2_types[j]})")
+        for (i, j), (A, B) in arrays.items():
+            self.A[i, j] = A
+            self.B[i, j] = B
+        self._extensive_form = None
+
+    def _check_player(self, player):
+        """Raise ValueError if player is not 1 or 2."""
+        if player not in (1, 2):
+            raise ValueError("player must be an int with the value of 1 or 2")
+
+    def _action_names(self, player):
+        """Names of a player's actions, as in StrategicGame.get_strategies."""
+        prefix = "A" if player == 1 else "B"
+        return [f"{prefix}{k + 1}" for k in range(self.actions[player - 1])]
+
+    def to_extensive_form(self):
+        """Get the game as an extensive form game, built on first use.
+
+        Chance draws the pair of types, then each player chooses an action at
+        the information set of their own type.
+
+        Returns:
+            ExtensiveFormGame
+        """
+        if self._extensive_form is None:
+            p1_actions, p2_actions = self._action_names(1), self._action_names(2)
+            probabilities = []
+            children = []
+            for i, j in zip(*np.nonzero(self.prior)):
+                p2_nodes = [
+                    DecisionNode(
+                        2,
+                        self.p2_types[j],
+                        p2_actions,
+                        [TerminalNode((self.A[i, j, a, b], self.B[i, j, a, b])) for b in range(self.actions[1])],
+                    )
+                    for a in range(self.actions[0])
+                ]
+                probabilities.append(self.prior[i, j])
+                children.append(DecisionNode(1, self.p1_types[i], p1_actions, p2_nodes))
+            self._extensive_form = ExtensiveFormGame(ChanceNode(probabilities, children))
+        return self._extensive_form
+
+    def find_bayesian_equilibrium(
+        self, tol=1e-6, deadline=None, timeout=None, cancel_token=None, progress=None, budget=None
+    ):
+        """Find a Bayesian Nash equilibrium over type-contingent strategies.
+
+        The equilibrium is computed through the sequence form of the extensive
+        form game, whose size is the number of types times the number of actions.
+
+        Arguments:
+            tol: Maximum exploitability accepted for the equilibrium
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces the four options above)
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'p1_strategy': {type: [probabilities]},  # Player 1's mixed action for each type
+                'p2_strategy': {type: [probabilities]},  # Player 2's mixed action for each type
+                'expected_payoffs': (p1_payoff, p2_payoff),  # ex ante, over the prior
+                'exploitability': total gain available from deviating,
+                'iterations': number of pivots,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+        result = self.to_extensive_form().solve(
+            tol=tol, deadline=deadline, timeout=timeout, cancel_token=cancel_token, progress=progress, budget=budget
+        )
+        return {
+            "p1_strategy": self._type_strategies(1, result["p1_behavior"]),
+            "p2_strategy": self._type_strategies(2, result["p2_behavior"]),
+            "expected_payoffs": result["expected_payoffs"],
+            "exploitability": result["exploitability"],
+            "iterations": result["iterations"],
+            "status": result["status"],
+            "error": result["error"],
+        }
+
+    def _type_strategies(self, player, behavior):
+        """Mixed action of every type, uniform for types with zero probability."""
+        types = self.p1_types if player == 1 else self.p2_types
+        uniform = [1.0 / self.actions[player - 1]] * self.actions[player - 1]
+        return {t: behavior.get(t, uniform) for t in types}
+
+    def count_induced_strategies(self, player):
+        """Number of pure strategies of a player in the induced normal form."""
+        self._check_player(player)
+        types = self.p1_types if player == 1 else self.p2_types
+        return self.actions[player - 1] ** len(types)
+
+    def induced_strategy(self, player, index):
+        """Decode a pure strategy of the induced normal form.
+
+        Strategies are numbered with the first type's action as the most
+        significant digit.
+
+        Arguments:
+            player: The player number (1 or 2)
+            index: Index of the strategy
+
+        Returns:
+            Dictionary mapping each type to the index of its action
+        """
+        types = self.p1_types if player == 1 else self.p2_types
+        return dict(zip(types, self._decode(player, [index])[0].tolist()))
+
+    def _decode(self, player, indices):
+        """Action of every type for each induced strategy index, as an array (len(indices), types)."""
+        self._check_player(player)
+        types = self.p1_types if player == 1 else self.p2_types
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= self.count_induced_strategies(player)):
+            raise ValueError(f"Induced strategy index out of range for player {player}")
+        return np.stack(np.unravel_index(indices, (self.actions[player - 1],) * len(types)), axis=-1)
+
+    def induced_payoff_block(self, rows, columns):
+        """Calculate a block of the induced normal form without building the rest.
+
+        Arguments:
+            rows: Indices of player 1's induced strategies
+            columns: Indices of player 2's induced strategies
+
+        Returns:
+            Tuple (A, B) of ex ante payoff arrays with shape (len(rows), len(columns))
+        """
+        R = self._decode(1, rows)
+        C = self._decode(2, columns)
+        A = np.zeros((len(R), len(C)))
+        B = np.zeros((len(R), len(C)))
+        for i, j in zip(*np.nonzero(self.prior)):
+            index = np.ix_(R[:, i], C[:, j])
+            A += self.prior[i, j] * self.A[i, j][index]
+            B += self.prior[i, j] * self.B[i, j][index]
+        return A, B
+
+    def induced_payoff(self, row, column):
+        """Calculate one cell of the induced normal form.
+
+        Returns:
+            Tuple (p1_payoff, p2_payoff)
+        """
+        A, B = self.induced_payoff_block([row], [column])
+        return float(A[0, 0]), float(B[0, 0])
+
+    def induced_normal_form(self, cache_size=None, executor=None):
+        """Get the induced normal form as a lazily evaluated ImplicitGame.
+
+        Arguments:
+            cache_size: Maximum number of evaluated cells kept in memory (None for no limit)
+            executor: Optional executor used to evaluate cells in parallel
+
+        Returns:
+            ImplicitGame whose cells are computed on demand
+        """
+        from nash_equilibrium.implicit_game import ImplicitGame
+
+        return ImplicitGame(
+            self.induced_payoff,
+            self.count_induced_strategies(1),
+            self.count_induced_strategies(2),
+            cache_size=cache_size,
+            executor=executor,
+        )
+
+    def to_strategic_game(self, max_cells=10**6):
+        """Build the induced normal form as a StrategicGame.
+
+        Arguments:
+            max_cells: Refuse to build games with more cells than this
+
+        Returns:
+            StrategicGame with the ex ante payoffs of every pair of induced strategies
+
+        Raises:
+            ValueError: If the induced normal form has more than max_cells cells
+        """
+        from nash_equilibrium.strategic_game import StrategicGame
+
+        rows, columns = self.count_induced_strategies(1), self.count_induced_strategies(2)
+        if rows * columns > max_cells:
+            raise ValueError(f"The induced normal form has {rows * columns} cells, more than max_cells={max_cells}")
+        A, B = self.induced_payoff_block(range(rows), range(columns))
+        grid = [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(A.tolist(), B.tolist())]
+        return StrategicGame(mode="d", payoff_matrix=grid)
+
+    def induced_mixed_strategy(self, player, strategy):
+        """Convert type-contingent mixed actions into a mixed strategy of the induced normal form.
+
+        Types choose independently, so each induced strategy gets the product of
+        the probabilities of its actions. The result has one entry per induced
+        strategy and is only practical for small games.
+
+        Arguments:
+            player: The player number (1 or 2)
+            strategy: Dictionary mapping each type to its action probabilities
+
+        Returns:
+            Numpy array over the player's induced strategies
+        """
+        types = self.p1_types if player == 1 else self.p2_types
+        self._check_player(player)
+        mixed = np.ones(1)
+        for t in types:
+            mixed = np.outer(mixed, np.asarray(strategy[t], dtype=float)).ravel()
+        return mixed
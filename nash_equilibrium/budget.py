@@ -0,0 +1,96 @@
+"""
+Solve Budgets
+
+This module provides deadlines, cancellation tokens and progress callbacks
+for the equilibrium solvers. A solver that runs out of budget stops early and
+returns the best result found so far, flagged as partial.
+
+Linear programs cannot be interrupted once the solver runs. They check the
+budget before they start, and their deadline is passed to the solver as a
+time limit.
+"""
+
+import threading
+import time
+
+
+class CancellationToken:
+    """A thread-safe flag used to ask running solvers to stop early."""
+
+    def __init__(self):
+        """Initialize an uncancelled token."""
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Ask every solver using this token to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """Whether cancel() has been called."""
+        return self._event.is_set()
+
+
+class SolveBudget:
+    """Time limit, cancellation token and progress callback for a solve."""
+
+    def __init__(self, deadline=None, timeout=None, cancel_token=None, progress=None):
+        """Initialize a budget.
+
+        Arguments:
+            deadline: Absolute deadline as a time.monotonic() value
+            timeout: Seconds from now until the deadline (used if deadline is not given)
+            cancel_token: Optional CancellationToken
+            progress: Optional callback receiving a dictionary of progress information
+        """
+        self.start = time.monotonic()
+        if deadline is None and timeout is not None:
+            deadline = self.start + timeout
+        self.deadline = deadline
+        self.cancel_token = cancel_token
+        self.progress = progress
+
+    def expired(self):
+        """Check whether the deadline has passed or the solve was cancelled."""
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self):
+        """Seconds left until the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def elapsed(self):
+        """Seconds since the budget was created."""
+        return time.monotonic() - self.start
+
+    def report(self, **info):
+        """Send progress information to the progress callback, if any."""
+        if self.progress is not None:
+            info["elapsed"] = self.elapsed()
+            self.progress(info)
+
+
+def make_budget(budget=None, deadline=None, timeout=None, cancel_token=None, progress=None):
+    """Return the given budget, or build one from the individual options.
+
+    Returns:
+        A SolveBudget, or None if no limits or callbacks were requested
+    """
+    if budget is not None:
+        return budget
+    if deadline is None and timeout is None and cancel_token is None and progress is None:
+        return None
+    return SolveBudget(deadline=deadline, timeout=timeout, cancel_token=cancel_token, progress=progress)
+
+
+def linprog_options(budget=None):
+    """Options of scipy's HiGHS linear programming solver bounding it by a budget's deadline.
+
+    Returns:
+        Dictionary to pass as the options of scipy.optimize.linprog
+    """
+    remaining = None if budget is None else budget.remaining()
+    return {} if remaining is None else {"time_limit": remaining}
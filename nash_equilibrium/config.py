@@ -13,6 +13,17 @@ DEFAULT_CONFIG = {
     "random_seed": None,
     "output_format": "text",
     "log_level": "INFO",
+    "solve_timeout": None,
+    "game_store": None,
+    "max_games": None,
+    "max_game_bytes": None,
+    "game_ttl": None,
+    "spill_directory": None,
+    "snapshot": None,
+    "deduplicate_games": False,
+    "job_workers": 2,
+    "job_queue_size": 100,
+    "job_retention": 3600.0,
 }
 
 
@@ -46,6 +57,39 @@ def get_config():
     if "NASH_LOG_LEVEL" in os.environ:
         config["log_level"] = os.environ["NASH_LOG_LEVEL"]
 
+    if "NASH_SOLVE_TIMEOUT" in os.environ:
+        config["solve_timeout"] = float(os.environ["NASH_SOLVE_TIMEOUT"])
+
+    if "NASH_GAME_STORE" in os.environ:
+        config["game_store"] = os.environ["NASH_GAME_STORE"]
+
+    if "NASH_MAX_GAMES" in os.environ:
+        config["max_games"] = int(os.environ["NASH_MAX_GAMES"])
+
+    if "NASH_MAX_GAME_BYTES" in os.environ:
+        config["max_game_bytes"] = int(os.environ["NASH_MAX_GAME_BYTES"])
+
+    if "NASH_GAME_TTL" in os.environ:
+        config["game_ttl"] = float(os.environ["NASH_GAME_TTL"])
+
+    if "NASH_SPILL_DIR" in os.environ:
+        config["spill_directory"] = os.environ["NASH_SPILL_DIR"]
+
+    if "NASH_SNAPSHOT" in os.environ:
+        config["snapshot"] = os.environ["NASH_SNAPSHOT"]
+
+    if "NASH_DEDUPLICATE_GAMES" in os.environ:
+        config["deduplicate_games"] = os.environ["NASH_DEDUPLICATE_GAMES"].lower() in ("1", "true", "yes")
+
+    if "NASH_JOB_WORKERS" in os.environ:
+        config["job_workers"] = int(os.environ["NASH_JOB_WORKERS"])
+
+    if "NASH_JOB_QUEUE_SIZE" in os.environ:
+        config["job_queue_size"] = int(os.environ["NASH_JOB_QUEUE_SIZE"])
+
+    if "NASH_JOB_RETENTION" in os.environ:
+        config["job_retention"] = float(os.environ["NASH_JOB_RETENTION"])
+
     return config
 
 
@@ -0,0 +1,274 @@
+"""
+Congestion Games
+
+This module provides CongestionGame, a compact description of a congestion
+game: players choose among subsets of shared resources, such as paths made of
+network edges, and the cost of a resource depends only on how many players use
+it. Each player pays the sum of the costs of the resources they use.
+
+The normal form of such a game has one payoff entry per profile of strategies
+and is far too large for more than a handful of players. The game is instead
+analyzed through its compact form and Rosenthal's potential
+
+    potential = sum over resources r of cost_r(1) + ... + cost_r(load_r)
+
+Any move that lowers the mover's cost lowers the potential by the same amount,
+so best response dynamics always stop at a pure Nash equilibrium. The change in
+potential of a move only involves the resources the mover leaves and joins, so
+it is updated in constant time with respect to the number of players.
+"""
+
+import itertools
+
+import numpy as np
+
+from nash_equilibrium.budget import make_budget
+
+
+class CongestionGame:
+    """A congestion game described by its resources and the players' strategies."""
+
+    def __init__(self, resource_costs, strategies):
+        """Initialize a congestion game.
+
+        Arguments:
+            resource_costs: One entry per resource, either a function load -> cost or a
+                            sequence of costs for loads 1, 2, ..., number of players
+            strategies: One entry per player, listing that player's strategies, each an
+                        iterable of resource indices (e.g. the edges of a path)
+
+        Raises:
+            ValueError: If there are no players, a player has no strategy, a strategy uses
+                        an unknown resource or a cost sequence is too short
+        """
+        if len(strategies) == 0:
+            raise ValueError("A congestion game needs at least one player")
+        self.num_players = len(strategies)
+        self.num_resources = len(resource_costs)
+
+        # costs[r, k] is the cost of resource r used by k players (k = 0 is unused)
+        self.costs = np.zeros((self.num_resources, self.num_players + 1))
+        for r, cost in enumerate(resource_costs):
+            if callable(cost):
+                self.costs[r, 1:] = [cost(load) for load in range(1, self.num_players + 1)]
+            else:
+                cost = np.asarray(cost, dtype=float)
+                if len(cost) < self.num_players:
+                    raise ValueError(f"Resource {r} needs a cost for every load up to {self.num_players}")
+                self.costs[r, 1:] = cost[: self.num_players]
+        self._cumulative_costs = np.cumsum(self.costs, axis=1)
+
+        self.strategies = []
+        self._incidence = []
+        for player, player_strategies in enumerate(strategies):
+            player_strategies = [tuple(sorted(set(int(r) for r in s))) for s in player_strategies]
+            if len(player_strategies) == 0:
+                raise ValueError(f"Player {player + 1} has no strategies")
+            incidence = np.zeros((len(player_strategies), self.num_resources), dtype=bool)
+            for k, resources in enumerate(player_strategies):
+                if any(r < 0 or r >= self.num_resources for r in resources):
+                    raise ValueError(f"Strategy {k} of player {player + 1} uses an unknown resource")
+                incidence[k, list(resources)] = True
+            self.strategies.append(player_strategies)
+            self._incidence.append(incidence)
+
+    @property
+    def num_strategies(self):
+        """Number of strategies of each player."""
+        return tuple(len(s) for s in self.strategies)
+
+    def _check_profile(self, profile):
+        """Validate a pure strategy profile and return it as a list of ints."""
+        if len(profile) != self.num_players:
+            raise ValueError(f"A profile needs one strategy for each of the {self.num_players} players")
+        profile = [int(s) for s in profile]
+        for player, (s, size) in enumerate(zip(profile, self.num_strategies)):
+            if s < 0 or s >= size:
+                raise ValueError(f"Strategy {s} out of range for player {player + 1}")
+        return profile
+
+    def loads(self, profile):
+        """Number of players using each resource in a pure profile.
+
+        Returns:
+            Integer array with one load per resource
+        """
+        profile = self._check_profile(profile)
+        loads = np.zeros(self.num_resources, dtype=np.int64)
+        for player, s in enumerate(profile):
+            loads += self._incidence[player][s]
+        return loads
+
+    def potential(self, profile):
+        """Rosenthal's potential of a pure profile."""
+        loads = self.loads(profile)
+        return float(self._cumulative_costs[np.arange(self.num_resources), loads].sum())
+
+    def player_costs(self, profile):
+        """Cost paid by each player in a pure profile.
+
+        Returns:
+            Float array with one cost per player
+        """
+        profile = self._check_profile(profile)
+        loads = self.loads(profile)
+        resource_costs = self.costs[np.arange(self.num_resources), loads]
+        return np.array([resource_costs[self._incidence[p][s]].sum() for p, s in enumerate(profile)])
+
+    def _deviation_costs(self, player, current, loads):
+        """Cost of each of a player's strategies if the others keep their strategies."""
+        used = self._incidence[player][current]
+        # The player counts in the load of the resources they use already
+        resource_costs = self.costs[np.arange(self.num_resources), loads + ~used]
+        return self._incidence[player] @ resource_costs
+
+    def is_pure_nash(self, profile, tol=1e-9):
+        """Check whether no player can lower their cost by switching strategies.
+
+        Returns:
+            True if the profile is a pure Nash equilibrium
+        """
+        profile = self._check_profile(profile)
+        loads = self.loads(profile)
+        for player, s in enumerate(profile):
+            costs = self._deviation_costs(player, s, loads)
+            if costs.min() < costs[s] - tol:
+                return False
+        return True
+
+    def best_response_dynamics(
+        self,
+        initial=None,
+        max_moves=None,
+        tol=1e-9,
+        seed=None,
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+        budget=None,
+    ):
+        """Find a pure Nash equilibrium with best response dynamics.
+
+        Players take turns switching to a best response whenever it lowers their
+        cost by more than tol. Every such move lowers the potential, so the
+        dynamics end at a pure Nash equilibrium. Loads and potential are updated
+        from the resources of the move only.
+
+        Arguments:
+            initial: Optional initial profile (one strategy index per player).
+                     By default every player starts from a random strategy.
+            max_moves: Optional maximum number of moves
+            tol: Smallest cost decrease that counts as an improvement
+            seed: Seed for the random initial profile
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the dynamics early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces deadline, timeout, cancel_token and progress)
+
+        Returns:
+            A dictionary with the final profile:
+            {
+                'profile': [...],  # strategy index of each player
+                'costs': [...],  # cost of each player
+                'loads': [...],  # load of each resource
+                'potential': Rosenthal's potential,
+                'moves': number of moves made,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+        if initial is None:
+            rng = np.random.default_rng(seed)
+            profile = [int(rng.integers(size)) for size in self.num_strategies]
+        else:
+            profile = self._check_profile(initial)
+        loads = self.loads(profile)
+        potential = float(self._cumulative_costs[np.arange(self.num_resources), loads].sum())
+
+        moves = 0
+        status = "complete"
+        error = None
+        stable = 0
+        player = 0
+        while stable < self.num_players:
+            if max_moves is not None and moves >= max_moves:
+                error = "Maximum number of moves reached"
+                break
+            if budget is not None and budget.expired():
+                status = "partial"
+                error = "Solve stopped before completion"
+                break
+
+            current = profile[player]
+            costs = self._deviation_costs(player, current, loads)
+            best = int(np.argmin(costs))
+            if costs[best] < costs[current] - tol:
+                leaving = np.flatnonzero(self._incidence[player][current] & ~self._incidence[player][best])
+                joining = np.flatnonzero(self._incidence[player][best] & ~self._incidence[player][current])
+                # The potential changes by exactly the mover's change in cost
+                potential += self.costs[joining, loads[joining] + 1].sum() - self.costs[leaving, loads[leaving]].sum()
+                loads[leaving] -= 1
+                loads[joining] += 1
+                profile[player] = best
+                moves += 1
+                stable = 0
+                if budget is not None:
+                    budget.report(method="best_response_dynamics", iterations=moves, potential=potential)
+            else:
+                stable += 1
+            player = (player + 1) % self.num_players
+
+        return {
+            "profile": profile,
+            "costs": self.player_costs(profile).tolist(),
+            "loads": loads.tolist(),
+            "potential": potential,
+            "moves": moves,
+            "status": status,
+            "error": error,
+        }
+
+    def _payoff_tensor(self, max_profiles):
+        """Payoffs (negated costs) of every profile, shaped (N, s1, ..., sN)."""
+        shape = self.num_strategies
+        if int(np.prod(shape, dtype=float)) > max_profiles:
+            raise ValueError(f"The normal form has more than {max_profiles} profiles")
+        payoffs = np.empty((self.num_players,) + shape)
+        for profile in itertools.product(*(range(size) for size in shape)):
+            payoffs[(slice(None),) + profile] = -self.player_costs(profile)
+        return payoffs
+
+    def to_n_player_game(self, max_profiles=100000):
+        """Expand a small game into its normal form, with payoffs equal to minus the costs.
+
+        Arguments:
+            max_profiles: Largest number of strategy profiles that may be expanded
+
+        Returns:
+            NPlayerGame
+
+        Raises:
+            ValueError: If the normal form has more than max_profiles profiles
+        """
+        from nash_equilibrium.n_player_game import NPlayerGame
+
+        return NPlayerGame(mode="d", payoffs=self._payoff_tensor(max_profiles))
+
+    def to_strategic_game(self, max_profiles=100000):
+        """Expand a small 2-player game into a StrategicGame, with payoffs equal to minus the costs.
+
+        Arguments:
+            max_profiles: Largest number of strategy profiles that may be expanded
+
+        Returns:
+            StrategicGame
+
+        Raises:
+            ValueError: If the game does not have two players or is too large
+        """
+        if self.num_players != 2:
+            raise ValueError("Only 2-player games can be converted to a StrategicGame")
+        return self.to_n_player_game(max_profiles).to_strategic_game()
@@ -0,0 +1,148 @@
+"""
+Correlated Equilibria
+
+This module computes correlated equilibria of 2-player games by linear
+programming. A correlated equilibrium is a distribution over strategy profiles
+such that no player gains by deviating from the strategy it recommends.
+Unlike Nash equilibria, correlated equilibria can be found in polynomial time,
+which makes them a fast answer for games too large for the mixed Nash solvers.
+
+The incentive constraints are built as a sparse matrix directly from the
+payoff arrays returned by StrategicGame.payoff_arrays().
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from nash_equilibrium.budget import linprog_options
+
+CORRELATED_OBJECTIVES = ["welfare", "p1", "p2", "egalitarian"]
+
+
+def incentive_constraints(A, B):
+    """Build the incentive constraints of a correlated equilibrium.
+
+    For every pair of distinct strategies (i, k) of player 1 the distribution p
+    must satisfy sum_j p[i, j] * (A[i, j] - A[k, j]) >= 0, and likewise for
+    player 2 with the roles of rows and columns swapped.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+
+    Returns:
+        Sparse matrix G with one row per constraint and one column per profile
+        (in row-major order), such that G @ p >= 0 for a correlated equilibrium
+    """
+    m, n = A.shape
+
+    # Player 1: recommended row i, deviation k != i
+    i, k = np.nonzero(~np.eye(m, dtype=bool))
+    j = np.arange(n)
+    p1_values = (A[i] - A[k]).ravel()
+    p1_rows = np.repeat(np.arange(len(i)), n)
+    p1_columns = (i[:, None] * n + j).ravel()
+
+    # Player 2: recommended column j, deviation l != j
+    jj, ll = np.nonzero(~np.eye(n, dtype=bool))
+    r = np.arange(m)
+    p2_values = (B[:, jj] - B[:, ll]).T.ravel()
+    p2_rows = len(i) + np.repeat(np.arange(len(jj)), m)
+    p2_columns = (r * n + jj[:, None]).ravel()
+
+    return sparse.csr_matrix(
+        (
+            np.concatenate([p1_values, p2_values]),
+            (np.concatenate([p1_rows, p2_rows]), np.concatenate([p1_columns, p2_columns])),
+        ),
+        shape=(len(i) + len(jj), m * n),
+    )
+
+
+def correlated_equilibrium(A, B, objective="welfare", budget=None):
+    """Find a correlated equilibrium that maximizes an objective.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+        objective: 'welfare' (sum of payoffs), 'p1' or 'p2' (one player's payoff)
+                   or 'egalitarian' (the smaller of the two payoffs)
+        budget: Optional SolveBudget, checked before the LP and bounding it by its deadline
+
+    Returns:
+        A dictionary with the equilibrium:
+        {
+            'distribution': [[...], ...],  # probability of each profile (rows x columns)
+            'expected_payoffs': (p1_payoff, p2_payoff),
+            'objective': objective,
+            'status': 'complete', or 'partial' if the budget ran out before a solution was found,
+            'error': None or error message
+        }
+
+    Raises:
+        ValueError: If objective is unknown
+    """
+    if objective not in CORRELATED_OBJECTIVES:
+        raise ValueError(f"Objective must be one of {CORRELATED_OBJECTIVES}")
+
+    stopped = {
+        "distribution": None,
+        "expected_payoffs": None,
+        "objective": objective,
+        "status": "partial",
+        "error": "Solve stopped before completion",
+    }
+    if budget is not None and budget.expired():
+        return stopped
+
+    m, n = A.shape
+    cells = m * n
+    G = incentive_constraints(A, B)
+    a, b = A.ravel(), B.ravel()
+
+    if objective == "egalitarian":
+        # Maximize t subject to a @ p >= t and b @ p >= t, with t as an extra variable
+        c = np.zeros(cells + 1)
+        c[-1] = -1.0
+        fairness = sparse.csr_matrix(np.column_stack([-np.vstack([a, b]), np.ones(2)]))
+        A_ub = sparse.vstack([sparse.hstack([-G, sparse.csr_matrix((G.shape[0], 1))]), fairness])
+        A_eq = sparse.csr_matrix(np.append(np.ones(cells), 0.0))
+        bounds = [(0, None)] * cells + [(None, None)]
+    else:
+        weights = {"welfare": a + b, "p1": a, "p2": b}[objective]
+        c = -weights
+        A_ub = -G
+        A_eq = sparse.csr_matrix(np.ones((1, cells)))
+        bounds = (0, None)
+
+    solution = linprog(
+        c,
+        A_ub=A_ub,
+        b_ub=np.zeros(A_ub.shape[0]),
+        A_eq=A_eq,
+        b_eq=[1.0],
+        bounds=bounds,
+        method="highs",
+        options=linprog_options(budget),
+    )
+    if not solution.success:
+        if budget is not None and budget.expired():
+            return stopped
+        return {
+            "distribution": None,
+            "expected_payoffs": None,
+            "objective": objective,
+            "status": "complete",
+            "error": solution.message,
+        }
+
+    p = np.clip(solution.x[:cells], 0.0, None)
+    p /= p.sum()
+    return {
+        "distribution": p.reshape(m, n).tolist(),
+        "expected_payoffs": (float(a @ p), float(b @ p)),
+        "objective": objective,
+        "status": "complete",
+        "error": None,
+    }
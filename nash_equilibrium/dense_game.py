@@ -0,0 +1,248 @@
+"""
+Dense Strategic Games
+
+This module provides DenseStrategicGame, a StrategicGame whose payoffs are
+stored as one numpy array of shape (rows, columns, 2) instead of a grid of
+(p1, p2) tuples. Games loaded from the binary formats are dense games: their
+array can be a memory map of the file, which is used without being read or
+copied.
+
+- payoff_arrays are read-only views of the array when it holds floats.
+- The grid of (p1, p2) tuples is only built when a method needs it, and the
+  best responses and pure Nash equilibria are computed on the array.
+- set_payoff writes to the array, copying it first if it is read-only.
+  Copy-on-write memory maps take the write in memory, never in the file.
+- add_payoffs fills a new array, for games of mode 'r' or 'm' reloaded from
+  a store or file.
+"""
+
+import random
+
+import numpy as np
+
+from nash_equilibrium.sparse_game import _sorted_coordinates
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+class DenseStrategicGame(StrategicGame):
+    """A 2-player strategic game with payoffs stored as one numpy array."""
+
+    def __init__(self, payoffs):
+        """Initialize a dense game.
+
+        Arguments:
+            payoffs: Array of shape (rows, columns, 2) holding the (p1, p2) payoffs of
+                     each cell, such as a memory map. It is used without being copied.
+
+        Raises:
+            ValueError: If payoffs does not have shape (rows, columns, 2) with at least one row and column
+        """
+        payoffs = np.asarray(payoffs)
+        if payoffs.ndim != 3 or payoffs.shape[2] != 2:
+            raise ValueError("payoffs must have shape (rows, columns, 2)")
+        if min(payoffs.shape[:2]) < 1:
+            raise ValueError("Game must have at least one row and one column")
+        self.payoffs = payoffs
+
+        self.mode = "d"
+        self.lower_limit = None
+        self.upper_limit = None
+        self.rows, self.columns = payoffs.shape[:2]
+
+        self.nash_equilibria = []
+        # whether find_br or find_pure_nash_equi has marked the best responses
+        self._best_responses_marked = False
+
+        self._payoff_version = 0
+        self._memo = {}
+        self._memo_token = None
+        self._last_mixed_equilibrium = None
+
+    @property
+    def grid(self):
+        """The payoff grid of (p1, p2) tuples, built from the array on first use.
+
+        Integer payoffs come back as ints and float payoffs as floats.
+        """
+
+        def compute():
+            # zip builds the (p1, p2) cells in C, much faster than a tuple() call per cell
+            p1_rows, p2_rows = self.payoffs[:, :, 0].tolist(), self.payoffs[:, :, 1].tolist()
+            return [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(p1_rows, p2_rows)]
+
+        return self._memoized("grid", compute)
+
+    @property
+    def p1_br(self):
+        """Player 1's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(1) if self._best_responses_marked else []
+
+    @property
+    def p2_br(self):
+        """Player 2's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(2) if self._best_responses_marked else []
+
+    @property
+    def grid_pure_nash(self):
+        """The payoff grid with best responses marked 'H', built on first use."""
+        grid = [list(row) for row in self.grid]
+        for column, row in self.p1_br:
+            grid[row][column] = ("H", grid[row][column][1])
+        for column, row in self.p2_br:
+            grid[row][column] = (grid[row][column][0], "H")
+        return grid
+
+    def _payoff_token(self):
+        """The array only changes through set_payoff and add_payoffs, which bump the version."""
+        return self._payoff_version
+
+    def set_payoff(self, row, col, p1_payoff, p2_payoff):
+        """Set the payoffs for a specific cell.
+
+        The array is copied first if it is read-only, and converted to floats
+        if the payoffs do not fit its integer dtype.
+
+        Arguments:
+            row: Row index
+            col: Column index
+            p1_payoff: Payoff for player 1
+            p2_payoff: Payoff for player 2
+
+        Raises:
+            IndexError: If row or col are out of bounds
+        """
+        if row < 0 or row >= self.rows:
+            raise IndexError(f"Row index {row} out of bounds (0-{self.rows - 1})")
+        if col < 0 or col >= self.columns:
+            raise IndexError(f"Column index {col} out of bounds (0-{self.columns - 1})")
+
+        values = np.array([p1_payoff, p2_payoff])
+        if not np.can_cast(values.dtype, self.payoffs.dtype, casting="same_kind"):
+            self.payoffs = self.payoffs.astype(np.result_type(self.payoffs, values))
+        elif not self.payoffs.flags.writeable:
+            self.payoffs = self.payoffs.copy()
+        self.payoffs[row, col] = values
+        self._payoff_version += 1
+
+    def add_payoffs(self, input_function=None):
+        """Add payoffs to the game's array.
+
+        For mode 'r', random payoffs are generated.
+        For mode 'm', payoffs are entered manually using the provided input_function
+        or standard input if none is provided.
+        For mode 'd', this method does nothing as payoffs are provided at initialization.
+
+        The payoffs replace the array, so a memory-mapped file is never written.
+
+        Arguments:
+            input_function: Optional function to get user input (for testing / UI abstraction)
+                           If not provided, the built - in input() function is used.
+
+        Raises:
+            ValueError: If mode is not valid
+        """
+        if self.mode == "d":
+            return
+        if self.mode not in ("r", "m"):
+            raise ValueError(f"Invalid mode: {self.mode}")
+
+        if input_function is None:
+            input_function = input
+
+        cells = []
+        for r in range(self.rows):
+            for c in range(self.columns):
+                if self.mode == "r":
+                    cells.append(
+                        (
+                            random.randint(self.lower_limit, self.upper_limit),
+                            random.randint(self.lower_limit, self.upper_limit),
+                        )
+                    )
+                else:
+                    values = input_function(f"Enter payoff for ( A{r + 1}, B{c + 1} ) = ").split(",")
+                    try:
+                        cells.append((int(values[0]), int(values[1])))
+                    except (ValueError, IndexError):
+                        raise ValueError("Payoff must be two comma - separated integers (e.g., 3, 4)")
+        self.payoffs = np.array(cells).reshape(self.rows, self.columns, 2)
+        self._payoff_version += 1
+
+    def _payoff_blocks(self, block_rows):
+        """Iterate over the payoffs in blocks of rows, without building the grid."""
+        for start in range(0, self.rows, block_rows):
+            block = self.payoffs[start : start + block_rows]
+            yield block[:, :, 0].tolist(), block[:, :, 1].tolist()
+
+    def payoff_arrays(self):
+        """Get the payoffs of both players as numpy arrays.
+
+        Float payoffs are returned as read-only views of the game's array,
+        other dtypes are converted to float.
+
+        Returns:
+            Tuple (A, B) of float arrays with shape (rows, columns)
+        """
+
+        def compute():
+            A = self.payoffs[:, :, 0].astype(float, copy=False)
+            B = self.payoffs[:, :, 1].astype(float, copy=False)
+            if np.shares_memory(A, self.payoffs):
+                # Writing to the views would change the game's payoffs
+                A, B = A.view(), B.view()
+                A.flags.writeable = B.flags.writeable = False
+            return A, B
+
+        return self._memoized("payoff_arrays", compute)
+
+    def _best_cells(self, player):
+        """Boolean array of the cells where a player's payoff is a best response."""
+        A, B = self.payoff_arrays()
+        if player == 1:
+            return A == A.max(axis=0)
+        return B == B.max(axis=1, keepdims=True)
+
+    def calculate_best_responses(self, player, update_state=False):
+        """Calculate the pure best responses of a player against each opponent strategy.
+
+        Arguments:
+            player: The player number (1 or 2)
+            update_state: Whether to mark the best responses in p1_br, p2_br and grid_pure_nash
+
+        Returns:
+            A list of (column, row) coordinates representing best responses, sorted
+            by column and then row
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+        if update_state:
+            self._best_responses_marked = True
+
+        def compute():
+            return _sorted_coordinates(*np.nonzero(self._best_cells(player)))
+
+        return list(self._memoized(("best_responses", player), compute))
+
+    def find_pure_nash_equi(self, update_state=True, budget=None):
+        """Find all pure strategy Nash equilibria.
+
+        Arguments:
+            update_state: Whether to update the class state (for backward compatibility)
+            budget: Accepted for compatibility with StrategicGame; the vectorized search is not interrupted
+
+        Returns:
+            A list of (column, row) coordinates representing Nash equilibria,
+            sorted by column and then row
+        """
+
+        def compute():
+            return _sorted_coordinates(*np.nonzero(self._best_cells(1) & self._best_cells(2)))
+
+        nash_eq = list(self._memoized("pure_nash", compute))
+        if update_state:
+            self._best_responses_marked = True
+            self.nash_equilibria = list(nash_eq)
+        return nash_eq
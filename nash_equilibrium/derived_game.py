@@ -0,0 +1,393 @@
+"""
+Derived Games
+
+This module provides DerivedGame, a StrategicGame defined as a transformation
+of a base game instead of by payoffs of its own: the base game with the
+players swapped, restricted to some strategies of each player, with negated
+payoffs, or with a few cells edited. Sensitivity studies can then derive
+thousands of variants of a game without copying its payoffs for each one.
+
+- Creating a derived game takes time and memory independent of the size of
+  the base game: it only records the transformation.
+- Its payoff_arrays are views of the base game's arrays when the
+  transformation allows it: a transpose, and strategy subsets that are
+  evenly spaced, such as ranges. Other subsets, negation and edits build
+  arrays of the derived game's own size, on first use.
+- Edits go into a copy-on-write overlay of cells, so the base game never
+  changes. set_payoff on a derived game edits its overlay.
+- Deriving a game from a derived game composes the transformations, so every
+  derived game reads its base game directly, however long the chain. Only
+  the overlay of edits is read through the intermediate derived game.
+- Like numpy views, derived games follow later changes of their base game,
+  and of the intermediate derived games, including their edits.
+
+The grid of (p1, p2) tuples is only built when a method needs it, and the
+best responses and pure Nash equilibria are computed on the payoff arrays.
+"""
+
+import numpy as np
+
+from nash_equilibrium.sparse_game import _sorted_coordinates
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def _as_index(selection, size):
+    """Normalize a selection of strategies to a range or an integer array.
+
+    Evenly spaced selections become ranges, which select views of arrays.
+
+    Arguments:
+        selection: None for every strategy, a slice, or a sequence of indices
+        size: Number of strategies to select from
+
+    Raises:
+        IndexError: If an index is out of bounds
+        ValueError: If no strategy is selected
+    """
+    if selection is None:
+        return range(size)
+    if isinstance(selection, slice):
+        index = range(size)[selection]
+    else:
+        index = np.asarray(selection, dtype=np.intp).ravel()
+        if len(index) and (index.min() < 0 or index.max() >= size):
+            raise IndexError(f"Strategy indices must be between 0 and {size - 1}")
+        if len(index) == 1:
+            index = range(int(index[0]), int(index[0]) + 1)
+        elif len(index) > 1:
+            steps = np.diff(index)
+            if steps[0] != 0 and np.all(steps == steps[0]):
+                index = range(int(index[0]), int(index[-1]) + int(steps[0]), int(steps[0]))
+    if len(index) == 0:
+        raise ValueError("A derived game needs at least one strategy for each player")
+    return index
+
+
+def _slice(index):
+    """The slice selecting a range, for lists and numpy arrays."""
+    # A negative stop would count from the end
+    return slice(index.start, index.stop if index.stop >= 0 else None, index.step)
+
+
+def _compose(outer, inner):
+    """Select the positions inner of the index outer."""
+    if isinstance(inner, range):
+        return outer[_slice(inner)]
+    if isinstance(outer, range):
+        return outer.start + outer.step * inner
+    return outer[inner]
+
+
+def _indexer(index):
+    """The numpy indexer of a range or integer array."""
+    return _slice(index) if isinstance(index, range) else index
+
+
+def _positions(index):
+    """Map each selected strategy to its positions in the selection."""
+    positions = {}
+    for position, strategy in enumerate(index):
+        positions.setdefault(int(strategy), []).append(position)
+    return positions
+
+
+class DerivedGame(StrategicGame):
+    """A 2-player strategic game defined as a transformation of a base game."""
+
+    def __init__(self, base, transpose=False, rows=None, columns=None, negate=False, edits=None):
+        """Derive a game from a base game.
+
+        The transformations are applied in the order of the arguments: first
+        the players are swapped, then strategies are selected, then payoffs
+        are negated and finally cells are edited, each in the coordinates of
+        the game produced by the previous steps.
+
+        Arguments:
+            base: StrategicGame (or subclass) to derive from
+            transpose: Whether to swap the players: player 1 of the derived game
+                       is player 2 of the base game, and the payoff matrix is transposed
+            rows: Optional indices (or a slice) of player 1's strategies to keep
+            columns: Optional indices (or a slice) of player 2's strategies to keep
+            negate: Whether to negate both players' payoffs
+            edits: Optional mapping from (row, column) to the (p1, p2) payoffs of edited cells
+
+        Raises:
+            IndexError: If a strategy index or edited cell is out of bounds
+            ValueError: If no strategy is selected for a player
+        """
+        if isinstance(base, DerivedGame):
+            # The payoffs are read from the base game, the edits through the intermediate game
+            self.base, self._parent = base.base, base
+            swap, row_index, column_index, sign = base._swap, base._rows, base._columns, base._sign
+        else:
+            self.base, self._parent = base, None
+            swap, row_index, column_index, sign = False, range(base.rows), range(base.columns), 1
+
+        if transpose:
+            swap = not swap
+            row_index, column_index = column_index, row_index
+
+        new_rows = new_columns = None
+        if rows is not None or columns is not None:
+            new_rows = _as_index(rows, len(row_index))
+            new_columns = _as_index(columns, len(column_index))
+            row_index = _compose(row_index, new_rows)
+            column_index = _compose(column_index, new_columns)
+
+        if negate:
+            sign = -sign
+
+        self._swap = swap
+        self._rows = row_index
+        self._columns = column_index
+        self._sign = sign
+        # The steps from the intermediate game's coordinates to this game's
+        self._steps = (transpose, new_rows, new_columns, negate)
+        self._own_edits = {}
+        # (token of the intermediate game, its edits in this game's coordinates)
+        self._carried = None
+
+        self.mode = "d"
+        self.lower_limit = None
+        self.upper_limit = None
+        self.rows = len(row_index)
+        self.columns = len(column_index)
+
+        self.nash_equilibria = []
+        # whether find_br or find_pure_nash_equi has marked the best responses
+        self._best_responses_marked = False
+
+        self._payoff_version = 0
+        self._memo = {}
+        self._memo_token = None
+        self._last_mixed_equilibrium = None
+
+        for (row, column), (p1, p2) in (edits or {}).items():
+            self._check_cell(row, column)
+            self._own_edits[(row, column)] = (p1, p2)
+
+    @property
+    def _edits(self):
+        """The overlay of edited cells: the intermediate game's edits, then this game's own."""
+        if self._parent is None:
+            return self._own_edits
+        token = self._parent._payoff_token()
+        if self._carried is None or self._carried[0] != token:
+            self._carried = (token, self._carry(self._parent._edits))
+        if not self._own_edits:
+            return self._carried[1]
+        overlay = dict(self._carried[1])
+        overlay.update(self._own_edits)
+        return overlay
+
+    def _carry(self, overlay):
+        """Map the intermediate game's edits to this game's coordinates."""
+        transpose, new_rows, new_columns, negate = self._steps
+        if transpose:
+            overlay = {(column, row): (p2, p1) for (row, column), (p1, p2) in overlay.items()}
+        if new_rows is not None and overlay:
+            row_positions, column_positions = _positions(new_rows), _positions(new_columns)
+            overlay = {
+                (new_row, new_column): payoffs
+                for (row, column), payoffs in overlay.items()
+                for new_row in row_positions.get(row, ())
+                for new_column in column_positions.get(column, ())
+            }
+        if negate:
+            overlay = {cell: (-p1, -p2) for cell, (p1, p2) in overlay.items()}
+        return dict(overlay)
+
+    @property
+    def edits(self):
+        """The edited cells, as a mapping from (row, column) to (p1, p2) payoffs."""
+        return dict(self._edits)
+
+    @property
+    def shares_payoffs(self):
+        """Whether payoff_arrays are views of the base game's arrays rather than copies."""
+        return (
+            self._sign == 1 and not self._edits and isinstance(self._rows, range) and isinstance(self._columns, range)
+        )
+
+    def _check_cell(self, row, col):
+        if row < 0 or row >= self.rows:
+            raise IndexError(f"Row index {row} out of bounds (0-{self.rows - 1})")
+        if col < 0 or col >= self.columns:
+            raise IndexError(f"Column index {col} out of bounds (0-{self.columns - 1})")
+
+    def _payoff_token(self):
+        """The payoffs change with the base game's payoffs and with the edits here or in the intermediate game."""
+        parent_token = self._parent._payoff_token() if self._parent is not None else None
+        return (self.base._payoff_token(), parent_token, self._payoff_version)
+
+    @property
+    def grid(self):
+        """The payoff grid of (p1, p2) tuples, built from the base game's grid on first use.
+
+        Without a transpose or negation, the cells are the base grid's own tuples.
+        """
+
+        def compute():
+            base_grid = self.base.grid
+            if self._swap:
+                # Row i of the derived game is column i of the base game
+                grid = [
+                    [(base_grid[column][row][1], base_grid[column][row][0]) for column in self._columns]
+                    for row in self._rows
+                ]
+            elif isinstance(self._columns, range):
+                grid = [base_grid[row][_slice(self._columns)] for row in self._rows]
+            else:
+                grid = [[base_grid[row][column] for column in self._columns] for row in self._rows]
+            if self._sign < 0:
+                grid = [[(-p1, -p2) for p1, p2 in row] for row in grid]
+            for (row, column), payoffs in self._edits.items():
+                grid[row][column] = payoffs
+            return grid
+
+        return self._memoized("grid", compute)
+
+    @property
+    def p1_br(self):
+        """Player 1's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(1) if self._best_responses_marked else []
+
+    @property
+    def p2_br(self):
+        """Player 2's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(2) if self._best_responses_marked else []
+
+    @property
+    def grid_pure_nash(self):
+        """The payoff grid with best responses marked 'H', built on first use."""
+        grid = [list(row) for row in self.grid]
+        for column, row in self.p1_br:
+            grid[row][column] = ("H", grid[row][column][1])
+        for column, row in self.p2_br:
+            grid[row][column] = (grid[row][column][0], "H")
+        return grid
+
+    def set_payoff(self, row, col, p1_payoff, p2_payoff):
+        """Set the payoffs of a cell in the derived game's overlay, leaving the base game unchanged.
+
+        Arguments:
+            row: Row index
+            col: Column index
+            p1_payoff: Payoff for player 1
+            p2_payoff: Payoff for player 2
+
+        Raises:
+            IndexError: If row or col are out of bounds
+        """
+        self._check_cell(row, col)
+        self._own_edits[(row, col)] = (p1_payoff, p2_payoff)
+        self._payoff_version += 1
+
+    def payoff_arrays(self):
+        """Get the payoffs of both players as numpy arrays.
+
+        When shares_payoffs is true these are read-only views of the base
+        game's payoff arrays. Otherwise they are arrays of the derived game's
+        size, built from views of the base game's arrays.
+
+        Returns:
+            Tuple (A, B) of float arrays with shape (rows, columns)
+        """
+
+        def compute():
+            A, B = self.base.payoff_arrays()
+            if self._swap:
+                A, B = B.T, A.T
+            rows, columns = _indexer(self._rows), _indexer(self._columns)
+            if isinstance(rows, slice) or isinstance(columns, slice):
+                A, B = A[rows][:, columns], B[rows][:, columns]
+            else:
+                index = np.ix_(rows, columns)
+                A, B = A[index], B[index]
+            if self._sign < 0:
+                A, B = -A, -B
+            if self._edits:
+                if self._sign > 0 and isinstance(self._rows, range) and isinstance(self._columns, range):
+                    # Copy on write: the slices are views of the base game's arrays
+                    A, B = A.copy(), B.copy()
+                for (row, column), (p1, p2) in self._edits.items():
+                    A[row, column] = p1
+                    B[row, column] = p2
+            if self.shares_payoffs:
+                # Writing to the views would change the base game
+                A, B = A.view(), B.view()
+                A.flags.writeable = B.flags.writeable = False
+            return A, B
+
+        return self._memoized("payoff_arrays", compute)
+
+    def _best_cells(self, player):
+        """Boolean array of the cells where a player's payoff is a best response."""
+        A, B = self.payoff_arrays()
+        if player == 1:
+            return A == A.max(axis=0)
+        return B == B.max(axis=1, keepdims=True)
+
+    def calculate_best_responses(self, player, update_state=False):
+        """Calculate the pure best responses of a player against each opponent strategy.
+
+        Arguments:
+            player: The player number (1 or 2)
+            update_state: Whether to mark the best responses in p1_br, p2_br and grid_pure_nash
+
+        Returns:
+            A list of (column, row) coordinates representing best responses, sorted
+            by column and then row
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+        if update_state:
+            self._best_responses_marked = True
+
+        def compute():
+            return _sorted_coordinates(*np.nonzero(self._best_cells(player)))
+
+        return list(self._memoized(("best_responses", player), compute))
+
+    def find_pure_nash_equi(self, update_state=True, budget=None):
+        """Find all pure strategy Nash equilibria.
+
+        Arguments:
+            update_state: Whether to update the class state (for backward compatibility)
+            budget: Accepted for compatibility with StrategicGame; the vectorized search is not interrupted
+
+        Returns:
+            A list of (column, row) coordinates representing Nash equilibria,
+            sorted by column and then row
+        """
+
+        def compute():
+            return _sorted_coordinates(*np.nonzero(self._best_cells(1) & self._best_cells(2)))
+
+        nash_eq = list(self._memoized("pure_nash", compute))
+        if update_state:
+            self._best_responses_marked = True
+            self.nash_equilibria = list(nash_eq)
+        return nash_eq
+
+    def materialize(self):
+        """Copy the derived game into an independent StrategicGame.
+
+        Returns:
+            StrategicGame with the same payoffs, which no longer follows the base game
+        """
+        return StrategicGame(mode="d", payoff_matrix=[list(row) for row in self.grid])
+
+    def __str__(self):
+        """Return a string representation of the game."""
+        return f"DerivedGame({self.rows}x{self.columns}, edits={len(self._edits)})"
+
+    def __repr__(self):
+        """Return a detailed string representation of the game."""
+        return (
+            f"DerivedGame(rows={self.rows}, columns={self.columns}, transposed={self._swap}, "
+            f"negated={self._sign < 0}, edits={len(self._edits)})"
+        )
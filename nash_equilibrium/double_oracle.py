@@ -0,0 +1,268 @@
+"""
+Double Oracle
+
+This module finds Nash equilibria of very large 2-player games whose
+equilibria have small supports. The double oracle solves a restricted game
+that contains only a few strategies of each player, then adds each player's
+best response against the restricted equilibrium, computed over the full
+payoff arrays, and repeats until neither player can gain by deviating.
+
+Restricted games are views of the parent game's payoff arrays: they hold the
+indices of the strategies they contain and a payoff block that grows by one
+row or column at a time, so the work per iteration scales with the size of
+the supports rather than with the size of the game.
+"""
+
+import numpy as np
+
+from nash_equilibrium import solvers
+
+
+class RestrictedGame:
+    """A view of a game restricted to a subset of each player's strategies."""
+
+    def __init__(self, A, B, rows=(0,), columns=(0,)):
+        """Initialize a restricted game.
+
+        Arguments:
+            A: Payoff array for player 1 of the full game. It is shared, not copied.
+            B: Payoff array for player 2 of the full game. It is shared, not copied.
+            rows: Indices of player 1's strategies in the restricted game
+            columns: Indices of player 2's strategies in the restricted game
+
+        Raises:
+            ValueError: If no strategies are given for a player
+        """
+        self.A = A
+        self.B = B
+        self.full_shape = A.shape
+        self._select(rows, columns)
+
+    def _select(self, rows, columns):
+        """Set the strategies of the restricted game and fetch its payoff block."""
+        if len(rows) == 0 or len(columns) == 0:
+            raise ValueError("A restricted game needs at least one strategy for each player")
+        self.rows = list(dict.fromkeys(int(i) for i in rows))
+        self.columns = list(dict.fromkeys(int(j) for j in columns))
+        self._block_A, self._block_B = self._payoff_block(self.rows, self.columns)
+
+    def _payoff_block(self, rows, columns):
+        """Get both players' payoffs for the given rows and columns of the full game.
+
+        This is the only place where payoffs of the full game are read.
+        Subclasses override it to read payoffs from other sources.
+        """
+        index = np.ix_(rows, columns)
+        return self.A[index], self.B[index]
+
+    @property
+    def shape(self):
+        """Number of strategies of each player in the restricted game."""
+        return len(self.rows), len(self.columns)
+
+    def payoff_arrays(self):
+        """Get the payoff arrays of the restricted game.
+
+        Returns:
+            Tuple (A, B) of arrays with shape (len(rows), len(columns))
+        """
+        return self._block_A, self._block_B
+
+    def add_row(self, row):
+        """Add one of player 1's strategies, reading only its restricted row.
+
+        Returns:
+            True if the strategy was added, False if it was already included
+        """
+        row = int(row)
+        if row in self.rows:
+            return False
+        self.rows.append(row)
+        block_A, block_B = self._payoff_block([row], self.columns)
+        self._block_A = np.vstack([self._block_A, block_A])
+        self._block_B = np.vstack([self._block_B, block_B])
+        return True
+
+    def add_column(self, column):
+        """Add one of player 2's strategies, reading only its restricted column.
+
+        Returns:
+            True if the strategy was added, False if it was already included
+        """
+        column = int(column)
+        if column in self.columns:
+            return False
+        self.columns.append(column)
+        block_A, block_B = self._payoff_block(self.rows, [column])
+        self._block_A = np.hstack([self._block_A, block_A])
+        self._block_B = np.hstack([self._block_B, block_B])
+        return True
+
+    def lift(self, p1_strategy, p2_strategy):
+        """Extend a profile of the restricted game to the full game.
+
+        Returns:
+            Tuple (p1_strategy, p2_strategy) of arrays over all strategies
+        """
+        x = np.zeros(self.full_shape[0])
+        y = np.zeros(self.full_shape[1])
+        x[self.rows] = p1_strategy
+        y[self.columns] = p2_strategy
+        return x, y
+
+    def best_responses(self, p1_strategy, p2_strategy, p1_candidates=None, p2_candidates=None):
+        """Find each player's best response in the full game to a restricted profile.
+
+        Only the restricted rows and columns are read, so the cost is
+        proportional to the number of candidates times the restricted size.
+
+        Arguments:
+            p1_strategy: Player 1's strategy over the restricted rows
+            p2_strategy: Player 2's strategy over the restricted columns
+            p1_candidates: Rows to search (defaults to every row of the full game)
+            p2_candidates: Columns to search (defaults to every column of the full game)
+
+        Returns:
+            Tuple (row, p1_gain, column, p2_gain) with each player's best response
+            and how much it gains over the restricted profile
+        """
+        if p1_candidates is None:
+            p1_candidates = np.arange(self.full_shape[0])
+        if p2_candidates is None:
+            p2_candidates = np.arange(self.full_shape[1])
+        p1_value = p1_strategy @ self._block_A @ p2_strategy
+        p2_value = p1_strategy @ self._block_B @ p2_strategy
+        p1_payoffs = self._payoff_block(p1_candidates, self.columns)[0] @ p2_strategy
+        p2_payoffs = p1_strategy @ self._payoff_block(self.rows, p2_candidates)[1]
+        best_row = int(np.argmax(p1_payoffs))
+        best_column = int(np.argmax(p2_payoffs))
+        return (
+            int(p1_candidates[best_row]),
+            float(p1_payoffs[best_row] - p1_value),
+            int(p2_candidates[best_column]),
+            float(p2_payoffs[best_column] - p2_value),
+        )
+
+
+def _solve_restricted(A, B, warm_start, tol):
+    """Solve a restricted game, falling back to support enumeration if pivoting fails."""
+    result = solvers.lemke_howson(A, B, warm_start=warm_start, tol=tol)
+    if result["error"] is not None:
+        result = solvers.support_enumeration(A, B, warm_start=warm_start, tol=tol)
+    return result
+
+
+def _sample(size, restricted, sample_size, rng):
+    """Candidate strategies: the restricted ones plus a random sample of the others."""
+    if sample_size is None or sample_size >= size:
+        return None
+    sample = rng.choice(size, sample_size, replace=False)
+    return np.union1d(restricted, sample)
+
+
+def grow_restricted_game(restricted, tol=1e-9, max_iterations=None, budget=None, sample_size=None, seed=None):
+    """Run the double oracle loop on a restricted game until neither player gains.
+
+    Arguments:
+        restricted: RestrictedGame to grow. It is modified in place.
+        tol: Smallest gain from a best response that counts as an improvement
+        max_iterations: Maximum number of restricted games solved
+                        (defaults to rows + columns, enough to add every strategy)
+        budget: Optional SolveBudget
+        sample_size: If given, best responses are searched among the restricted
+                     strategies and this many randomly sampled others, instead of
+                     among all strategies. The final gain then only covers the sample.
+        seed: Seed for the sampling
+
+    Returns:
+        Dictionary with the lifted profile ('p1_strategy', 'p2_strategy'),
+        'iterations', 'gain' (total best response gain at the end),
+        'status' and 'error'
+    """
+    rows, columns = restricted.full_shape
+    if max_iterations is None:
+        max_iterations = rows + columns
+    rng = np.random.default_rng(seed)
+
+    start = None
+    x = y = None
+    gain = None
+    status = "complete"
+    error = "Maximum number of iterations reached"
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        block_A, block_B = restricted.payoff_arrays()
+        result = _solve_restricted(block_A, block_B, start, tol)
+        if result["error"] is not None:
+            return {
+                "p1_strategy": None,
+                "p2_strategy": None,
+                "iterations": iteration,
+                "gain": None,
+                "status": status,
+                "error": result["error"],
+            }
+        x, y = result["p1_strategy"], result["p2_strategy"]
+
+        p1_candidates = _sample(rows, restricted.rows, sample_size, rng)
+        p2_candidates = _sample(columns, restricted.columns, sample_size, rng)
+        row, p1_gain, column, p2_gain = restricted.best_responses(x, y, p1_candidates, p2_candidates)
+        gain = max(p1_gain, 0.0) + max(p2_gain, 0.0)
+        if budget is not None:
+            budget.report(method="double_oracle", iterations=iteration, support_size=restricted.shape)
+        added = p1_gain > tol and restricted.add_row(row)
+        added = (p2_gain > tol and restricted.add_column(column)) or added
+        if not added:
+            error = None
+            break
+
+        if budget is not None and budget.expired():
+            status = "partial"
+            error = "Solve stopped before completion"
+            break
+
+        # Warm start the next restricted game from this equilibrium
+        new_rows, new_columns = restricted.shape
+        start = (np.pad(x, (0, new_rows - len(x))), np.pad(y, (0, new_columns - len(y))))
+
+    # The last restricted game may have grown since x and y were found
+    x = np.pad(x, (0, len(restricted.rows) - len(x)))
+    y = np.pad(y, (0, len(restricted.columns) - len(y)))
+    x, y = restricted.lift(x, y)
+    return {"p1_strategy": x, "p2_strategy": y, "iterations": iteration, "gain": gain, "status": status, "error": error}
+
+
+def double_oracle(A, B, warm_start=None, tol=1e-9, max_iterations=None, budget=None):
+    """Find a Nash equilibrium by growing a restricted game with best responses.
+
+    When warm started, the restricted game starts from the supports of the
+    previous equilibrium, so a game whose equilibrium barely moved is solved
+    in one or two iterations.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        warm_start: Optional (p1_strategy, p2_strategy) of a previous equilibrium
+        tol: Smallest gain from a best response that counts as an improvement
+        max_iterations: Maximum number of restricted games solved
+                        (defaults to rows + columns, enough to add every strategy)
+        budget: Optional SolveBudget
+
+    Returns:
+        Result dictionary with the equilibrium strategies
+    """
+    if warm_start is not None:
+        restricted = RestrictedGame(
+            A, B, solvers.support_of(warm_start[0], tol) or (0,), solvers.support_of(warm_start[1], tol) or (0,)
+        )
+    else:
+        restricted = RestrictedGame(A, B, (0,), (int(np.argmax(B[0])),))
+
+    found = grow_restricted_game(restricted, tol=tol, max_iterations=max_iterations, budget=budget)
+    x, y = found["p1_strategy"], found["p2_strategy"]
+    warm_started = warm_start is not None
+    if found["status"] == "partial":
+        return solvers._partial_result(
+            "double_oracle", solvers._BestProfile(A, B, (x, y)), A, B, found["iterations"], warm_started
+        )
+    return solvers._result("double_oracle", x, y, A, B, found["iterations"], warm_started, found["error"])
@@ -0,0 +1,404 @@
+"""
+Empirical Games
+
+This module provides EmpiricalGame, a StrategicGame whose payoffs are
+estimated from samples, such as the outcomes of agent simulations. Every cell
+holds the running count, mean and sum of squared deviations of the payoffs
+sampled for it, and the game is analyzed on the current means.
+
+Samples are ingested in bulk: a batch is grouped by cell and merged into the
+running statistics with the parallel form of Welford's update, so ingestion
+costs time proportional to the batch rather than to the game. The analysis is
+incremental as well: the best responses are only recomputed in the columns and
+rows a batch touched, and the mixed strategy solvers are warm started from the
+previous equilibrium.
+
+Uncertainty is reported with Student t confidence intervals on the cell means.
+Cells with fewer than two samples have unbounded intervals.
+"""
+
+import numpy as np
+from scipy import stats
+
+from nash_equilibrium.sparse_game import _sorted_coordinates
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+class EmpiricalGame(StrategicGame):
+    """A 2-player strategic game whose payoffs are running means of samples."""
+
+    def __init__(self, rows, columns, confidence=0.95):
+        """Initialize an empirical game without samples.
+
+        Cells without samples have a mean payoff of 0 until they are sampled.
+
+        Arguments:
+            rows: Number of strategies of player 1
+            columns: Number of strategies of player 2
+            confidence: Default confidence level of the reported intervals
+
+        Raises:
+            ValueError: If a size is not positive or the confidence is not in (0, 1)
+        """
+        if rows < 1 or columns < 1:
+            raise ValueError("Game must have at least one row and one column")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        self.mode = "d"
+        self.lower_limit = None
+        self.upper_limit = None
+        self.rows = rows
+        self.columns = columns
+        self.confidence = confidence
+
+        # running statistics of each cell; the last axis is the player
+        self.counts = np.zeros((rows, columns), dtype=np.int64)
+        self.means = np.zeros((rows, columns, 2))
+        self._squared_deviations = np.zeros((rows, columns, 2))
+
+        # best payoff of player 1 in each column and of player 2 in each row,
+        # and where it is reached, kept up to date as samples arrive
+        self._p1_maxima = np.zeros(columns)
+        self._p2_maxima = np.zeros(rows)
+        self._p1_best = np.ones((rows, columns), dtype=bool)
+        self._p2_best = np.ones((rows, columns), dtype=bool)
+
+        self.nash_equilibria = []
+        self._best_responses_marked = False
+
+        self._payoff_version = 0
+        self._memo = {}
+        self._memo_token = None
+        self._last_mixed_equilibrium = None
+
+    @property
+    def total_samples(self):
+        """Number of samples ingested over all cells."""
+        return int(self.counts.sum())
+
+    @property
+    def grid(self):
+        """The grid of (p1, p2) mean payoffs, built on first use after each batch."""
+
+        def compute():
+            return [[(float(p1), float(p2)) for p1, p2 in row] for row in self.means]
+
+        return self._memoized("grid", compute)
+
+    @property
+    def p1_br(self):
+        """Player 1's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(1) if self._best_responses_marked else []
+
+    @property
+    def p2_br(self):
+        """Player 2's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(2) if self._best_responses_marked else []
+
+    @property
+    def grid_pure_nash(self):
+        """The mean payoff grid with best responses marked 'H'."""
+        grid = [list(row) for row in self.grid]
+        for column, row in self.p1_br:
+            grid[row][column] = ("H", grid[row][column][1])
+        for column, row in self.p2_br:
+            grid[row][column] = (grid[row][column][0], "H")
+        return grid
+
+    def _payoff_token(self):
+        """The means only change when samples are added, which bumps the version."""
+        return self._payoff_version
+
+    def add_samples(self, rows, columns, p1_payoffs, p2_payoffs):
+        """Add a batch of sampled payoffs.
+
+        The batch is grouped by cell, and each group's count, mean and squared
+        deviations are merged into the cell's running statistics in one
+        vectorized step. Cells may appear any number of times in a batch.
+
+        Arguments:
+            rows: Row index of each sample
+            columns: Column index of each sample
+            p1_payoffs: Player 1's payoff in each sample
+            p2_payoffs: Player 2's payoff in each sample
+
+        Raises:
+            ValueError: If the arrays have different lengths or an index is out of range
+        """
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        columns = np.asarray(columns, dtype=np.int64).ravel()
+        payoffs = np.column_stack([np.asarray(p1_payoffs, dtype=float).ravel(),
+                                   np.asarray(p2_payoffs, dtype=float).ravel()])
+        if not len(rows) == len(columns) == len(payoffs):
+            raise ValueError("rows, columns and payoffs must have the same length")
+        if len(rows) == 0:
+            return
+        if rows.min() < 0 or rows.max() >= self.rows or columns.min() < 0 or columns.max() >= self.columns:
+            raise ValueError("Sample outside the game")
+
+        cells, inverse = np.unique(rows * self.columns + columns, return_inverse=True)
+        batch_counts = np.bincount(inverse)
+        batch_means = np.column_stack(
+            [np.bincount(inverse, weights=payoffs[:, p]) for p in range(2)]
+        ) / batch_counts[:, None]
+        deviations = (payoffs - batch_means[inverse]) ** 2
+        batch_squared = np.column_stack([np.bincount(inverse, weights=deviations[:, p]) for p in range(2)])
+
+        # Merge the batch statistics into the running ones (Chan et al.)
+        cell_rows, cell_columns = np.divmod(cells, self.columns)
+        old_counts = self.counts[cell_rows, cell_columns][:, None]
+        new_counts = old_counts + batch_counts[:, None]
+        delta = batch_means - self.means[cell_rows, cell_columns]
+        self.means[cell_rows, cell_columns] += delta * (batch_counts[:, None] / new_counts)
+        self._squared_deviations[cell_rows, cell_columns] += (
+            batch_squared + delta**2 * old_counts * batch_counts[:, None] / new_counts
+        )
+        self.counts[cell_rows, cell_columns] = new_counts[:, 0]
+
+        self._update_best_responses(np.unique(cell_rows), np.unique(cell_columns))
+        self._payoff_version += 1
+
+    def _update_best_responses(self, rows, columns):
+        """Recompute the best responses in the given rows and columns only."""
+        p1_block = self.means[:, columns, 0]
+        self._p1_maxima[columns] = p1_block.max(axis=0)
+        self._p1_best[:, columns] = p1_block == self._p1_maxima[columns]
+        p2_block = self.means[rows, :, 1]
+        self._p2_maxima[rows] = p2_block.max(axis=1)
+        self._p2_best[rows, :] = p2_block == self._p2_maxima[rows, None]
+
+    def set_payoff(self, row, col, p1_payoff, p2_payoff):
+        """Replace the statistics of a cell by a single sample with the given payoffs.
+
+        Arguments:
+            row: Row index
+            col: Column index
+            p1_payoff: Payoff for player 1
+            p2_payoff: Payoff for player 2
+
+        Raises:
+            IndexError: If row or col are out of bounds
+        """
+        if row < 0 or row >= self.rows:
+            raise IndexError(f"Row index {row} out of bounds (0-{self.rows - 1})")
+        if col < 0 or col >= self.columns:
+            raise IndexError(f"Column index {col} out of bounds (0-{self.columns - 1})")
+
+        self.counts[row, col] = 1
+        self.means[row, col] = (p1_payoff, p2_payoff)
+        self._squared_deviations[row, col] = 0.0
+        self._update_best_responses(np.array([row]), np.array([col]))
+        self._payoff_version += 1
+
+    def _payoff_blocks(self, block_rows):
+        """Iterate over the mean payoffs in blocks of rows, without building the grid."""
+        for start in range(0, self.rows, block_rows):
+            block = self.means[start : start + block_rows]
+            yield block[:, :, 0].tolist(), block[:, :, 1].tolist()
+
+    def payoff_arrays(self):
+        """Get the mean payoffs of both players as numpy arrays.
+
+        Returns:
+            Tuple (A, B) of float arrays with shape (rows, columns)
+        """
+        return self._memoized("payoff_arrays", lambda: (self.means[:, :, 0].copy(), self.means[:, :, 1].copy()))
+
+    def variances(self):
+        """Get the sample variance of each cell's payoffs.
+
+        Returns:
+            Array with shape (rows, columns, 2), NaN for cells with fewer than two samples
+        """
+        counts = self.counts[:, :, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 1, self._squared_deviations / (counts - 1), np.nan)
+
+    def confidence_widths(self, confidence=None):
+        """Get the half width of the confidence interval of each cell's mean payoffs.
+
+        Arguments:
+            confidence: Confidence level (defaults to the game's confidence)
+
+        Returns:
+            Array with shape (rows, columns, 2), infinite for cells with fewer than two samples
+        """
+        confidence = self.confidence if confidence is None else confidence
+
+        def compute():
+            counts = self.counts[:, :, None]
+            sampled = counts > 1
+            degrees = np.where(sampled, counts - 1, 1)
+            t = stats.t.ppf(0.5 + confidence / 2, degrees)
+            with np.errstate(invalid="ignore"):
+                widths = t * np.sqrt(self.variances() / np.where(sampled, counts, 1))
+            return np.where(sampled, widths, np.inf)
+
+        return self._memoized(("confidence_widths", confidence), compute)
+
+    def calculate_best_responses(self, player, update_state=False):
+        """Calculate the pure best responses of a player against the mean payoffs.
+
+        Arguments:
+            player: The player number (1 or 2)
+            update_state: Whether to mark the best responses in p1_br, p2_br and grid_pure_nash
+
+        Returns:
+            A list of (column, row) coordinates representing best responses, sorted
+            by column and then row
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+        if update_state:
+            self._best_responses_marked = True
+        best = self._p1_best if player == 1 else self._p2_best
+        return _sorted_coordinates(*np.nonzero(best))
+
+    def find_pure_nash_equi(self, update_state=True, budget=None):
+        """Find all pure strategy Nash equilibria of the mean payoffs.
+
+        Arguments:
+            update_state: Whether to update the class state (for backward compatibility)
+            budget: Accepted for compatibility with StrategicGame; the vectorized search is not interrupted
+
+        Returns:
+            A list of (column, row) coordinates representing Nash equilibria,
+            sorted by column and then row
+        """
+        nash_eq = _sorted_coordinates(*np.nonzero(self._p1_best & self._p2_best))
+        if update_state:
+            self._best_responses_marked = True
+            self.nash_equilibria = nash_eq
+        return nash_eq
+
+    def calculate_expected_payoffs(self, player, beliefs):
+        """Calculate a player's expected mean payoffs against a mixed strategy.
+
+        Arguments:
+            player: The player number (1 or 2)
+            beliefs: The opponent's mixed strategy (list of probabilities)
+
+        Returns:
+            A dictionary mapping strategy names to expected payoffs
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+        A, B = self.payoff_arrays()
+        if player == 1:
+            return {f"A{i + 1}": float(value) for i, value in enumerate(A @ np.asarray(beliefs, dtype=float))}
+        return {f"B{j + 1}": float(value) for j, value in enumerate(np.asarray(beliefs, dtype=float) @ B)}
+
+    def is_robust_pure_nash(self, row, column, confidence=None):
+        """Check whether a pure profile is an equilibrium for every payoff in the confidence intervals.
+
+        Arguments:
+            row: Player 1's strategy
+            column: Player 2's strategy
+            confidence: Confidence level (defaults to the game's confidence)
+
+        Returns:
+            True if no deviation can be profitable within the confidence intervals
+        """
+        widths = self.confidence_widths(confidence)
+        lower = self.means - widths
+        upper = self.means + widths
+        p1_others = np.delete(upper[:, column, 0], row)
+        p2_others = np.delete(upper[row, :, 1], column)
+        p1_robust = len(p1_others) == 0 or lower[row, column, 0] >= p1_others.max()
+        p2_robust = len(p2_others) == 0 or lower[row, column, 1] >= p2_others.max()
+        return bool(p1_robust and p2_robust)
+
+    def equilibrium_bounds(self, p1_strategy, p2_strategy, confidence=None):
+        """Bound the payoffs and regrets of a mixed profile given the confidence intervals.
+
+        Arguments:
+            p1_strategy: Player 1's mixed strategy
+            p2_strategy: Player 2's mixed strategy
+            confidence: Confidence level (defaults to the game's confidence)
+
+        Returns:
+            A dictionary with:
+            {
+                'expected_payoffs': (p1, p2) under the mean payoffs,
+                'payoff_intervals': ((low, high), (low, high)) for each player,
+                'regret_bounds': (p1, p2), the most each player could gain by
+                                 deviating if the true payoffs are anywhere in the intervals
+            }
+        """
+        x = np.asarray(p1_strategy, dtype=float)
+        y = np.asarray(p2_strategy, dtype=float)
+        widths = self.confidence_widths(confidence)
+        A, B = self.payoff_arrays()
+        # Zero probabilities must not turn infinite widths into NaN
+        x_support = x > 0
+        y_support = y > 0
+        W1 = widths[:, :, 0][np.ix_(x_support, y_support)]
+        W2 = widths[:, :, 1][np.ix_(x_support, y_support)]
+
+        values = (float(x @ A @ y), float(x @ B @ y))
+        spreads = (float(x[x_support] @ W1 @ y[y_support]), float(x[x_support] @ W2 @ y[y_support]))
+        p1_best = float(np.max(A[:, y_support] @ y[y_support] + widths[:, y_support, 0] @ y[y_support]))
+        p2_best = float(np.max(x[x_support] @ B[x_support] + x[x_support] @ widths[x_support, :, 1]))
+        return {
+            "expected_payoffs": values,
+            "payoff_intervals": tuple((value - spread, value + spread) for value, spread in zip(values, spreads)),
+            "regret_bounds": (p1_best - (values[0] - spreads[0]), p2_best - (values[1] - spreads[1])),
+        }
+
+    def confidence_report(self, pure_nash=None, mixed_nash=None, confidence=None):
+        """Report how reliable equilibria of the mean payoffs are.
+
+        Arguments:
+            pure_nash: Optional list of (column, row) pure equilibria
+            mixed_nash: Optional result of find_mixed_nash
+            confidence: Confidence level (defaults to the game's confidence)
+
+        Returns:
+            A dictionary with the confidence level, the sample counts, the robust
+            pure equilibria and, for the mixed equilibrium, equilibrium_bounds
+        """
+        confidence = self.confidence if confidence is None else confidence
+        report = {
+            "confidence": confidence,
+            "total_samples": self.total_samples,
+            "min_cell_samples": int(self.counts.min()),
+        }
+        if pure_nash is not None:
+            report["robust_pure_nash"] = [
+                (column, row) for column, row in pure_nash if self.is_robust_pure_nash(row, column, confidence)
+            ]
+        if mixed_nash is not None and mixed_nash.get("p1_strategy") is not None:
+            report["mixed_nash"] = self.equilibrium_bounds(
+                mixed_nash["p1_strategy"], mixed_nash["p2_strategy"], confidence
+            )
+        return report
+
+    def analyze(self, method="support_enumeration", confidence=None, **options):
+        """Analyze the current mean payoffs and report confidence bounds.
+
+        Calling this after every batch of samples is cheap: the pure equilibria
+        come from best responses maintained by add_samples, and the mixed solver
+        is warm started from the previous batch's equilibrium.
+
+        Arguments:
+            method: Mixed strategy solver (see find_mixed_nash)
+            confidence: Confidence level (defaults to the game's confidence)
+            **options: Extra options passed to find_mixed_nash (e.g. timeout)
+
+        Returns:
+            A dictionary with 'pure_nash', 'mixed_nash' and 'confidence' (see confidence_report)
+        """
+        pure_nash = self.find_pure_nash_equi()
+        mixed_nash = self.find_mixed_nash(method=method, **options)
+        return {
+            "pure_nash": pure_nash,
+            "mixed_nash": mixed_nash,
+            "confidence": self.confidence_report(pure_nash, mixed_nash, confidence),
+        }
@@ -0,0 +1,446 @@
+"""
+Extensive Form Games
+
+This module provides 2-player extensive form games with imperfect
+information and chance moves. Equilibria are computed through the sequence
+form, whose size is linear in the size of the game tree, instead of the
+normal form, whose size is exponential in it. A reduced normal form view
+compatible with StrategicGame is available for small trees.
+"""
+
+import itertools
+
+import numpy as np
+
+from nash_equilibrium import solvers
+from nash_equilibrium.budget import make_budget
+
+
+class TerminalNode:
+    """A leaf of the game tree."""
+
+    def __init__(self, payoffs):
+        """Initialize a leaf.
+
+        Arguments:
+            payoffs: Pair (p1_payoff, p2_payoff)
+        """
+        if len(payoffs) != 2:
+            raise ValueError("Terminal payoffs must be a pair (p1_payoff, p2_payoff)")
+        self.payoffs = tuple(payoffs)
+
+
+class ChanceNode:
+    """A node where nature picks a child at random."""
+
+    def __init__(self, probabilities, children):
+        """Initialize a chance node.
+
+        Arguments:
+            probabilities: Probability of each child
+            children: Child nodes
+
+        Raises:
+            ValueError: If the probabilities are invalid
+        """
+        if len(probabilities) != len(children) or not children:
+            raise ValueError("A chance node needs one probability per child")
+        if min(probabilities) < 0 or abs(sum(probabilities) - 1.0) > 1e-6:
+            raise ValueError("Chance probabilities must be non-negative and sum to 1")
+        self.probabilities = list(probabilities)
+        self.children = list(children)
+
+
+class DecisionNode:
+    """A node where a player picks an action."""
+
+    def __init__(self, player, infoset, actions, children):
+        """Initialize a decision node.
+
+        Arguments:
+            player: The player to move (1 or 2)
+            infoset: Name of the information set the node belongs to
+            actions: Names of the actions available at the information set
+            children: Child node reached by each action
+
+        Raises:
+            ValueError: If player is not 1 or 2 or actions and children don't match
+        """
+        if player not in [1, 2]:
+            raise ValueError("player must be 1 or 2")
+        if len(actions) != len(children) or not children:
+            raise ValueError("A decision node needs one child per action")
+        self.player = player
+        self.infoset = infoset
+        self.actions = list(actions)
+        self.children = list(children)
+
+
+def node_from_dict(spec):
+    """Build a game tree from nested dictionaries.
+
+    Leaves are {'payoffs': [p1, p2]}, chance nodes are
+    {'chance': [[probability, child], ...]} and decision nodes are
+    {'player': 1, 'infoset': 'name', 'actions': {'action': child, ...}}.
+
+    Arguments:
+        spec: Nested dictionary describing the tree
+
+    Returns:
+        The root node
+    """
+    if "payoffs" in spec:
+        return TerminalNode(spec["payoffs"])
+    if "chance" in spec:
+        return ChanceNode([p for p, _ in spec["chance"]], [node_from_dict(child) for _, child in spec["chance"]])
+    actions = list(spec["actions"])
+    children = [node_from_dict(spec["actions"][action]) for action in actions]
+    return DecisionNode(spec["player"], spec["infoset"], actions, children)
+
+
+class ExtensiveFormGame:
+    """A 2-player extensive form game with perfect recall, solved through the sequence form."""
+
+    def __init__(self, root):
+        """Initialize the game and build its sequence form.
+
+        Arguments:
+            root: Root node, or a nested dictionary accepted by node_from_dict
+
+        Raises:
+            ValueError: If the tree is inconsistent or players lack perfect recall
+        """
+        if isinstance(root, dict):
+            root = node_from_dict(root)
+        self.root = root
+        # sequences[p][0] is the empty sequence, the rest are (infoset, action) pairs
+        self.sequences = ([None], [None])
+        # infosets[p] lists dicts with the name, actions, parent sequence and child sequences
+        self.infosets = ([], [])
+        self._infoset_index = ({}, {})
+        self._reduced_normal_form = None
+        self._build_sequence_form()
+
+    def _build_sequence_form(self):
+        """Traverse the tree once, collecting sequences and the sequence form payoffs."""
+        leaves = {}
+        stack = [(self.root, 0, 0, 1.0)]
+        while stack:
+            node, seq1, seq2, reach = stack.pop()
+            if isinstance(node, TerminalNode):
+                cell = leaves.setdefault((seq1, seq2), [0.0, 0.0, 0.0])
+                cell[0] += reach * node.payoffs[0]
+                cell[1] += reach * node.payoffs[1]
+                cell[2] += reach
+            elif isinstance(node, ChanceNode):
+                for probability, child in zip(node.probabilities, node.children):
+                    if probability > 0:
+                        stack.append((child, seq1, seq2, reach * probability))
+            elif isinstance(node, DecisionNode):
+                own = seq1 if node.player == 1 else seq2
+                children = self._register_infoset(node, own)
+                for child_seq, child in zip(children, node.children):
+                    if node.player == 1:
+                        stack.append((child, child_seq, seq2, reach))
+                    else:
+                        stack.append((child, seq1, child_seq, reach))
+            else:
+                raise ValueError(f"Unknown node type: {type(node).__name__}")
+
+        n1, n2 = len(self.sequences[0]), len(self.sequences[1])
+        self.payoff_matrices = (np.zeros((n1, n2)), np.zeros((n1, n2)))
+        self._reach = np.zeros((n1, n2))
+        if leaves:
+            index = tuple(np.array(list(leaves)).T)
+            values = np.array(list(leaves.values()))
+            self.payoff_matrices[0][index] = values[:, 0]
+            self.payoff_matrices[1][index] = values[:, 1]
+            self._reach[index] = values[:, 2]
+
+    def _register_infoset(self, node, parent):
+        """Record the node's information set and return its child sequence indices."""
+        p = node.player - 1
+        index = self._infoset_index[p].get(node.infoset)
+        if index is None:
+            children = list(range(len(self.sequences[p]), len(self.sequences[p]) + len(node.actions)))
+            self.sequences[p].extend((node.infoset, action) for action in node.actions)
+            self._infoset_index[p][node.infoset] = len(self.infosets[p])
+            self.infosets[p].append(
+                {"name": node.infoset, "actions": list(node.actions), "parent": parent, "children": children}
+            )
+            return children
+
+        infoset = self.infosets[p][index]
+        if infoset["actions"] != node.actions:
+            raise ValueError(f"Nodes in information set {node.infoset} have different actions")
+        if infoset["parent"] != parent:
+            raise ValueError(f"Information set {node.infoset} violates perfect recall")
+        return infoset["children"]
+
+    def constraint_matrix(self, player):
+        """Build the sequence form constraints E x = e for a player.
+
+        Row 0 fixes the empty sequence to 1; every other row says that the
+        realization probabilities of an information set's actions add up to
+        the probability of the sequence leading to it.
+
+        Arguments:
+            player: The player number (1 or 2)
+
+        Returns:
+            Tuple (E, e) of numpy arrays
+        """
+        p = player - 1
+        E = np.zeros((len(self.infosets[p]) + 1, len(self.sequences[p])))
+        E[0, 0] = 1.0
+        for row, infoset in enumerate(self.infosets[p], start=1):
+            E[row, infoset["parent"]] = -1.0
+            E[row, infoset["children"]] = 1.0
+        e = np.zeros(E.shape[0])
+        e[0] = 1.0
+        return E, e
+
+    def behavior_to_realization(self, player, behavior):
+        """Convert a behavior strategy into a realization plan.
+
+        Arguments:
+            player: The player number (1 or 2)
+            behavior: Dictionary mapping information sets to lists of action probabilities
+
+        Returns:
+            Realization plan as a numpy array over the player's sequences
+        """
+        p = player - 1
+        plan = np.zeros(len(self.sequences[p]))
+        plan[0] = 1.0
+        for infoset in self.infosets[p]:
+            plan[infoset["children"]] = plan[infoset["parent"]] * np.asarray(behavior[infoset["name"]], dtype=float)
+        return plan
+
+    def realization_to_behavior(self, player, plan):
+        """Convert a realization plan into a behavior strategy.
+
+        Information sets that the plan never reaches get uniform probabilities.
+
+        Arguments:
+            player: The player number (1 or 2)
+            plan: Realization plan over the player's sequences
+
+        Returns:
+            Dictionary mapping information sets to lists of action probabilities
+        """
+        behavior = {}
+        for infoset in self.infosets[player - 1]:
+            mass = np.clip(plan[infoset["children"]], 0.0, None)
+            total = mass.sum()
+            if total > 1e-12:
+                behavior[infoset["name"]] = (mass / total).tolist()
+            else:
+                behavior[infoset["name"]] = [1.0 / len(mass)] * len(mass)
+        return behavior
+
+    def best_response_value(self, player, opponent_plan):
+        """Calculate the best payoff a player can get against an opponent's realization plan.
+
+        Arguments:
+            player: The player number (1 or 2)
+            opponent_plan: The opponent's realization plan
+
+        Returns:
+            The best response payoff
+        """
+        p = player - 1
+        if player == 1:
+            values = self.payoff_matrices[0] @ opponent_plan
+        else:
+            values = opponent_plan @ self.payoff_matrices[1]
+        # Information sets are stored parents first, so a reverse pass is bottom up
+        for infoset in reversed(self.infosets[p]):
+            values[infoset["parent"]] += values[infoset["children"]].max()
+        return float(values[0])
+
+    def expected_payoffs(self, p1_plan, p2_plan):
+        """Calculate both players' expected payoffs for a pair of realization plans.
+
+        Returns:
+            Tuple (p1_payoff, p2_payoff)
+        """
+        return float(p1_plan @ self.payoff_matrices[0] @ p2_plan), float(p1_plan @ self.payoff_matrices[1] @ p2_plan)
+
+    def exploitability(self, p1_plan, p2_plan):
+        """Calculate the total gain available to the players by deviating."""
+        p1_payoff, p2_payoff = self.expected_payoffs(p1_plan, p2_plan)
+        return self.best_response_value(1, p2_plan) - p1_payoff + self.best_response_value(2, p1_plan) - p2_payoff
+
+    def solve(self, tol=1e-6, deadline=None, timeout=None, cancel_token=None, progress=None, budget=None):
+        """Find a Nash equilibrium by solving the sequence form LCP with Lemke's algorithm.
+
+        Payoffs are first shifted to be negative, which does not change the
+        equilibria but lets the equality constraints E x = e be relaxed to
+        inequalities, turning the problem into a standard LCP.
+
+        Arguments:
+            tol: Maximum exploitability accepted for the equilibrium
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces the four options above)
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'p1_behavior': {infoset: [probabilities]},
+                'p2_behavior': {infoset: [probabilities]},
+                'p1_realization': [...], 'p2_realization': [...],
+                'expected_payoffs': (p1_payoff, p2_payoff),
+                'exploitability': total gain available from deviating,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+        A, B = self.payoff_matrices
+        E, e = self.constraint_matrix(1)
+        F, f = self.constraint_matrix(2)
+        n1, n2 = A.shape
+        m1, m2 = len(e), len(f)
+
+        # Positive costs: leaf payoffs shifted below zero and negated
+        leaf_payoffs = [node.payoffs for node in self._leaves()]
+        cost1 = (max(u[0] for u in leaf_payoffs) + 1.0) * self._reach - A
+        cost2 = (max(u[1] for u in leaf_payoffs) + 1.0) * self._reach - B
+
+        size = n1 + n2 + m1 + m2
+        M = np.zeros((size, size))
+        M[:n1, n1 : n1 + n2] = cost1
+        M[:n1, n1 + n2 : n1 + n2 + m1] = -E.T
+        M[n1 : n1 + n2, :n1] = cost2.T
+        M[n1 : n1 + n2, n1 + n2 + m1 :] = -F.T
+        M[n1 + n2 : n1 + n2 + m1, :n1] = E
+        M[n1 + n2 + m1 :, n1 : n1 + n2] = F
+        q = np.concatenate([np.zeros(n1 + n2), -e, -f])
+
+        z, pivots = solvers.lemke(M, q, budget=budget)
+        status = "complete"
+        error = None
+        if z is None:
+            status = "partial" if budget is not None and budget.expired() else "complete"
+            error = "Solve stopped before completion" if status == "partial" else "Lemke's algorithm did not converge"
+            p1_behavior = self.realization_to_behavior(1, np.zeros(n1))
+            p2_behavior = self.realization_to_behavior(2, np.zeros(n2))
+        else:
+            p1_behavior = self.realization_to_behavior(1, z[:n1])
+            p2_behavior = self.realization_to_behavior(2, z[n1 : n1 + n2])
+
+        x = self.behavior_to_realization(1, p1_behavior)
+        y = self.behavior_to_realization(2, p2_behavior)
+        gain = self.exploitability(x, y)
+        if error is None and gain > tol:
+            error = "Lemke's algorithm did not find an equilibrium"
+
+        return {
+            "p1_behavior": p1_behavior,
+            "p2_behavior": p2_behavior,
+            "p1_realization": x.tolist(),
+            "p2_realization": y.tolist(),
+            "expected_payoffs": self.expected_payoffs(x, y),
+            "exploitability": gain,
+            "iterations": pivots,
+            "status": status,
+            "error": error,
+        }
+
+    def _leaves(self):
+        """Yield every terminal node of the tree."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, TerminalNode):
+                yield node
+            else:
+                stack.extend(node.children)
+
+    def _reduced_plans(self, player):
+        """Enumerate the reduced pure strategies of a player as 0/1 realization plans."""
+        p = player - 1
+        below = {}
+        for index, infoset in enumerate(self.infosets[p]):
+            below.setdefault(infoset["parent"], []).append(index)
+
+        def choices(sequence):
+            # Pick one action at every information set directly below the sequence, then recurse
+            options = []
+            for index in below.get(sequence, []):
+                infoset = self.infosets[p][index]
+                options.append([[child] + rest for child in infoset["children"] for rest in choices(child)])
+            return [sum(combination, []) for combination in itertools.product(*options)]
+
+        plans = []
+        for chosen in choices(0):
+            plan = np.zeros(len(self.sequences[p]))
+            plan[0] = 1.0
+            plan[chosen] = 1.0
+            plans.append(plan)
+        return np.array(plans)
+
+    def count_reduced_strategies(self, player):
+        """Count a player's reduced pure strategies without enumerating them."""
+        p = player - 1
+        below = {}
+        for infoset in self.infosets[p]:
+            below.setdefault(infoset["parent"], []).append(infoset)
+
+        counts = {}
+        # Child sequences always have higher indices than their parents
+        for sequence in reversed(range(len(self.sequences[p]))):
+            count = 1
+            for infoset in below.get(sequence, []):
+                count *= sum(counts[child] for child in infoset["children"])
+            counts[sequence] = count
+        return counts[0]
+
+    def reduced_normal_form(self, max_cells=10**6):
+        """Get the reduced normal form of the game as a StrategicGame.
+
+        The view is built on first use and then reused. Rows and columns are
+        the players' reduced pure strategies, in the order returned by
+        get_reduced_strategies.
+
+        Arguments:
+            max_cells: Refuse to build games with more cells than this
+
+        Returns:
+            StrategicGame with the expected payoffs of every pair of reduced strategies
+
+        Raises:
+            ValueError: If the reduced normal form has more than max_cells cells
+        """
+        from nash_equilibrium.strategic_game import StrategicGame
+
+        if self._reduced_normal_form is None:
+            cells = self.count_reduced_strategies(1) * self.count_reduced_strategies(2)
+            if cells > max_cells:
+                raise ValueError(f"The reduced normal form has {cells} cells, more than max_cells={max_cells}")
+            R1, R2 = self._reduced_plans(1), self._reduced_plans(2)
+            p1_payoffs = (R1 @ self.payoff_matrices[0] @ R2.T).tolist()
+            p2_payoffs = (R1 @ self.payoff_matrices[1] @ R2.T).tolist()
+            grid = [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(p1_payoffs, p2_payoffs)]
+            self._reduced_normal_form = StrategicGame(mode="d", payoff_matrix=grid)
+        return self._reduced_normal_form
+
+    def get_reduced_strategies(self, player):
+        """Describe a player's reduced pure strategies.
+
+        Arguments:
+            player: The player number (1 or 2)
+
+        Returns:
+            List of dictionaries mapping the information sets a strategy reaches to the chosen action
+        """
+        p = player - 1
+        strategies = []
+        for plan in self._reduced_plans(player):
+            chosen = np.flatnonzero(plan[1:]) + 1
+            strategies.append({self.sequences[p][s][0]: self.sequences[p][s][1] for s in chosen})
+        return strategies
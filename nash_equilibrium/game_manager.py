@@ -3,10 +3,37 @@ Game Manager Module
 
 This module provides a service layer between user interfaces
 (CLI or Web) and the core StrategicGame class.
+
+Games are kept in a storage backend (see the storage module): in memory by
+default, or in a SQLite file shared by several processes.
+
+A GameManager can be shared by the threads of a multi-threaded server. Game
+IDs are allocated atomically by the store, games are looked up without a
+global lock, and analysis never marks best responses on the shared games, so
+concurrent analyses of the same game do not interfere.
+
+With deduplicate=True, creating a game with the same content as a stored one
+returns the stored game and its ID instead of storing a copy, so repeated
+requests for the same game share its memory and its cached analysis. Each
+creation counts as a reference, and delete_game only removes the game when
+its last reference is deleted. The digests and references are kept by the
+store, so processes sharing a SQLite store deduplicate each other's games.
+
+Long analyses can also run in the background on the manager's JobQueue (see
+the jobs module): submit_analysis returns a job ID right away, and get_job
+and cancel_job poll and stop the job, from any process sharing a SQLite store.
 """
 
-import json
+import inspect
 
+from nash_equilibrium import json_stream, npz_format, security, snapshot
+from nash_equilibrium.budget import make_budget
+from nash_equilibrium.derived_game import DerivedGame
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.jobs import JobQueue
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.storage import MemoryStore, SQLiteStore
 from nash_equilibrium.strategic_game import (
     StrategicGame,
     create_battle_of_sexes,
@@ -22,10 +49,26 @@ NormalForm = StrategicGame
 class GameManager:
     """Manages game creation, analysis, and serialization."""
 
-    def __init__(self):
-        """Initialize the GameManager."""
-        self.games = {}
-        self.next_game_id = 1
+    def __init__(self, store=None, deduplicate=False, jobs=None):
+        """Initialize the GameManager.
+
+        Arguments:
+            store: Optional GameStore keeping the games (a new MemoryStore by default).
+                   Use storage.SQLiteStore to share games between processes.
+            deduplicate: Whether games with identical content share one stored game and ID
+            jobs: Optional JobQueue running submitted analyses (by default a new JobQueue,
+                  keeping the jobs' states in the store if it is a SQLiteStore)
+        """
+        self.store = store if store is not None else MemoryStore()
+        if jobs is None:
+            jobs = JobQueue(store=self.store if isinstance(self.store, SQLiteStore) else None)
+        self.jobs = jobs
+        self.deduplicate = deduplicate
+
+    @property
+    def games(self):
+        """The stored games, as a read-only mapping from game ID to game."""
+        return self.store
 
     def create_game(self, mode, rows=None, columns=None, payoff_matrix=None, lower_limit=-99, upper_limit=99):
         """Create a new game.
@@ -50,11 +93,80 @@ class GameManager:
             upper_limit=upper_limit,
         )
 
-        game_id = str(self.next_game_id)
-        self.games[game_id] = game
-        self.next_game_id += 1
+        return self._store_game(game)
+
+    def create_n_player_game(self, mode, strategies=None, payoffs=None, lower_limit=-99, upper_limit=99):
+        """Create a new game with any number of players.
+
+        Arguments:
+            mode: 'r' for random or 'd' for a direct payoff tensor
+            strategies: Number of strategies of each player (required for 'r')
+            payoffs: Payoff tensor of shape (N, s1, ..., sN) (required for 'd')
+            lower_limit: Lower limit for random payoffs
+            upper_limit: Upper limit for random payoffs
+
+        Returns:
+            Tuple of (game_id, game)
+        """
+        game = NPlayerGame(
+            mode=mode, strategies=strategies, payoffs=payoffs, lower_limit=lower_limit, upper_limit=upper_limit
+        )
+
+        return self._store_game(game)
+
+    def create_sparse_game(self, p1_payoffs, p2_payoffs):
+        """Create a new game stored as one sparse payoff matrix per player.
+
+        Arguments:
+            p1_payoffs: Player 1's payoffs as a scipy sparse matrix or array-like
+            p2_payoffs: Player 2's payoffs as a scipy sparse matrix or array-like
+
+        Returns:
+            Tuple of (game_id, game)
+        """
+        return self._store_game(SparseStrategicGame(p1_payoffs, p2_payoffs))
+
+    def create_empirical_game(self, rows, columns, confidence=0.95):
+        """Create a new game whose payoffs are estimated from samples.
+
+        Arguments:
+            rows: Number of strategies of player 1
+            columns: Number of strategies of player 2
+            confidence: Default confidence level of the reported intervals
+
+        Returns:
+            Tuple of (game_id, game)
+        """
+        return self._store_game(EmpiricalGame(rows, columns, confidence=confidence))
+
+    def derive_game(self, game_id, transpose=False, rows=None, columns=None, negate=False, edits=None):
+        """Create a new game derived from a stored 2-player game, sharing its payoffs.
+
+        The derived game is a view of the stored game (see DerivedGame) as
+        long as it stays in memory. Stores that serialize games, such as
+        SQLiteStore, save it as a copy of its payoffs.
+
+        Arguments:
+            game_id: ID of the base game
+            transpose: Whether to swap the players
+            rows: Optional indices of player 1's strategies to keep
+            columns: Optional indices of player 2's strategies to keep
+            negate: Whether to negate both players' payoffs
+            edits: Optional mapping from (row, column) to the (p1, p2) payoffs of edited cells
 
-        return game_id, game
+        Returns:
+            Tuple of (game_id, game)
+
+        Raises:
+            KeyError: If game_id is not found
+            ValueError: If the game is an N-player game or no strategy is selected
+            IndexError: If a strategy index or edited cell is out of bounds
+        """
+        base = self.get_game(game_id)
+        if isinstance(base, NPlayerGame):
+            raise ValueError("Only 2-player games can be derived")
+        game = DerivedGame(base, transpose=transpose, rows=rows, columns=columns, negate=negate, edits=edits)
+        return self._store_game(game)
 
     def create_common_game(self, game_type, **kwargs):
         """Create a common game type.
@@ -78,11 +190,32 @@ class GameManager:
         else:
             raise ValueError(f"Unknown game type: {game_type}")
 
-        game_id = str(self.next_game_id)
-        self.games[game_id] = game
-        self.next_game_id += 1
+        return self._store_game(game)
+
+    def _store_game(self, game):
+        """Store a game under the next free ID, or return the stored game with the same content.
+
+        Empirical games are never deduplicated, as their samples are added in place.
 
-        return game_id, game
+        Returns:
+            Tuple of (game_id, game)
+        """
+        if not self.deduplicate or isinstance(game, EmpiricalGame):
+            return self.store.add(game), game
+        return self.store.add_by_content(game)
+
+    def reference_count(self, game_id):
+        """Number of creations that returned a game, which delete_game must each undo to remove it.
+
+        Games not created with deduplicate=True have a single reference.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        try:
+            return self.store.references(game_id)
+        except KeyError:
+            raise KeyError(f"Game with ID {game_id} not found") from None
 
     def get_game(self, game_id):
         """Get a game by ID.
@@ -96,35 +229,138 @@ class GameManager:
         Raises:
             KeyError: If game_id is not found
         """
-        if game_id not in self.games:
-            raise KeyError(f"Game with ID {game_id} not found")
+        try:
+            return self.store.get(game_id)
+        except KeyError:
+            raise KeyError(f"Game with ID {game_id} not found") from None
 
-        return self.games[game_id]
+    def save_game(self, game_id, game=None):
+        """Write the current state of a game back to the store.
 
-    def analyze_game(self, game_id, find_nash=True, find_mixed=True):
+        Games changed in place, e.g. with set_payoff or EmpiricalGame.add_samples,
+        must be saved to be seen by other processes sharing a SQLite store.
+        Saving is not needed with the default in-memory store.
+
+        Arguments:
+            game_id: ID of the game
+            game: The game to store under game_id (defaults to the game returned by get_game)
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        try:
+            self.store.put(game_id, game if game is not None else self.store.get(game_id))
+        except KeyError:
+            raise KeyError(f"Game with ID {game_id} not found") from None
+
+    def delete_game(self, game_id):
+        """Delete a game.
+
+        A game shared by several creations with deduplicate=True only loses one
+        reference, and is removed from the store with its last one.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        try:
+            self.store.release(game_id)
+        except KeyError:
+            raise KeyError(f"Game with ID {game_id} not found") from None
+
+    def analyze_game(
+        self,
+        game_id,
+        find_nash=True,
+        find_mixed=True,
+        mixed_method=None,
+        find_correlated=False,
+        find_security=False,
+        find_welfare=False,
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+    ):
         """Analyze a game for Nash equilibria.
 
         Arguments:
             game_id: ID of the game
             find_nash: Whether to find pure Nash equilibria
             find_mixed: Whether to calculate mixed strategy Nash equilibrium
+            mixed_method: Optional solver for games of any size ('support_enumeration',
+                          'lemke_howson', 'fictitious_play', 'logit_qre' or 'double_oracle').
+                          Solvers are warm started from the game's previous equilibrium.
+                          If not given, the mixed equilibrium is only calculated for 2x2 games.
+            find_correlated: Whether to calculate the welfare-maximizing correlated
+                             equilibrium. Pass an objective ('welfare', 'p1', 'p2' or
+                             'egalitarian') to maximize something else.
+            find_security: Whether to calculate both players' maxmin (security)
+                           strategies and values
+            find_welfare: Whether to report the Pareto optimal and welfare-maximizing
+                          outcomes and the prices of anarchy and stability
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds for the whole analysis
+            cancel_token: Optional CancellationToken to stop the analysis early
+            progress: Optional callback receiving progress dictionaries
 
         Returns:
-            Dictionary with analysis results
+            Dictionary with analysis results. For an EmpiricalGame it also has a
+            'confidence' key with the confidence bounds of the equilibria found.
+            When a time limit or cancellation token is given, every section checks
+            it, and the result also has a 'status' key that is 'partial' if the
+            analysis was cut short. The sections not started by then are left
+            out, and the section that was running reports what it found so far.
 
         Raises:
             KeyError: If game_id is not found
+            ValueError: If a solver or objective is unknown or not supported for the game
         """
         game = self.get_game(game_id)
+        budget = make_budget(None, deadline, timeout, cancel_token, progress)
 
-        result = {}
+        result = {} if budget is None else {"status": "complete"}
 
-        if find_nash:
-            # Find pure Nash equilibria
-            nash_eq = game.find_pure_nash_equi()
-            result["pure_nash"] = nash_eq
+        def stopped():
+            """Check the budget before a section, marking the result partial once it ran out."""
+            if budget is not None and budget.expired():
+                result["status"] = "partial"
+                return True
+            return False
 
-        if find_mixed and game.rows == 2 and game.columns == 2:
+        if find_nash and not stopped():
+            # Find pure Nash equilibria without marking them on the shared game
+            nash_eq = game.find_pure_nash_equi(update_state=False, budget=budget)
+            result["pure_nash"] = nash_eq
+            # The search stops early when the budget runs out
+            stopped()
+
+        if isinstance(game, NPlayerGame):
+            if find_mixed and mixed_method is not None:
+                raise ValueError("Mixed strategy solvers only support 2-player games")
+            if find_correlated:
+                raise ValueError("Correlated equilibria are only supported for 2-player games")
+            if find_security:
+                raise ValueError("Security strategies are only supported for 2-player games")
+            if find_welfare:
+                raise ValueError("Welfare analysis is only supported for 2-player games")
+            return result
+
+        if find_correlated and not stopped():
+            objective = "welfare" if find_correlated is True else find_correlated
+            result["correlated"] = game.find_correlated_equilibrium(objective=objective, budget=budget)
+
+        if find_security and not stopped():
+            result["security"] = game.find_security_strategies(budget=budget)
+
+        if find_welfare and not stopped():
+            result["welfare"] = game.analyze_welfare(budget=budget)
+
+        if find_mixed and stopped():
+            return result
+
+        if find_mixed and mixed_method is not None:
+            result["mixed_nash"] = game.find_mixed_nash(method=mixed_method, budget=budget)
+        elif find_mixed and game.rows == 2 and game.columns == 2:
             # Calculate mixed strategy Nash equilibrium
             mixed_eq = game.get_indifference_probabilities()
             if isinstance(mixed_eq, list):
@@ -136,18 +372,112 @@ class GameManager:
             else:
                 result["mixed_nash"] = mixed_eq
 
+        if isinstance(game, EmpiricalGame):
+            result["confidence"] = game.confidence_report(result.get("pure_nash"), result.get("mixed_nash"))
+
+        for key in ("correlated", "security", "welfare", "mixed_nash"):
+            if budget is not None and result.get(key, {}).get("status") == "partial":
+                result["status"] = "partial"
+
         return result
 
-    def calculate_expected_payoffs(self, game_id, p1_strategy, p2_strategy):
+    def submit_analysis(self, game_id, **options):
+        """Queue an analysis to run in the background.
+
+        Arguments:
+            game_id: ID of the game
+            **options: Options of analyze_game, except cancel_token and progress
+                       which the job provides
+
+        Returns:
+            The job ID, to pass to get_job and cancel_job
+
+        Raises:
+            KeyError: If game_id is not found
+            TypeError: If an option is unknown
+            jobs.JobQueueFull: If the queue already holds its maximum number of waiting jobs
+        """
+        if "cancel_token" in options or "progress" in options:
+            raise TypeError("cancel_token and progress are provided by the job")
+        inspect.signature(self.analyze_game).bind(game_id, **options)
+        self.get_game(game_id)
+        return self.jobs.submit(self.analyze_game, game_id, **options)
+
+    def get_job(self, job_id, wait=None):
+        """Get the state of a submitted analysis.
+
+        Arguments:
+            job_id: ID returned by submit_analysis
+            wait: Optional number of seconds to wait for the job to finish
+
+        Returns:
+            Dictionary with the job's 'status' ('queued', 'running', 'done',
+            'failed' or 'cancelled') and 'progress', and the analysis 'result'
+            of a finished job or the 'error' of a failed one
+
+        Raises:
+            KeyError: If job_id is unknown or its job is older than the retention time
+        """
+        if wait is None:
+            return self.jobs.status(job_id)
+        return self.jobs.wait(job_id, timeout=wait)
+
+    def cancel_job(self, job_id):
+        """Cancel a submitted analysis.
+
+        A running analysis stops early and keeps its partial result.
+
+        Returns:
+            Whether the job was still waiting or running
+
+        Raises:
+            KeyError: If job_id is unknown
+        """
+        return self.jobs.cancel(job_id)
+
+    def find_security_strategies(self, game_ids):
+        """Find the security strategies of many games at once.
+
+        The maxmin LPs of all games without a memoized result are solved as a
+        few large batched LPs, and the results are memoized in each game, so
+        later calls and analyze_game(find_security=True) reuse them.
+
+        Arguments:
+            game_ids: IDs of 2-player games
+
+        Returns:
+            Dictionary mapping each game ID to the result of
+            StrategicGame.find_security_strategies
+
+        Raises:
+            KeyError: If a game_id is not found
+            ValueError: If a game is not a 2-player game
+        """
+        games = {game_id: self.get_game(game_id) for game_id in game_ids}
+        if any(isinstance(game, NPlayerGame) for game in games.values()):
+            raise ValueError("Security strategies are only supported for 2-player games")
+
+        pending = {}
+        for game in games.values():
+            if not game._is_memoized("security"):
+                pending[id(game)] = game
+        solved = security.security_strategies_many([game.payoff_arrays() for game in pending.values()])
+        for game, found in zip(pending.values(), solved):
+            game._memoized("security", lambda found=found: found)
+
+        return {game_id: game.find_security_strategies() for game_id, game in games.items()}
+
+    def calculate_expected_payoffs(self, game_id, p1_strategy, p2_strategy, *other_strategies):
         """Calculate expected payoffs with mixed strategies.
 
         Arguments:
             game_id: ID of the game
             p1_strategy: Player 1's mixed strategy (list of probabilities)
             p2_strategy: Player 2's mixed strategy (list of probabilities)
+            *other_strategies: Mixed strategies of players 3, 4, ... for N-player games
 
         Returns:
-            Tuple of (p1_payoff, p2_payoff)
+            Tuple of (p1_payoff, p2_payoff, ...)
 
         Raises:
             KeyError: If game_id is not found
@@ -155,7 +485,7 @@ class GameManager:
         """
         game = self.get_game(game_id)
 
-        return game.ep_bpm(p1_strategy, p2_strategy)
+        return game.ep_bpm(p1_strategy, p2_strategy, *other_strategies)
 
     def generate_random_beliefs(self, game_id, mode="dirichlet"):
         """Generate random mixed strategies.
@@ -172,39 +502,107 @@ class GameManager:
         """
         game = self.get_game(game_id)
 
+        if isinstance(game, NPlayerGame):
+            return game.create_random_beliefs()
         return game.create_random_beliefs(mode)
 
-    def export_game(self, game_id, format="json"):
+    def export_game(self, game_id, format="json", fields=None, exclude=()):
         """Export a game to a specific format.
 
         Arguments:
             game_id: ID of the game
-            format: Export format ('json', 'dict')
+            format: Export format ('json', 'dict' or 'npz'). 'npz' is the binary
+                    format of the npz_format module, which stores each payoff array
+                    once together with the game's memoized analysis results
+            fields: Names of the to_dict fields to export with 'json' or 'dict'
+                    (defaults to all)
+            exclude: Names of fields to leave out with 'json' or 'dict', e.g.
+                     json_stream.REDUNDANT_FIELDS
 
         Returns:
-            Game in requested format
+            Game in requested format ('npz' returns bytes)
 
         Raises:
             KeyError: If game_id is not found
-            ValueError: If format is not supported
+            ValueError: If format is not supported or a field name is unknown
         """
         game = self.get_game(game_id)
-        game_dict = game.to_dict()
-
-        if format == "json":
-            # Convert NumPy values to Python native types for JSON serialization
-            def convert_numpy(obj):
-                if isinstance(obj, (list, tuple)):
-                    return [convert_numpy(item) for item in obj]
-                if isinstance(obj, dict):
-                    return {k: convert_numpy(v) for k, v in obj.items()}
-                if hasattr(obj, "tolist"):  # NumPy arrays, float64, etc.
-                    return obj.tolist()
-                return obj
-
-            game_dict = convert_numpy(game_dict)
-            return json.dumps(game_dict)
+        if format == "npz":
+            return npz_format.dumps_npz(game)
+        elif format == "json":
+            return "".join(json_stream.iter_game_json(game, fields=fields, exclude=exclude))
         elif format == "dict":
-            return game_dict
+            return game.to_dict(fields=fields, exclude=exclude)
         else:
             raise ValueError(f"Unsupported export format: {format}")
+
+    def stream_game_json(self, game_id, fields=None, exclude=(), chunk_size=8192):
+        """Export a game as JSON in chunks, for writing to a file or a streamed response.
+
+        Arguments:
+            game_id: ID of the game
+            fields: Names of the to_dict fields to export (defaults to all)
+            exclude: Names of fields to leave out
+            chunk_size: Approximate number of payoffs encoded per chunk
+
+        Returns:
+            Iterator over strings whose concatenation is the JSON export
+
+        Raises:
+            KeyError: If game_id is not found
+            ValueError: If a field name is unknown
+        """
+        game = self.get_game(game_id)
+        return json_stream.iter_game_json(game, fields=fields, exclude=exclude, chunk_size=chunk_size)
+
+    def import_game(self, source, mmap=True):
+        """Import a game exported with format='npz' or saved with npz_format.save_npz.
+
+        Arguments:
+            source: Path to the archive, or the archive as bytes
+            mmap: Whether to memory map the payoff arrays of an archive given by path
+
+        Returns:
+            Tuple of (game_id, game)
+
+        Raises:
+            ValueError: If source is not a saved game
+        """
+        return self._store_game(npz_format.load_npz(source, mmap=mmap))
+
+    def save_snapshot(self, path, analysis=True):
+        """Save every stored game, with its ID and cached analysis results, into one archive.
+
+        Arguments:
+            path: Path of the snapshot archive (an existing file is replaced)
+            analysis: Whether to save the games' memoized analysis results
+
+        Returns:
+            Number of games saved
+        """
+        games = ((game_id, self.store.get(game_id)) for game_id in self.store.ids())
+        return snapshot.write_snapshot(path, games, analysis=analysis)
+
+    def load_snapshot(self, path, lazy=True):
+        """Restore the games of a snapshot under their saved IDs.
+
+        With the in-memory store and lazy=True, only the snapshot's index is
+        read: each game is decoded when it is first used. Other stores receive
+        all the games at once.
+
+        Arguments:
+            path: Path of an archive written by save_snapshot
+            lazy: Whether to decode games on first use instead of right away
+
+        Returns:
+            Number of games restored
+
+        Raises:
+            ValueError: If the file is not a snapshot or a game ID is already used
+        """
+        archive = snapshot.Snapshot(path)
+        if lazy and isinstance(self.store, MemoryStore):
+            self.store.attach_snapshot(archive)
+        else:
+            self.store.insert_many((game_id, archive.load(game_id)) for game_id in archive.ids())
+        return len(archive)
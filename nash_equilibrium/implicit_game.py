@@ -0,0 +1,305 @@
+"""
+Implicit Games
+
+This module provides ImplicitGame, a 2-player game whose payoffs are given by
+a function payoff_function(row, column) -> (p1_payoff, p2_payoff) instead of a
+stored grid. It is meant for games where every payoff comes from an expensive
+computation, such as a simulator run, so only the cells a solver actually
+reads are evaluated.
+
+Evaluated cells are memoized in a cache that can be bounded, in which case
+the least recently used cells are evicted first. When a solver needs a block
+of cells, the missing ones are evaluated in batches, in parallel if an
+executor (e.g. concurrent.futures.ThreadPoolExecutor) is given.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from nash_equilibrium import double_oracle
+from nash_equilibrium.budget import make_budget
+
+
+class ImplicitRestrictedGame(double_oracle.RestrictedGame):
+    """A restricted game whose payoffs are read from an ImplicitGame."""
+
+    def __init__(self, game, rows=(0,), columns=(0,)):
+        """Initialize a restricted view of an implicit game.
+
+        Arguments:
+            game: ImplicitGame the payoffs are read from
+            rows: Indices of player 1's strategies in the restricted game
+            columns: Indices of player 2's strategies in the restricted game
+        """
+        self.game = game
+        self.full_shape = game.shape
+        self._select(rows, columns)
+
+    def _payoff_block(self, rows, columns):
+        """Read the block from the implicit game, evaluating only missing cells."""
+        return self.game.payoff_block(rows, columns)
+
+
+class ImplicitGame:
+    """A 2-player game whose payoffs are evaluated on demand by a function."""
+
+    def __init__(self, payoff_function, rows, columns, cache_size=None, executor=None, batch_size=64):
+        """Initialize an implicit game.
+
+        Arguments:
+            payoff_function: Callable (row, column) -> (p1_payoff, p2_payoff)
+            rows: Number of strategies of player 1
+            columns: Number of strategies of player 2
+            cache_size: Maximum number of evaluated cells kept in memory (None for no limit)
+            executor: Optional concurrent.futures executor used to evaluate batches in parallel.
+                      A ProcessPoolExecutor needs a payoff_function that can be pickled.
+            batch_size: Number of missing cells submitted to the executor at once
+
+        Raises:
+            ValueError: If a size is not positive
+        """
+        if rows < 1 or columns < 1:
+            raise ValueError("An implicit game needs at least one strategy for each player")
+        if cache_size is not None and cache_size < 1:
+            raise ValueError("cache_size must be positive or None")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.payoff_function = payoff_function
+        self.rows = rows
+        self.columns = columns
+        self.cache_size = cache_size
+        self.executor = executor
+        self.batch_size = batch_size
+        self._cache = OrderedDict()
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    @property
+    def shape(self):
+        """Number of strategies of each player."""
+        return self.rows, self.columns
+
+    @property
+    def cached_cells(self):
+        """Number of evaluated cells currently in the cache."""
+        return len(self._cache)
+
+    def clear_cache(self):
+        """Forget every evaluated cell."""
+        self._cache.clear()
+
+    def _check_indices(self, indices, size, player):
+        """Raise ValueError if a strategy index is out of range."""
+        if len(indices) and (min(indices) < 0 or max(indices) >= size):
+            raise ValueError(f"Strategy index out of range for player {player}")
+
+    def _store(self, cell, value):
+        """Add an evaluated cell to the cache, evicting the least recently used ones."""
+        self._cache[cell] = value
+        if self.cache_size is not None:
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _evaluate(self, cells):
+        """Evaluate a batch of cells with the payoff function."""
+        rows = [row for row, _ in cells]
+        columns = [column for _, column in cells]
+        if self.executor is None:
+            values = map(self.payoff_function, rows, columns)
+        else:
+            values = self.executor.map(self.payoff_function, rows, columns)
+        result = []
+        for value in values:
+            try:
+                p1, p2 = value
+                result.append((float(p1), float(p2)))
+            except (TypeError, ValueError):
+                raise ValueError("The payoff function must return a (p1_payoff, p2_payoff) pair") from None
+        self.evaluations += len(cells)
+        return result
+
+    def cell(self, row, column):
+        """Get the payoffs of one cell, evaluating it if it is not cached.
+
+        Returns:
+            Tuple (p1_payoff, p2_payoff)
+        """
+        A, B = self.payoff_block([row], [column])
+        return float(A[0, 0]), float(B[0, 0])
+
+    def payoff_block(self, rows, columns):
+        """Get both players' payoffs for the given rows and columns.
+
+        Cached cells are read from the cache and the missing ones are evaluated
+        in batches of batch_size, through the executor if there is one.
+
+        Arguments:
+            rows: Indices of player 1's strategies
+            columns: Indices of player 2's strategies
+
+        Returns:
+            Tuple (A, B) of arrays with shape (len(rows), len(columns))
+
+        Raises:
+            ValueError: If an index is out of range
+        """
+        rows = [int(i) for i in rows]
+        columns = [int(j) for j in columns]
+        self._check_indices(rows, self.rows, 1)
+        self._check_indices(columns, self.columns, 2)
+
+        A = np.empty((len(rows), len(columns)))
+        B = np.empty((len(rows), len(columns)))
+        missing = {}
+        for i, row in enumerate(rows):
+            for j, column in enumerate(columns):
+                value = self._cache.get((row, column))
+                if value is None:
+                    missing.setdefault((row, column), []).append((i, j))
+                    continue
+                self._cache.move_to_end((row, column))
+                self.cache_hits += 1
+                A[i, j], B[i, j] = value
+
+        cells = list(missing)
+        for start in range(0, len(cells), self.batch_size):
+            batch = cells[start : start + self.batch_size]
+            for cell, value in zip(batch, self._evaluate(batch)):
+                self._store(cell, value)
+                for i, j in missing[cell]:
+                    A[i, j], B[i, j] = value
+        return A, B
+
+    def best_response(self, player, opponent_strategy, candidates=None):
+        """Find a player's best response to a mixed strategy of the opponent.
+
+        Only the cells in the opponent's support and the candidate strategies
+        are evaluated, so searching a sample of candidates keeps the cost low.
+
+        Arguments:
+            player: The player number (1 or 2)
+            opponent_strategy: Probabilities over all of the opponent's strategies
+            candidates: Strategies of the player to search (defaults to all of them)
+
+        Returns:
+            Tuple (strategy, expected_payoff) of the best candidate
+
+        Raises:
+            ValueError: If player is not 1 or 2, or the strategy has the wrong length
+        """
+        if player not in (1, 2):
+            raise ValueError("Player must be either 1 or 2")
+        own, opponent = (self.rows, self.columns) if player == 1 else (self.columns, self.rows)
+        opponent_strategy = np.asarray(opponent_strategy, dtype=float)
+        if len(opponent_strategy) != opponent:
+            raise ValueError(f"Expected a strategy over {opponent} strategies")
+        if candidates is None:
+            candidates = range(own)
+        candidates = [int(c) for c in candidates]
+        support = np.flatnonzero(opponent_strategy > 0)
+
+        if player == 1:
+            payoffs = self.payoff_block(candidates, support)[0] @ opponent_strategy[support]
+        else:
+            payoffs = opponent_strategy[support] @ self.payoff_block(support, candidates)[1]
+        best = int(np.argmax(payoffs))
+        return candidates[best], float(payoffs[best])
+
+    def restrict(self, rows, columns):
+        """Get a view of the game restricted to some strategies of each player.
+
+        Arguments:
+            rows: Indices of player 1's strategies to keep
+            columns: Indices of player 2's strategies to keep
+
+        Returns:
+            ImplicitRestrictedGame view
+        """
+        return ImplicitRestrictedGame(self, rows, columns)
+
+    def find_double_oracle_equilibrium(
+        self,
+        tol=1e-9,
+        max_iterations=None,
+        sample_size=None,
+        seed=None,
+        rows=(0,),
+        columns=(0,),
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+        budget=None,
+    ):
+        """Find a Nash equilibrium with the double oracle, evaluating only the cells it reads.
+
+        Each iteration evaluates the best responses of both players against the
+        restricted equilibrium, which needs the cells between the candidates and
+        the restricted strategies. With sample_size, best responses are searched
+        among the restricted strategies and a random sample of the others, so an
+        iteration evaluates O(sample_size x support) cells. The result is then an
+        equilibrium against the sampled deviations only, and 'gain' is a lower
+        bound of the true exploitability.
+
+        Arguments:
+            tol: Smallest gain from a best response that counts as an improvement
+            max_iterations: Maximum number of restricted games solved
+            sample_size: Number of strategies sampled per player and iteration (None searches all)
+            seed: Seed for the sampling
+            rows: Initial strategies of player 1
+            columns: Initial strategies of player 2
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces deadline, timeout, cancel_token and progress)
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'p1_strategy': [...],  # Player 1's strategy over all rows
+                'p2_strategy': [...],  # Player 2's strategy over all columns
+                'expected_payoffs': (p1_payoff, p2_payoff),
+                'iterations': number of restricted games solved,
+                'gain': total best response gain found in the last iteration,
+                'sampled': whether best responses were searched on samples,
+                'evaluations': number of cells evaluated so far by this game,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+        restricted = self.restrict(rows, columns)
+        found = double_oracle.grow_restricted_game(
+            restricted, tol=tol, max_iterations=max_iterations, budget=budget, sample_size=sample_size, seed=seed
+        )
+        x, y = found["p1_strategy"], found["p2_strategy"]
+        expected = None
+        if x is not None:
+            A, B = restricted.payoff_arrays()
+            x_restricted, y_restricted = x[restricted.rows], y[restricted.columns]
+            expected = (float(x_restricted @ A @ y_restricted), float(x_restricted @ B @ y_restricted))
+            x, y = x.tolist(), y.tolist()
+        return {
+            "p1_strategy": x,
+            "p2_strategy": y,
+            "expected_payoffs": expected,
+            "iterations": found["iterations"],
+            "gain": found["gain"],
+            "sampled": sample_size is not None and sample_size < max(self.shape),
+            "evaluations": self.evaluations,
+            "status": found["status"],
+            "error": found["error"],
+        }
+
+    def to_strategic_game(self):
+        """Evaluate every cell and build the equivalent StrategicGame.
+
+        Returns:
+            StrategicGame with the same payoffs
+        """
+        from nash_equilibrium.strategic_game import StrategicGame
+
+        A, B = self.payoff_block(range(self.rows), range(self.columns))
+        return StrategicGame(mode="d", payoff_matrix=np.stack([A, B], axis=-1).tolist())
@@ -0,0 +1,421 @@
+"""
+Analysis Jobs
+
+This module runs long analyses in the background, so that a caller can
+submit one, get a job ID back right away and poll for its result instead of
+waiting for the solve to finish.
+
+A JobQueue runs jobs on a bounded pool of worker threads, started on the
+first submission. Jobs wait in a queue of bounded depth: submitting to a full
+queue raises JobQueueFull instead of letting the backlog grow. Each job gets
+a CancellationToken and a progress callback, so cancelling a running job
+stops its solver early with its partial result. Finished jobs are kept for a
+retention time, then forgotten.
+
+Jobs run in the process that submitted them. Given a SQLiteStore, a JobQueue
+also keeps the state of its jobs in the store's jobs table, so that every
+process sharing the store, such as the workers of a gunicorn server, can poll
+any job and cancel it: the process running the job picks up the cancellation
+with the job's next progress report.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from nash_equilibrium.budget import CancellationToken
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+# Seconds between writes of a running job's progress to a shared store, and between polls of a job run elsewhere
+_SYNC_INTERVAL = 0.25
+
+
+def _jsonable(value):
+    """Convert the numpy values of a result for json.dumps."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _describe(record, now):
+    """Describe a job's state from its record (see Job.to_dict)."""
+    # A job cancelled while waiting stopped waiting when it finished
+    left_queue = next((moment for moment in (record["started"], record["finished"]) if moment is not None), now)
+    ended = record["finished"] if record["finished"] is not None else now
+    info = {
+        "job_id": record["job_id"],
+        "status": record["status"],
+        "progress": record["progress"],
+        "queued_seconds": left_queue - record["submitted"],
+        "running_seconds": ended - record["started"] if record["started"] is not None else 0.0,
+    }
+    if record["status"] in (DONE, CANCELLED):
+        info["result"] = record["result"]
+    elif record["status"] == FAILED:
+        info["error"] = record["error"]
+    return info
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted to a queue holding its maximum number of waiting jobs."""
+
+    pass
+
+
+class Job:
+    """A submitted job and its state."""
+
+    def __init__(self, function, args, kwargs, submitted):
+        """Initialize a queued job.
+
+        Arguments:
+            function: Function called with the job's arguments and its cancel_token and progress
+            args: Positional arguments of function
+            kwargs: Keyword arguments of function
+            submitted: Submission time, from the queue's clock
+        """
+        self.job_id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.cancel_token = CancellationToken()
+        self.submitted = submitted
+        self.started = None
+        self.finished = None
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        self._exception = None
+        self._done = threading.Event()
+        # time.monotonic() of the last write to a shared store
+        self._synced = None
+
+    def _report(self, info):
+        """Progress callback: keep the latest progress information."""
+        self.progress = dict(info)
+
+    def record(self):
+        """The job's state as a dictionary, as kept in a shared store."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+    def to_dict(self, now):
+        """Describe the job's state.
+
+        Arguments:
+            now: Current time, from the queue's clock
+
+        Returns:
+            Dictionary with the job ID, status, latest progress and seconds spent
+            waiting and running, plus the result of a finished job (possibly
+            partial if it was cancelled) or the error of a failed one
+        """
+        return _describe(self.record(), now)
+
+
+class JobQueue:
+    """Runs jobs on a bounded pool of worker threads."""
+
+    def __init__(self, workers=2, max_queued=100, retention=3600.0, clock=None, store=None):
+        """Initialize an empty queue.
+
+        Arguments:
+            workers: Number of jobs run at the same time
+            max_queued: Maximum number of jobs waiting for a worker
+            retention: Seconds a finished job is kept after it finished
+            clock: Function returning the current time in seconds, for the retention
+                   (time.time with a store, whose processes must agree on the time,
+                   otherwise time.monotonic)
+            store: Optional SQLiteStore keeping the state of the jobs, so that every
+                   process sharing it can poll and cancel them
+        """
+        if workers < 1:
+            raise ValueError("A job queue needs at least one worker")
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.store = store
+        if clock is None:
+            clock = time.time if store is not None else time.monotonic
+        self._clock = clock
+        # job_id -> Job, in submission order
+        self._jobs = {}
+        self._waiting = deque()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._threads = []
+        self._shut_down = False
+
+    def _purge(self):
+        """Forget the finished jobs older than the retention time. Call with the lock held."""
+        now = self._clock()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished is not None and now - job.finished > self.retention
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _save(self, job):
+        """Write a job's state to the shared store, if any."""
+        if self.store is None:
+            return
+        job._synced = time.monotonic()
+        record = json.loads(json.dumps(job.record(), default=_jsonable))
+        self.store.save_job(job.job_id, record, finished=job.finished)
+
+    def _progress(self, job, info):
+        """Progress callback of a job: keep the report and sync with the shared store now and then."""
+        job._report(info)
+        if self.store is None or time.monotonic() - job._synced < _SYNC_INTERVAL:
+            return
+        self._save(job)
+        if self.store.load_job(job.job_id)[1]:
+            job.cancel_token.cancel()
+
+    def _remote(self, job_id):
+        """Read the state of a job of another process from the shared store.
+
+        Returns:
+            Tuple (record, cancel_requested)
+
+        Raises:
+            KeyError: If there is no store or the job is not in it
+        """
+        if self.store is None:
+            raise KeyError(f"Job with ID {job_id} not found")
+        try:
+            return self.store.load_job(job_id)
+        except KeyError:
+            raise KeyError(f"Job with ID {job_id} not found") from None
+
+    def _job(self, job_id):
+        """Look up a job. Call with the lock held."""
+        self._purge()
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise KeyError(f"Job with ID {job_id} not found") from None
+
+    def submit(self, function, *args, **kwargs):
+        """Queue a job.
+
+        The job calls function(*args, cancel_token=..., progress=..., **kwargs),
+        passing the job's CancellationToken and a progress callback.
+
+        Returns:
+            The job ID
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+            RuntimeError: If the queue was shut down
+        """
+        with self._lock:
+            if self._shut_down:
+                raise RuntimeError("The job queue was shut down")
+            self._purge()
+            if len(self._waiting) >= self.max_queued:
+                raise JobQueueFull(f"{len(self._waiting)} jobs are already waiting")
+            job = Job(function, args, kwargs, self._clock())
+            if self.store is not None:
+                self.store.purge_jobs(job.submitted - self.retention)
+                self._save(job)
+            self._jobs[job.job_id] = job
+            self._waiting.append(job)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run_worker, name="nash-job-worker", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._work.notify()
+        return job.job_id
+
+    def _run_worker(self):
+        """Run queued jobs until the queue is shut down."""
+        while True:
+            with self._lock:
+                while not self._waiting and not self._shut_down:
+                    self._work.wait()
+                if not self._waiting:
+                    return
+                job = self._waiting.popleft()
+                job.status = RUNNING
+                job.started = self._clock()
+
+            if self.store is not None:
+                if self.store.load_job(job.job_id)[1]:
+                    # Cancelled by another process while it was waiting
+                    job.cancel_token.cancel()
+                self._save(job)
+            progress = job._report if self.store is None else lambda info, job=job: self._progress(job, info)
+            try:
+                result = job._function(*job._args, cancel_token=job.cancel_token, progress=progress, **job._kwargs)
+            except Exception as e:
+                status, result, job._exception = FAILED, None, e
+                # KeyError quotes its message when converted to a string
+                job.error = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            else:
+                status = CANCELLED if job.cancel_token.cancelled else DONE
+
+            with self._lock:
+                job.result = result
+                job.status = status
+                job.finished = self._clock()
+                # Release the arguments, such as games, while the job is retained
+                job._function = job._args = job._kwargs = None
+            self._save(job)
+            job._done.set()
+
+    def status(self, job_id):
+        """Describe a job's state (see Job.to_dict), including jobs of other processes sharing the store.
+
+        Raises:
+            KeyError: If job_id is unknown or its job was forgotten after the retention time
+        """
+        with self._lock:
+            if job_id in self._jobs or self.store is None:
+                return self._job(job_id).to_dict(self._clock())
+        return _describe(self._remote(job_id)[0], self._clock())
+
+    def wait(self, job_id, timeout=None):
+        """Wait until a job finishes, then describe its state.
+
+        Arguments:
+            job_id: ID of the job
+            timeout: Optional maximum number of seconds to wait
+
+        Returns:
+            The job's state, which is still queued or running if the timeout expired
+
+        Raises:
+            KeyError: If job_id is unknown
+        """
+        with self._lock:
+            job = self._job(job_id) if job_id in self._jobs or self.store is None else None
+        if job is not None:
+            job._done.wait(timeout)
+            with self._lock:
+                return job.to_dict(self._clock())
+
+        # A job of another process: poll the store
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            record = self._remote(job_id)[0]
+            if record["status"] in FINISHED_STATUSES or (deadline is not None and time.monotonic() >= deadline):
+                return _describe(record, self._clock())
+            pause = _SYNC_INTERVAL if deadline is None else min(_SYNC_INTERVAL, max(deadline - time.monotonic(), 0))
+            time.sleep(pause)
+
+    def result(self, job_id, timeout=None):
+        """Wait until a job of this process finishes and return its result.
+
+        Returns:
+            The function's return value (None for a job cancelled before it started)
+
+        Raises:
+            KeyError: If job_id is unknown
+            TimeoutError: If the job did not finish within timeout seconds
+            Exception: The exception raised by a failed job
+        """
+        with self._lock:
+            job = self._job(job_id)
+        if not job._done.wait(timeout):
+            raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds")
+        if job._exception is not None:
+            raise job._exception
+        return job.result
+
+    def cancel(self, job_id):
+        """Cancel a job.
+
+        A waiting job is removed from the queue. A running job is asked to stop
+        through its CancellationToken, and keeps the partial result its
+        function returns. Jobs of other processes sharing the store are
+        cancelled by the process running them, when it next syncs the job.
+
+        Returns:
+            Whether the job was still waiting or running
+
+        Raises:
+            KeyError: If job_id is unknown
+        """
+        with self._lock:
+            local = job_id in self._jobs or self.store is None
+        if not local:
+            if self._remote(job_id)[0]["status"] in FINISHED_STATUSES:
+                return False
+            self.store.request_job_cancel(job_id)
+            return True
+
+        with self._lock:
+            job = self._job(job_id)
+            if job.status == RUNNING:
+                job.cancel_token.cancel()
+                return True
+            if job.status != QUEUED:
+                return False
+            self._waiting.remove(job)
+            job.cancel_token.cancel()
+            job.status = CANCELLED
+            job.finished = self._clock()
+            job._function = job._args = job._kwargs = None
+        self._save(job)
+        job._done.set()
+        return True
+
+    def jobs(self):
+        """States of every job of this process kept, in submission order."""
+        with self._lock:
+            self._purge()
+            now = self._clock()
+            return [job.to_dict(now) for job in self._jobs.values()]
+
+    def shutdown(self, wait=True, cancel=False):
+        """Stop the workers once the waiting jobs have run.
+
+        Arguments:
+            wait: Whether to wait for the workers to finish
+            cancel: Whether to cancel the waiting and running jobs instead of running them
+        """
+        with self._lock:
+            self._shut_down = True
+            cancelled = []
+            if cancel:
+                now = self._clock()
+                while self._waiting:
+                    job = self._waiting.popleft()
+                    job.status = CANCELLED
+                    job.finished = now
+                    cancelled.append(job)
+                for job in self._jobs.values():
+                    job.cancel_token.cancel()
+            self._work.notify_all()
+        for job in cancelled:
+            self._save(job)
+            job._done.set()
+        if wait:
+            for thread in list(self._threads):
+                thread.join()
@@ -0,0 +1,113 @@
+"""
+Streaming JSON Export
+
+This module writes the JSON representation of a game (the fields of its
+to_dict method) as a stream of text chunks, for large games whose JSON would
+otherwise be built three times in memory: as the to_dict dictionary, as its
+numpy-free copy and as the final string.
+
+The payoff fields are written block by block from the game's own storage
+(the grid of a StrategicGame, the sparse matrices of a SparseStrategicGame,
+the mean array of an EmpiricalGame or the payoff tensor of an NPlayerGame),
+each block encoded by one json.dumps call, so only one block of rows is
+converted to Python values at a time. The other fields are small and are
+encoded whole.
+
+The output is the same JSON as json.dumps of to_dict. Field selection can
+leave out fields such as p1_payoffs and p2_payoffs, which repeat the
+payoffs already in payoff_matrix.
+"""
+
+import json
+
+# Fields repeating the payoffs of payoff_matrix
+REDUNDANT_FIELDS = ("p1_payoffs", "p2_payoffs")
+
+# Fields of 2-player games written block by block
+_PAYOFF_FIELDS = ("payoff_matrix", "p1_payoffs", "p2_payoffs")
+
+
+def _default(obj):
+    """Encode numpy arrays and scalars that json cannot encode natively."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _payoff_chunks(game, name, block_rows):
+    """Encode one payoff field of a 2-player game block by block."""
+    yield "["
+    separator = ""
+    for p1_rows, p2_rows in game._payoff_blocks(block_rows):
+        if name == "payoff_matrix":
+            rows = [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(p1_rows, p2_rows)]
+        else:
+            rows = p1_rows if name == "p1_payoffs" else p2_rows
+        if rows:
+            # Strip the brackets of the block's list to splice its rows into the field's
+            yield separator + json.dumps(rows, default=_default)[1:-1]
+            separator = ", "
+    yield "]"
+
+
+def _array_chunks(array, chunk_size):
+    """Encode a numpy array, splitting it along its leading axes into chunks."""
+    if array.ndim <= 1 or array.size <= chunk_size:
+        yield json.dumps(array.tolist())
+        return
+    yield "["
+    for index, part in enumerate(array):
+        if index:
+            yield ", "
+        yield from _array_chunks(part, chunk_size)
+    yield "]"
+
+
+def _chunks(game, selected, chunk_size):
+    """Encode the selected fields of a game."""
+    block_rows = max(1, chunk_size // max(getattr(game, "columns", 1), 1))
+    yield "{"
+    for index, (name, compute) in enumerate(selected.items()):
+        yield (", " if index else "") + json.dumps(name) + ": "
+        if name in _PAYOFF_FIELDS and hasattr(game, "_payoff_blocks"):
+            yield from _payoff_chunks(game, name, block_rows)
+        elif name == "payoffs" and hasattr(game, "num_players"):
+            yield from _array_chunks(game.payoffs, chunk_size)
+        else:
+            yield json.dumps(compute(), default=_default)
+    yield "}"
+
+
+def iter_game_json(game, fields=None, exclude=(), chunk_size=8192):
+    """Encode a game as JSON in chunks.
+
+    Arguments:
+        game: StrategicGame, SparseStrategicGame, EmpiricalGame or NPlayerGame
+        fields: Names of the to_dict fields to include (defaults to all)
+        exclude: Names of fields to leave out, e.g. REDUNDANT_FIELDS
+        chunk_size: Approximate number of payoffs encoded per chunk
+
+    Returns:
+        Iterator over strings whose concatenation is the JSON document
+
+    Raises:
+        ValueError: If a field name is unknown (raised before any chunk is produced)
+    """
+    return _chunks(game, game._serialized_fields(fields, exclude), chunk_size)
+
+
+def write_game_json(game, file, fields=None, exclude=(), chunk_size=8192):
+    """Write a game as JSON to a text file object, one chunk at a time.
+
+    Arguments:
+        game: The game
+        file: Text file object to write to
+        fields: Names of the to_dict fields to include (defaults to all)
+        exclude: Names of fields to leave out
+        chunk_size: Approximate number of payoffs encoded per chunk
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    for chunk in iter_game_json(game, fields=fields, exclude=exclude, chunk_size=chunk_size):
+        file.write(chunk)
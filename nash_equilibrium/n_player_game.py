@@ -0,0 +1,292 @@
+"""
+N-Player Normal Form Games
+
+This module provides NPlayerGame, a normal form game for any number of
+players backed by a single payoff tensor of shape (N, s1, ..., sN), where
+payoffs[p] holds player p + 1's payoff for every strategy profile.
+"""
+
+import string
+
+import numpy as np
+
+from nash_equilibrium.utils import select_fields
+
+
+class NPlayerGame:
+    """A normal form game with any number of players."""
+
+    def __init__(self, mode="d", strategies=None, payoffs=None, lower_limit=-99, upper_limit=99):
+        """Initialize an N-player game.
+
+        Arguments:
+            mode: 'r' for random payoffs or 'd' for a direct payoff tensor
+            strategies: Number of strategies of each player, e.g. (2, 3, 2).
+                        Required if mode is 'r'.
+            payoffs: Array-like of shape (N, s1, ..., sN). Required if mode is 'd'.
+            lower_limit: lower limit for random payoffs if mode is 'r'
+            upper_limit: upper limit for random payoffs if mode is 'r'
+
+        Raises:
+            ValueError: if mode is invalid, required parameters are missing or
+                        the payoff tensor has the wrong shape
+        """
+        valid_modes = ["r", "d"]
+        if mode not in valid_modes:
+            raise ValueError(f"Mode must be one of {valid_modes}")
+
+        self.mode = mode
+        self.lower_limit = lower_limit
+        self.upper_limit = upper_limit
+
+        if mode == "d":
+            if payoffs is None:
+                raise ValueError("payoffs must be provided when mode is 'd'")
+            payoffs = np.asarray(payoffs)
+            if payoffs.ndim < 2 or payoffs.shape[0] != payoffs.ndim - 1:
+                raise ValueError("payoffs must have shape (N, s1, ..., sN) for N players")
+        else:
+            if strategies is None:
+                raise ValueError("strategies must be provided when mode is 'r'")
+            strategies = tuple(int(s) for s in strategies)
+            payoffs = np.random.randint(lower_limit, upper_limit + 1, size=(len(strategies),) + strategies)
+
+        if payoffs.shape[0] > len(string.ascii_uppercase):
+            raise ValueError(f"At most {len(string.ascii_uppercase)} players are supported")
+        if min(payoffs.shape[1:]) < 1:
+            raise ValueError("Every player must have at least one strategy")
+
+        self.payoffs = payoffs
+        self.num_players = payoffs.shape[0]
+        self.strategies = payoffs.shape[1:]
+
+        # a list of strategy profiles (one index per player) that are Nash equilibria
+        self.nash_equilibria = []
+
+    @classmethod
+    def from_strategic_game(cls, game):
+        """Create an NPlayerGame from a 2-player StrategicGame.
+
+        Arguments:
+            game: StrategicGame to convert
+
+        Returns:
+            NPlayerGame with the same payoffs
+        """
+        A, B = game.payoff_arrays()
+        return cls(mode="d", payoffs=np.stack([A, B]))
+
+    def to_strategic_game(self):
+        """Convert a 2-player game to a StrategicGame.
+
+        Returns:
+            StrategicGame with the same payoffs
+
+        Raises:
+            ValueError: If the game does not have exactly two players
+        """
+        from nash_equilibrium.strategic_game import StrategicGame
+
+        if self.num_players != 2:
+            raise ValueError("Only 2-player games can be converted to a StrategicGame")
+        p1_payoffs, p2_payoffs = self.payoffs.tolist()
+        grid = [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(p1_payoffs, p2_payoffs)]
+        return StrategicGame(mode="d", payoff_matrix=grid)
+
+    def _check_player(self, player):
+        """Raise ValueError if player is not between 1 and num_players."""
+        if not isinstance(player, (int, np.integer)) or player < 1 or player > self.num_players:
+            raise ValueError(f"player must be an int between 1 and {self.num_players}")
+
+    def _check_profile(self, strategies):
+        """Validate a mixed strategy profile and return it as float arrays."""
+        if len(strategies) != self.num_players:
+            raise ValueError(f"A strategy profile needs one strategy for each of the {self.num_players} players")
+        profile = [np.asarray(s, dtype=float) for s in strategies]
+        for p, (s, size) in enumerate(zip(profile, self.strategies)):
+            if s.shape != (size,):
+                raise ValueError(f"Strategy for player {p + 1} must have length {size}")
+        return profile
+
+    def get_payoffs(self, player):
+        """Get the payoff tensor of a specific player.
+
+        Arguments:
+            player: The player number (1 to num_players)
+
+        Returns:
+            Array of shape (s1, ..., sN) with the player's payoffs
+
+        Raises:
+            ValueError: If player is out of range
+        """
+        self._check_player(player)
+        return self.payoffs[player - 1]
+
+    def get_strategies(self, player):
+        """Get the list of strategy names for a specific player.
+
+        Player 1's strategies are named A1, A2, ..., player 2's B1, B2, ... and so on.
+
+        Arguments:
+            player: The player number (1 to num_players)
+
+        Returns:
+            List of strategy names for the specified player
+        """
+        self._check_player(player)
+        letter = string.ascii_uppercase[player - 1]
+        return [f"{letter}{i + 1}" for i in range(self.strategies[player - 1])]
+
+    def find_pure_nash_equi(self, update_state=True, budget=None):
+        """Find all pure strategy Nash equilibria.
+
+        A profile is a Nash equilibrium when every player's payoff is maximal
+        along that player's own axis of the payoff tensor.
+
+        Arguments:
+            update_state: Whether to store the equilibria in nash_equilibria
+            budget: Accepted for compatibility with StrategicGame; the vectorized search is not interrupted
+
+        Returns:
+            A list of strategy profiles, each a tuple with one strategy index per player
+        """
+        equilibria = np.ones(self.strategies, dtype=bool)
+        for p in range(self.num_players):
+            payoffs = self.payoffs[p]
+            np.logical_and(equilibria, payoffs == payoffs.max(axis=p, keepdims=True), out=equilibria)
+        nash_eq = [tuple(int(i) for i in profile) for profile in np.argwhere(equilibria)]
+        if update_state:
+            self.nash_equilibria = nash_eq
+        return nash_eq
+
+    def calculate_expected_payoffs(self, player, strategies):
+        """Calculate a player's expected payoff for each pure strategy against the others.
+
+        Arguments:
+            player: The player number (1 to num_players)
+            strategies: A mixed strategy profile. The entry for the player itself is ignored.
+
+        Returns:
+            A dictionary mapping strategy names to expected payoffs
+        """
+        self._check_player(player)
+        values = self.pure_strategy_payoffs(player, strategies)
+        return dict(zip(self.get_strategies(player), values.tolist()))
+
+    def pure_strategy_payoffs(self, player, strategies):
+        """Contract a player's payoff tensor with every other player's strategy.
+
+        Arguments:
+            player: The player number (1 to num_players)
+            strategies: A mixed strategy profile. The entry for the player itself is ignored.
+
+        Returns:
+            Array with the expected payoff of each of the player's pure strategies
+        """
+        own = player - 1
+        strategies = list(strategies)
+        strategies[own] = np.ones(self.strategies[own])
+        profile = self._check_profile(strategies)
+        values = self.payoffs[own]
+        # Contract the highest axes first so the remaining axis numbers do not shift
+        for q in reversed(range(self.num_players)):
+            if q != own:
+                values = np.tensordot(values, profile[q], axes=([q], [0]))
+        return values
+
+    def ep_bpm(self, *strategies):
+        """Calculate expected payoffs when every player uses a mixed strategy.
+
+        Arguments:
+            *strategies: One list of probabilities per player
+
+        Returns:
+            Tuple with the expected payoff of each player
+
+        Raises:
+            ValueError: If the strategies don't match the game dimensions
+        """
+        profile = self._check_profile(strategies)
+        values = self.payoffs
+        for s in reversed(profile):
+            values = values @ s
+        return tuple(values.tolist())
+
+    def calculate_regret(self, *strategies):
+        """Calculate how much each player could gain by deviating from a profile.
+
+        Arguments:
+            *strategies: One list of probabilities per player
+
+        Returns:
+            Tuple with the regret of each player
+        """
+        current = self.ep_bpm(*strategies)
+        return tuple(
+            float(self.pure_strategy_payoffs(p + 1, strategies).max() - current[p]) for p in range(self.num_players)
+        )
+
+    def create_random_beliefs(self):
+        """Create a random mixed strategy for every player.
+
+        Returns:
+            A list with one list of probabilities per player
+        """
+        return [np.random.dirichlet(np.ones(size)).tolist() for size in self.strategies]
+
+    # Fields of to_dict that are cheap for games of any size
+    SUMMARY_FIELDS = ("players", "strategies", "mode")
+
+    def _serialized_fields(self, fields=None, exclude=()):
+        """Functions computing each field of to_dict, in order.
+
+        Arguments:
+            fields: Names of the fields to select (defaults to all)
+            exclude: Names of fields to leave out
+
+        Returns:
+            Dictionary from field name to a function called without arguments
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        available = {
+            "players": lambda: self.num_players,
+            "strategies": lambda: list(self.strategies),
+            "mode": lambda: self.mode,
+            "payoffs": lambda: self.payoffs.tolist(),
+            "strategy_names": lambda: [self.get_strategies(p + 1) for p in range(self.num_players)],
+            "nash_equilibria": lambda: self.nash_equilibria or self.find_pure_nash_equi(),
+        }
+        return select_fields(available, fields, exclude)
+
+    def to_dict(self, fields=None, exclude=()):
+        """Convert the game to a dictionary representation for serialization.
+
+        Arguments:
+            fields: Names of the fields to include (defaults to all),
+                    e.g. SUMMARY_FIELDS for the fields that are cheap for any size
+            exclude: Names of fields to leave out
+
+        Returns:
+            Dictionary containing the selected game information
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        return {name: compute() for name, compute in self._serialized_fields(fields, exclude).items()}
+
+    def __str__(self):
+        """Return a string representation of the game."""
+        return f"NPlayerGame({'x'.join(str(s) for s in self.strategies)}, mode='{self.mode}')"
+
+    def __repr__(self):
+        """Return a detailed string representation of the game."""
+        return f"NPlayerGame(mode='{self.mode}', strategies={tuple(self.strategies)})"
+
+    def __eq__(self, other):
+        """Check equality between two N-player games."""
+        if not isinstance(other, NPlayerGame):
+            return False
+        return self.payoffs.shape == other.payoffs.shape and bool(np.array_equal(self.payoffs, other.payoffs))
@@ -0,0 +1,228 @@
+"""
+Binary Game Format
+
+This module saves games and their cached analysis results as uncompressed
+.npz archives, the compact alternative to exporting games as JSON:
+
+- Every payoff array is stored once, in its binary dtype, where the JSON
+  export repeats the payoffs as payoff_matrix, p1_payoffs and p2_payoffs.
+- A small JSON header stores the game's kind and metadata, its pure Nash
+  equilibria and its memoized analysis results (the pure, mixed, correlated,
+  Stackelberg, security and welfare results computed so far), so loading a
+  game does not recompute them.
+
+As the archive is not compressed, each array is stored contiguously in the
+file and load_npz memory maps it instead of reading it: a payoff array is
+only paged in when it is used, and 2-player games are DenseStrategicGames
+that only build their grid of tuples when a method needs it. The maps are
+copy-on-write, so changing the loaded game never writes to the file.
+"""
+
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from nash_equilibrium.storage import decode_arrays, encode_arrays
+
+FORMAT_VERSION = 1
+
+# Name of the archive entry holding the JSON header
+HEADER = "__header__"
+
+# Size of the fixed part of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+
+# Memoized results saved although they are not dictionaries
+_SAVED_MEMO_KEYS = ("pure_nash",)
+
+
+def _plain(value):
+    """Convert an analysis result to JSON-serializable values, tagging tuples and arrays."""
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Only dictionaries with string keys can be saved")
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_plain(item) for item in value]}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return {"__array__": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"Values of type {type(value).__name__} cannot be saved")
+
+
+def _restore(value):
+    """Rebuild a value converted by _plain."""
+    if isinstance(value, dict):
+        if "__tuple__" in value:
+            return tuple(_restore(item) for item in value["__tuple__"])
+        if "__array__" in value:
+            return np.array(value["__array__"], dtype=value["dtype"])
+        return {key: _restore(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore(item) for item in value]
+    return value
+
+
+def _analysis(game):
+    """Collect the memoized analysis results of a game as (key, result) pairs."""
+    if not hasattr(game, "_memo") or game._memo_token != game._payoff_token():
+        return []
+    results = []
+    for key, result in list(game._memo.items()):
+        # Analysis results are dictionaries; other entries are caches derived from the payoffs
+        if not isinstance(result, dict) and key not in _SAVED_MEMO_KEYS:
+            continue
+        try:
+            results.append([_plain(key), _plain(result)])
+        except TypeError:
+            continue
+    return results
+
+
+def encode_analysis(game):
+    """Collect a game's pure Nash equilibria and memoized analysis results.
+
+    Returns:
+        JSON-serializable dictionary, or None if the game has no results to save
+    """
+    nash_equilibria = list(getattr(game, "nash_equilibria", None) or [])
+    analysis = _analysis(game)
+    if not nash_equilibria and not analysis:
+        return None
+    return {"nash_equilibria": _plain(nash_equilibria), "analysis": analysis}
+
+
+def restore_analysis(game, encoded):
+    """Restore the results collected by encode_analysis into a game with the same payoffs."""
+    if encoded["nash_equilibria"]:
+        game.nash_equilibria = _restore(encoded["nash_equilibria"])
+    if encoded["analysis"] and hasattr(game, "_memo"):
+        game._memo = {_restore(key): _restore(result) for key, result in encoded["analysis"]}
+        game._memo_token = game._payoff_token()
+
+
+def save_npz(game, file, analysis=True):
+    """Save a game in the binary format.
+
+    Arguments:
+        game: StrategicGame, SparseStrategicGame, EmpiricalGame or NPlayerGame
+        file: Path or binary file object to write the archive to
+        analysis: Whether to save the game's memoized analysis results
+
+    Raises:
+        ValueError: If the game type cannot be saved
+    """
+    kind, metadata, arrays = encode_arrays(game)
+    header = {"format_version": FORMAT_VERSION, "kind": kind, "metadata": metadata}
+    header.update((analysis and encode_analysis(game)) or {"nash_equilibria": [], "analysis": []})
+    entries = {HEADER: np.array(json.dumps(header))}
+    for name, array in arrays.items():
+        entries[name] = np.ascontiguousarray(array)
+    np.savez(file, **entries)
+
+
+def dumps_npz(game, analysis=True):
+    """Save a game in the binary format to bytes.
+
+    Returns:
+        The archive as bytes
+    """
+    buffer = io.BytesIO()
+    save_npz(game, buffer, analysis=analysis)
+    return buffer.getvalue()
+
+
+def _read_header(handle):
+    """Read the header of a .npy entry, leaving handle at the start of its data.
+
+    Returns:
+        Tuple (shape, fortran_order, dtype)
+    """
+    version = np.lib.format.read_magic(handle)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(handle)
+    return np.lib.format.read_array_header_2_0(handle)
+
+
+def map_npz(path):
+    """Memory map the arrays of an uncompressed .npz archive.
+
+    Arrays stored compressed, and empty arrays, are read into memory instead.
+
+    Arguments:
+        path: Path to the archive
+
+    Returns:
+        Dictionary from array name to a copy-on-write numpy memmap
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as handle:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            handle.seek(info.header_offset)
+            local_header = handle.read(_LOCAL_HEADER_SIZE)
+            name_length = int.from_bytes(local_header[26:28], "little")
+            extra_length = int.from_bytes(local_header[28:30], "little")
+            handle.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+            shape, fortran_order, dtype = _read_header(handle)
+            if dtype.hasobject:
+                raise ValueError(f"Array {name} holds Python objects and cannot be loaded")
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="c",
+                offset=handle.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+def load_npz(file, mmap=True):
+    """Load a game saved in the binary format.
+
+    The memoized analysis results and pure Nash equilibria saved with the game
+    are restored, so they are returned without being computed again.
+
+    Arguments:
+        file: Path, bytes or binary file object holding the archive
+        mmap: Whether to memory map the payoff arrays of an archive given by path
+
+    Returns:
+        The game object
+
+    Raises:
+        ValueError: If the archive is not in the binary game format
+    """
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        file = io.BytesIO(file)
+    if mmap and isinstance(file, (str, os.PathLike)):
+        arrays = map_npz(file)
+    else:
+        with np.load(file, allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+
+    if HEADER not in arrays:
+        raise ValueError("Archive is not a saved game")
+    header = json.loads(str(arrays.pop(HEADER)[()]))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version: {header.get('format_version')}")
+
+    game = decode_arrays(header["kind"], header["metadata"], arrays)
+    restore_analysis(game, header)
+    return game
@@ -9,6 +9,8 @@ import os
 import re
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
 from nash_equilibrium.game_manager import GameManager
 
 
@@ -72,6 +74,7 @@ class GameFileParser:
         lines = content.split("\n")
         game_def = {
             "game_type": None,
+            "players": 2,
             "strategies": None,
             "params": {},
             "payoffs": None,
@@ -104,12 +107,22 @@ class GameFileParser:
                 if key == "game_type":
                     game_def["game_type"] = value
                     current_section = None
+                elif key == "players":
+                    try:
+                        game_def["players"] = int(value)
+                    except ValueError:
+                        raise GameFileParseError(f"Line {line_num}: PLAYERS must be an integer")
+                    if game_def["players"] < 2:
+                        raise GameFileParseError(f"Line {line_num}: PLAYERS must be at least 2")
+                    current_section = None
                 elif key == "strategies":
                     try:
-                        rows, cols = map(int, value.split())
-                        game_def["strategies"] = (rows, cols)
+                        counts = tuple(map(int, value.split()))
                     except ValueError:
+                        counts = ()
+                    if len(counts) < 2:
                         raise GameFileParseError(f"Line {line_num}: Invalid strategies format. Expected 'rows columns'")
+                    game_def["strategies"] = counts
                     current_section = None
                 elif key == "params":
                     current_section = "params"
@@ -170,7 +183,7 @@ class GameFileParser:
 
             elif current_section == "payoffs":
                 # Parse payoff matrix row
-                payoff_row = self._parse_payoff_row(line, line_num)
+                payoff_row = self._parse_payoff_row(line, line_num, game_def["players"])
                 payoff_matrix.append(payoff_row)
 
             elif line.strip():
@@ -181,10 +194,10 @@ class GameFileParser:
 
         return game_def
 
-    def _parse_payoff_row(self, line: str, line_num: int) -> List[Tuple[int, int]]:
-        """Parse a single row of payoffs."""
-        # Find all payoff pairs in the format (p1, p2)
-        pattern = r"\(\s*([+-]?\d+)\s*,\s*([+-]?\d+)\s*\)"
+    def _parse_payoff_row(self, line: str, line_num: int, players: int = 2) -> List[Tuple[int, ...]]:
+        """Parse a single row of payoffs, each a tuple with one payoff per player."""
+        # Find all payoff tuples in the format (p1, p2, ...)
+        pattern = r"\(\s*" + r"\s*,\s*".join([r"([+-]?\d+)"] * players) + r"\s*\)"
         matches = re.findall(pattern, line)
 
         # Also check for malformed tuples (wrong number of elements)
@@ -193,19 +206,20 @@ class GameFileParser:
 
         for tuple_content in all_tuples:
             elements = [x.strip() for x in tuple_content.split(",")]
-            if len(elements) != 2:
+            if len(elements) != players:
+                kind = "pairs" if players == 2 else "tuples"
                 raise GameFileParseError(
-                    f"Line {line_num}: Payoff pairs must have exactly 2 elements, found {len(elements)}"
+                    f"Line {line_num}: Payoff {kind} must have exactly {players} elements, found {len(elements)}"
                 )
 
         if not matches:
-            raise GameFileParseError(f"Line {line_num}: No valid payoff pairs found. Expected format: (p1, p2)")
+            expected = ", ".join(f"p{i + 1}" for i in range(players))
+            raise GameFileParseError(f"Line {line_num}: No valid payoff pairs found. Expected format: ({expected})")
 
         payoffs = []
         for match in matches:
             try:
-                p1, p2 = int(match[0]), int(match[1])
-                payoffs.append((p1, p2))
+                payoffs.append(tuple(int(value) for value in match))
             except ValueError:
                 raise GameFileParseError(f"Line {line_num}: Invalid payoff values: {match}")
 
@@ -221,6 +235,14 @@ class GameFileParser:
         # Normalize game type to lowercase and replace spaces / underscores
         normalized_game_type = game_type.lower().replace(" ", "_")
 
+        if game_def["strategies"] and len(game_def["strategies"]) != game_def["players"]:
+            raise GameFileParseError(
+                f"STRATEGIES lists {len(game_def['strategies'])} counts but the game has {game_def['players']} players"
+            )
+
+        if game_def["players"] > 2:
+            return self._create_n_player_game_from_definition(normalized_game_type, game_def)
+
         if normalized_game_type in ["prisoners_dilemma", "coordination", "battle_of_sexes", "zero_sum"]:
             # Create common game type
             game_id, game = self.game_manager.create_common_game(normalized_game_type, **game_def["params"])
@@ -270,6 +292,35 @@ class GameFileParser:
 
         return game_id, game
 
+    def _create_n_player_game_from_definition(self, game_type: str, game_def: Dict[str, Any]) -> Tuple[str, Any]:
+        """Create a game with more than two players from the parsed definition."""
+        if not game_def["strategies"]:
+            raise GameFileParseError("STRATEGIES is required for games with more than 2 players")
+        strategies = game_def["strategies"]
+
+        if game_type == "custom":
+            if not game_def["payoffs"]:
+                raise GameFileParseError("PAYOFFS section is required for custom games")
+            # Payoff tuples list the strategy profiles in order, the last player's strategy changing fastest
+            cells = [cell for row in game_def["payoffs"] for cell in row]
+            if len(cells) != int(np.prod(strategies)):
+                raise GameFileParseError(
+                    f"PAYOFFS has {len(cells)} payoff tuples but STRATEGIES requires {int(np.prod(strategies))}"
+                )
+            payoffs = np.moveaxis(np.array(cells).reshape(strategies + (game_def["players"],)), -1, 0)
+            return self.game_manager.create_n_player_game("d", payoffs=payoffs)
+
+        if game_type == "random":
+            params = game_def["params"]
+            return self.game_manager.create_n_player_game(
+                "r",
+                strategies=strategies,
+                lower_limit=params.get("min_value", -99),
+                upper_limit=params.get("max_value", 99),
+            )
+
+        raise GameFileParseError(f"Game type {game_def['game_type']} only supports 2 players")
+
     def validate_file(self, file_path: str) -> List[str]:
         """
         Validate a game file and return any warnings or errors.
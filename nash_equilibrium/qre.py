@@ -0,0 +1,315 @@
+"""
+Logit Quantal Response Equilibria
+
+This module traces the branch of logit quantal response equilibria (QRE) of a
+2-player game. In a logit QRE every player plays each strategy with
+probability proportional to exp(lambda * expected payoff). At lambda = 0 both
+players mix uniformly, and as lambda grows the branch converges to a Nash
+equilibrium, which makes the limit of the branch a principled way of selecting
+one equilibrium.
+
+The branch is followed with a predictor-corrector method on the curve
+H(log p1, log p2, lambda) = 0: the predictor steps along the tangent of the
+curve and Newton's method corrects back onto it. The step length adapts to how
+easily the corrector converges. Payoffs are scaled to a range of 1 internally
+so that the step sizes do not depend on the payoff units.
+"""
+
+import numpy as np
+
+from nash_equilibrium import solvers
+
+# Precision (lambda times the payoff range) at which the branch is stopped by default
+DEFAULT_PRECISION = 1e4
+
+# Thresholds tried when reading the supports of the limiting Nash equilibrium
+_SUPPORT_THRESHOLDS = (1e-2, 1e-3, 1e-4, 1e-6, 1e-8)
+
+# Step acceptance: largest corrector distance relative to the step, and smallest
+# cosine between consecutive tangents
+_MAX_CORRECTION = 0.3
+_MIN_COSINE = 0.99
+
+# Precision multipliers tried by logit_qre until the limiting Nash equilibrium is found
+_PRECISION_FACTORS = (1, 100, 10000)
+
+
+def _payoff_range(A, B):
+    """The largest payoff range of the two players, or 1 for constant payoffs."""
+    spread = max(np.ptp(A), np.ptp(B))
+    return float(spread) if spread > 0 else 1.0
+
+
+def _equations(A, B, point):
+    """Evaluate the QRE equations at point = (log p1, log p2, lambda)."""
+    m, n = A.shape
+    lam = point[-1]
+    x = np.exp(point[:m])
+    y = np.exp(point[m:-1])
+    Ay = A @ y
+    xB = x @ B
+
+    H = np.empty(m + n)
+    H[0] = x.sum() - 1.0
+    H[1:m] = point[1:m] - point[0] - lam * (Ay[1:] - Ay[0])
+    H[m] = y.sum() - 1.0
+    H[m + 1 :] = point[m + 1 : m + n] - point[m] - lam * (xB[1:] - xB[0])
+    return H
+
+
+def _jacobian(A, B, point):
+    """Jacobian of the QRE equations with respect to (log p1, log p2, lambda)."""
+    m, n = A.shape
+    lam = point[-1]
+    x = np.exp(point[:m])
+    y = np.exp(point[m:-1])
+    A_diff = A[1:] - A[0]
+    B_diff = (B[:, 1:] - B[:, :1]).T
+
+    J = np.zeros((m + n, m + n + 1))
+    J[0, :m] = x
+    J[1:m, 0] = -1.0
+    J[1:m, 1:m] = np.eye(m - 1)
+    J[1:m, m : m + n] = -lam * A_diff * y
+    J[1:m, -1] = -(A_diff @ y)
+    J[m, m : m + n] = y
+    J[m + 1 :, m] = -1.0
+    J[m + 1 :, m + 1 : m + n] = np.eye(n - 1)
+    J[m + 1 :, :m] = -lam * B_diff * x
+    J[m + 1 :, -1] = -(B_diff @ x)
+    return J
+
+
+def _tangent(J, previous):
+    """Unit tangent of the curve, oriented to continue in the direction of previous."""
+    q, _ = np.linalg.qr(J.T, mode="complete")
+    tangent = q[:, -1]
+    return -tangent if tangent @ previous < 0 else tangent
+
+
+def _correct(A, B, point, tol, max_iterations, fixed_lambda=False):
+    """Newton corrector back onto the curve.
+
+    With fixed_lambda the square system in the log probabilities is solved,
+    otherwise the minimum norm Newton step is taken in all coordinates.
+
+    Returns:
+        Tuple (point, iterations), with point None if Newton did not converge
+    """
+    point = point.copy()
+    previous = np.inf
+    for iteration in range(1, max_iterations + 1):
+        H = _equations(A, B, point)
+        residual = np.abs(H).max()
+        if residual < tol:
+            return point, iteration - 1
+        if residual > previous or not np.isfinite(residual):
+            return None, iteration
+        previous = residual
+        J = _jacobian(A, B, point)
+        if fixed_lambda:
+            point[:-1] -= np.linalg.solve(J[:, :-1], H)
+        else:
+            point -= np.linalg.lstsq(J, H, rcond=None)[0]
+    if np.abs(_equations(A, B, point)).max() < tol:
+        return point, max_iterations
+    return None, max_iterations
+
+
+def _profile(point, m):
+    """Mixed strategies at a point of the curve."""
+    x = np.exp(point[:m])
+    y = np.exp(point[m:-1])
+    return x / x.sum(), y / y.sum()
+
+
+def limiting_nash(A, B, x, y, tol=1e-9):
+    """Find the Nash equilibrium a QRE profile at high precision converges to.
+
+    Strategies played with non-negligible probability are taken as supports
+    and solved exactly with solvers.solve_on_support.
+
+    Returns:
+        Tuple (p1_strategy, p2_strategy) of numpy arrays, or None
+    """
+    tried = set()
+    for threshold in _SUPPORT_THRESHOLDS:
+        supports = (solvers.support_of(x, threshold), solvers.support_of(y, threshold))
+        if supports in tried:
+            continue
+        tried.add(supports)
+        profile = solvers.solve_on_support(A, B, *supports, tol=tol)
+        if profile is not None:
+            return profile
+    return None
+
+
+def trace_logit_qre(
+    A,
+    B,
+    lam=None,
+    initial_step=0.1,
+    max_step=None,
+    tol=1e-10,
+    max_steps=10000,
+    record_path=False,
+    budget=None,
+    resume=None,
+):
+    """Follow the branch of logit quantal response equilibria from lambda = 0.
+
+    With resume the branch is instead continued from where an earlier trace of
+    the same game stopped, so raising the precision does not retrace the branch.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+        lam: Precision at which to stop, in the units of the payoffs. By default the
+             branch is followed until lambda times the payoff range reaches DEFAULT_PRECISION.
+        initial_step: Initial arc length step
+        max_step: Optional upper limit on the arc length step
+        tol: Tolerance of the Newton corrector
+        max_steps: Maximum number of predictor-corrector steps
+        record_path: Whether to return every point visited on the branch
+        budget: Optional SolveBudget
+        resume: Optional result of an earlier trace_logit_qre call on the same payoffs
+                to continue from
+
+    Returns:
+        A dictionary with the QRE at the end of the branch:
+        {
+            'p1_strategy': [...],  # numpy array
+            'p2_strategy': [...],  # numpy array
+            'lambda': precision reached,
+            'steps': number of accepted steps,
+            'path': [{'lambda', 'p1_strategy', 'p2_strategy'}, ...] or None,
+            'status': 'complete' or 'partial',
+            'error': None or error message,
+            'state': internal state for resuming the trace
+        }
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    m, n = A.shape
+    scale = _payoff_range(A, B)
+    A = A / scale
+    B = B / scale
+    target = DEFAULT_PRECISION if lam is None else lam * scale
+
+    if resume is None:
+        point = np.concatenate([np.full(m, -np.log(m)), np.full(n, -np.log(n)), [0.0]])
+        direction = np.zeros(m + n + 1)
+        direction[-1] = 1.0
+        tangent = _tangent(_jacobian(A, B, point), direction)
+        step = initial_step
+    else:
+        point, tangent, step = resume["state"]
+    steps = 0
+    path = [] if record_path else None
+    status = "complete"
+    error = None
+
+    def record(point):
+        if path is not None:
+            x, y = _profile(point, m)
+            path.append({"lambda": float(point[-1] / scale), "p1_strategy": x, "p2_strategy": y})
+
+    record(point)
+    while point[-1] < target:
+        if steps >= max_steps:
+            error = "Maximum number of steps reached"
+            break
+        if budget is not None:
+            budget.report(method="logit_qre", iterations=steps, precision=point[-1] / scale)
+            if budget.expired():
+                status = "partial"
+                error = "Solve stopped before completion"
+                break
+
+        predicted = point + step * tangent
+        corrected, iterations = _correct(A, B, predicted, tol, max_iterations=8)
+        # A large correction means the predictor left the curve and may jump to another branch
+        if corrected is None or np.linalg.norm(corrected - predicted) > _MAX_CORRECTION * step:
+            step /= 2.0
+            if step < 1e-12:
+                error = "Path tracing failed to converge"
+                break
+            continue
+
+        new_tangent = _tangent(_jacobian(A, B, corrected), tangent)
+        if new_tangent @ tangent < _MIN_COSINE:
+            # The curve bends sharply: take a shorter step
+            step /= 2.0
+            continue
+
+        if corrected[-1] > target:
+            # Land exactly on the requested precision
+            start = point + (corrected - point) * (target - point[-1]) / (corrected[-1] - point[-1])
+            start[-1] = target
+            landed, _ = _correct(A, B, start, tol, max_iterations=20, fixed_lambda=True)
+            if landed is None:
+                step /= 2.0
+                continue
+            corrected = landed
+
+        point = corrected
+        tangent = new_tangent
+        steps += 1
+        record(point)
+        if iterations <= 2:
+            step *= 2.0
+            if max_step is not None:
+                step = min(step, max_step)
+
+    x, y = _profile(point, m)
+    return {
+        "p1_strategy": x,
+        "p2_strategy": y,
+        "lambda": float(point[-1] / scale),
+        "steps": steps,
+        "path": path,
+        "status": status,
+        "error": error,
+        "state": (point, tangent, step),
+    }
+
+
+def logit_qre(A, B, warm_start=None, tol=1e-9, lam=None, budget=None, **options):
+    """Select a Nash equilibrium as the limit of the logit QRE branch.
+
+    The branch is followed up to lam. If no Nash equilibrium can be read from
+    the end of the branch yet, typically because two strategies have nearly
+    equal payoffs, the branch is continued to a 100 and then 10000 times higher
+    precision. A QRE that is itself within tol of a Nash equilibrium is
+    returned as it is. The path always starts from uniform play at lambda = 0;
+    warm_start is accepted for compatibility with the other solvers and ignored.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        warm_start: Ignored
+        tol: Maximum exploitability of the limiting Nash equilibrium
+        lam: Precision at which to stop following the branch (see trace_logit_qre)
+        budget: Optional SolveBudget
+        **options: Extra options passed to trace_logit_qre
+
+    Returns:
+        Result dictionary with the limiting Nash equilibrium, or the QRE at the
+        end of the branch if no equilibrium could be read from it
+    """
+    if lam is None:
+        lam = DEFAULT_PRECISION / _payoff_range(A, B)
+    steps = 0
+    trace = None
+    for factor in _PRECISION_FACTORS:
+        trace = trace_logit_qre(A, B, lam=lam * factor, budget=budget, resume=trace, **options)
+        steps += trace["steps"]
+        x, y = trace["p1_strategy"], trace["p2_strategy"]
+        if trace["error"] is not None:
+            return solvers._result("logit_qre", x, y, A, B, steps, False, trace["error"], trace["status"])
+        profile = limiting_nash(A, B, x, y, tol=tol)
+        if profile is None and solvers.exploitability(A, B, x, y) <= tol:
+            profile = (x, y)
+        if profile is not None:
+            return solvers._result("logit_qre", *profile, A, B, steps, False)
+    return solvers._result("logit_qre", x, y, A, B, steps, False, "The QRE branch did not reach a Nash equilibrium")
@@ -0,0 +1,142 @@
+"""
+Security Strategies
+
+This module computes maxmin (security) strategies of 2-player games by linear
+programming. A player's security strategy is the mixed strategy that
+maximizes the payoff it guarantees whatever the opponent does, and that
+guarantee is the player's security value:
+
+    maximize v  subject to  x @ M[:, j] >= v for every opponent strategy j,
+                            sum(x) = 1, x >= 0
+
+where M holds the player's own payoffs with its strategies as rows.
+
+The LPs of different players and games are independent, so many of them are
+solved as one block diagonal LP: a single solver call replaces hundreds of
+small ones, whose setup cost would dominate for small games.
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from nash_equilibrium.budget import linprog_options
+
+
+def _block(payoffs):
+    """Inequality rows and equality row of one maxmin LP over (x, v)."""
+    m, n = payoffs.shape
+    # v - x @ M[:, j] <= 0 for every opponent strategy j
+    inequalities = sparse.hstack([sparse.csr_matrix(-payoffs.T), sparse.csr_matrix(np.ones((n, 1)))])
+    equality = sparse.csr_matrix(np.append(np.ones(m), 0.0))
+    return inequalities, equality
+
+
+def maxmin_many(payoff_arrays, chunk_size=256, budget=None):
+    """Find the maxmin strategies of many independent players with batched LPs.
+
+    Arguments:
+        payoff_arrays: Sequence of payoff arrays, each holding a player's own payoffs
+                       (own strategies x opponent strategies)
+        chunk_size: Number of LPs combined into each solver call
+        budget: Optional SolveBudget, checked before each solver call and bounding
+                the calls by its deadline
+
+    Returns:
+        List with one tuple (strategy, value, error) per array, where strategy is
+        a numpy array and strategy and value are None if the LP failed or the
+        budget ran out before it was solved
+    """
+    payoff_arrays = [np.asarray(M, dtype=float) for M in payoff_arrays]
+    results = []
+    for start in range(0, len(payoff_arrays), chunk_size):
+        chunk = payoff_arrays[start : start + chunk_size]
+        if budget is not None and budget.expired():
+            results.extend((None, None, "Solve stopped before completion") for _ in payoff_arrays[start:])
+            break
+        blocks = [_block(M) for M in chunk]
+        A_ub = sparse.block_diag([inequalities for inequalities, _ in blocks], format="csr")
+        A_eq = sparse.block_diag([equality for _, equality in blocks], format="csr")
+        sizes = [M.shape[0] + 1 for M in chunk]
+        offsets = np.cumsum([0] + sizes)
+        # Maximize the sum of the values, which maximizes each value as the blocks are independent
+        c = np.zeros(offsets[-1])
+        c[offsets[1:] - 1] = -1.0
+        bounds = np.zeros((offsets[-1], 2))
+        bounds[:, 1] = np.inf
+        bounds[offsets[1:] - 1] = (-np.inf, np.inf)
+
+        solution = linprog(
+            c,
+            A_ub=A_ub,
+            b_ub=np.zeros(A_ub.shape[0]),
+            A_eq=A_eq,
+            b_eq=np.ones(len(chunk)),
+            bounds=bounds,
+            method="highs",
+            options=linprog_options(budget),
+        )
+        if not solution.success:
+            stopped = budget is not None and budget.expired()
+            error = "Solve stopped before completion" if stopped else solution.message
+            results.extend((None, None, error) for _ in chunk)
+            continue
+        for M, begin, end in zip(chunk, offsets[:-1], offsets[1:]):
+            strategy = np.clip(solution.x[begin : end - 1], 0.0, None)
+            strategy /= strategy.sum()
+            # The guarantee of the normalized strategy, free of the solver's tolerance on v
+            results.append((strategy, float((strategy @ M).min()), None))
+    return results
+
+
+def security_strategies_many(games, chunk_size=256, budget=None):
+    """Find both players' security strategies of many games with batched LPs.
+
+    Arguments:
+        games: Sequence of (A, B) payoff array pairs (rows x columns)
+        chunk_size: Number of LPs combined into each solver call
+        budget: Optional SolveBudget (see maxmin_many)
+
+    Returns:
+        List with one dictionary per game, as returned by security_strategies
+    """
+    arrays = []
+    for A, B in games:
+        arrays.append(np.asarray(A, dtype=float))
+        arrays.append(np.asarray(B, dtype=float).T)
+    solved = maxmin_many(arrays, chunk_size=chunk_size, budget=budget)
+
+    results = []
+    for (x, v1, error1), (y, v2, error2) in zip(solved[::2], solved[1::2]):
+        stopped = "Solve stopped before completion" in (error1, error2)
+        results.append(
+            {
+                "p1_strategy": None if x is None else x.tolist(),
+                "p2_strategy": None if y is None else y.tolist(),
+                "security_values": None if error1 or error2 else (v1, v2),
+                "status": "partial" if stopped else "complete",
+                "error": error1 or error2,
+            }
+        )
+    return results
+
+
+def security_strategies(A, B, budget=None):
+    """Find both players' security strategies and values.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+        budget: Optional SolveBudget, checked before the LPs and bounding them by its deadline
+
+    Returns:
+        A dictionary with the security strategies:
+        {
+            'p1_strategy': [...],  # Player 1's maxmin strategy against payoffs A
+            'p2_strategy': [...],  # Player 2's maxmin strategy against payoffs B
+            'security_values': (p1_value, p2_value),  # payoffs each strategy guarantees
+            'status': 'complete', or 'partial' if the budget ran out before a solution was found,
+            'error': None or error message
+        }
+    """
+    return security_strategies_many([(A, B)], budget=budget)[0]
@@ -0,0 +1,216 @@
+"""
+Game Snapshots
+
+This module saves every game of a GameManager into a single archive, together
+with the games' IDs and cached analysis results, and loads them back. It
+serves warm restarts and moving the games of one server to another.
+
+A snapshot is an uncompressed .npz archive written with bulk array writes:
+instead of one entry per game, the payoff arrays of all games with the same
+kind, array name and dtype are concatenated into one column, with the
+offsets and shapes that cut it back into games. An index gives, for each
+game, its ID, its kind, its metadata and analysis (as codes into tables of
+JSON strings, shared by games with equal metadata) and the positions of its
+arrays in the columns.
+
+Opening a snapshot memory maps the archive and only decodes the index, so it
+takes well under a second even for millions of games. A game is only decoded
+when it is loaded, from views of the mapped columns.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from nash_equilibrium import npz_format
+from nash_equilibrium.storage import decode_arrays, encode_arrays
+
+FORMAT_VERSION = 1
+
+# Separator of the strings in a string table; IDs never contain it and JSON escapes it
+_SEPARATOR = "\n"
+
+
+def _string_table(strings):
+    """Pack strings into one byte array."""
+    return np.frombuffer(_SEPARATOR.join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _read_string_table(array, count):
+    """Unpack the strings packed by _string_table."""
+    if count == 0:
+        return []
+    return bytes(array).decode("utf-8").split(_SEPARATOR)
+
+
+class _Column:
+    """Arrays of one kind, name and dtype, concatenated while a snapshot is written."""
+
+    def __init__(self, index):
+        self.index = index
+        self.parts = []
+        self.offsets = [0]
+        self.shapes = []
+
+    def append(self, array):
+        """Add an array, returning its position in the column."""
+        self.parts.append(np.ravel(array))
+        self.offsets.append(self.offsets[-1] + array.size)
+        self.shapes.append(array.shape)
+        return len(self.shapes) - 1
+
+
+def write_snapshot(path, games, analysis=True):
+    """Write games into a snapshot archive.
+
+    The archive is written to a temporary file first, so an existing snapshot
+    at path is only replaced once the new one is complete.
+
+    Arguments:
+        path: Path of the archive
+        games: Iterable of (game_id, game) pairs
+        analysis: Whether to save the games' memoized analysis results
+
+    Returns:
+        Number of games written
+
+    Raises:
+        ValueError: If a game type cannot be saved
+    """
+    ids = []
+    kinds = []
+    kind_codes = []
+    metadata_table = {}
+    metadata_codes = []
+    analysis_table = []
+    analysis_codes = []
+    columns = {}
+    entry_offsets = [0]
+    entry_columns = []
+    entry_positions = []
+
+    for game_id, game in games:
+        kind, metadata, arrays = encode_arrays(game)
+        ids.append(str(game_id))
+        if kind not in kinds:
+            kinds.append(kind)
+        kind_codes.append(kinds.index(kind))
+        metadata_codes.append(metadata_table.setdefault(json.dumps(metadata, sort_keys=True), len(metadata_table)))
+
+        encoded = npz_format.encode_analysis(game) if analysis else None
+        if encoded is None:
+            analysis_codes.append(-1)
+        else:
+            analysis_codes.append(len(analysis_table))
+            analysis_table.append(json.dumps(encoded))
+
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            key = (kind, name, array.dtype.str, array.ndim)
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = _Column(len(columns))
+            entry_columns.append(column.index)
+            entry_positions.append(column.append(array))
+        entry_offsets.append(len(entry_columns))
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "games": len(ids),
+        "kinds": kinds,
+        "metadata": len(metadata_table),
+        "analysis": len(analysis_table),
+        "columns": [{"kind": kind, "name": name, "dtype": dtype, "ndim": ndim} for kind, name, dtype, ndim in columns],
+    }
+    entries = {
+        npz_format.HEADER: np.array(json.dumps(header)),
+        "ids": _string_table(ids),
+        "kinds": np.array(kind_codes, dtype=np.uint8),
+        "metadata": _string_table(metadata_table),
+        "metadata_codes": np.array(metadata_codes, dtype=np.int64),
+        "analysis": _string_table(analysis_table),
+        "analysis_codes": np.array(analysis_codes, dtype=np.int64),
+        "entry_offsets": np.array(entry_offsets, dtype=np.int64),
+        "entry_columns": np.array(entry_columns, dtype=np.int32),
+        "entry_positions": np.array(entry_positions, dtype=np.int64),
+    }
+    for (_, _, _, ndim), column in columns.items():
+        entries[f"column{column.index}_data"] = np.concatenate(column.parts)
+        entries[f"column{column.index}_offsets"] = np.array(column.offsets, dtype=np.int64)
+        entries[f"column{column.index}_shapes"] = np.array(column.shapes, dtype=np.int64).reshape(-1, ndim)
+
+    temporary = os.fspath(path) + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez(f, **entries)
+    os.replace(temporary, path)
+    return len(ids)
+
+
+class Snapshot:
+    """A snapshot archive opened for loading its games on demand."""
+
+    def __init__(self, path):
+        """Open a snapshot, memory mapping the archive.
+
+        Arguments:
+            path: Path of the archive written by write_snapshot
+
+        Raises:
+            ValueError: If the file is not a snapshot
+        """
+        self.path = os.fspath(path)
+        self._arrays = npz_format.map_npz(self.path)
+        if npz_format.HEADER not in self._arrays or "entry_offsets" not in self._arrays:
+            raise ValueError(f"{self.path} is not a game snapshot")
+        header = json.loads(str(self._arrays[npz_format.HEADER][()]))
+        if header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {header.get('format_version')}")
+        self._kinds = header["kinds"]
+        self._columns = header["columns"]
+        self._ids = _read_string_table(self._arrays["ids"], header["games"])
+        self._positions = {game_id: index for index, game_id in enumerate(self._ids)}
+        # Shared metadata is parsed once; analysis strings are parsed when their game is loaded
+        self._metadata = [json.loads(text) for text in _read_string_table(self._arrays["metadata"], header["metadata"])]
+        self._analysis = _read_string_table(self._arrays["analysis"], header["analysis"])
+
+    def ids(self):
+        """IDs of the games in the snapshot, in the order they were written."""
+        return list(self._ids)
+
+    def __contains__(self, game_id):
+        return game_id in self._positions
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _array(self, column, position):
+        """A view of one array of a column."""
+        arrays = self._arrays
+        start, stop = arrays[f"column{column}_offsets"][position : position + 2]
+        shape = tuple(int(size) for size in arrays[f"column{column}_shapes"][position])
+        return arrays[f"column{column}_data"][start:stop].reshape(shape)
+
+    def load(self, game_id):
+        """Decode a game with its saved analysis results.
+
+        Returns:
+            The game object, whose arrays are copy-on-write views of the archive
+
+        Raises:
+            KeyError: If game_id is not in the snapshot
+        """
+        index = self._positions[game_id]
+        arrays = self._arrays
+        kind = self._kinds[arrays["kinds"][index]]
+        metadata = self._metadata[arrays["metadata_codes"][index]]
+        start, stop = arrays["entry_offsets"][index : index + 2]
+        game_arrays = {}
+        for column, position in zip(arrays["entry_columns"][start:stop], arrays["entry_positions"][start:stop]):
+            game_arrays[self._columns[column]["name"]] = self._array(column, position)
+
+        game = decode_arrays(kind, metadata, game_arrays)
+        analysis_code = arrays["analysis_codes"][index]
+        if analysis_code >= 0:
+            npz_format.restore_analysis(game, json.loads(self._analysis[analysis_code]))
+        return game
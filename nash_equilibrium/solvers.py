@@ -0,0 +1,543 @@
+"""
+Mixed Strategy Solvers
+
+This module contains numerical solvers for mixed strategy Nash equilibria of
+2-player games. The solvers work directly on the payoff arrays returned by
+StrategicGame.payoff_arrays() and can be warm started from a previous
+equilibrium, which makes re-solving a slightly edited game cheap.
+
+Every solver accepts an optional SolveBudget. When the deadline passes or the
+solve is cancelled, the solver returns the least exploitable profile it has
+seen so far with its status set to 'partial'.
+"""
+
+import itertools
+
+import numpy as np
+from scipy.optimize import linprog
+
+SOLVER_METHODS = ["support_enumeration", "lemke_howson", "fictitious_play", "logit_qre", "double_oracle"]
+
+
+def exploitability(A, B, p1_strategy, p2_strategy):
+    """Calculate how much the players could gain in total by deviating.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+        p1_strategy: Player 1's mixed strategy
+        p2_strategy: Player 2's mixed strategy
+
+    Returns:
+        The sum of both players' best response gains (0 at a Nash equilibrium)
+    """
+    x = np.asarray(p1_strategy, dtype=float)
+    y = np.asarray(p2_strategy, dtype=float)
+    Ay = A @ y
+    xB = x @ B
+    return float((Ay.max() - x @ Ay) + (xB.max() - xB @ y))
+
+
+def normalize_warm_start(warm_start, rows, columns):
+    """Turn a warm start specification into a (p1_strategy, p2_strategy) pair.
+
+    Arguments:
+        warm_start: A dict with 'p1_strategy' / 'p2_strategy' keys or a pair of strategies
+        rows: Number of strategies for player 1
+        columns: Number of strategies for player 2
+
+    Returns:
+        Tuple of numpy arrays, or None if the warm start does not fit the game
+    """
+    if warm_start is None:
+        return None
+    if isinstance(warm_start, dict):
+        warm_start = (warm_start.get("p1_strategy"), warm_start.get("p2_strategy"))
+    x, y = warm_start
+    if x is None or y is None or len(x) != rows or len(y) != columns:
+        return None
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+
+def support_of(strategy, tol=1e-9):
+    """Return the indices played with positive probability."""
+    return tuple(int(i) for i in np.flatnonzero(np.asarray(strategy) > tol))
+
+
+def _indifferent_strategy(M, tol, others=None):
+    """Find a probability vector over the rows of M making every column of M equal.
+
+    The linear system usually determines the vector. When it does not, as on
+    supports of unequal sizes in degenerate games, its minimum norm solution
+    may have negative entries although non-negative solutions exist, so a
+    feasibility LP with non-negative probabilities is solved instead.
+
+    Arguments:
+        M: Payoffs of the columns against the rows (rows x columns)
+        tol: Numerical tolerance
+        others: Optional payoffs of further columns, which the LP keeps from exceeding
+                the common value of the columns of M
+
+    Returns:
+        Tuple (strategy, value) or None if no such probability vector exists
+    """
+    k, s = M.shape
+    system = np.zeros((s + 1, k + 1))
+    system[:s, :k] = M.T
+    system[:s, k] = -1.0
+    system[s, :k] = 1.0
+    rhs = np.zeros(s + 1)
+    rhs[s] = 1.0
+    solution, _, rank, _ = np.linalg.lstsq(system, rhs, rcond=None)
+    if np.abs(system @ solution - rhs).max() > tol:
+        return None
+    strategy, value = solution[:k], solution[k]
+    if strategy.min() < -tol:
+        if rank == k + 1:
+            return None
+        solution = _feasible_strategy(system, rhs, others)
+        if solution is None:
+            return None
+        strategy, value = solution[:k], solution[k]
+    return np.clip(strategy, 0.0, None), value
+
+
+def _feasible_strategy(system, rhs, others):
+    """Solve the indifference system for a non-negative strategy with a linear program.
+
+    The LP maximizes the smallest probability, so the strategy plays every
+    row when some solution does.
+
+    Returns:
+        Array of the strategy followed by the value, or None if the LP is infeasible
+    """
+    k = system.shape[1] - 1
+    # Variables (strategy, value, smallest probability); t - x_i <= 0 for every row i
+    A_ub = np.hstack([-np.eye(k), np.zeros((k, 1)), np.ones((k, 1))])
+    if others is not None and others.shape[1]:
+        # No further column may pay more than the value
+        A_ub = np.vstack([A_ub, np.hstack([others.T, -np.ones((others.shape[1], 1)), np.zeros((others.shape[1], 1))])])
+    c = np.zeros(k + 2)
+    c[-1] = -1.0
+    solution = linprog(
+        c,
+        A_ub=A_ub,
+        b_ub=np.zeros(A_ub.shape[0]),
+        A_eq=np.hstack([system, np.zeros((system.shape[0], 1))]),
+        b_eq=rhs,
+        bounds=[(0.0, None)] * k + [(None, None), (0.0, None)],
+        method="highs",
+    )
+    return solution.x[:-1] if solution.status == 0 else None
+
+
+def _support_profile(A, B, p1_support, p2_support, tol):
+    """Find the profile making each player indifferent over the opponent's support.
+
+    Returns:
+        Tuple (p1_strategy, p2_strategy) of numpy arrays, or None
+    """
+    rows = list(p1_support)
+    cols = list(p2_support)
+    if not rows or not cols:
+        return None
+    other_rows = np.setdiff1d(np.arange(A.shape[0]), rows)
+    other_cols = np.setdiff1d(np.arange(A.shape[1]), cols)
+
+    # Player 1's mix makes player 2 indifferent over its support and vice versa
+    p1 = _indifferent_strategy(B[np.ix_(rows, cols)], tol, B[np.ix_(rows, other_cols)])
+    if p1 is None:
+        return None
+    p2 = _indifferent_strategy(A[np.ix_(rows, cols)].T, tol, A[np.ix_(other_rows, cols)].T)
+    if p2 is None:
+        return None
+
+    x = np.zeros(A.shape[0])
+    y = np.zeros(A.shape[1])
+    x[rows] = p1[0]
+    y[cols] = p2[0]
+    x /= x.sum()
+    y /= y.sum()
+    return x, y
+
+
+def solve_on_support(A, B, p1_support, p2_support, tol=1e-9):
+    """Find a Nash equilibrium whose supports are p1_support and p2_support.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        p1_support: Row indices player 1 may play
+        p2_support: Column indices player 2 may play
+        tol: Numerical tolerance
+
+    Returns:
+        Tuple (p1_strategy, p2_strategy) of numpy arrays, or None
+    """
+    profile = _support_profile(A, B, p1_support, p2_support, tol)
+    # No strategy outside the supports may do better
+    if profile is None or exploitability(A, B, *profile) > tol:
+        return None
+    return profile
+
+
+class _BestProfile:
+    """Keeps the least exploitable profile seen while a solver runs."""
+
+    def __init__(self, A, B, initial):
+        self.A = A
+        self.B = B
+        self.profile = initial
+        self.value = exploitability(A, B, *initial)
+
+    def offer(self, x, y):
+        """Remember (x, y) if it is less exploitable than the best so far."""
+        value = exploitability(self.A, self.B, x, y)
+        if value < self.value:
+            self.profile = (x, y)
+            self.value = value
+        return value
+
+
+def _uniform_profile(A):
+    """Return the profile where both players mix uniformly."""
+    rows, columns = A.shape
+    return np.full(rows, 1.0 / rows), np.full(columns, 1.0 / columns)
+
+
+def _result(method, x, y, A, B, iterations, warm_started, error=None, status="complete"):
+    """Build the common result dictionary returned by every solver."""
+    return {
+        "p1_strategy": x,
+        "p2_strategy": y,
+        "method": method,
+        "iterations": iterations,
+        "exploitability": exploitability(A, B, x, y) if x is not None else None,
+        "warm_started": warm_started,
+        "status": status,
+        "error": error,
+    }
+
+
+def _partial_result(method, best, A, B, iterations, warm_started):
+    """Build the result returned when a solver runs out of budget."""
+    x, y = best.profile
+    return _result(method, x, y, A, B, iterations, warm_started, "Solve stopped before completion", "partial")
+
+
+def _split_prior(prior, n):
+    """Split the strategies into those of a prior support and the others."""
+    if prior is None:
+        return None
+    inside = set(prior)
+    return tuple(sorted(inside)), tuple(i for i in range(n) if i not in inside)
+
+
+def _support_candidates(size, n, split):
+    """Yield supports of the given size, closest to the prior support first.
+
+    A support sharing k strategies with the prior differs from it in
+    len(prior) + size - 2k strategies, so supports are generated lazily by
+    decreasing overlap with the prior instead of sorting every combination.
+
+    Arguments:
+        size: Number of strategies in each support
+        n: Number of strategies of the player
+        split: Prior support and other strategies from _split_prior, or None
+    """
+    if split is None:
+        yield from itertools.combinations(range(n), size)
+        return
+    inside, outside = split
+    for overlap in range(min(len(inside), size), max(0, size - len(outside)) - 1, -1):
+        for kept in itertools.combinations(inside, overlap):
+            for added in itertools.combinations(outside, size - overlap):
+                yield tuple(sorted(kept + added))
+
+
+def support_enumeration(A, B, warm_start=None, tol=1e-9, budget=None):
+    """Find a Nash equilibrium by enumerating pairs of equal-sized supports.
+
+    When warm started, the supports of the previous equilibrium are checked
+    first and the search then proceeds outwards from them, so a small payoff
+    edit that keeps the support unchanged costs a single linear solve.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        warm_start: Optional (p1_strategy, p2_strategy) of a previous equilibrium
+        tol: Numerical tolerance
+        budget: Optional SolveBudget
+
+    Returns:
+        Result dictionary with the equilibrium strategies
+    """
+    rows, columns = A.shape
+    p1_prior = p2_prior = None
+    sizes = list(range(1, min(rows, columns) + 1))
+    checked = 0
+    best = _BestProfile(A, B, warm_start if warm_start is not None else _uniform_profile(A))
+
+    if warm_start is not None:
+        p1_prior, p2_prior = support_of(warm_start[0], tol), support_of(warm_start[1], tol)
+        checked += 1
+        found = solve_on_support(A, B, p1_prior, p2_prior, tol)
+        if found is not None:
+            return _result("support_enumeration", found[0], found[1], A, B, checked, True)
+        target = len(p1_prior)
+        sizes.sort(key=lambda size: (abs(size - target), size))
+
+    p1_split, p2_split = _split_prior(p1_prior, rows), _split_prior(p2_prior, columns)
+    for size in sizes:
+        for p1_support in _support_candidates(size, rows, p1_split):
+            for p2_support in _support_candidates(size, columns, p2_split):
+                checked += 1
+                profile = _support_profile(A, B, p1_support, p2_support, tol)
+                if profile is not None and best.offer(*profile) <= tol:
+                    return _result("support_enumeration", profile[0], profile[1], A, B, checked, warm_start is not None)
+                if budget is not None and checked % 64 == 0:
+                    budget.report(method="support_enumeration", iterations=checked, exploitability=best.value)
+                    if budget.expired():
+                        return _partial_result("support_enumeration", best, A, B, checked, warm_start is not None)
+
+    return _result("support_enumeration", None, None, A, B, checked, warm_start is not None, "No equilibrium found")
+
+
+def _pivot(tableau, basis, entering):
+    """Pivot the entering label into the tableau basis and return the leaving label."""
+    column = tableau[:, entering]
+    candidates = np.flatnonzero(column > 1e-12)
+    if candidates.size == 0:
+        return None
+    ratios = tableau[candidates, -1] / column[candidates]
+    row = candidates[np.argmin(ratios)]
+    tableau[row] /= tableau[row, entering]
+    others = np.arange(tableau.shape[0]) != row
+    tableau[others] -= np.outer(tableau[others, entering], tableau[row])
+    leaving = basis[row]
+    basis[row] = entering
+    return leaving
+
+
+def _tableau_strategy(tableau, basis, labels):
+    """Read a normalized strategy for the given variable labels off a tableau."""
+    strategy = np.zeros(len(labels))
+    for row, label in enumerate(basis):
+        if label in labels:
+            strategy[labels.index(label)] = tableau[row, -1]
+    total = strategy.sum()
+    return strategy / total if total > 0 else None
+
+
+def lemke_howson(A, B, initial_label=0, warm_start=None, tol=1e-9, max_pivots=None, budget=None):
+    """Find a Nash equilibrium with the Lemke-Howson complementary pivoting algorithm.
+
+    When warm started, the previous equilibrium's support is checked first;
+    only if it no longer supports an equilibrium does pivoting start, using a
+    label from the previous support as the initially dropped label.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        initial_label: Label dropped to start the path (0 .. rows + columns - 1)
+        warm_start: Optional (p1_strategy, p2_strategy) of a previous equilibrium
+        tol: Numerical tolerance
+        max_pivots: Maximum number of pivots (defaults to a bound based on game size)
+        budget: Optional SolveBudget
+
+    Returns:
+        Result dictionary with the equilibrium strategies
+    """
+    rows, columns = A.shape
+    if warm_start is not None:
+        p1_support, p2_support = support_of(warm_start[0], tol), support_of(warm_start[1], tol)
+        found = solve_on_support(A, B, p1_support, p2_support, tol)
+        if found is not None:
+            return _result("lemke_howson", found[0], found[1], A, B, 0, True)
+        if p1_support:
+            initial_label = p1_support[0]
+
+    # Shift payoffs so both polytopes are bounded
+    A_pos = A - A.min() + 1.0
+    B_pos = B - B.min() + 1.0
+
+    row_tableau = np.hstack([B_pos.T, np.eye(columns), np.ones((columns, 1))])
+    row_basis = list(range(rows, rows + columns))
+    col_tableau = np.hstack([np.eye(rows), A_pos, np.ones((rows, 1))])
+    col_basis = list(range(rows))
+
+    if max_pivots is None:
+        max_pivots = 10 * (rows + columns) ** 2
+
+    entering = initial_label
+    use_row_tableau = entering < rows
+    pivots = 0
+    while pivots < max_pivots:
+        if use_row_tableau:
+            leaving = _pivot(row_tableau, row_basis, entering)
+        else:
+            leaving = _pivot(col_tableau, col_basis, entering)
+        pivots += 1
+        if leaving is None or leaving == initial_label:
+            break
+        entering = leaving
+        use_row_tableau = not use_row_tableau
+        if budget is not None and pivots % 16 == 0:
+            budget.report(method="lemke_howson", iterations=pivots)
+            if budget.expired():
+                best = _BestProfile(A, B, warm_start if warm_start is not None else _uniform_profile(A))
+                x = _tableau_strategy(row_tableau, row_basis, list(range(rows)))
+                y = _tableau_strategy(col_tableau, col_basis, list(range(rows, rows + columns)))
+                if x is not None and y is not None:
+                    best.offer(x, y)
+                return _partial_result("lemke_howson", best, A, B, pivots, warm_start is not None)
+
+    x = _tableau_strategy(row_tableau, row_basis, list(range(rows)))
+    y = _tableau_strategy(col_tableau, col_basis, list(range(rows, rows + columns)))
+    if x is None or y is None or exploitability(A, B, x, y) > 1e-6:
+        return _result("lemke_howson", None, None, A, B, pivots, warm_start is not None, "Pivoting did not converge")
+    return _result("lemke_howson", x, y, A, B, pivots, warm_start is not None)
+
+
+def fictitious_play(
+    A, B, iterations=10000, warm_start=None, warm_start_weight=100.0, tol=1e-4, check_every=10, budget=None
+):
+    """Approximate a Nash equilibrium with fictitious play.
+
+    Each player repeatedly best responds to the empirical frequency of the
+    opponent's past play. A warm start seeds those frequencies with a previous
+    equilibrium, weighted as if it had been observed warm_start_weight times.
+
+    Arguments:
+        A: Payoff array for player 1
+        B: Payoff array for player 2
+        iterations: Maximum number of iterations
+        warm_start: Optional (p1_strategy, p2_strategy) of a previous equilibrium
+        warm_start_weight: Number of pseudo-observations given to the warm start
+        tol: Stop once the exploitability of the empirical strategies is below this
+        check_every: How often (in iterations) to measure exploitability
+        budget: Optional SolveBudget
+
+    Returns:
+        Result dictionary with the empirical strategies
+    """
+    rows, columns = A.shape
+    if warm_start is not None:
+        p1_counts = warm_start[0] * warm_start_weight
+        p2_counts = warm_start[1] * warm_start_weight
+    else:
+        p1_counts = np.zeros(rows)
+        p2_counts = np.zeros(columns)
+        p1_counts[0] = p2_counts[0] = 1.0
+
+    best = _BestProfile(A, B, (p1_counts / p1_counts.sum(), p2_counts / p2_counts.sum()))
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        x = p1_counts / p1_counts.sum()
+        y = p2_counts / p2_counts.sum()
+        if (iteration - 1) % check_every == 0:
+            if best.offer(x, y) <= tol:
+                break
+            if budget is not None:
+                budget.report(method="fictitious_play", iterations=iteration, exploitability=best.value)
+                if budget.expired():
+                    return _partial_result("fictitious_play", best, A, B, iteration, warm_start is not None)
+        p1_counts[np.argmax(A @ y)] += 1.0
+        p2_counts[np.argmax(x @ B)] += 1.0
+
+    x, y = best.profile
+    return _result("fictitious_play", x, y, A, B, iteration, warm_start is not None)
+
+
+def solve(A, B, method="support_enumeration", warm_start=None, budget=None, **options):
+    """Dispatch to one of the solvers in SOLVER_METHODS.
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method == "support_enumeration":
+        return support_enumeration(A, B, warm_start=warm_start, budget=budget, **options)
+    elif method == "lemke_howson":
+        return lemke_howson(A, B, warm_start=warm_start, budget=budget, **options)
+    elif method == "fictitious_play":
+        return fictitious_play(A, B, warm_start=warm_start, budget=budget, **options)
+    elif method == "logit_qre":
+        from nash_equilibrium.qre import logit_qre
+
+        return logit_qre(A, B, warm_start=warm_start, budget=budget, **options)
+    elif method == "double_oracle":
+        from nash_equilibrium.double_oracle import double_oracle
+
+        return double_oracle(A, B, warm_start=warm_start, budget=budget, **options)
+    raise ValueError(f"Method must be one of {SOLVER_METHODS}")
+
+
+def lemke(M, q, covering=None, max_pivots=None, budget=None):
+    """Solve a linear complementarity problem with Lemke's algorithm.
+
+    Finds z >= 0 with w = q + M z >= 0 and w.z = 0. Ties in the ratio test
+    are broken lexicographically so degenerate problems (such as the sequence
+    form of extensive games) do not cycle.
+
+    Arguments:
+        M: Square matrix of the LCP
+        q: Constant vector of the LCP
+        covering: Covering vector for the artificial variable (defaults to all ones)
+        max_pivots: Maximum number of pivots
+        budget: Optional SolveBudget
+
+    Returns:
+        Tuple (z, pivots), where z is None if the algorithm ended on a ray,
+        ran out of pivots or ran out of budget
+    """
+    n = len(q)
+    q = np.asarray(q, dtype=float)
+    if q.min() >= 0:
+        return np.zeros(n), 0
+    d = np.ones(n) if covering is None else np.asarray(covering, dtype=float)
+    if max_pivots is None:
+        max_pivots = 50 * n * n
+
+    # Columns: w (0..n-1), z (n..2n-1), z0 (2n), right hand side (2n+1)
+    tableau = np.hstack([np.eye(n), -np.asarray(M, dtype=float), -d[:, None], q[:, None]])
+    basis = list(range(n))
+    artificial = 2 * n
+
+    def pivot(row, column):
+        tableau[row] /= tableau[row, column]
+        others = np.arange(n) != row
+        tableau[others] -= np.outer(tableau[others, column], tableau[row])
+        leaving = basis[row]
+        basis[row] = column
+        return leaving
+
+    # The artificial variable enters, replacing the most negative q. Among ties the
+    # last row leaves, which keeps every row of the tableau lexicographically positive.
+    start = q / d
+    ties = np.flatnonzero(start <= start.min() + 1e-9 * max(1.0, abs(start.min())))
+    leaving = pivot(int(ties[-1]), artificial)
+    pivots = 1
+    while pivots < max_pivots:
+        entering = leaving + n if leaving < n else leaving - n
+        column = tableau[:, entering]
+        # Pivots on entries that are rounding noise would make the tableau unstable
+        candidates = np.flatnonzero(column > 1e-9 * max(1.0, np.abs(column).max()))
+        if candidates.size == 0:
+            return None, pivots
+        # Lexicographic minimum ratio test over (rhs, inverse basis columns)
+        ratios = np.hstack([tableau[candidates, -1:], tableau[candidates, :n]]) / column[candidates, None]
+        order = np.lexsort(np.round(ratios, 9).T[::-1])
+        row = candidates[order[0]]
+        leaving = pivot(row, entering)
+        pivots += 1
+        if leaving == artificial:
+            z = np.zeros(n)
+            for r, variable in enumerate(basis):
+                if n <= variable < 2 * n:
+                    z[variable - n] = tableau[r, -1]
+            return z, pivots
+        if budget is not None and pivots % 16 == 0:
+            budget.report(method="lemke", iterations=pivots)
+            if budget.expired():
+                return None, pivots
+    return None, pivots
@@ -0,0 +1,446 @@
+"""
+Sparse Strategic Games
+
+This module provides SparseStrategicGame, a StrategicGame whose payoffs are
+stored as one scipy CSR matrix per player instead of a grid of (p1, p2)
+tuples. Games where most payoffs are zero, such as large coordination and
+matching games, then use memory and time proportional to the number of
+non-zero payoffs.
+
+Every payoff that is not stored is an implicit zero, and the analysis kernels
+take those zeros into account: a column whose stored payoffs are all negative
+has its best responses among the rows that are not stored.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def _to_csr(payoffs):
+    """Convert a sparse matrix or array-like to CSR without explicit zeros."""
+    matrix = sparse.csr_matrix(payoffs)
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _row_max_difference(M, reference):
+    """Calculate max over j of M[k, j] - reference[j] for every row k of a sparse matrix.
+
+    The stored entries of each row are compared directly. The implicit zeros
+    contribute -reference[j], and the best of those is found at the column with
+    the smallest reference value that the row does not store, which is located
+    by ranking the columns once instead of scanning every row densely.
+
+    Arguments:
+        M: CSR matrix of shape (k, n)
+        reference: Dense array of length n
+
+    Returns:
+        Array of length k
+    """
+    k, n = M.shape
+    counts = np.diff(M.indptr)
+    row_of_entry = np.repeat(np.arange(k), counts)
+
+    explicit = np.full(k, -np.inf)
+    nonempty = counts > 0
+    if M.nnz:
+        explicit[nonempty] = np.maximum.reduceat(M.data - reference[M.indices], M.indptr[:-1][nonempty])
+
+    # Rank the columns by reference value; the first rank missing from a row is its best implicit zero
+    order = np.argsort(reference, kind="stable")
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n)
+    entry_rank = rank[M.indices]
+    sorter = np.lexsort((entry_rank, row_of_entry))
+    position = np.arange(M.nnz) - M.indptr[row_of_entry]
+    first_missing = np.bincount(row_of_entry, weights=entry_rank[sorter] == position, minlength=k).astype(np.intp)
+    implicit = np.full(k, -np.inf)
+    has_zero = first_missing < n
+    implicit[has_zero] = -reference[order[first_missing[has_zero]]]
+
+    return np.maximum(explicit, implicit)
+
+
+def _best_response_cells(M, maxima):
+    """Find the cells of each column of M that reach the column maximum.
+
+    Arguments:
+        M: CSC matrix without explicit zeros
+        maxima: Maximum of each column, counting implicit zeros
+
+    Returns:
+        Tuple (rows, columns) of index arrays
+    """
+    counts = np.diff(M.indptr)
+    columns = np.repeat(np.arange(M.shape[1]), counts)
+    best = M.data == maxima[columns]
+    rows = [M.indices[best]]
+    cols = [columns[best]]
+
+    # Columns whose maximum is an implicit zero: every row not stored is a best response
+    for column in np.flatnonzero(maxima == 0):
+        stored = M.indices[M.indptr[column] : M.indptr[column + 1]]
+        free = np.setdiff1d(np.arange(M.shape[0]), stored, assume_unique=True)
+        rows.append(free)
+        cols.append(np.full(len(free), column))
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def _sorted_coordinates(rows, columns):
+    """Return (column, row) tuples sorted by column and then row."""
+    order = np.lexsort((rows, columns))
+    return [(int(c), int(r)) for c, r in zip(columns[order], rows[order])]
+
+
+class SparseStrategicGame(StrategicGame):
+    """A 2-player strategic game with payoffs stored as sparse matrices."""
+
+    def __init__(self, p1_payoffs, p2_payoffs):
+        """Initialize a sparse game.
+
+        Arguments:
+            p1_payoffs: Player 1's payoffs as a scipy sparse matrix or array-like (rows x columns)
+            p2_payoffs: Player 2's payoffs as a scipy sparse matrix or array-like (rows x columns)
+
+        Raises:
+            ValueError: If the payoff matrices have different or empty shapes
+        """
+        self.p1_payoffs = _to_csr(p1_payoffs)
+        self.p2_payoffs = _to_csr(p2_payoffs)
+        if self.p1_payoffs.shape != self.p2_payoffs.shape:
+            raise ValueError("Both players' payoff matrices must have the same shape")
+        if min(self.p1_payoffs.shape) < 1:
+            raise ValueError("Game must have at least one row and one column")
+
+        self.mode = "d"
+        self.lower_limit = None
+        self.upper_limit = None
+        self.rows, self.columns = self.p1_payoffs.shape
+
+        self.nash_equilibria = []
+        # whether find_br or find_pure_nash_equi has marked the best responses
+        self._best_responses_marked = False
+
+        self._payoff_version = 0
+        self._memo = {}
+        self._memo_token = None
+        self._last_mixed_equilibrium = None
+
+    @classmethod
+    def from_strategic_game(cls, game):
+        """Create a sparse game with the same payoffs as a StrategicGame.
+
+        Arguments:
+            game: StrategicGame to convert
+
+        Returns:
+            SparseStrategicGame
+        """
+        return cls(game.get_payoffs(1), game.get_payoffs(2))
+
+    @property
+    def nnz(self):
+        """Number of stored (non-zero) payoffs of both players."""
+        return self.p1_payoffs.nnz + self.p2_payoffs.nnz
+
+    @property
+    def grid(self):
+        """The payoff grid of (p1, p2) tuples, built on first use.
+
+        Building the grid takes memory for every cell, so the analysis methods
+        of this class never use it.
+        """
+
+        def compute():
+            p1_rows = self.p1_payoffs.toarray().tolist()
+            p2_rows = self.p2_payoffs.toarray().tolist()
+            return [list(zip(p1_row, p2_row)) for p1_row, p2_row in zip(p1_rows, p2_rows)]
+
+        return self._memoized("grid", compute)
+
+    @property
+    def p1_br(self):
+        """Player 1's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(1) if self._best_responses_marked else []
+
+    @property
+    def p2_br(self):
+        """Player 2's best responses, once find_br or find_pure_nash_equi has been called."""
+        return self.calculate_best_responses(2) if self._best_responses_marked else []
+
+    @property
+    def grid_pure_nash(self):
+        """The payoff grid with best responses marked 'H', built on first use."""
+        grid = [list(row) for row in self.grid]
+        for column, row in self.p1_br:
+            grid[row][column] = ("H", grid[row][column][1])
+        for column, row in self.p2_br:
+            grid[row][column] = (grid[row][column][0], "H")
+        return grid
+
+    def _payoff_token(self):
+        """The payoff matrices only change through set_payoff, which bumps the version."""
+        return self._payoff_version
+
+    def _column_major(self, player):
+        """Get a player's payoffs in CSC format, with columns indexed by the opponent.
+
+        For player 1 the matrix is rows x columns; for player 2 it is transposed,
+        so that in both cases each column holds the payoffs the player chooses between.
+        """
+
+        def compute():
+            if player == 1:
+                return self.p1_payoffs.tocsc()
+            return self.p2_payoffs.T.tocsc()
+
+        return self._memoized(("csc", player), compute)
+
+    def _strategy_rows(self, player):
+        """Get a player's payoffs in CSR format with one row per own strategy."""
+        if player == 1:
+            return self.p1_payoffs
+        return self._memoized(("strategy_rows", 2), lambda: self.p2_payoffs.T.tocsr())
+
+    def _column_maxima(self, player):
+        """Best payoff of a player against each opponent strategy, counting implicit zeros."""
+
+        def compute():
+            M = self._column_major(player)
+            return M.max(axis=0).toarray().ravel()
+
+        return self._memoized(("maxima", player), compute)
+
+    def set_payoff(self, row, col, p1_payoff, p2_payoff):
+        """Set the payoffs for a specific cell.
+
+        Arguments:
+            row: Row index
+            col: Column index
+            p1_payoff: Payoff for player 1
+            p2_payoff: Payoff for player 2
+
+        Raises:
+            IndexError: If row or col are out of bounds
+        """
+        if row < 0 or row >= self.rows:
+            raise IndexError(f"Row index {row} out of bounds (0-{self.rows - 1})")
+        if col < 0 or col >= self.columns:
+            raise IndexError(f"Column index {col} out of bounds (0-{self.columns - 1})")
+
+        for name, value in (("p1_payoffs", p1_payoff), ("p2_payoffs", p2_payoff)):
+            matrix = getattr(self, name).tolil()
+            matrix[row, col] = value
+            setattr(self, name, _to_csr(matrix))
+        self._payoff_version += 1
+
+    def _payoff_blocks(self, block_rows):
+        """Iterate over the dense payoffs in blocks of rows, without building the grid."""
+        for start in range(0, self.rows, block_rows):
+            yield (
+                self.p1_payoffs[start : start + block_rows].toarray().tolist(),
+                self.p2_payoffs[start : start + block_rows].toarray().tolist(),
+            )
+
+    def payoff_arrays(self):
+        """Get the payoffs of both players as dense numpy arrays.
+
+        The mixed strategy solvers need dense arrays, which take memory for
+        every cell of the game.
+
+        Returns:
+            Tuple (A, B) of float arrays with shape (rows, columns)
+        """
+
+        def compute():
+            return self.p1_payoffs.toarray().astype(float), self.p2_payoffs.toarray().astype(float)
+
+        return self._memoized("payoff_arrays", compute)
+
+    def calculate_best_responses(self, player, update_state=False):
+        """Calculate the pure best responses of a player against each opponent strategy.
+
+        A column whose maximum is an implicit zero has every row it does not
+        store as a best response, so the result can be much larger than the
+        number of stored payoffs.
+
+        Arguments:
+            player: The player number (1 or 2)
+            update_state: Whether to mark the best responses in p1_br, p2_br and grid_pure_nash
+
+        Returns:
+            A list of (column, row) coordinates representing best responses, sorted
+            by column and then row
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+
+        def compute():
+            own, other = _best_response_cells(self._column_major(player), self._column_maxima(player))
+            if player == 1:
+                return _sorted_coordinates(own, other)
+            return _sorted_coordinates(other, own)
+
+        if update_state:
+            self._best_responses_marked = True
+        return list(self._memoized(("best_responses", player), compute))
+
+    def find_pure_nash_equi(self, update_state=True, budget=None):
+        """Find all pure strategy Nash equilibria.
+
+        Stored cells are checked against both players' best payoffs directly.
+        Cells that are zero for both players are equilibria exactly when zero is
+        the best payoff of player 1 in their column and of player 2 in their row.
+
+        Arguments:
+            update_state: Whether to update the class state (for backward compatibility)
+            budget: Accepted for compatibility with StrategicGame; the vectorized search is not interrupted
+
+        Returns:
+            A list of (column, row) coordinates representing Nash equilibria,
+            sorted by column and then row
+        """
+        p1_maxima = self._column_maxima(1)
+        p2_maxima = self._column_maxima(2)
+
+        # Cells where at least one payoff is stored
+        stored = (abs(self.p1_payoffs) + abs(self.p2_payoffs)).tocoo()
+        rows, columns = stored.row, stored.col
+        p1_values = np.asarray(self.p1_payoffs[rows, columns]).ravel()
+        p2_values = np.asarray(self.p2_payoffs[rows, columns]).ravel()
+        equilibrium = (p1_values == p1_maxima[columns]) & (p2_values == p2_maxima[rows])
+        found_rows = [rows[equilibrium]]
+        found_columns = [columns[equilibrium]]
+
+        # Cells where both payoffs are implicit zeros
+        zero_rows = np.flatnonzero(p2_maxima == 0)
+        zero_columns = np.flatnonzero(p1_maxima == 0)
+        if len(zero_rows) and len(zero_columns):
+            free = np.ones((len(zero_rows), len(zero_columns)), dtype=bool)
+            free[stored.tocsr()[zero_rows][:, zero_columns].nonzero()] = False
+            r, c = np.nonzero(free)
+            found_rows.append(zero_rows[r])
+            found_columns.append(zero_columns[c])
+
+        nash_eq = _sorted_coordinates(np.concatenate(found_rows), np.concatenate(found_columns))
+        if update_state:
+            # The best responses themselves are only listed when p1_br, p2_br or grid_pure_nash are read
+            self._best_responses_marked = True
+            self.nash_equilibria = nash_eq
+        return nash_eq
+
+    def calculate_expected_payoffs(self, player, beliefs):
+        """Calculate expected payoffs for a player against a mixed strategy.
+
+        Arguments:
+            player: The player number (1 or 2)
+            beliefs: The opponent's mixed strategy (list of probabilities)
+
+        Returns:
+            A dictionary mapping strategy names to expected payoffs
+
+        Raises:
+            ValueError: If player is not 1 or 2
+        """
+        if player != 1 and player != 2:
+            raise ValueError("player must be an int with the value of 1 or 2")
+
+        values = self._strategy_rows(player) @ np.asarray(beliefs, dtype=float)
+        return dict(zip(self.get_strategies(player), values.tolist()))
+
+    def ep_bpm(self, p1_beliefs, p2_beliefs):
+        """Calculate expected payoffs when both players use mixed strategies.
+
+        Arguments:
+            p1_beliefs: List of probabilities for Player 1's strategies
+            p2_beliefs: List of probabilities for Player 2's strategies
+
+        Returns:
+            Tuple of expected payoffs (p1_payoff, p2_payoff)
+
+        Raises:
+            ValueError: If belief vectors don't match game dimensions
+        """
+        if len(p1_beliefs) != self.rows:
+            raise ValueError(f"p1_beliefs must have length {self.rows}")
+        if len(p2_beliefs) != self.columns:
+            raise ValueError(f"p2_beliefs must have length {self.columns}")
+
+        x = np.asarray(p1_beliefs, dtype=float)
+        y = np.asarray(p2_beliefs, dtype=float)
+        return float(x @ (self.p1_payoffs @ y)), float(x @ (self.p2_payoffs @ y))
+
+    def _dominance_margins(self, strategy_index, player):
+        """Compare one strategy against all of a player's strategies.
+
+        Returns:
+            Tuple (worst, best): for every strategy k, the smallest and largest
+            amount by which the payoff of k exceeds that of strategy_index
+            over all opponent strategies
+        """
+        M = self._strategy_rows(player)
+        reference = M[strategy_index].toarray().ravel()
+        best = _row_max_difference(M, reference)
+        worst = -_row_max_difference(-M, -reference)
+        return worst, best
+
+    def is_dominant_strategy(self, strategy_index: int, player: int, strict: bool = True):
+        """Check if a strategy is dominant for a player.
+
+        Args:
+            strategy_index: Index of the strategy to check
+            player: Player number (1 or 2)
+            strict: Whether to check for strict dominance (default) or weak dominance
+
+        Returns:
+            bool: True if the strategy is dominant
+        """
+        _, best = self._dominance_margins(strategy_index, player)
+        others = np.arange(len(best)) != strategy_index
+        return bool(np.all(best[others] < 0) if strict else np.all(best[others] <= 0))
+
+    def get_dominated_strategies(self, player: int, strict: bool = True):
+        """Get all dominated strategies for a player.
+
+        Args:
+            player: Player number (1 or 2)
+            strict: Whether to check for strict dominance (default) or weak dominance
+
+        Returns:
+            List of dominated strategy indices
+        """
+        dominated = []
+        for strategy in range(self.rows if player == 1 else self.columns):
+            worst, best = self._dominance_margins(strategy, player)
+            others = np.arange(len(best)) != strategy
+            if np.all(best[others] < 0) if strict else np.all(best[others] <= 0):
+                # A dominant strategy is never dominated
+                continue
+            if np.any(worst[others] > 0) if strict else np.any(worst[others] >= 0):
+                dominated.append(strategy)
+        return dominated
+
+    def __str__(self):
+        """Return a string representation of the game."""
+        return f"SparseStrategicGame({self.rows}x{self.columns}, nnz={self.nnz})"
+
+    def __repr__(self):
+        """Return a detailed string representation of the game."""
+        return f"SparseStrategicGame(rows={self.rows}, columns={self.columns}, nnz={self.nnz})"
+
+    def __eq__(self, other):
+        """Check equality with another sparse or dense game."""
+        if isinstance(other, SparseStrategicGame):
+            return (
+                self.p1_payoffs.shape == other.p1_payoffs.shape
+                and (self.p1_payoffs != other.p1_payoffs).nnz == 0
+                and (self.p2_payoffs != other.p2_payoffs).nnz == 0
+            )
+        return super().__eq__(other)
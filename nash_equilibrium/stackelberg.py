@@ -0,0 +1,230 @@
+"""
+Stackelberg Equilibria
+
+This module computes strong Stackelberg equilibria of 2-player games: the
+leader commits to a mixed strategy, the follower observes it and best
+responds, breaking ties in the leader's favour.
+
+The equilibrium is found with the multiple LPs method. For every follower
+action j, one linear program finds the leader strategy that maximizes the
+leader's payoff subject to j being a best response, and the best of these is
+the equilibrium. Two kinds of pruning skip most LPs in large games:
+
+- Follower actions strictly dominated by another pure action are never best
+  responses, so they get no LP and their constraints are implied by the
+  dominating action's.
+- The leader can never get more than its best payoff in column j. Actions
+  are solved in decreasing order of that bound, and the remaining ones are
+  skipped once their bound is no better than the best LP value found.
+
+The LPs of a batch can be solved in parallel on a process pool. The batch is
+split into one task per worker, so the payoff arrays are sent once per task
+rather than once per LP. The pool is kept between solves, so interactive
+solves do not pay for starting processes each time; callers can also pass
+their own executor.
+
+Every LP gets the remaining time of the budget as the HiGHS time limit. Worker
+processes receive the remaining time with each task, since a cancellation
+token cannot be shared with them: a cancelled solve stops after its current
+batch.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import linprog
+
+from nash_equilibrium.budget import SolveBudget, linprog_options
+
+# Process pools kept between solves, by number of workers
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def strictly_dominated_columns(payoffs, chunk_size=256):
+    """Find the columns strictly dominated by another column.
+
+    Arguments:
+        payoffs: Array of the follower's payoffs (leader strategies x follower actions)
+        chunk_size: Number of columns compared against all others at once
+
+    Returns:
+        Boolean array with True for each strictly dominated column
+    """
+    n = payoffs.shape[1]
+    dominated = np.zeros(n, dtype=bool)
+    for start in range(0, n, chunk_size):
+        block = payoffs[:, start : start + chunk_size]
+        # better[k, j] is True when column j is better than column start + k in every row
+        better = np.all(payoffs[:, None, :] > block[:, :, None], axis=0)
+        dominated[start : start + chunk_size] = better.any(axis=1)
+    return dominated
+
+
+def _follower_lp(leader_payoffs, follower_payoffs, action, floor=-np.inf, tol=1e-9, budget=None):
+    """Solve the LP of one follower action by constraint generation.
+
+    The LP starts with the constraints of the follower's best responses to
+    each pure leader strategy. Constraints violated by the solution are added
+    and the LP is solved again, so only a few of the follower's actions ever
+    enter it. Every intermediate value bounds the final one from above, so
+    the LP is abandoned as soon as it cannot beat floor.
+
+    Returns:
+        Tuple (action, leader_value, leader_strategy), with value and strategy
+        None if the action can never be a best response, cannot beat floor, or
+        the budget ran out
+    """
+    m = leader_payoffs.shape[0]
+    # The follower prefers action to k when x @ gaps[:, k] <= 0
+    gaps = follower_payoffs - follower_payoffs[:, action][:, None]
+    active = np.unique(np.argmax(follower_payoffs, axis=1))
+    while True:
+        result = linprog(
+            -leader_payoffs[:, action],
+            A_ub=gaps[:, active].T,
+            b_ub=np.zeros(len(active)),
+            A_eq=np.ones((1, m)),
+            b_eq=[1.0],
+            bounds=(0, None),
+            method="highs",
+            options=linprog_options(budget),
+        )
+        if result.status != 0 or -result.fun <= floor + tol:
+            return action, None, None
+        violations = result.x @ gaps
+        violated = np.flatnonzero(violations > tol)
+        if len(violated) == 0:
+            return action, float(-result.fun), result.x
+        worst = violated[np.argsort(-violations[violated])[:m]]
+        active = np.union1d(active, worst)
+
+
+def _worker_lps(leader_payoffs, follower_payoffs, actions, floor, timeout):
+    """Solve the LPs of some follower actions in a worker process, within timeout seconds."""
+    budget = SolveBudget(timeout=timeout) if timeout is not None else None
+    return [_follower_lp(leader_payoffs, follower_payoffs, action, floor, budget=budget) for action in actions]
+
+
+def _pool(workers):
+    """The process pool with the given number of workers, started on first use."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def stackelberg(leader_payoffs, follower_payoffs, workers=None, batch_size=None, tol=1e-9, budget=None, executor=None):
+    """Find a strong Stackelberg equilibrium with the multiple LPs method.
+
+    Arguments:
+        leader_payoffs: Leader's payoff array (leader strategies x follower actions)
+        follower_payoffs: Follower's payoff array (leader strategies x follower actions)
+        workers: Number of worker processes (None or 1 solves the LPs serially). With
+                 executor, the number of tasks each batch is split into (default 4).
+        batch_size: Number of LPs solved between pruning steps
+                    (defaults to 1 serially and 4 per task in parallel)
+        tol: Tolerance of the bound pruning
+        budget: Optional SolveBudget
+        executor: Optional executor running the tasks, such as a ProcessPoolExecutor
+                  shared with other work (defaults to a pool of workers kept between solves)
+
+    Returns:
+        A dictionary with the equilibrium:
+        {
+            'leader_strategy': [...],  # numpy array over the leader's strategies
+            'follower_action': index of the follower's best response,
+            'leader_payoff': leader's expected payoff,
+            'follower_payoff': follower's expected payoff,
+            'lps_solved': number of LPs solved,
+            'dominated': number of follower actions pruned by dominance,
+            'bound_pruned': number of follower actions pruned by the bound,
+            'status': 'complete' or 'partial',
+            'error': None or error message
+        }
+    """
+    leader_payoffs = np.asarray(leader_payoffs, dtype=float)
+    follower_payoffs = np.asarray(follower_payoffs, dtype=float)
+    parallel = executor is not None or (workers is not None and workers > 1)
+    tasks = (workers or 4) if parallel else 1
+    if batch_size is None:
+        batch_size = 4 * tasks if parallel else 1
+    if parallel and executor is None:
+        executor = _pool(workers)
+
+    dominated = strictly_dominated_columns(follower_payoffs)
+    candidates = np.flatnonzero(~dominated)
+    # Constraints of dominated actions are implied by those of the actions dominating them
+    constraint_payoffs = follower_payoffs[:, candidates]
+    candidate_payoffs = leader_payoffs[:, candidates]
+    bounds = candidate_payoffs.max(axis=0)
+    order = np.argsort(-bounds, kind="stable")
+
+    best_value = -np.inf
+    best = None
+    solved = 0
+    status = "complete"
+    error = None
+    position = 0
+
+    while position < len(order) and bounds[order[position]] > best_value + tol:
+        if budget is not None and budget.expired():
+            status = "partial"
+            error = "Solve stopped before completion"
+            break
+        batch = [int(k) for k in order[position : position + batch_size] if bounds[k] > best_value + tol]
+        position += batch_size
+        if parallel:
+            timeout = budget.remaining() if budget is not None else None
+            futures = [
+                executor.submit(
+                    _worker_lps, candidate_payoffs, constraint_payoffs, batch[start::tasks], best_value, timeout
+                )
+                for start in range(min(tasks, len(batch)))
+            ]
+            results = [result for future in futures for result in future.result()]
+        else:
+            results = (_follower_lp(candidate_payoffs, constraint_payoffs, k, best_value, budget=budget) for k in batch)
+        for k, value, strategy in results:
+            solved += 1
+            if value is not None and value > best_value:
+                best_value, best = value, (int(candidates[k]), strategy)
+        if budget is not None:
+            budget.report(method="stackelberg", iterations=solved, leader_payoff=best_value)
+            if budget.expired():
+                # The time limit may have cut LPs of this batch short
+                status = "partial"
+                error = "Solve stopped before completion"
+                break
+
+    if best is None:
+        if error is None:
+            error = "No follower action could be induced"
+        return {
+            "leader_strategy": None,
+            "follower_action": None,
+            "leader_payoff": None,
+            "follower_payoff": None,
+            "lps_solved": solved,
+            "dominated": int(dominated.sum()),
+            "bound_pruned": len(order) - solved,
+            "status": status,
+            "error": error,
+        }
+
+    action, strategy = best
+    strategy = np.clip(strategy, 0.0, None)
+    strategy /= strategy.sum()
+    return {
+        "leader_strategy": strategy,
+        "follower_action": action,
+        "leader_payoff": float(strategy @ leader_payoffs[:, action]),
+        "follower_payoff": float(strategy @ follower_payoffs[:, action]),
+        "lps_solved": solved,
+        "dominated": int(dominated.sum()),
+        "bound_pruned": len(order) - solved if status == "complete" else 0,
+        "status": status,
+        "error": error,
+    }
@@ -0,0 +1,986 @@
+"""
+Game Storage
+
+This module provides the storage backends of GameManager:
+
+- MemoryStore keeps the game objects in a dictionary of the current process.
+  It is the default and the fastest, but every process has its own games.
+  It can be bounded by game count, payoff bytes and idle time, evicting the
+  least recently used games to a spill directory or dropping them.
+- SQLiteStore keeps the games in a SQLite file shared by every process that
+  opens it, such as the workers of a gunicorn server.
+
+SQLiteStore stores each game as a row with its kind, a small JSON metadata
+document and its payoff arrays as one binary blob (an uncompressed .npz), so
+loading a game never parses text payoffs. The database runs in WAL mode, so
+readers never wait for a writer, and each thread reuses its own connection.
+Games are also kept decoded in a per-process cache together with the version
+of their row: a lookup only reads that version and decodes the blob again
+when another process has changed the game.
+
+A SQLiteStore also keeps the states of analysis jobs in a jobs table, so that
+any process can report on and cancel a job submitted to another one (see the
+jobs module).
+
+Stores behave like read-only mappings from game ID to game: they support
+`game_id in store`, `store[game_id]`, `len(store)` and iteration over IDs.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from nash_equilibrium.dense_game import DenseStrategicGame
+from nash_equilibrium.derived_game import DerivedGame
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def _pack(arrays):
+    """Serialize a dictionary of numpy arrays into one binary blob."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(blob):
+    """Deserialize a blob written by _pack into a dictionary of numpy arrays."""
+    with np.load(io.BytesIO(blob), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def encode_arrays(game):
+    """Split a game into its kind, JSON-serializable metadata and payoff arrays."""
+    if isinstance(game, EmpiricalGame):
+        metadata = {"rows": game.rows, "columns": game.columns, "confidence": game.confidence}
+        arrays = {"counts": game.counts, "means": game.means, "squared_deviations": game._squared_deviations}
+        return "empirical", metadata, arrays
+    if isinstance(game, SparseStrategicGame):
+        arrays = {}
+        for name in ("p1_payoffs", "p2_payoffs"):
+            matrix = getattr(game, name)
+            arrays[f"{name}_data"] = matrix.data
+            arrays[f"{name}_indices"] = matrix.indices
+            arrays[f"{name}_indptr"] = matrix.indptr
+        return "sparse", {"rows": game.rows, "columns": game.columns}, arrays
+    if isinstance(game, DenseStrategicGame):
+        metadata = {"mode": game.mode, "lower_limit": game.lower_limit, "upper_limit": game.upper_limit}
+        return "strategic", metadata, {"grid": game.payoffs}
+    if isinstance(game, StrategicGame):
+        metadata = {"mode": game.mode, "lower_limit": game.lower_limit, "upper_limit": game.upper_limit}
+        # Integer payoffs keep an integer dtype, so they come back as ints
+        grid = np.asarray(game.grid).reshape(game.rows, game.columns, 2)
+        return "strategic", metadata, {"grid": grid}
+    if isinstance(game, NPlayerGame):
+        metadata = {"mode": game.mode, "lower_limit": game.lower_limit, "upper_limit": game.upper_limit}
+        return "n_player", metadata, {"payoffs": np.asarray(game.payoffs)}
+    raise ValueError(f"Games of type {type(game).__name__} cannot be stored")
+
+
+def decode_arrays(kind, metadata, arrays):
+    """Rebuild a game from the parts returned by encode_arrays.
+
+    The game uses the arrays without copying them: 2-player games are
+    DenseStrategicGames, which only build their grid of tuples when needed.
+    """
+    if kind == "strategic":
+        game = DenseStrategicGame(arrays["grid"])
+    elif kind == "sparse":
+        shape = (metadata["rows"], metadata["columns"])
+        p1, p2 = (
+            sparse.csr_matrix(
+                (arrays[f"{name}_data"], arrays[f"{name}_indices"], arrays[f"{name}_indptr"]), shape=shape
+            )
+            for name in ("p1_payoffs", "p2_payoffs")
+        )
+        return SparseStrategicGame(p1, p2)
+    elif kind == "empirical":
+        game = EmpiricalGame(metadata["rows"], metadata["columns"], confidence=metadata["confidence"])
+        game.counts = arrays["counts"]
+        game.means = arrays["means"]
+        game._squared_deviations = arrays["squared_deviations"]
+        game._update_best_responses(np.arange(game.rows), np.arange(game.columns))
+        return game
+    elif kind == "n_player":
+        game = NPlayerGame(mode="d", payoffs=arrays["payoffs"])
+    else:
+        raise ValueError(f"Unknown game kind: {kind}")
+    game.mode = metadata["mode"]
+    game.lower_limit = metadata["lower_limit"]
+    game.upper_limit = metadata["upper_limit"]
+    return game
+
+
+def encode_game(game):
+    """Serialize a game into its kind, metadata and payoff blob.
+
+    Arguments:
+        game: StrategicGame, SparseStrategicGame, EmpiricalGame or NPlayerGame
+
+    Returns:
+        Tuple (kind, metadata, blob) with a string kind, a JSON-serializable
+        metadata dictionary and the payoff arrays as bytes
+
+    Raises:
+        ValueError: If the game type cannot be stored
+    """
+    kind, metadata, arrays = encode_arrays(game)
+    return kind, metadata, _pack(arrays)
+
+
+def decode_game(kind, metadata, blob):
+    """Rebuild a game serialized by encode_game.
+
+    Returns:
+        The game object
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    return decode_arrays(kind, metadata, _unpack(blob))
+
+
+def _grid_bytes(grid):
+    """Estimate the size of a list of rows of (p1, p2) tuples from its first cell."""
+    if not grid or not grid[0]:
+        return sys.getsizeof(grid)
+    cell = grid[0][0]
+    cell_bytes = sys.getsizeof(cell) + sum(sys.getsizeof(payoff) for payoff in cell)
+    return sys.getsizeof(grid) + len(grid) * (sys.getsizeof(grid[0]) + len(grid[0]) * cell_bytes)
+
+
+def _memo_bytes(game):
+    """Estimate the size of the payoff caches a game has memoized: grids built on demand and payoff arrays."""
+    size = 0
+    for key, value in list(getattr(game, "_memo", {}).items()):
+        if key == "grid":
+            size += _grid_bytes(value)
+            continue
+        for array in value if isinstance(value, tuple) else (value,):
+            # Views share the memory of arrays counted elsewhere
+            if isinstance(array, np.ndarray) and array.flags.owndata:
+                size += array.nbytes
+    return size
+
+
+def payoff_bytes(game, stored=None):
+    """Estimate the memory a game's payoffs take in bytes, as counted by the MemoryStore limits.
+
+    The estimate follows what the game holds: arrays count their nbytes, and
+    payoff grids of (p1, p2) tuples, like the grid of StrategicGame, count
+    their lists, tuples and numbers, several times the size of an array.
+    Grids and payoff arrays a game has built and memoized count too, so the
+    estimate grows as the game is analyzed.
+
+    Derived games count their edited cells and what they have built. The game
+    they are derived from counts too when it is not kept by the store itself,
+    since the derived game keeps it in memory.
+
+    Arguments:
+        game: The game
+        stored: Optional function telling whether a game object is kept by the store
+                (without it, the games that derived games depend on are not counted)
+    """
+    if isinstance(game, EmpiricalGame):
+        return game.counts.nbytes + game.means.nbytes + game._squared_deviations.nbytes + _memo_bytes(game)
+    if isinstance(game, SparseStrategicGame):
+        return _memo_bytes(game) + sum(
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            for matrix in (game.p1_payoffs, game.p2_payoffs)
+        )
+    if isinstance(game, DerivedGame):
+        size = _grid_bytes([list(game._own_edits.values())]) + _memo_bytes(game)
+        # The intermediate derived game, if any, depends on the base game in turn
+        dependency = game._parent if game._parent is not None else game.base
+        if stored is not None and not stored(dependency):
+            size += payoff_bytes(dependency, stored)
+        return size
+    if isinstance(game, DenseStrategicGame):
+        return game.payoffs.nbytes + _memo_bytes(game)
+    if isinstance(game, StrategicGame):
+        # grid_pure_nash and the copy noticing in-place edits have their own lists, but share most cells with grid
+        size = _grid_bytes(game.grid) + _memo_bytes(game)
+        return size + 2 * (sys.getsizeof(game.grid_pure_nash) + game.rows * sys.getsizeof(game.grid[0]))
+    if isinstance(game, NPlayerGame):
+        return game.payoffs.nbytes
+    raise ValueError(f"Games of type {type(game).__name__} cannot be stored")
+
+
+def _payoff_token(game):
+    """The payoff token of a game, or None for game types that do not track payoff changes."""
+    return game._payoff_token() if hasattr(game, "_payoff_token") else None
+
+
+def content_digest(game):
+    """Hash of a game's kind, metadata and payoff arrays.
+
+    Games with identical content, such as two Prisoner's Dilemmas, have the
+    same digest. Payoffs of different dtypes, e.g. 1 and 1.0, count as different.
+
+    Returns:
+        Hexadecimal digest string
+
+    Raises:
+        ValueError: If the game type cannot be stored
+    """
+    kind, metadata, arrays = encode_arrays(game)
+    digest = hashlib.blake2b(json.dumps([kind, metadata], sort_keys=True).encode("utf-8"), digest_size=20)
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape};".encode("utf-8"))
+        digest.update(array)
+    return digest.hexdigest()
+
+
+class SpillDirectory:
+    """Games evicted from a MemoryStore, kept as one .npz file per game."""
+
+    def __init__(self, path):
+        """Open a spill directory, creating it if needed.
+
+        Arguments:
+            path: Directory of the spilled games. Games spilled by an earlier
+                  process stay available; the directory must not be shared by
+                  processes running at the same time.
+        """
+        self.path = os.fspath(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, game_id):
+        return os.path.join(self.path, f"{game_id}.npz")
+
+    def save(self, game_id, game):
+        """Write a game, replacing any earlier copy."""
+        kind, metadata, arrays = encode_arrays(game)
+        header = {"__kind__": np.array(kind), "__metadata__": np.array(json.dumps(metadata))}
+        temporary = self._file(game_id) + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(_pack({**arrays, **header}))
+        # Readers never see a partly written file
+        os.replace(temporary, self._file(game_id))
+
+    def load(self, game_id):
+        """Read a game.
+
+        Raises:
+            KeyError: If the game was not spilled
+        """
+        try:
+            with open(self._file(game_id), "rb") as f:
+                arrays = _unpack(f.read())
+        except FileNotFoundError:
+            raise KeyError(game_id) from None
+        kind = str(arrays.pop("__kind__"))
+        metadata = json.loads(str(arrays.pop("__metadata__")))
+        return decode_arrays(kind, metadata, arrays)
+
+    def discard(self, game_id):
+        """Delete a spilled game, returning whether it existed."""
+        try:
+            os.remove(self._file(game_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def __contains__(self, game_id):
+        return os.path.exists(self._file(game_id))
+
+    def ids(self):
+        """IDs of the spilled games."""
+        return [name[: -len(".npz")] for name in os.listdir(self.path) if name.endswith(".npz")]
+
+
+class GameStore:
+    """Interface of the game storage backends used by GameManager."""
+
+    def add(self, game):
+        """Store a new game under a new ID.
+
+        Returns:
+            The game ID, a string
+        """
+        raise NotImplementedError
+
+    def get(self, game_id):
+        """Get a game by ID.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        raise NotImplementedError
+
+    def put(self, game_id, game):
+        """Replace the stored state of an existing game.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        """Delete a game.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        raise NotImplementedError
+
+    def add_by_content(self, game):
+        """Store a game by content, or add a reference to the stored game with the same content.
+
+        The content digest and reference count of the game are kept by the
+        store, so every process sharing the store sees them. A stored game
+        that no longer has the content of its digest, because it was changed
+        since, is not returned.
+
+        Returns:
+            Tuple (game_id, game) of the stored game, which is game itself if it was added
+        """
+        raise NotImplementedError
+
+    def references(self, game_id):
+        """Number of references of a game; games not added by content have one.
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        raise NotImplementedError
+
+    def release(self, game_id):
+        """Drop one reference of a game, deleting the game with its last reference.
+
+        Returns:
+            Whether the game was deleted
+
+        Raises:
+            KeyError: If game_id is not found
+        """
+        raise NotImplementedError
+
+    def insert_many(self, games):
+        """Store games under given IDs, e.g. when restoring a snapshot.
+
+        New games added later get IDs after the inserted ones.
+
+        Arguments:
+            games: Iterable of (game_id, game) pairs
+
+        Raises:
+            ValueError: If a game ID is already used
+        """
+        raise NotImplementedError
+
+    def ids(self):
+        """IDs of all stored games, in creation order."""
+        raise NotImplementedError
+
+    def __contains__(self, game_id):
+        try:
+            self.get(game_id)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, game_id):
+        return self.get(game_id)
+
+    def __iter__(self):
+        return iter(self.ids())
+
+    def __len__(self):
+        return len(self.ids())
+
+
+class MemoryStore(GameStore):
+    """Games kept as objects in a dictionary of the current process.
+
+    The store can be bounded by a number of games, an estimated size of their
+    payoffs (see payoff_bytes) and a time to live since each game's last use.
+    Sizes are estimated again whenever a game is looked up, so the caches it
+    builds while it is analyzed count from its next lookup on.
+    Beyond the limits, the least recently used games are evicted. Evicted
+    games are dropped, or written to a spill directory and loaded back
+    transparently by get when they are needed again.
+
+    Games of an attached snapshot are loaded the same way, on first use.
+
+    Games added by content lose their digest when they are evicted, and their
+    references too when they are dropped rather than spilled.
+    """
+
+    def __init__(self, max_games=None, max_bytes=None, ttl=None, spill_directory=None, clock=time.monotonic):
+        """Initialize an empty store.
+
+        Arguments:
+            max_games: Optional maximum number of games kept in memory
+            max_bytes: Optional maximum total payoff bytes kept in memory
+            ttl: Optional seconds after its last use when a game is evicted
+            spill_directory: Optional directory evicted games are written to
+                             instead of being dropped
+            clock: Function returning the current time in seconds, for the TTL
+        """
+        # game_id -> game, least recently used first
+        self.games = OrderedDict()
+        self.max_games = max_games
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill = SpillDirectory(spill_directory) if spill_directory is not None else None
+        self.total_bytes = 0
+        self.evictions = 0
+        self._sizes = {}
+        self._last_used = {}
+        # id of each game object kept in memory -> number of IDs it is kept under
+        self._objects = {}
+        self._clock = clock
+        # game_id -> attached snapshot, for snapshot games not loaded yet
+        self._unloaded = {}
+        # Games added by content: digest -> game_id, game_id -> (digest, payoff token
+        # when the digest was last checked) and game_id -> number of references
+        self._content_ids = {}
+        self._digests = {}
+        self._references = {}
+
+        self.next_game_id = 1
+        if self.spill is not None:
+            # Continue after the games spilled by an earlier process
+            self.next_game_id = max((int(game_id) for game_id in self.spill.ids()), default=0) + 1
+        # Guards next_game_id, the games and their order of use; only unbounded lookups skip it
+        self._lock = threading.RLock()
+
+    @property
+    def bounded(self):
+        """Whether any limit is set."""
+        return self.max_games is not None or self.max_bytes is not None or self.ttl is not None
+
+    def _holds(self, game):
+        """Whether a game object is kept in memory under some ID. Call with the lock held."""
+        return id(game) in self._objects
+
+    def _resize(self, game_id):
+        """Estimate the size of a game in memory again. Call with the lock held."""
+        if self.max_bytes is None:
+            return
+        size = payoff_bytes(self.games[game_id], stored=self._holds)
+        self.total_bytes += size - self._sizes[game_id]
+        self._sizes[game_id] = size
+
+    def _remove(self, game_id):
+        """Drop a game from memory and from the total size. Call with the lock held."""
+        game = self.games.pop(game_id)
+        self.total_bytes -= self._sizes.pop(game_id)
+        self._last_used.pop(game_id, None)
+        key = id(game)
+        self._objects[key] -= 1
+        if not self._objects[key]:
+            del self._objects[key]
+        return game
+
+    def _insert(self, game_id, game):
+        """Keep a game in memory as the most recently used one. Call with the lock held."""
+        if game_id in self.games:
+            self._remove(game_id)
+        self.games[game_id] = game
+        self._objects[id(game)] = self._objects.get(id(game), 0) + 1
+        self._sizes[game_id] = 0
+        self._last_used[game_id] = self._clock()
+        self._resize(game_id)
+
+    def _evict(self, game_id):
+        """Remove a game from memory, spilling it if possible. Call with the lock held."""
+        if game_id not in self.games:
+            return
+        game = self._remove(game_id)
+        self._forget_content(game_id)
+        self.evictions += 1
+        if self.spill is not None:
+            self.spill.save(game_id, game)
+        else:
+            self._references.pop(game_id, None)
+
+    def _forget_content(self, game_id):
+        """Stop returning a game for its content. Call with the lock held."""
+        digest, _ = self._digests.pop(game_id, (None, None))
+        if digest is not None and self._content_ids.get(digest) == game_id:
+            del self._content_ids[digest]
+
+    def _expired(self, game_id, now):
+        last_used = self._last_used.get(game_id)
+        return self.ttl is not None and last_used is not None and now - last_used > self.ttl
+
+    def evict_expired(self):
+        """Evict every game unused for longer than the TTL.
+
+        This also happens whenever a game is added, so it only needs to be
+        called to free memory while no games are being created.
+
+        Returns:
+            Number of games evicted
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            now = self._clock()
+            expired = [game_id for game_id in list(self.games) if self._expired(game_id, now)]
+            for game_id in expired:
+                self._evict(game_id)
+        return len(expired)
+
+    def _enforce_limits(self, keep):
+        """Evict games until the limits hold, never evicting keep. Call with the lock held."""
+        self.evict_expired()
+        while (self.max_games is not None and len(self.games) > self.max_games) or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            victim = next((game_id for game_id in self.games if game_id != keep), None)
+            if victim is None:
+                break
+            self._evict(victim)
+
+    def add(self, game):
+        with self._lock:
+            game_id = str(self.next_game_id)
+            self.next_game_id += 1
+            self._insert(game_id, game)
+            self._enforce_limits(keep=game_id)
+        return game_id
+
+    def _usable(self, game_id):
+        """Whether a game in memory may be returned: expired games are only dropped without a spill."""
+        return self.spill is not None or not self._expired(game_id, self._clock())
+
+    def _touch(self, game_id):
+        """Mark a game in memory as the most recently used one and size it again. Call with the lock held."""
+        self._last_used[game_id] = self._clock()
+        self.games.move_to_end(game_id)
+        self._resize(game_id)
+        self._enforce_limits(keep=game_id)
+
+    def get(self, game_id):
+        if not self.bounded:
+            # Nothing is evicted or reordered, so a single lookup needs no lock
+            game = self.games.get(game_id)
+            if game is not None:
+                return game
+
+        with self._lock:
+            if game_id in self.games:
+                if self._usable(game_id):
+                    self._touch(game_id)
+                    return self.games[game_id]
+                self._evict(game_id)
+                raise KeyError(game_id)
+            if game_id in self._unloaded:
+                game = self._unloaded.pop(game_id).load(game_id)
+            elif self.spill is None:
+                raise KeyError(game_id)
+            else:
+                game = self.spill.load(game_id)
+                self.spill.discard(game_id)
+            self._insert(game_id, game)
+            self._enforce_limits(keep=game_id)
+            return game
+
+    def put(self, game_id, game):
+        with self._lock:
+            if (
+                game_id not in self.games
+                and game_id not in self._unloaded
+                and (self.spill is None or game_id not in self.spill)
+            ):
+                raise KeyError(game_id)
+            self._unloaded.pop(game_id, None)
+            if self.spill is not None:
+                self.spill.discard(game_id)
+            if game_id in self._digests:
+                # The new state is checked against the digest on its next lookup by content
+                self._digests[game_id] = (self._digests[game_id][0], None)
+            self._insert(game_id, game)
+            self._enforce_limits(keep=game_id)
+
+    def delete(self, game_id):
+        with self._lock:
+            spilled = self.spill is not None and self.spill.discard(game_id)
+            unloaded = self._unloaded.pop(game_id, None) is not None
+            self._forget_content(game_id)
+            self._references.pop(game_id, None)
+            if game_id in self.games:
+                self._remove(game_id)
+            elif not spilled and not unloaded:
+                raise KeyError(game_id)
+
+    def _stored_content(self, game_id, digest):
+        """The game stored for a digest, or None if it was evicted or changed. Call with the lock held."""
+        try:
+            game = self.get(game_id)
+        except KeyError:
+            return None
+        _, token = self._digests[game_id]
+        if token is not None and _payoff_token(game) == token:
+            return game
+        if content_digest(game) != digest:
+            self._forget_content(game_id)
+            return None
+        self._digests[game_id] = (digest, _payoff_token(game))
+        return game
+
+    def add_by_content(self, game):
+        digest = content_digest(game)
+        with self._lock:
+            game_id = self._content_ids.get(digest)
+            if game_id is not None:
+                stored = self._stored_content(game_id, digest)
+                if stored is not None:
+                    self._references[game_id] += 1
+                    return game_id, stored
+            game_id = self.add(game)
+            self._content_ids[digest] = game_id
+            self._digests[game_id] = (digest, _payoff_token(game))
+            self._references[game_id] = 1
+        return game_id, game
+
+    def references(self, game_id):
+        with self._lock:
+            if game_id not in self._references and game_id not in self:
+                raise KeyError(game_id)
+            return self._references.get(game_id, 1)
+
+    def release(self, game_id):
+        with self._lock:
+            if self._references.get(game_id, 1) > 1:
+                self._references[game_id] -= 1
+                return False
+            self.delete(game_id)
+        return True
+
+    def _check_new_ids(self, game_ids):
+        """Raise ValueError if any of the IDs is used. Call with the lock held."""
+        used = set(self.games) | set(self._unloaded)
+        if self.spill is not None:
+            used.update(self.spill.ids())
+        conflicts = used.intersection(game_ids)
+        if conflicts:
+            raise ValueError(f"Game IDs already used: {', '.join(sorted(conflicts, key=int)[:10])}")
+        self.next_game_id = max([self.next_game_id - 1] + [int(game_id) for game_id in game_ids]) + 1
+
+    def insert_many(self, games):
+        games = [(str(game_id), game) for game_id, game in games]
+        with self._lock:
+            self._check_new_ids([game_id for game_id, _ in games])
+            for game_id, game in games:
+                self._insert(game_id, game)
+            self._enforce_limits(keep=None)
+
+    def attach_snapshot(self, snapshot):
+        """Make the games of a snapshot available, loading each one on first use.
+
+        Arguments:
+            snapshot: Snapshot whose games are added under their saved IDs
+
+        Raises:
+            ValueError: If a game ID of the snapshot is already used
+        """
+        game_ids = snapshot.ids()
+        with self._lock:
+            self._check_new_ids(game_ids)
+            self._unloaded.update(dict.fromkeys(game_ids, snapshot))
+
+    def ids(self):
+        ids = set(self.games)
+        ids.update(self._unloaded)
+        if self.spill is not None:
+            ids.update(self.spill.ids())
+        return sorted(ids, key=int)
+
+
+class SQLiteStore(GameStore):
+    """Games kept in a SQLite file that every process opening it shares."""
+
+    def __init__(self, path, cache_size=256, timeout=30.0):
+        """Open a store, creating the database file if needed.
+
+        Arguments:
+            path: Path of the SQLite database file
+            cache_size: Number of decoded games kept in the per-process cache
+            timeout: Seconds a writer waits for another process's write to finish
+        """
+        self.path = os.fspath(path)
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._local = threading.local()
+        # game_id -> (version, game), least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS games ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "kind TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, "
+            "payoffs BLOB NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 1, "
+            "digest TEXT, "
+            "refs INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(games)")}
+        # Databases created before games were stored by content
+        if "digest" not in columns:
+            connection.execute("ALTER TABLE games ADD COLUMN digest TEXT")
+        if "refs" not in columns:
+            connection.execute("ALTER TABLE games ADD COLUMN refs INTEGER NOT NULL DEFAULT 1")
+        connection.execute("CREATE INDEX IF NOT EXISTS games_digest ON games (digest)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, "
+            "record TEXT NOT NULL, "
+            "finished REAL, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def _connection(self):
+        """The connection of the current thread, opened on first use.
+
+        Connections are not shared between threads, nor inherited by processes
+        forked after they were opened.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            # Autocommit mode: every statement outside an explicit BEGIN commits immediately
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _remember(self, game_id, version, game):
+        """Put a decoded game in the cache, evicting the least recently used one."""
+        with self._cache_lock:
+            self._cache[game_id] = (version, game)
+            self._cache.move_to_end(game_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _row_id(game_id):
+        """The integer row ID of a game ID, raising KeyError for malformed IDs."""
+        try:
+            return int(game_id)
+        except (TypeError, ValueError):
+            raise KeyError(game_id) from None
+
+    def add(self, game):
+        kind, metadata, blob = encode_game(game)
+        cursor = self._connection().execute(
+            "INSERT INTO games (kind, metadata, payoffs) VALUES (?, ?, ?)", (kind, json.dumps(metadata), blob)
+        )
+        game_id = str(cursor.lastrowid)
+        self._remember(game_id, 1, game)
+        return game_id
+
+    def get(self, game_id):
+        connection = self._connection()
+        row = connection.execute("SELECT version FROM games WHERE id = ?", (self._row_id(game_id),)).fetchone()
+        if row is None:
+            with self._cache_lock:
+                self._cache.pop(game_id, None)
+            raise KeyError(game_id)
+
+        with self._cache_lock:
+            cached = self._cache.get(game_id)
+            if cached is not None and cached[0] == row[0]:
+                self._cache.move_to_end(game_id)
+                return cached[1]
+
+        row = connection.execute(
+            "SELECT kind, metadata, payoffs, version FROM games WHERE id = ?", (self._row_id(game_id),)
+        ).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        kind, metadata, blob, version = row
+        game = decode_game(kind, json.loads(metadata), blob)
+        self._remember(game_id, version, game)
+        return game
+
+    def put(self, game_id, game):
+        kind, metadata, blob = encode_game(game)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            updated = connection.execute(
+                "UPDATE games SET kind = ?, metadata = ?, payoffs = ?, version = version + 1 WHERE id = ?",
+                (kind, json.dumps(metadata), blob, self._row_id(game_id)),
+            ).rowcount
+            if not updated:
+                raise KeyError(game_id)
+            (version,) = connection.execute(
+                "SELECT version FROM games WHERE id = ?", (self._row_id(game_id),)
+            ).fetchone()
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._remember(game_id, version, game)
+
+    def delete(self, game_id):
+        deleted = self._connection().execute("DELETE FROM games WHERE id = ?", (self._row_id(game_id),)).rowcount
+        with self._cache_lock:
+            self._cache.pop(game_id, None)
+        if not deleted:
+            raise KeyError(game_id)
+
+    def add_by_content(self, game):
+        digest = content_digest(game)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT id FROM games WHERE digest = ?", (digest,)).fetchone()
+            if row is not None:
+                stored = self.get(str(row[0]))
+                if content_digest(stored) == digest:
+                    connection.execute("UPDATE games SET refs = refs + 1 WHERE id = ?", row)
+                    connection.execute("COMMIT")
+                    return str(row[0]), stored
+                # Changed since it was added
+                connection.execute("UPDATE games SET digest = NULL WHERE id = ?", row)
+            kind, metadata, blob = encode_game(game)
+            cursor = connection.execute(
+                "INSERT INTO games (kind, metadata, payoffs, digest) VALUES (?, ?, ?, ?)",
+                (kind, json.dumps(metadata), blob, digest),
+            )
+            game_id = str(cursor.lastrowid)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._remember(game_id, 1, game)
+        return game_id, game
+
+    def references(self, game_id):
+        row = self._connection().execute("SELECT refs FROM games WHERE id = ?", (self._row_id(game_id),)).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        return row[0]
+
+    def release(self, game_id):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT refs FROM games WHERE id = ?", (self._row_id(game_id),)).fetchone()
+            if row is None:
+                raise KeyError(game_id)
+            if row[0] > 1:
+                connection.execute("UPDATE games SET refs = refs - 1 WHERE id = ?", (self._row_id(game_id),))
+            else:
+                connection.execute("DELETE FROM games WHERE id = ?", (self._row_id(game_id),))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if row[0] > 1:
+            return False
+        with self._cache_lock:
+            self._cache.pop(game_id, None)
+        return True
+
+    def insert_many(self, games):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for game_id, game in games:
+                kind, metadata, blob = encode_game(game)
+                try:
+                    connection.execute(
+                        "INSERT INTO games (id, kind, metadata, payoffs) VALUES (?, ?, ?, ?)",
+                        (self._row_id(game_id), kind, json.dumps(metadata), blob),
+                    )
+                except sqlite3.IntegrityError:
+                    raise ValueError(f"Game IDs already used: {game_id}") from None
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def ids(self):
+        return [str(row[0]) for row in self._connection().execute("SELECT id FROM games ORDER BY id")]
+
+    def save_job(self, job_id, record, finished=None):
+        """Write the state of an analysis job, keeping any cancellation requested for it.
+
+        Arguments:
+            job_id: ID of the job
+            record: JSON-serializable dictionary describing the job
+            finished: Time the job finished, or None while it is queued or running
+        """
+        self._connection().execute(
+            "INSERT INTO jobs (id, record, finished) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET record = excluded.record, finished = excluded.finished",
+            (job_id, json.dumps(record), finished),
+        )
+
+    def load_job(self, job_id):
+        """Read the state of an analysis job.
+
+        Returns:
+            Tuple (record, cancel_requested)
+
+        Raises:
+            KeyError: If job_id is not found
+        """
+        row = self._connection().execute("SELECT record, cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        return json.loads(row[0]), bool(row[1])
+
+    def request_job_cancel(self, job_id):
+        """Ask the process running a job to cancel it.
+
+        Raises:
+            KeyError: If job_id is not found
+        """
+        if not self._connection().execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,)).rowcount:
+            raise KeyError(job_id)
+
+    def purge_jobs(self, before):
+        """Delete the jobs that finished before a time."""
+        self._connection().execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (before,))
+
+    def close(self):
+        """Close the current thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def open_store(location=None, max_games=None, max_bytes=None, ttl=None, spill_directory=None):
+    """Open the game store at a location.
+
+    Arguments:
+        location: None or 'memory' for a MemoryStore, otherwise the path of a
+                  SQLite database file
+        max_games: Optional maximum number of games kept in memory. For a
+                   SQLiteStore this is the size of its cache of decoded games.
+        max_bytes: Optional maximum total payoff bytes kept in memory (MemoryStore only)
+        ttl: Optional seconds after its last use when a game is evicted (MemoryStore only)
+        spill_directory: Optional directory evicted games are written to (MemoryStore only)
+
+    Returns:
+        GameStore
+    """
+    if location is None or location == "memory":
+        return MemoryStore(max_games=max_games, max_bytes=max_bytes, ttl=ttl, spill_directory=spill_directory)
+    if max_games is None:
+        return SQLiteStore(location)
+    return SQLiteStore(location, cache_size=max_games)
@@ -19,11 +19,19 @@
 #  =============================================================================
 
 import functools
+import operator
 import random
 from typing import List, Tuple
 
 import numpy as np
 
+from nash_equilibrium import correlated, double_oracle, qre, security, solvers, stackelberg, welfare
+from nash_equilibrium.budget import make_budget
+from nash_equilibrium.utils import select_fields
+
+# Marks a result missing from the memo, as None is a valid result
+_MISSING = object()
+
 # Factory methods for common games
 
 
@@ -114,6 +122,19 @@ def create_zero_sum_game(values=None):
 
 
 class StrategicGame:
+    """A 2-player strategic game with its payoffs in a grid of (p1, p2) tuples.
+
+    Analysis results are memoized until the payoffs change. set_payoff,
+    add_payoffs, assigning a new grid and replacing cells of grid in place
+    are all noticed: the grid is compared with a shallow copy of it at each
+    lookup, which is cheap because unchanged cells compare by identity.
+    payoff_matrix is copied, so later changes to the caller's lists do not
+    reach the game. Writes that do not go through grid, such as those to
+    grid_pure_nash, do not change the payoffs. Subclasses that keep their
+    payoffs in arrays build grid as a copy, so they only change through
+    set_payoff.
+    """
+
     def __init__(self, mode="d", rows=None, columns=None, payoff_matrix=None, lower_limit=-99, upper_limit=99):
         """ Initialize a grid that represents the normal form of a game
 
@@ -144,7 +165,7 @@ class StrategicGame:
             if payoff_matrix is None:
                 raise ValueError("payoff_matrix must be provided when mode is 'd'")
 
-            self.grid = payoff_matrix
+            self.grid = [list(row) for row in payoff_matrix]
             self.rows = len(payoff_matrix)
             self.columns = len(payoff_matrix[0]) if self.rows > 0 else 0
             self.grid_pure_nash = [[payoff for payoff in row] for row in payoff_matrix]
@@ -164,6 +185,15 @@ class StrategicGame:
         self.p1_br = []  # the set of best responses for player 1
         self.p2_br = []  # the set of best responses for player 2
 
+        # memoized analysis results, valid while the payoffs are unchanged
+        self._payoff_version = 0
+        self._memo = {}
+        self._memo_token = None
+        # (grid, shallow copy of its rows) at the last _payoff_token call, to notice in-place edits
+        self._cells = None
+        # the last mixed equilibrium found, kept across payoff edits for warm starts
+        self._last_mixed_equilibrium = None
+
     def get_payoffs(self, player):
         """Get the payoffs for a specific player as a list.
 
@@ -379,6 +409,10 @@ class StrategicGame:
 
         self.grid[row][col] = (p1_payoff, p2_payoff)
         self.grid_pure_nash[row][col] = (p1_payoff, p2_payoff)
+        self._payoff_version += 1
+        if self._cells is not None and self._cells[0] is self.grid:
+            # The version already records the edit, so the copy need not be taken again
+            self._cells[1][row][col] = self.grid[row][col]
 
     def add_payoffs(self, input_function=None):
         """Add payoffs to the game grid.
@@ -427,13 +461,168 @@ class StrategicGame:
                     raise ValueError(f"Invalid mode: {self.mode}")
                 c += 1
             r += 1
+        self._payoff_version += 1
+
+    def _payoff_token(self):
+        """Return a value that changes whenever the payoffs may have changed.
+
+        Cells replaced in place are found by comparing the grid row by row with
+        a shallow copy taken at the previous call.
+        """
+        grid = self.grid
+        cells = self._cells
+        if (
+            cells is None
+            or cells[0] is not grid
+            or len(grid) != len(cells[1])
+            or any(map(operator.ne, grid, cells[1]))
+        ):
+            if cells is not None:
+                self._payoff_version += 1
+            self._cells = (grid, [row[:] for row in grid])
+        return (id(grid), self._payoff_version)
+
+    def _memoized(self, key, compute):
+        """Return a memoized analysis result, computing it if needed.
+
+        Memoized results are dropped whenever the payoffs change (see
+        _payoff_token and the class docstring).
+
+        Safe to call from several threads: each call works on one memo
+        dictionary and only uses its atomic get and set, so concurrent calls
+        at worst compute the same result twice.
+
+        Arguments:
+            key: Hashable key identifying the result
+            compute: Function called without arguments to compute the result
+
+        Returns:
+            The memoized result
+        """
+        token = self._payoff_token()
+        memo = self._memo
+        if self._memo_token != token:
+            memo = {}
+            self._memo = memo
+            self._memo_token = token
+        result = memo.get(key, _MISSING)
+        if result is _MISSING:
+            result = compute()
+            memo[key] = result
+        return result
+
+    def _memoized_complete(self, key, compute):
+        """Return a copy of a memoized result dictionary, forgetting it if it is partial."""
+        result = self._memoized(key, compute)
+        if result.get("status") == "partial":
+            self._forget(key)
+        return dict(result)
+
+    def _forget(self, key):
+        """Drop a memoized result, such as a partial one, if it is still there."""
+        self._memo.pop(key, None)
+
+    def _is_memoized(self, key):
+        """Check whether a result is memoized for the current payoffs."""
+        return self._memo_token == self._payoff_token() and key in self._memo
+
+    def payoff_arrays(self):
+        """Get the payoffs of both players as numpy arrays.
+
+        Returns:
+            Tuple (A, B) of float arrays with shape (rows, columns)
+        """
+
+        def compute():
+            grid = np.asarray(self.grid, dtype=float).reshape(self.rows, self.columns, 2)
+            return grid[:, :, 0].copy(), grid[:, :, 1].copy()
+
+        return self._memoized("payoff_arrays", compute)
+
+    def restrict(self, rows, columns):
+        """Get a view of the game restricted to some strategies of each player.
+
+        The view shares this game's payoff arrays and copies only the payoffs of
+        the strategies it contains. It is used by the double oracle solver.
+
+        Arguments:
+            rows: Indices of player 1's strategies to keep
+            columns: Indices of player 2's strategies to keep
+
+        Returns:
+            RestrictedGame view
+        """
+        A, B = self.payoff_arrays()
+        return double_oracle.RestrictedGame(A, B, rows, columns)
+
+    def transposed(self):
+        """Get the game with the players swapped, without copying its payoffs.
+
+        Returns:
+            DerivedGame in which player 1 is this game's player 2
+        """
+        from nash_equilibrium.derived_game import DerivedGame
+
+        return DerivedGame(self, transpose=True)
+
+    def subgame(self, rows=None, columns=None):
+        """Get the game restricted to some strategies of each player, without copying its payoffs.
+
+        Unlike restrict, the result is a full game that can be analyzed and
+        derived from again. Evenly spaced strategies, such as ranges, share
+        this game's payoff arrays.
+
+        Arguments:
+            rows: Optional indices (or a slice) of player 1's strategies to keep, all by default
+            columns: Optional indices (or a slice) of player 2's strategies to keep, all by default
+
+        Returns:
+            DerivedGame with the selected strategies, in the given order
+
+        Raises:
+            IndexError: If an index is out of bounds
+            ValueError: If no strategy is selected for a player
+        """
+        from nash_equilibrium.derived_game import DerivedGame
+
+        return DerivedGame(self, rows=rows, columns=columns)
 
-    def calculate_best_responses(self, player, update_state=False):
+    def negated(self):
+        """Get the game with both players' payoffs negated, without changing this game.
+
+        Returns:
+            DerivedGame with negated payoffs
+        """
+        from nash_equilibrium.derived_game import DerivedGame
+
+        return DerivedGame(self, negate=True)
+
+    def edited(self, cells):
+        """Get a copy-on-write variant of the game with some cells changed.
+
+        Only the edited cells are stored; this game is left unchanged.
+
+        Arguments:
+            cells: Mapping from (row, column) to the (p1, p2) payoffs of the cell
+
+        Returns:
+            DerivedGame with the edited cells
+
+        Raises:
+            IndexError: If a cell is out of bounds
+        """
+        from nash_equilibrium.derived_game import DerivedGame
+
+        return DerivedGame(self, edits=cells)
+
+    def calculate_best_responses(self, player, update_state=False, budget=None):
         """Calculate best responses for a player without modifying class state.
 
         Arguments:
             player: The player number (1 or 2)
             update_state: Whether to update the class state (for backward compatibility)
+            budget: Optional SolveBudget, checked every 64 columns or rows. The search
+                    stops when it runs out, with the best responses found so far.
 
         Returns:
             A list of (column, row) coordinates representing best responses
@@ -449,6 +638,8 @@ class StrategicGame:
 
         if player == 1:
             for i in range(self.columns):
+                if budget is not None and i % 64 == 0 and budget.expired():
+                    break
                 br_coordinates = best = None
                 counter = 0
                 multiple_br_values = []
@@ -459,6 +650,8 @@ class StrategicGame:
                     if best is None or current_value > best:
                         best = current_value
                         br_coordinates = current_value_coordinates
+                        # Earlier ties with a worse value are not best responses
+                        multiple_br_values = []
                     elif best == current_value:
                         if current_value_coordinates not in multiple_br_values:
                             multiple_br_values.append(current_value_coordinates)
@@ -484,6 +677,8 @@ class StrategicGame:
         elif player == 2:
             counter = 0
             for row in self.grid:
+                if budget is not None and counter % 64 == 0 and budget.expired():
+                    break
                 br_coordinates = best = None
                 multiple_br_values = []
                 for i in range(self.columns):
@@ -493,6 +688,8 @@ class StrategicGame:
                     if best is None or current_value > best:
                         best = current_value
                         br_coordinates = current_value_coordinates
+                        # Earlier ties with a worse value are not best responses
+                        multiple_br_values = []
                     elif best == current_value:
                         if current_value_coordinates not in multiple_br_values:
                             multiple_br_values.append(current_value_coordinates)
@@ -585,7 +782,7 @@ class StrategicGame:
         else:
             return self.calculate_expected_payoffs(player, beliefs)
 
-    def find_pure_nash_equi(self, update_state=True):
+    def find_pure_nash_equi(self, update_state=True, budget=None):
         """Find all pure strategy Nash equilibria.
 
         A pure strategy Nash equilibrium is a strategy profile where neither
@@ -593,23 +790,350 @@ class StrategicGame:
 
         Arguments:
             update_state: Whether to update the class state (for backward compatibility)
+            budget: Optional SolveBudget. If it runs out, the search stops and only the
+                    equilibria found so far are returned, without memoizing them or
+                    storing them in nash_equilibria.
 
         Returns:
             A list of (column, row) coordinates representing Nash equilibria
         """
-        # Get best responses for both players
-        player1 = self.calculate_best_responses(player=1, update_state=update_state)
-        player2 = self.calculate_best_responses(player=2, update_state=update_state)
 
-        # Nash equilibria are cells that are best responses for both players
-        nash_eq = [value for value in player1 if value in player2]
+        def compute():
+            # Get best responses for both players
+            player1 = self.calculate_best_responses(player=1, update_state=update_state, budget=budget)
+            player2 = set(self.calculate_best_responses(player=2, update_state=update_state, budget=budget))
 
-        # Update class state if requested
-        if update_state:
-            self.nash_equilibria = nash_eq
+            # Nash equilibria are cells that are best responses for both players
+            return [value for value in player1 if value in player2]
 
+        if update_state:
+            # Marking the best responses needs the full search; its result replaces the memoized one
+            self._forget("pure_nash")
+        nash_eq = list(self._memoized("pure_nash", compute))
+        if budget is not None and budget.expired():
+            # A partial list is neither memoized nor kept as the game's equilibria
+            self._forget("pure_nash")
+        elif update_state:
+            self.nash_equilibria = list(nash_eq)
         return nash_eq
 
+    def find_mixed_nash(
+        self,
+        method="support_enumeration",
+        warm_start=True,
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+        budget=None,
+        **options,
+    ):
+        """Find a mixed strategy Nash equilibrium for a game of any size.
+
+        Results are memoized until the payoffs change. After an edit, the
+        solvers are warm started from the last equilibrium found for this game,
+        so re-solving after a small payoff change is much cheaper than a cold solve.
+
+        The solve can be bounded in time. If the deadline passes or the token is
+        cancelled, the least exploitable profile found so far is returned with
+        status 'partial'. Partial results are not memoized.
+
+        Arguments:
+            method: 'support_enumeration', 'lemke_howson', 'fictitious_play', 'logit_qre'
+                    or 'double_oracle'
+            warm_start: True to warm start from the last equilibrium found, False for
+                        a cold solve, or an explicit dict / pair of strategies
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces deadline, timeout, cancel_token and progress)
+            **options: Extra options passed to the solver (e.g. tol, iterations)
+
+        Returns:
+            A dictionary with the equilibrium and solver information:
+            {
+                'p1_strategy': [...],  # Player 1's mixed strategy
+                'p2_strategy': [...],  # Player 2's mixed strategy
+                'method': method,
+                'iterations': number of supports checked, pivots or iterations,
+                'exploitability': total gain available from deviating,
+                'warm_started': whether a warm start was used,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+
+        Raises:
+            ValueError: If method is unknown
+        """
+        if method not in solvers.SOLVER_METHODS:
+            raise ValueError(f"Method must be one of {solvers.SOLVER_METHODS}")
+
+        if warm_start is True:
+            warm_start = self._last_mixed_equilibrium
+        elif warm_start is False:
+            warm_start = None
+        start = solvers.normalize_warm_start(warm_start, self.rows, self.columns)
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+
+        def compute():
+            A, B = self.payoff_arrays()
+            result = solvers.solve(A, B, method=method, warm_start=start, budget=budget, **options)
+            if result["error"] is None:
+                self._last_mixed_equilibrium = (result["p1_strategy"], result["p2_strategy"])
+            if result["p1_strategy"] is not None:
+                result["p1_strategy"] = result["p1_strategy"].tolist()
+                result["p2_strategy"] = result["p2_strategy"].tolist()
+            return result
+
+        key = ("mixed_nash", method, tuple(sorted(options.items())))
+        result = self._memoized(key, compute)
+        if result["status"] == "partial":
+            self._forget(key)
+        return dict(result)
+
+    def find_correlated_equilibrium(self, objective="welfare", budget=None):
+        """Find a correlated equilibrium by linear programming.
+
+        Correlated equilibria can be computed in polynomial time, so this is a
+        fast alternative for games too large for find_mixed_nash. Results are
+        memoized until the payoffs change, except partial ones.
+
+        Arguments:
+            objective: 'welfare', 'p1', 'p2' or 'egalitarian'
+            budget: Optional SolveBudget, checked before the LP and bounding it by its deadline
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'distribution': [[...], ...],  # probability of each profile (rows x columns)
+                'expected_payoffs': (p1_payoff, p2_payoff),
+                'objective': objective,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+
+        Raises:
+            ValueError: If objective is unknown
+        """
+        if objective not in correlated.CORRELATED_OBJECTIVES:
+            raise ValueError(f"Objective must be one of {correlated.CORRELATED_OBJECTIVES}")
+
+        def compute():
+            A, B = self.payoff_arrays()
+            return correlated.correlated_equilibrium(A, B, objective=objective, budget=budget)
+
+        return self._memoized_complete(("correlated", objective), compute)
+
+    def find_security_strategies(self, budget=None):
+        """Find each player's maxmin (security) strategy by linear programming.
+
+        A security strategy maximizes the payoff a player can guarantee whatever
+        the opponent plays, and that guarantee is the player's security value.
+        Results are memoized until the payoffs change, except partial ones.
+
+        Arguments:
+            budget: Optional SolveBudget, checked before the LPs and bounding them by its deadline
+
+        Returns:
+            A dictionary with the security strategies:
+            {
+                'p1_strategy': [...],  # Player 1's maxmin strategy
+                'p2_strategy': [...],  # Player 2's maxmin strategy
+                'security_values': (p1_value, p2_value),  # payoffs each strategy guarantees
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+
+        def compute():
+            A, B = self.payoff_arrays()
+            return security.security_strategies(A, B, budget=budget)
+
+        return self._memoized_complete("security", compute)
+
+    def analyze_welfare(self, budget=None):
+        """Analyze the Pareto optimality and welfare of the game's pure outcomes.
+
+        Pareto optimal cells are found with a sort-based skyline over the payoff
+        arrays, and the prices of anarchy and stability compare the best
+        utilitarian welfare with that of the pure Nash equilibria, which are
+        found from the arrays as well (see the welfare module). Results are
+        memoized until the payoffs change, except partial ones.
+
+        Arguments:
+            budget: Optional SolveBudget, checked before each pass over the payoffs
+
+        Returns:
+            A dictionary with the analysis:
+            {
+                'pareto_optimal': [(column, row), ...],
+                'utilitarian': {'welfare': maximum sum of payoffs, 'cells': [(column, row), ...]},
+                'egalitarian': {'welfare': maximum smaller payoff, 'cells': [(column, row), ...]},
+                'nash_welfare': (worst, best) welfare of the pure equilibria, or None,
+                'price_of_anarchy': optimal welfare / worst equilibrium welfare, or None,
+                'price_of_stability': optimal welfare / best equilibrium welfare, or None,
+                'status': 'complete', or 'partial' with every other field None
+            }
+        """
+
+        def compute():
+            A, B = self.payoff_arrays()
+            return welfare.welfare_analysis(A, B, budget=budget)
+
+        return self._memoized_complete("welfare", compute)
+
+    def find_stackelberg_equilibrium(
+        self,
+        leader=1,
+        workers=None,
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+        budget=None,
+    ):
+        """Find a strong Stackelberg equilibrium with either player as leader.
+
+        The leader commits to a mixed strategy and the follower best responds,
+        breaking ties in the leader's favour. One LP is solved per follower
+        action that is not pruned (see the stackelberg module), optionally on a
+        pool of worker processes. Results are memoized until the payoffs change,
+        except partial ones.
+
+        Arguments:
+            leader: The leading player (1 or 2)
+            workers: Number of worker processes for the LPs (None solves them serially)
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces deadline, timeout, cancel_token and progress)
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'leader': leader,
+                'p1_strategy': [...],  # Player 1's strategy (pure if player 1 follows)
+                'p2_strategy': [...],  # Player 2's strategy (pure if player 2 follows)
+                'follower_action': index of the follower's best response,
+                'expected_payoffs': (p1_payoff, p2_payoff),
+                'lps_solved': number of LPs solved,
+                'dominated': number of follower actions pruned by dominance,
+                'bound_pruned': number of follower actions pruned by the bound,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+
+        Raises:
+            ValueError: If leader is not 1 or 2
+        """
+        if leader not in (1, 2):
+            raise ValueError("leader must be 1 or 2")
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+
+        def compute():
+            A, B = self.payoff_arrays()
+            if leader == 1:
+                found = stackelberg.stackelberg(A, B, workers=workers, budget=budget)
+            else:
+                found = stackelberg.stackelberg(B.T, A.T, workers=workers, budget=budget)
+            result = {"leader": leader}
+            if found["leader_strategy"] is None:
+                result.update(p1_strategy=None, p2_strategy=None, expected_payoffs=None)
+            else:
+                follower = np.zeros(self.columns if leader == 1 else self.rows)
+                follower[found["follower_action"]] = 1.0
+                strategies = (found["leader_strategy"], follower)
+                if leader == 2:
+                    strategies = strategies[::-1]
+                result["p1_strategy"] = strategies[0].tolist()
+                result["p2_strategy"] = strategies[1].tolist()
+                result["expected_payoffs"] = (
+                    float(strategies[0] @ A @ strategies[1]),
+                    float(strategies[0] @ B @ strategies[1]),
+                )
+            for key in ("follower_action", "lps_solved", "dominated", "bound_pruned", "status", "error"):
+                result[key] = found[key]
+            return result
+
+        key = ("stackelberg", leader)
+        result = self._memoized(key, compute)
+        if result["status"] == "partial":
+            self._forget(key)
+        return dict(result)
+
+    def find_quantal_response_equilibrium(
+        self,
+        lam=None,
+        record_path=False,
+        deadline=None,
+        timeout=None,
+        cancel_token=None,
+        progress=None,
+        budget=None,
+        **options,
+    ):
+        """Find the logit quantal response equilibrium at precision lam.
+
+        The branch of logit QRE is traced from uniform play at lam = 0. As lam
+        grows the QRE converges to a Nash equilibrium, which is also returned;
+        find_mixed_nash(method='logit_qre') returns only that limit. Results
+        are memoized until the payoffs change, except partial ones.
+
+        Arguments:
+            lam: Precision in the units of the payoffs. By default the branch is
+                 followed until the QRE is close to its limiting Nash equilibrium.
+            record_path: Whether to return every point visited on the branch
+            deadline: Optional absolute deadline as a time.monotonic() value
+            timeout: Optional time limit in seconds
+            cancel_token: Optional CancellationToken to stop the solve early
+            progress: Optional callback receiving progress dictionaries
+            budget: Optional SolveBudget (replaces deadline, timeout, cancel_token and progress)
+            **options: Extra options passed to qre.trace_logit_qre (e.g. max_steps)
+
+        Returns:
+            A dictionary with the equilibrium:
+            {
+                'p1_strategy': [...],  # Player 1's QRE strategy
+                'p2_strategy': [...],  # Player 2's QRE strategy
+                'lambda': precision reached,
+                'steps': number of path following steps,
+                'path': [{'lambda', 'p1_strategy', 'p2_strategy'}, ...] or None,
+                'nash': (p1_strategy, p2_strategy) of the limiting Nash equilibrium, or None,
+                'status': 'complete' or 'partial',
+                'error': None or error message
+            }
+        """
+        budget = make_budget(budget, deadline, timeout, cancel_token, progress)
+
+        def compute():
+            A, B = self.payoff_arrays()
+            result = qre.trace_logit_qre(A, B, lam=lam, record_path=record_path, budget=budget, **options)
+            del result["state"]
+            nash = None
+            if result["error"] is None:
+                nash = qre.limiting_nash(A, B, result["p1_strategy"], result["p2_strategy"])
+            result["nash"] = None if nash is None else (nash[0].tolist(), nash[1].tolist())
+            result["p1_strategy"] = result["p1_strategy"].tolist()
+            result["p2_strategy"] = result["p2_strategy"].tolist()
+            if result["path"] is not None:
+                result["path"] = [
+                    {
+                        "lambda": point["lambda"],
+                        "p1_strategy": point["p1_strategy"].tolist(),
+                        "p2_strategy": point["p2_strategy"].tolist(),
+                    }
+                    for point in result["path"]
+                ]
+            return result
+
+        key = ("logit_qre", lam, record_path, tuple(sorted(options.items())))
+        result = self._memoized(key, compute)
+        if result["status"] == "partial":
+            self._forget(key)
+        return dict(result)
+
     def create_random_beliefs(self, mode="dirichlet"):
         if mode == "dirichlet":
             # We can use the Dirichlet distribution https://en.wikipedia.org / wiki/Dirichlet_distribution
@@ -729,47 +1253,90 @@ class StrategicGame:
 
         return p1_ep, p2_ep
 
-    def to_dict(self):
-        """Convert the game to a dictionary representation for serialization.
+    # Fields of to_dict that are cheap for games of any size
+    SUMMARY_FIELDS = ("rows", "columns", "mode")
+
+    def _serialized_fields(self, fields=None, exclude=()):
+        """Functions computing each field of to_dict, in order.
+
+        Arguments:
+            fields: Names of the fields to select (defaults to all)
+            exclude: Names of fields to leave out
 
         Returns:
-            Dictionary containing all game information
+            Dictionary from field name to a function called without arguments
+
+        Raises:
+            ValueError: If a field name is unknown
         """
-        # Basic game information
-        result = {
-            "rows": self.rows,
-            "columns": self.columns,
-            "mode": self.mode,
-            "payoff_matrix": self.grid,
-            "p1_strategies": self.get_strategies(1),
-            "p2_strategies": self.get_strategies(2),
-            "p1_payoffs": self.get_payoffs(1),
-            "p2_payoffs": self.get_payoffs(2),
-            "nash_equilibria": self.nash_equilibria,
+        available = {
+            "rows": lambda: self.rows,
+            "columns": lambda: self.columns,
+            "mode": lambda: self.mode,
+            "payoff_matrix": lambda: self.grid,
+            "p1_strategies": lambda: self.get_strategies(1),
+            "p2_strategies": lambda: self.get_strategies(2),
+            "p1_payoffs": lambda: self.get_payoffs(1),
+            "p2_payoffs": lambda: self.get_payoffs(2),
+            # Calculate pure Nash equilibria if not done yet
+            "nash_equilibria": lambda: self.nash_equilibria or self.find_pure_nash_equi(update_state=False),
         }
-
-        # Calculate pure Nash equilibria if not done yet
-        if not self.nash_equilibria:
-            result["nash_equilibria"] = self.find_pure_nash_equi(update_state=False)
-
         # For 2x2 games, include mixed strategy Nash equilibrium
         if self.rows == 2 and self.columns == 2:
+            available["mixed_strategy"] = self._mixed_strategy_field
+        return select_fields(available, fields, exclude, optional=("mixed_strategy",))
+
+    def _mixed_strategy_field(self):
+        """The mixed_strategy field of to_dict for 2x2 games, memoized."""
+
+        def compute():
             mixed_result = self.get_indifference_probabilities(check_pure_nash=False)
             if isinstance(mixed_result, dict):
-                result["mixed_strategy"] = {
+                return {
                     "p1_strategy": mixed_result.get("p1_strategy"),
                     "p2_strategy": mixed_result.get("p2_strategy"),
                     "error": mixed_result.get("error"),
                 }
-            else:
-                # Handle legacy return format
-                result["mixed_strategy"] = {
-                    "p1_strategy": mixed_result[0] if mixed_result else None,
-                    "p2_strategy": mixed_result[1] if mixed_result else None,
-                    "error": None,
-                }
+            # Handle legacy return format
+            return {
+                "p1_strategy": mixed_result[0] if mixed_result else None,
+                "p2_strategy": mixed_result[1] if mixed_result else None,
+                "error": None,
+            }
 
-        return result
+        return dict(self._memoized("indifference", compute))
+
+    def _payoff_blocks(self, block_rows):
+        """Iterate over the payoffs in blocks of rows, without copying the whole grid.
+
+        Arguments:
+            block_rows: Number of rows per block
+
+        Yields:
+            Tuples (p1_rows, p2_rows) of lists of payoff rows
+        """
+        for start in range(0, self.rows, block_rows):
+            rows = self.grid[start : start + block_rows]
+            yield [[cell[0] for cell in row] for row in rows], [[cell[1] for cell in row] for row in rows]
+
+    def to_dict(self, fields=None, exclude=()):
+        """Convert the game to a dictionary representation for serialization.
+
+        Only the selected fields are computed. The equilibrium fields come from
+        the memoized analysis, so they are only computed once per payoffs.
+
+        Arguments:
+            fields: Names of the fields to include (defaults to all),
+                    e.g. SUMMARY_FIELDS for the fields that are cheap for any size
+            exclude: Names of fields to leave out
+
+        Returns:
+            Dictionary containing the selected game information
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        return {name: compute() for name, compute in self._serialized_fields(fields, exclude).items()}
 
     def get_indifference_probabilities(self, check_pure_nash=True):
         """Calculate the mixed strategy Nash equilibrium for a 2x2 game.
@@ -33,6 +33,19 @@ def get_coordinates_string(nash_eq_coordinates):
     return coordinates
 
 
+def get_profiles_string(profiles):
+    """Format N-player strategy profiles as a readable string."""
+    if not profiles:
+        return "None"
+
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    formatted = []
+    for profile in profiles:
+        # Display as 1 - indexed for user - friendly output
+        formatted.append("(" + ", ".join(f"{letters[p]}{s + 1}" for p, s in enumerate(profile)) + ")")
+    return "   ".join(formatted)
+
+
 def print_section_header(title):
     """Print a formatted section header."""
     try:
@@ -59,3 +72,30 @@ def print_subsection_header(title):
         print(f"\n{'-' * 40}")
         print(title)
         print(f"{'-' * 40}")
+
+
+def select_fields(available, fields=None, exclude=(), optional=()):
+    """Select entries of an ordered field table by name.
+
+    Arguments:
+        available: Dictionary from field name to a function computing the field
+        fields: Names of the fields to keep (defaults to all), kept in the table's order
+        exclude: Names of fields to leave out
+        optional: Names that are accepted even when the table lacks them
+
+    Returns:
+        Dictionary with the selected entries of available
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    unknown = [
+        name for name in list(fields or []) + list(exclude) if name not in available and name not in optional
+    ]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return {
+        name: compute
+        for name, compute in available.items()
+        if (fields is None or name in fields) and name not in exclude
+    }
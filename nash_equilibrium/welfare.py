@@ -0,0 +1,149 @@
+"""
+Welfare Analysis
+
+This module measures the efficiency of the pure outcomes of 2-player games:
+which outcomes are Pareto optimal, which maximize utilitarian welfare (the sum
+of payoffs) or egalitarian welfare (the smaller payoff), and how much welfare
+the pure Nash equilibria lose compared with the best outcome:
+
+- The price of anarchy is the optimal welfare divided by the welfare of the
+  worst pure equilibrium.
+- The price of stability is the optimal welfare divided by the welfare of the
+  best pure equilibrium.
+
+The Pareto optimal outcomes are found with a sort-based skyline: cells are
+sorted by player 1's payoff, and a cell is optimal when player 2's payoff
+beats every cell that pays player 1 strictly more. This takes O(N log N) for
+N cells instead of comparing every pair of cells.
+
+The pure equilibria are found the same way, as the cells that are best
+responses for both players in whole-array comparisons. Cells are reported as
+(column, row) coordinates, like the pure equilibria returned by
+StrategicGame.find_pure_nash_equi.
+"""
+
+import numpy as np
+
+
+def pareto_optimal_mask(A, B):
+    """Find the outcomes that no other outcome Pareto dominates.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+
+    Returns:
+        Boolean array shaped like A with True for each Pareto optimal cell
+    """
+    a = np.asarray(A, dtype=float).ravel()
+    b = np.asarray(B, dtype=float).ravel()
+    # Decreasing player 1 payoff, then decreasing player 2 payoff
+    order = np.lexsort((-b, -a))
+    a_sorted, b_sorted = a[order], b[order]
+
+    # Cells with the same player 1 payoff form a group; only its best for player 2 can be optimal
+    starts = np.flatnonzero(np.r_[True, a_sorted[1:] != a_sorted[:-1]])
+    group_best = b_sorted[starts]
+    # Best player 2 payoff among the groups paying player 1 strictly more
+    better_groups = np.r_[-np.inf, np.maximum.accumulate(group_best)[:-1]]
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(a_sorted)]))
+
+    optimal = (b_sorted == group_best[group]) & (b_sorted > better_groups[group])
+    mask = np.empty(len(a), dtype=bool)
+    mask[order] = optimal
+    return mask.reshape(np.shape(A))
+
+
+def pure_nash_mask(A, B):
+    """Find the pure Nash equilibria, the cells that are best responses for both players.
+
+    Returns:
+        Boolean array shaped like A with True for each pure Nash equilibrium
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    return (A == A.max(axis=0)) & (B == B.max(axis=1, keepdims=True))
+
+
+def _coordinates(mask):
+    """(column, row) coordinates of the True cells, in row-major order."""
+    rows, columns = np.nonzero(mask)
+    return [(int(c), int(r)) for r, c in zip(rows, columns)]
+
+
+def _price(optimum, equilibrium_welfare):
+    """Ratio of the optimal welfare to an equilibrium's, or None where it is undefined."""
+    if equilibrium_welfare is None or optimum <= 0 or equilibrium_welfare <= 0:
+        return None
+    return float(optimum / equilibrium_welfare)
+
+
+def _stopped():
+    """The result of a welfare analysis stopped by its budget."""
+    return {
+        "pareto_optimal": None,
+        "utilitarian": None,
+        "egalitarian": None,
+        "nash_welfare": None,
+        "price_of_anarchy": None,
+        "price_of_stability": None,
+        "status": "partial",
+    }
+
+
+def welfare_analysis(A, B, pure_nash=None, tol=1e-9, budget=None):
+    """Analyze the Pareto optimality and welfare of the pure outcomes of a game.
+
+    The prices of anarchy and stability compare utilitarian welfare and are
+    only defined when the game has pure equilibria and the welfare values
+    involved are positive.
+
+    Arguments:
+        A: Payoff array for player 1 (rows x columns)
+        B: Payoff array for player 2 (rows x columns)
+        pure_nash: Optional (column, row) coordinates of the pure Nash equilibria,
+                   found with pure_nash_mask if not given
+        tol: Tolerance for cells tying with the maximum welfare
+        budget: Optional SolveBudget, checked before each pass over the payoffs
+
+    Returns:
+        A dictionary with the analysis:
+        {
+            'pareto_optimal': [(column, row), ...],
+            'utilitarian': {'welfare': maximum sum of payoffs, 'cells': [(column, row), ...]},
+            'egalitarian': {'welfare': maximum smaller payoff, 'cells': [(column, row), ...]},
+            'nash_welfare': (worst, best) utilitarian welfare of the pure equilibria, or None,
+            'price_of_anarchy': optimal welfare / worst equilibrium welfare, or None,
+            'price_of_stability': optimal welfare / best equilibrium welfare, or None,
+            'status': 'complete', or 'partial' with every other field None if the budget ran out
+        }
+    """
+    if budget is not None and budget.expired():
+        return _stopped()
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    utilitarian = A + B
+    egalitarian = np.minimum(A, B)
+    best_sum = float(utilitarian.max())
+    best_min = float(egalitarian.max())
+
+    if pure_nash is None:
+        welfare = utilitarian[pure_nash_mask(A, B)]
+    else:
+        columns, rows = np.asarray(pure_nash, dtype=np.int64).reshape(-1, 2).T
+        welfare = utilitarian[rows, columns]
+    worst = best = None
+    if len(welfare):
+        worst, best = float(welfare.min()), float(welfare.max())
+    if budget is not None and budget.expired():
+        return _stopped()
+
+    return {
+        "pareto_optimal": _coordinates(pareto_optimal_mask(A, B)),
+        "utilitarian": {"welfare": best_sum, "cells": _coordinates(utilitarian >= best_sum - tol)},
+        "egalitarian": {"welfare": best_min, "cells": _coordinates(egalitarian >= best_min - tol)},
+        "nash_welfare": None if worst is None else (worst, best),
+        "price_of_anarchy": _price(best_sum, worst),
+        "price_of_stability": _price(best_sum, best),
+        "status": "complete",
+    }
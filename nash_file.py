@@ -8,19 +8,43 @@ defined in game definition files.
 
 import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 
 import click
 
+from nash_equilibrium.correlated import CORRELATED_OBJECTIVES
+from nash_equilibrium.json_stream import REDUNDANT_FIELDS
+from nash_equilibrium.n_player_game import NPlayerGame
 from nash_equilibrium.parser import GameFileParseError, GameFileParser
+from nash_equilibrium.solvers import SOLVER_METHODS
 from nash_equilibrium.utils import (
     from_list_to_beliefs,
     get_coordinates_string,
+    get_profiles_string,
     print_section_header,
     print_subsection_header,
 )
 
 
+def get_game_size(game):
+    """Format the number of strategies of each player, e.g. '2x3' or '2x2x2'."""
+    if isinstance(game, NPlayerGame):
+        return "x".join(str(s) for s in game.strategies)
+    return f"{game.rows}x{game.columns}"
+
+
+def run_analysis(game_manager, game_id, **options):
+    """Run GameManager.analyze_game as a job; on Ctrl-C, cancel it and return its partial result."""
+    job_id = game_manager.submit_analysis(game_id, **options)
+    try:
+        return game_manager.jobs.result(job_id)
+    except KeyboardInterrupt:
+        game_manager.cancel_job(job_id)
+        click.echo("Analysis interrupted: stopping the solver.", err=True)
+        return game_manager.jobs.result(job_id)
+
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -41,8 +65,24 @@ def cli():
 @click.option(
     "--analyze-mixed/--no-mixed", default=True, help="Whether to analyze mixed strategy equilibria for 2x2 games"
 )
+@click.option(
+    "--mixed-method",
+    type=click.Choice(SOLVER_METHODS),
+    default=None,
+    help="Solver for mixed strategy equilibria of games of any size",
+)
+@click.option("--timeout", type=float, default=None, help="Time limit in seconds for the mixed strategy solver")
+@click.option(
+    "--correlated",
+    type=click.Choice(CORRELATED_OBJECTIVES),
+    default=None,
+    help="Find the correlated equilibrium that maximizes this objective",
+)
 @click.option("--save-json", type=click.Path(), help="Save game data to JSON file")
-def analyze(game_file, output, analyze_mixed, save_json):
+@click.option(
+    "--compact-json", is_flag=True, help="Leave the p1_payoffs and p2_payoffs copies of the payoffs out of JSON"
+)
+def analyze(game_file, output, analyze_mixed, mixed_method, timeout, correlated, save_json, compact_json):
     """
     Analyze a game defined in GAME_FILE.
 
@@ -52,20 +92,40 @@ def analyze(game_file, output, analyze_mixed, save_json):
         parser = GameFileParser()
         game_id, game = parser.parse_file(game_file)
 
+        exclude = REDUNDANT_FIELDS if compact_json else ()
+
         if output == "json":
-            # JSON output
-            game_data = parser.game_manager.export_game(game_id, format="json")
-            click.echo(game_data)
+            # JSON output, streamed to stdout and to the JSON file at once
+            with open(save_json, "w") if save_json else nullcontext() as f:
+                for chunk in parser.game_manager.stream_game_json(game_id, exclude=exclude):
+                    click.echo(chunk, nl=False)
+                    if f is not None:
+                        f.write(chunk)
+            click.echo()
 
             if save_json:
-                with open(save_json, "w") as f:
-                    f.write(game_data)
                 click.echo(f"Game data saved to {save_json}", err=True)
 
             return
 
-        # Analyze the game
-        analysis = parser.game_manager.analyze_game(game_id, find_mixed=analyze_mixed)
+        if isinstance(game, NPlayerGame):
+            analysis = parser.game_manager.analyze_game(game_id, find_mixed=False)
+            if output != "minimal":
+                print_section_header(f"Game Analysis: {os.path.basename(game_file)}")
+                click.echo(f"File: {game_file}")
+            click.echo(f"Game size: {get_game_size(game)} ({game.num_players} players)")
+            click.echo(f"\nPure Nash Equilibria: {get_profiles_string(analysis['pure_nash'])}")
+            return
+
+        # Analyze the game as a job, so Ctrl-C stops the solver with its best result so far
+        analysis = run_analysis(
+            parser.game_manager,
+            game_id,
+            find_mixed=analyze_mixed,
+            mixed_method=mixed_method,
+            find_correlated=correlated or False,
+            timeout=timeout,
+        )
 
         if output == "minimal":
             click.echo(f"Game from: {game_file}")
@@ -87,18 +147,35 @@ def analyze(game_file, output, analyze_mixed, save_json):
         print_section_header(f"Game Analysis: {os.path.basename(game_file)}")
 
         click.echo(f"File: {game_file}")
-        click.echo(f"Game size: {game.rows}x{game.columns}")
+        click.echo(f"Game size: {get_game_size(game)}")
 
         print_section_header("Normal Form")
         click.echo(game.get_formatted_normal_form())
 
         print_section_header("Pure Strategy Nash Equilibria")
         nash_eq_coordinates = analysis.get("pure_nash", [])
+        # analyze_game leaves the game unmarked, so mark the best responses to highlight them
+        game.find_pure_nash_equi()
         click.echo(game.get_formatted_pure_nash())
         click.echo(f"\nPure Nash Equilibria: {get_coordinates_string(nash_eq_coordinates)}")
 
+        # Mixed strategy analysis with an explicit solver
+        if analyze_mixed and mixed_method is not None:
+            print_section_header("Mixed Strategy Nash Equilibrium")
+            mixed_results = analysis.get("mixed_nash", {"status": "partial"})
+            p1_probs = mixed_results.get("p1_strategy")
+            p2_probs = mixed_results.get("p2_strategy")
+            if p1_probs and p2_probs:
+                click.echo(f"Player 1 Mixed Strategy: {from_list_to_beliefs(p1_probs)}")
+                click.echo(f"Player 2 Mixed Strategy: {from_list_to_beliefs(p2_probs)}")
+                click.echo(f"Exploitability: {mixed_results['exploitability']:.6f}")
+            if mixed_results.get("status") == "partial":
+                click.echo("Time limit reached or interrupted: showing the best approximation found.")
+            elif mixed_results.get("error"):
+                click.echo(f"Error: {mixed_results['error']}")
+
         # Mixed strategy analysis for 2x2 games
-        if analyze_mixed and game.rows == 2 and game.columns == 2:
+        elif analyze_mixed and game.rows == 2 and game.columns == 2:
             print_section_header("Mixed Strategy Nash Equilibrium")
 
             if not nash_eq_coordinates:
@@ -126,10 +203,23 @@ def analyze(game_file, output, analyze_mixed, save_json):
             else:
                 click.echo("Pure strategy Nash equilibria exist.")
 
+        if correlated:
+            print_section_header("Correlated Equilibrium")
+            correlated_results = analysis["correlated"]
+            if correlated_results["error"]:
+                click.echo(f"Error: {correlated_results['error']}")
+            else:
+                click.echo(f"Objective: {correlated}")
+                for i, row in enumerate(correlated_results["distribution"]):
+                    cells = ", ".join(f"B{j + 1}: {prob:.3f}" for j, prob in enumerate(row))
+                    click.echo(f"  A{i + 1}: {cells}")
+                p1_payoff, p2_payoff = correlated_results["expected_payoffs"]
+                click.echo(f"Expected Payoffs: P1={p1_payoff:.3f}, P2={p2_payoff:.3f}")
+
         if save_json:
-            game_data = parser.game_manager.export_game(game_id, format="json")
             with open(save_json, "w") as f:
-                f.write(game_data)
+                for chunk in parser.game_manager.stream_game_json(game_id, exclude=exclude):
+                    f.write(chunk)
             click.echo(f"\nGame data saved to {save_json}")
 
     except GameFileParseError as e:
@@ -178,6 +268,10 @@ def payoffs(game_file, p1_strategy, p2_strategy):
         parser = GameFileParser()
         game_id, game = parser.parse_file(game_file)
 
+        if isinstance(game, NPlayerGame):
+            click.echo("Error: The payoffs command only supports 2-player games", err=True)
+            sys.exit(1)
+
         # Validate strategy dimensions
         if len(p1_beliefs) != game.rows:
             click.echo(f"Error: Player 1 strategy has {len(p1_beliefs)} values but game has {game.rows} rows", err=True)
@@ -236,6 +330,10 @@ def best_response(game_file, player, opponent_strategy):
         parser = GameFileParser()
         game_id, game = parser.parse_file(game_file)
 
+        if isinstance(game, NPlayerGame):
+            click.echo("Error: The best-response command only supports 2-player games", err=True)
+            sys.exit(1)
+
         player_num = int(player)
 
         # Validate strategy dimensions
@@ -297,6 +395,35 @@ def validate(game_file):
         click.echo(f"✓ {game_file} is valid")
 
 
+@cli.command()
+@click.argument("game_files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--output", "-o", type=click.Path(), required=True, help="Path of the snapshot archive to write")
+@click.option("--analyze/--no-analyze", default=False, help="Analyze the games so the snapshot holds their results")
+def snapshot(game_files, output, analyze):
+    """
+    Save the games defined in GAME_FILES into one snapshot archive.
+
+    The web API restores the snapshot named by NASH_SNAPSHOT at startup,
+    which is much faster than parsing the game files again.
+    """
+    try:
+        parser = GameFileParser()
+        for game_file in game_files:
+            game_id, game = parser.parse_file(game_file)
+            if analyze:
+                parser.game_manager.analyze_game(game_id, find_mixed=not isinstance(game, NPlayerGame))
+
+        count = parser.game_manager.save_snapshot(output)
+        click.echo(f"Saved {count} games to {output}")
+
+    except GameFileParseError as e:
+        click.echo(f"Error parsing game file: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 def examples():
     """List available example game files."""
@@ -323,7 +450,7 @@ def examples():
             parser = GameFileParser()
             game_id, game = parser.parse_file(str(game_file))
             click.echo(f"  Type: {game.mode if hasattr(game, 'mode') else 'Unknown'}")
-            click.echo(f"  Size: {game.rows}x{game.columns}")
+            click.echo(f"  Size: {get_game_size(game)}")
 
             # Show first few lines of the file
             with open(game_file) as f:
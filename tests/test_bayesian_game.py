@@ -0,0 +1,101 @@
+"""
+Tests for Bayesian games
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import solvers
+from nash_equilibrium.bayesian_game import BayesianGame
+from nash_equilibrium.strategic_game import create_prisoners_dilemma
+
+
+def first_price_auction(values=(1, 2, 3), bids=4):
+    """A first-price auction with independent uniform values and ties split evenly."""
+    payoffs = {}
+    for v1 in values:
+        for v2 in values:
+            grid = []
+            for b1 in range(bids):
+                row = []
+                for b2 in range(bids):
+                    share1 = 1.0 if b1 > b2 else 0.5 if b1 == b2 else 0.0
+                    row.append((share1 * (v1 - b1), (1 - share1) * (v2 - b2)))
+                grid.append(row)
+            payoffs[(v1, v2)] = grid
+    prior = np.full((len(values), len(values)), 1.0 / len(values) ** 2)
+    return BayesianGame(values, values, prior, payoffs)
+
+
+class TestBayesianEquilibrium:
+    """Tests for equilibria over type-contingent strategies."""
+
+    def test_dominant_strategies(self):
+        """Players defect for every type when every type plays a prisoner's dilemma"""
+        game = create_prisoners_dilemma()
+        bayesian = BayesianGame(
+            ["patient", "impatient"], ["x"], [[0.3], [0.7]], {("patient", "x"): game, ("impatient", "x"): game}
+        )
+        result = bayesian.find_bayesian_equilibrium()
+        assert result["error"] is None
+        assert result["p1_strategy"] == {"patient": [0.0, 1.0], "impatient": [0.0, 1.0]}
+        assert result["p2_strategy"] == {"x": [0.0, 1.0]}
+
+    def test_equilibrium_of_induced_form(self):
+        """The type-contingent equilibrium is an equilibrium of the induced normal form"""
+        game = first_price_auction()
+        result = game.find_bayesian_equilibrium()
+        assert result["error"] is None
+        A, B = game.to_strategic_game().payoff_arrays()
+        x = game.induced_mixed_strategy(1, result["p1_strategy"])
+        y = game.induced_mixed_strategy(2, result["p2_strategy"])
+        assert solvers.exploitability(A, B, x, y) < 1e-6
+        assert result["expected_payoffs"][0] == pytest.approx(x @ A @ y)
+
+    def test_many_types(self):
+        """Games whose induced normal form is too large to build are still solved"""
+        game = first_price_auction(values=range(1, 9), bids=8)
+        assert game.count_induced_strategies(1) == 8**8
+        result = game.find_bayesian_equilibrium()
+        assert result["error"] is None
+        assert result["exploitability"] < 1e-6
+
+    def test_invalid_prior(self):
+        """Priors must be distributions over the pairs of types"""
+        game = create_prisoners_dilemma()
+        with pytest.raises(ValueError):
+            BayesianGame(["a"], ["b"], [[0.5]], {("a", "b"): game})
+        with pytest.raises(ValueError):
+            BayesianGame(["a", "c"], ["b"], [[0.5], [0.5]], {("a", "b"): game})
+
+
+class TestInducedNormalForm:
+    """Tests for the lazily evaluated induced normal form."""
+
+    def test_strategy_encoding(self):
+        """Induced strategies number the first type's action as the most significant digit"""
+        game = first_price_auction()
+        assert game.count_induced_strategies(1) == 64
+        assert game.induced_strategy(1, 6) == {1: 0, 2: 1, 3: 2}
+
+    def test_lazy_block_matches_full_form(self):
+        """Blocks and single cells match the materialized StrategicGame"""
+        game = first_price_auction()
+        A, B = game.to_strategic_game().payoff_arrays()
+        block_A, block_B = game.induced_payoff_block([3, 17, 60], [0, 42])
+        assert np.allclose(block_A, A[np.ix_([3, 17, 60], [0, 42])])
+        assert np.allclose(block_B, B[np.ix_([3, 17, 60], [0, 42])])
+        assert game.induced_payoff(5, 9) == pytest.approx((A[5, 9], B[5, 9]))
+
+    def test_implicit_game(self):
+        """The induced normal form is available as an ImplicitGame evaluated on demand"""
+        game = first_price_auction(values=range(1, 7), bids=6)
+        implicit = game.induced_normal_form(cache_size=1000)
+        assert implicit.shape == (6**6, 6**6)
+        assert implicit.cell(7, 11) == pytest.approx(game.induced_payoff(7, 11))
+        assert implicit.evaluations == 1
+
+    def test_too_large(self):
+        """Large induced normal forms are not materialized"""
+        with pytest.raises(ValueError):
+            first_price_auction(values=range(1, 7), bids=6).to_strategic_game()
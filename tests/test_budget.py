@@ -0,0 +1,136 @@
+"""
+Tests for time-budgeted and cancellable solving
+"""
+
+import time
+
+import numpy as np
+
+from nash_equilibrium.budget import CancellationToken, SolveBudget, make_budget
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def random_game(size, seed=0):
+    """Create a random size x size game with float payoffs."""
+    rng = np.random.default_rng(seed)
+    A = rng.normal(size=(size, size))
+    B = rng.normal(size=(size, size))
+    return StrategicGame(mode="d", payoff_matrix=[[(A[i, j], B[i, j]) for j in range(size)] for i in range(size)])
+
+
+class TestSolveBudget:
+    """Tests for the budget primitives."""
+
+    def test_cancellation_token(self):
+        """A cancelled token expires the budget"""
+        token = CancellationToken()
+        budget = SolveBudget(cancel_token=token)
+        assert not budget.expired()
+        token.cancel()
+        assert budget.expired()
+
+    def test_timeout(self):
+        """A zero timeout expires immediately"""
+        assert SolveBudget(timeout=0).expired()
+        assert not SolveBudget(timeout=60).expired()
+
+    def test_make_budget_without_limits(self):
+        """No budget is built when nothing was requested"""
+        assert make_budget() is None
+        assert isinstance(make_budget(timeout=1), SolveBudget)
+
+
+class TestBudgetedSolving:
+    """Tests for solvers running out of budget."""
+
+    def test_cancelled_solve_is_partial(self):
+        """A cancelled solve returns the best profile found so far"""
+        game = random_game(12)
+        token = CancellationToken()
+        token.cancel()
+        result = game.find_mixed_nash(method="fictitious_play", tol=0, cancel_token=token)
+
+        assert result["status"] == "partial"
+        assert result["exploitability"] is not None
+        assert abs(sum(result["p1_strategy"]) - 1) < 1e-9
+
+    def test_partial_results_are_not_memoized(self):
+        """A partial result is recomputed on the next call"""
+        game = random_game(12)
+        game.find_mixed_nash(method="support_enumeration", timeout=0)
+        result = game.find_mixed_nash(method="support_enumeration")
+
+        assert result["status"] == "complete"
+        assert result["exploitability"] < 1e-6
+
+    def test_progress_callback(self):
+        """Progress information is reported while solving"""
+        reports = []
+        game = random_game(8)
+        game.find_mixed_nash(method="fictitious_play", iterations=200, tol=0, progress=reports.append)
+
+        assert reports
+        assert reports[-1]["method"] == "fictitious_play"
+        assert "elapsed" in reports[-1]
+
+    def test_deadline_bounds_solve_time(self):
+        """A long solve stops soon after its deadline"""
+        game = random_game(40)
+        start = time.monotonic()
+        result = game.find_mixed_nash(method="fictitious_play", iterations=10**7, tol=0, timeout=0.2)
+
+        assert result["status"] == "partial"
+        assert time.monotonic() - start < 2.0
+
+    def test_game_manager_timeout(self):
+        """GameManager reports the status of budgeted analyses"""
+        manager = GameManager()
+        game_id, _ = manager.create_game("d", payoff_matrix=[[(1, -1), (-1, 1)], [(-1, 1), (1, -1)]])
+        analysis = manager.analyze_game(game_id, mixed_method="support_enumeration", timeout=10)
+
+        assert analysis["status"] == "complete"
+        assert np.allclose(analysis["mixed_nash"]["p1_strategy"], [0.5, 0.5])
+
+    def test_every_analysis_section_is_bounded(self):
+        """An expired budget stops the pure, correlated, security and welfare sections too"""
+        game = random_game(6)
+        token = CancellationToken()
+        token.cancel()
+        budget = SolveBudget(cancel_token=token)
+
+        assert game.find_pure_nash_equi(update_state=False, budget=budget) == []
+        assert game.find_correlated_equilibrium(budget=budget)["status"] == "partial"
+        assert game.find_security_strategies(budget=budget)["status"] == "partial"
+        assert game.analyze_welfare(budget=budget)["status"] == "partial"
+        # Partial results are not memoized
+        assert not game._is_memoized("pure_nash")
+        assert game.find_security_strategies()["status"] == "complete"
+
+    def test_partial_pure_equilibria_not_stored(self):
+        """A search stopped by its budget leaves nash_equilibria and to_dict as they were"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(1, 1), (0, 0)], [(0, 0), (1, 1)]])
+        token = CancellationToken()
+        token.cancel()
+        game.find_pure_nash_equi(budget=SolveBudget(cancel_token=token))
+        assert game.nash_equilibria == []
+
+        assert game.find_pure_nash_equi(budget=SolveBudget(timeout=60)) == [(0, 0), (1, 1)]
+        assert game.nash_equilibria == [(0, 0), (1, 1)]
+        game.find_pure_nash_equi(budget=SolveBudget(cancel_token=token))
+        assert game.nash_equilibria == [(0, 0), (1, 1)]
+
+    def test_cancelled_analysis_skips_sections(self):
+        """A cancelled analysis is partial and leaves out the sections it did not start"""
+        manager = GameManager()
+        game_id, _ = manager.create_game("d", payoff_matrix=random_game(6).grid)
+        token = CancellationToken()
+        token.cancel()
+        analysis = manager.analyze_game(
+            game_id, find_correlated=True, find_security=True, find_welfare=True, cancel_token=token
+        )
+
+        assert analysis == {"status": "partial"}
+        complete = manager.analyze_game(game_id, find_correlated=True, find_security=True, timeout=60)
+        assert complete["status"] == "complete"
+        assert complete["security"]["status"] == "complete"
@@ -23,6 +23,17 @@ class TestDefaultConfig:
             "random_seed",
             "output_format",
             "log_level",
+            "solve_timeout",
+            "game_store",
+            "max_games",
+            "max_game_bytes",
+            "game_ttl",
+            "spill_directory",
+            "snapshot",
+            "deduplicate_games",
+            "job_workers",
+            "job_queue_size",
+            "job_retention",
         }
         assert set(DEFAULT_CONFIG.keys()) == required_keys
 
@@ -65,6 +76,41 @@ class TestGetConfig:
         assert config["log_level"] == "DEBUG"
         assert config["precision"] == DEFAULT_CONFIG["precision"]  # Others unchanged
 
+    @patch.dict(os.environ, {"NASH_GAME_STORE": "/tmp/games.db"})
+    def test_get_config_game_store_override(self):
+        """Test that NASH_GAME_STORE env var sets the game store location"""
+        config = get_config()
+        assert config["game_store"] == "/tmp/games.db"
+
+    @patch.dict(os.environ, {"NASH_MAX_GAMES": "500", "NASH_GAME_TTL": "3600", "NASH_SPILL_DIR": "/tmp/spill"})
+    def test_get_config_memory_limits(self):
+        """Test that the game memory limits are read from env vars"""
+        config = get_config()
+        assert config["max_games"] == 500
+        assert config["game_ttl"] == 3600.0
+        assert config["spill_directory"] == "/tmp/spill"
+        assert config["max_game_bytes"] is None
+
+    @patch.dict(os.environ, {"NASH_SNAPSHOT": "/tmp/games.snapshot.npz"})
+    def test_get_config_snapshot(self):
+        """Test that NASH_SNAPSHOT env var sets the snapshot restored at startup"""
+        config = get_config()
+        assert config["snapshot"] == "/tmp/games.snapshot.npz"
+
+    @patch.dict(os.environ, {"NASH_DEDUPLICATE_GAMES": "true"})
+    def test_get_config_deduplicate_games(self):
+        """Test that NASH_DEDUPLICATE_GAMES env var turns on game deduplication"""
+        assert DEFAULT_CONFIG["deduplicate_games"] is False
+        assert get_config()["deduplicate_games"] is True
+
+    @patch.dict(os.environ, {"NASH_JOB_WORKERS": "4", "NASH_JOB_QUEUE_SIZE": "10", "NASH_JOB_RETENTION": "60"})
+    def test_get_config_job_queue(self):
+        """Test that the analysis job queue settings are read from env vars"""
+        config = get_config()
+        assert config["job_workers"] == 4
+        assert config["job_queue_size"] == 10
+        assert config["job_retention"] == 60.0
+
     @patch.dict(
         os.environ,
         {"NASH_PRECISION": "10", "NASH_TOLERANCE": "1e-10", "NASH_LOG_LEVEL": "ERROR"},
@@ -0,0 +1,118 @@
+"""
+Tests for congestion games
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.congestion_game import CongestionGame
+
+
+def braess_network(players):
+    """Routing from s to t over edges s-a, s-b, a-t, b-t and a-b, where the zigzag s-a-b-t is dominant."""
+    delay = players + 1
+    costs = [lambda k: k / delay, lambda k: 1.0, lambda k: 1.0, lambda k: k / delay, lambda k: 0.0]
+    paths = [(0, 2), (1, 3), (0, 4, 3)]
+    return CongestionGame(costs, [paths] * players)
+
+
+def random_game(players, resources, strategies, seed):
+    """A random congestion game with increasing resource costs."""
+    rng = np.random.default_rng(seed)
+    costs = np.cumsum(rng.uniform(0, 3, size=(resources, players)), axis=1)
+    player_strategies = [
+        [rng.choice(resources, size=rng.integers(1, 4), replace=False) for _ in range(strategies)]
+        for _ in range(players)
+    ]
+    return CongestionGame(costs, player_strategies)
+
+
+class TestCompactForm:
+    """Tests for loads, costs and the potential."""
+
+    def test_costs_and_potential(self):
+        """Costs and the potential follow from the loads"""
+        game = CongestionGame([[1, 4, 9], [2, 2, 2]], [[(0,), (1,)], [(0,), (1,)], [(0, 1)]])
+        profile = [0, 1, 0]
+        assert game.loads(profile).tolist() == [2, 2]
+        assert game.player_costs(profile).tolist() == [4.0, 2.0, 6.0]
+        assert game.potential(profile) == 1 + 4 + 2 + 2
+
+    def test_potential_tracks_costs(self):
+        """A unilateral move changes the potential by the mover's change in cost"""
+        game = random_game(players=6, resources=8, strategies=4, seed=0)
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            profile = [int(rng.integers(4)) for _ in range(6)]
+            player = int(rng.integers(6))
+            moved = list(profile)
+            moved[player] = (profile[player] + 1) % 4
+            cost_change = game.player_costs(moved)[player] - game.player_costs(profile)[player]
+            assert game.potential(moved) - game.potential(profile) == pytest.approx(cost_change)
+
+    def test_invalid(self):
+        """Unknown resources and short cost tables are rejected"""
+        with pytest.raises(ValueError):
+            CongestionGame([[1, 2]], [[(0,)], [(1,)]])
+        with pytest.raises(ValueError):
+            CongestionGame([[1]], [[(0,)], [(0,)]])
+
+
+class TestBestResponseDynamics:
+    """Tests for the pure equilibrium search."""
+
+    def test_braess(self):
+        """All players take the zigzag path in the Braess network"""
+        result = braess_network(4).best_response_dynamics(seed=0)
+        assert result["error"] is None
+        assert result["profile"] == [2, 2, 2, 2]
+        assert result["costs"] == pytest.approx([1.6] * 4)
+
+    def test_incremental_potential(self):
+        """The incrementally updated potential matches the final profile"""
+        game = random_game(players=30, resources=20, strategies=6, seed=2)
+        result = game.best_response_dynamics(seed=3)
+        assert result["moves"] > 0
+        assert result["potential"] == pytest.approx(game.potential(result["profile"]))
+        assert result["loads"] == game.loads(result["profile"]).tolist()
+        assert game.is_pure_nash(result["profile"])
+
+    def test_many_players(self):
+        """Games with dozens of players are solved without their normal form"""
+        game = braess_network(60)
+        result = game.best_response_dynamics(seed=1)
+        assert game.is_pure_nash(result["profile"])
+
+    def test_matches_normal_form(self):
+        """The equilibrium found is a pure equilibrium of the expanded game"""
+        game = random_game(players=3, resources=5, strategies=3, seed=4)
+        result = game.best_response_dynamics(seed=0)
+        assert tuple(result["profile"]) in game.to_n_player_game().find_pure_nash_equi()
+
+    def test_max_moves(self):
+        """The dynamics stop after max_moves"""
+        result = braess_network(10).best_response_dynamics(initial=[0] * 10, max_moves=1)
+        assert result["moves"] == 1
+        assert result["error"] == "Maximum number of moves reached"
+
+    def test_cancelled(self):
+        """A zero time budget returns a partial result"""
+        result = braess_network(10).best_response_dynamics(timeout=0)
+        assert result["status"] == "partial"
+
+
+class TestNormalFormView:
+    """Tests for expanding small games."""
+
+    def test_strategic_game(self):
+        """A 2-player game expands to a StrategicGame with negated costs"""
+        game = CongestionGame([[1, 3], [2, 5]], [[(0,), (1,)], [(0,), (1,)]])
+        strategic = game.to_strategic_game()
+        assert strategic.grid[0][0] == (-3.0, -3.0)
+        assert strategic.grid[0][1] == (-1.0, -2.0)
+        assert sorted(strategic.find_pure_nash_equi()) == [(0, 1), (1, 0)]
+
+    def test_too_large(self):
+        """Games with too many profiles are not expanded"""
+        with pytest.raises(ValueError):
+            braess_network(20).to_n_player_game()
@@ -0,0 +1,80 @@
+"""
+Tests for the correlated equilibrium solver
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.correlated import correlated_equilibrium, incentive_constraints
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+@pytest.fixture
+def chicken():
+    """Game of chicken: dare/chicken with payoffs 0, 7, 2 and 6."""
+    return StrategicGame(mode="d", payoff_matrix=[[(6, 6), (2, 7)], [(7, 2), (0, 0)]])
+
+
+class TestIncentiveConstraints:
+    """Tests for the sparse incentive constraint matrix."""
+
+    def test_matches_loop_construction(self):
+        """The vectorized matrix equals the constraints written out one by one"""
+        rng = np.random.default_rng(0)
+        A = rng.integers(-5, 5, (3, 4)).astype(float)
+        B = rng.integers(-5, 5, (3, 4)).astype(float)
+
+        expected = []
+        for i in range(3):
+            for k in range(3):
+                if i != k:
+                    row = np.zeros((3, 4))
+                    row[i] = A[i] - A[k]
+                    expected.append(row.ravel())
+        for j in range(4):
+            for k in range(4):
+                if j != k:
+                    row = np.zeros((3, 4))
+                    row[:, j] = B[:, j] - B[:, k]
+                    expected.append(row.ravel())
+
+        assert np.allclose(incentive_constraints(A, B).toarray(), expected)
+
+
+class TestCorrelatedEquilibrium:
+    """Tests for correlated equilibria of StrategicGame."""
+
+    def test_welfare_maximizing(self, chicken):
+        """The best correlated equilibrium of chicken beats every Nash equilibrium"""
+        result = chicken.find_correlated_equilibrium()
+        assert result["error"] is None
+        assert result["expected_payoffs"] == pytest.approx((5.25, 5.25))
+        assert np.allclose(result["distribution"], [[0.5, 0.25], [0.25, 0]])
+
+    def test_player_objective(self, chicken):
+        """Maximizing one player's payoff selects its preferred pure equilibrium"""
+        assert chicken.find_correlated_equilibrium("p1")["expected_payoffs"] == pytest.approx((7, 2))
+
+    def test_is_equilibrium(self):
+        """No player gains by deviating from a recommendation"""
+        rng = np.random.default_rng(1)
+        A, B = rng.normal(size=(2, 6, 5))
+        result = correlated_equilibrium(A, B, objective="egalitarian")
+        p = np.ravel(result["distribution"])
+        assert p.sum() == pytest.approx(1)
+        assert (incentive_constraints(A, B) @ p).min() >= -1e-7
+
+    def test_invalid_objective(self, chicken):
+        """Unknown objectives are rejected"""
+        with pytest.raises(ValueError):
+            chicken.find_correlated_equilibrium("fairness")
+
+    def test_analyze_game(self, chicken):
+        """The manager reports the correlated equilibrium when asked"""
+        manager = GameManager()
+        game_id, _ = manager.create_game("d", payoff_matrix=chicken.grid)
+        assert "correlated" not in manager.analyze_game(game_id)
+        result = manager.analyze_game(game_id, find_correlated=True)
+        assert result["correlated"]["objective"] == "welfare"
+        assert len(result["pure_nash"]) == 2
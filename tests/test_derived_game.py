@@ -0,0 +1,218 @@
+"""
+Tests for derived games sharing the payoffs of their base game
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.dense_game import DenseStrategicGame
+from nash_equilibrium.derived_game import DerivedGame
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.storage import SQLiteStore
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def random_game(rows=6, columns=7, seed=0):
+    """A game with small integer payoffs, so that some cells tie."""
+    payoffs = np.random.default_rng(seed).integers(-5, 5, size=(rows, columns, 2))
+    return StrategicGame(mode="d", payoff_matrix=[[(int(p1), int(p2)) for p1, p2 in row] for row in payoffs])
+
+
+def as_array(game):
+    """The payoffs of a game as an array of shape (rows, columns, 2)."""
+    return np.asarray(game.grid).reshape(game.rows, game.columns, 2)
+
+
+def swap_players(payoffs):
+    """Swap the players of a payoff array of shape (rows, columns, 2)."""
+    return payoffs.transpose(1, 0, 2)[:, :, ::-1]
+
+
+class TestTransformations:
+    """Tests for the payoffs of derived games."""
+
+    def test_transposed(self):
+        """Player 1 of the transposed game is player 2 of the base game"""
+        game = random_game()
+        transposed = game.transposed()
+        assert (transposed.rows, transposed.columns) == (7, 6)
+        assert np.array_equal(as_array(transposed), swap_players(as_array(game)))
+        A, B = game.payoff_arrays()
+        assert np.array_equal(transposed.payoff_arrays()[0], B.T)
+        assert np.array_equal(transposed.payoff_arrays()[1], A.T)
+
+    def test_subgame(self):
+        """Subgames keep the selected strategies in the given order"""
+        game = random_game()
+        subgame = game.subgame(rows=[4, 0, 2], columns=slice(1, None, 3))
+        expected = as_array(game)[np.ix_([4, 0, 2], [1, 4])]
+        assert np.array_equal(as_array(subgame), expected)
+        assert np.array_equal(np.stack(subgame.payoff_arrays(), axis=-1), expected)
+        assert game.subgame(columns=[3]).rows == 6
+
+    def test_negated_and_edited(self):
+        """Negation and edits change the derived game only"""
+        game = random_game()
+        negated = game.negated()
+        assert np.array_equal(as_array(negated), -as_array(game))
+        edited = game.edited({(0, 0): (99, -99)})
+        assert edited.grid[0][0] == (99, -99)
+        assert edited.payoff_arrays()[0][0, 0] == 99
+        assert game.grid[0][0] != (99, -99)
+        assert game.payoff_arrays()[0][0, 0] != 99
+
+    def test_composition(self):
+        """Chained derivations compose into one view of the base game"""
+        game = random_game()
+        derived = game.transposed().subgame(rows=[2, 3], columns=[5, 1]).negated().edited({(1, 1): (7, 8)}).transposed()
+        assert derived.base is game
+
+        expected = -swap_players(as_array(game))[np.ix_([2, 3], [5, 1])]
+        expected[1, 1] = (7, 8)
+        expected = swap_players(expected)
+        assert np.array_equal(as_array(derived), expected)
+        assert np.array_equal(np.stack(derived.payoff_arrays(), axis=-1), expected)
+        assert derived.edits == {(1, 1): (8, 7)}
+
+    def test_invalid_selections(self):
+        """Out of bounds strategies and cells, and empty selections, are rejected"""
+        game = random_game()
+        with pytest.raises(IndexError):
+            game.subgame(rows=[6])
+        with pytest.raises(ValueError):
+            game.subgame(columns=[])
+        with pytest.raises(IndexError):
+            game.edited({(0, 7): (1, 1)})
+        with pytest.raises(IndexError):
+            game.subgame(rows=[0, 1]).set_payoff(2, 0, 1, 1)
+
+    def test_integer_payoffs_kept(self):
+        """Grids of derived games keep the payoff types of the base game"""
+        game = random_game()
+        assert all(isinstance(p1, int) for row in game.transposed().negated().grid for p1, _ in row)
+
+
+class TestSharing:
+    """Tests for the memory shared with the base game."""
+
+    def test_views_share_buffers(self):
+        """Transposes and evenly spaced subgames are read-only views of the base arrays"""
+        game = random_game()
+        A, B = game.payoff_arrays()
+        views = [game.transposed(), game.subgame(rows=[1, 3, 5], columns=range(2, 6))]
+        views.append(game.transposed().subgame(rows=[0]))
+        for derived in views:
+            assert derived.shares_payoffs
+            derived_A, derived_B = derived.payoff_arrays()
+            assert np.shares_memory(derived_A, B if derived._swap else A)
+            with pytest.raises(ValueError):
+                derived_A[0, 0] = 100
+        assert game.subgame(rows=[4, 0]).shares_payoffs
+        assert not game.subgame(rows=[4, 0, 1]).shares_payoffs
+        assert not game.negated().shares_payoffs
+
+    def test_copy_on_write(self):
+        """Edits copy the shared arrays instead of writing to them"""
+        game = random_game()
+        A = game.payoff_arrays()[0].copy()
+        edited = game.subgame(rows=range(3))
+        edited.set_payoff(1, 1, 50, 50)
+        assert edited.payoff_arrays()[0][1, 1] == 50
+        assert np.array_equal(game.payoff_arrays()[0], A)
+        assert not np.shares_memory(edited.payoff_arrays()[0], game.payoff_arrays()[0])
+
+    def test_follows_base_changes(self):
+        """Derived games see later changes of their base game, except in edited cells"""
+        game = random_game()
+        transposed = game.transposed()
+        edited = game.edited({(0, 1): (3, 3)})
+        transposed.find_pure_nash_equi()
+        game.set_payoff(0, 1, 40, 50)
+        assert transposed.grid[1][0] == (50, 40)
+        assert transposed.payoff_arrays()[0][1, 0] == 50
+        assert edited.grid[0][1] == (3, 3)
+
+    def test_follows_intermediate_edits(self):
+        """Games derived from a derived game see its later edits, under their own edits"""
+        game = random_game()
+        edited = game.edited({(0, 1): (3, 4)})
+        transposed = edited.transposed()
+        subgame = transposed.subgame(rows=[1, 0], columns=[0, 2])
+        subgame.set_payoff(0, 0, 9, 9)
+        assert transposed.grid[1][0] == (4, 3)
+        transposed.find_pure_nash_equi()
+
+        edited.set_payoff(0, 1, 5, 6)
+        edited.set_payoff(2, 0, 7, 8)
+        assert transposed.grid[1][0] == (6, 5)
+        assert transposed.payoff_arrays()[0][0, 2] == 8
+        assert transposed.find_pure_nash_equi() == edited.materialize().transposed().find_pure_nash_equi()
+        assert subgame.edits == {(0, 0): (9, 9), (1, 1): (8, 7)}
+        assert game.grid[0][1] != (5, 6)
+
+    def test_many_variants(self):
+        """Variants of a game with few edits each only store their edits"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(0.5, 0.5)] * 200 for _ in range(200)])
+        game.payoff_arrays()
+        variants = [game.edited({(index, index): (1.0, 1.0)}) for index in range(200)]
+        assert all(not variant._memo for variant in variants)
+        assert (7, 7) in variants[7].find_pure_nash_equi()
+        assert variants[7].payoff_arrays()[0][7, 7] == 1.0
+        assert game.payoff_arrays()[0][7, 7] == 0.5
+
+
+class TestAnalysis:
+    """Tests for analyzing derived games."""
+
+    @pytest.mark.parametrize(
+        "derive",
+        [
+            lambda game: game.transposed(),
+            lambda game: game.subgame(rows=[5, 1, 2], columns=[0, 3, 6]),
+            lambda game: game.negated(),
+            lambda game: game.edited({(2, 2): (9, 9)}),
+            lambda game: game.transposed().subgame(rows=slice(0, 5)),
+        ],
+    )
+    def test_same_results_as_copy(self, derive):
+        """Derived games have the analysis results of an independent copy"""
+        derived = derive(random_game())
+        copy = derived.materialize()
+        assert type(copy) is StrategicGame
+        assert derived.find_pure_nash_equi() == sorted(copy.find_pure_nash_equi())
+        for player in (1, 2):
+            assert derived.calculate_best_responses(player) == sorted(copy.calculate_best_responses(player))
+        assert derived.grid_pure_nash == copy.grid_pure_nash
+        assert derived.analyze_welfare() == copy.analyze_welfare()
+
+    def test_sparse_base(self):
+        """Games can be derived from sparse games"""
+        game = SparseStrategicGame(np.diag([1.0, 0.0, 2.0]), np.eye(3))
+        transposed = game.transposed()
+        assert isinstance(transposed, DerivedGame)
+        assert np.array_equal(transposed.payoff_arrays()[0], np.eye(3))
+        assert transposed.find_pure_nash_equi() == game.find_pure_nash_equi()
+
+
+class TestGameManager:
+    """Tests for derived games in GameManager."""
+
+    def test_derive_game(self):
+        """Derived games are stored under new IDs as views of the stored game"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        derived_id, derived = manager.derive_game(game_id, negate=True)
+        assert derived_id == "2" and derived.base is game
+        assert manager.get_game(derived_id).grid[0][0] == (-3, -3)
+        with pytest.raises(KeyError):
+            manager.derive_game("99", transpose=True)
+
+    def test_serialized_store(self, tmp_path):
+        """Stores that serialize games save derived games as copies"""
+        manager = GameManager(store=SQLiteStore(tmp_path / "games.db"))
+        game_id, _ = manager.create_common_game("battle_of_sexes")
+        derived_id, derived = manager.derive_game(game_id, transpose=True)
+        stored = SQLiteStore(tmp_path / "games.db").get(derived_id)
+        assert type(stored) is DenseStrategicGame
+        assert stored.grid == derived.grid
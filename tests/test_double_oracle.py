@@ -0,0 +1,92 @@
+"""
+Tests for the double oracle solver
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import solvers
+from nash_equilibrium.budget import SolveBudget
+from nash_equilibrium.double_oracle import RestrictedGame, double_oracle
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def small_support_game(size, seed=0):
+    """Zero-sum game where only 5 strategies of each player matter."""
+    rng = np.random.default_rng(seed)
+    A = rng.random((size, size)) * 0.5
+    A[:5, :] += 1.0
+    A[:, :5] -= 1.0
+    A[:5, :5] = rng.random((5, 5))
+    return A[rng.permutation(size)][:, rng.permutation(size)]
+
+
+class TestRestrictedGame:
+    """Tests for restricted game views."""
+
+    def test_shares_parent_arrays(self):
+        """The view keeps the parent's arrays and copies only its block"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(1, 2), (3, 4), (5, 6)], [(7, 8), (9, 10), (11, 12)]])
+        restricted = game.restrict([1], [0, 2])
+        A, B = game.payoff_arrays()
+        assert restricted.A is A and restricted.B is B
+        assert restricted.payoff_arrays()[0].tolist() == [[7, 11]]
+
+    def test_add_strategies(self):
+        """Adding strategies grows the block by one row or column"""
+        A = np.arange(12.0).reshape(3, 4)
+        restricted = RestrictedGame(A, -A, [0], [1])
+        assert restricted.add_row(2)
+        assert restricted.add_column(3)
+        assert not restricted.add_row(2)
+        assert restricted.shape == (2, 2)
+        assert np.array_equal(restricted.payoff_arrays()[0], A[np.ix_([0, 2], [1, 3])])
+
+    def test_best_responses(self):
+        """Best responses and gains are computed against the full game"""
+        A = np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 0.0]])
+        restricted = RestrictedGame(A, -A, [0], [0])
+        row, p1_gain, column, p2_gain = restricted.best_responses(np.ones(1), np.ones(1))
+        assert (row, p1_gain) == (2, 2.0)
+        assert (column, p2_gain) == (1, 1.0)
+
+
+class TestDoubleOracle:
+    """Tests for the double oracle solver."""
+
+    def test_random_games(self):
+        """The double oracle finds an equilibrium of small random games"""
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            A, B = rng.integers(-3, 4, (2, 6, 7)).astype(float)
+            result = solvers.solve(A, B, method="double_oracle")
+            assert result["error"] is None
+            assert result["exploitability"] < 1e-9
+
+    def test_small_support(self):
+        """Only a few strategies of a large game enter the restricted game"""
+        A = small_support_game(500)
+        result = double_oracle(A, -A)
+        assert result["error"] is None
+        assert result["exploitability"] < 1e-9
+        assert result["iterations"] <= 10
+
+    def test_warm_start(self):
+        """Warm starting from the equilibrium finishes in one iteration"""
+        A = small_support_game(200, seed=1)
+        first = double_oracle(A, -A)
+        second = double_oracle(A, -A, warm_start=(first["p1_strategy"], first["p2_strategy"]))
+        assert second["iterations"] == 1
+        assert second["warm_started"]
+
+    def test_cancelled(self):
+        """A zero time budget returns a partial result"""
+        A = small_support_game(200, seed=2)
+        result = double_oracle(A, -A, budget=SolveBudget(timeout=0))
+        assert result["status"] == "partial"
+
+    def test_strategic_game(self):
+        """StrategicGame exposes the solver through find_mixed_nash"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(1, -1), (-1, 1)], [(-1, 1), (1, -1)]])
+        result = game.find_mixed_nash(method="double_oracle")
+        assert result["p1_strategy"] == pytest.approx([0.5, 0.5])
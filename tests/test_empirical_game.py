@@ -0,0 +1,127 @@
+"""
+Tests for empirical games estimated from samples
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.game_manager import GameManager
+
+
+def sample_game(A, B, samples, noise=1.0, seed=0):
+    """Draw noisy samples of every cell of a game."""
+    rng = np.random.default_rng(seed)
+    rows, columns = A.shape
+    r = np.repeat(np.arange(rows), columns * samples)
+    c = np.tile(np.repeat(np.arange(columns), samples), rows)
+    return r, c, A[r, c] + rng.normal(scale=noise, size=len(r)), B[r, c] + rng.normal(scale=noise, size=len(r))
+
+
+class TestSampleIngestion:
+    """Tests for the running statistics."""
+
+    def test_statistics_match_numpy(self):
+        """Batched updates give the same means and variances as a single pass"""
+        rng = np.random.default_rng(1)
+        rows = rng.integers(0, 3, size=500)
+        columns = rng.integers(0, 4, size=500)
+        p1, p2 = rng.normal(size=(2, 500))
+        game = EmpiricalGame(3, 4)
+        for batch in np.array_split(np.arange(500), 7):
+            game.add_samples(rows[batch], columns[batch], p1[batch], p2[batch])
+
+        for i in range(3):
+            for j in range(4):
+                cell = (rows == i) & (columns == j)
+                assert game.counts[i, j] == cell.sum()
+                assert game.means[i, j] == pytest.approx([p1[cell].mean(), p2[cell].mean()])
+                assert game.variances()[i, j] == pytest.approx([p1[cell].var(ddof=1), p2[cell].var(ddof=1)])
+
+    def test_invalid_samples(self):
+        """Samples outside the game or with mismatched lengths are rejected"""
+        game = EmpiricalGame(2, 2)
+        with pytest.raises(ValueError):
+            game.add_samples([0, 2], [0, 0], [1, 1], [1, 1])
+        with pytest.raises(ValueError):
+            game.add_samples([0], [0, 1], [1], [1])
+
+    def test_confidence_widths(self):
+        """Intervals are unbounded until a cell has two samples and shrink with more"""
+        game = EmpiricalGame(1, 2)
+        game.add_samples([0, 0, 0], [0, 0, 1], [1.0, 3.0, 5.0], [0.0, 0.0, 0.0])
+        widths = game.confidence_widths()
+        assert np.isinf(widths[0, 1, 0])
+        assert widths[0, 0, 0] == pytest.approx(12.706, rel=1e-3)
+        game.add_samples([0, 0], [0, 0], [2.0, 2.0], [0.0, 0.0])
+        assert game.confidence_widths()[0, 0, 0] < widths[0, 0, 0]
+
+
+class TestAnalysis:
+    """Tests for equilibria of the mean payoffs."""
+
+    def test_pure_nash_incremental(self):
+        """Pure equilibria follow the means as batches arrive"""
+        game = EmpiricalGame(2, 2)
+        game.add_samples([0, 0, 1, 1], [0, 1, 0, 1], [3, 0, 5, 1], [3, 5, 0, 1])
+        assert game.find_pure_nash_equi() == [(1, 1)]
+        # Make mutual cooperation a best response for both players
+        game.add_samples([0, 0], [0, 0], [9, 9], [9, 9])
+        assert game.means[0, 0].tolist() == [7.0, 7.0]
+        assert game.find_pure_nash_equi() == [(0, 0), (1, 1)]
+        assert game.p1_br == [(0, 0), (1, 1)]
+
+    def test_matches_strategic_game(self):
+        """Best responses and equilibria match a StrategicGame with the same payoffs"""
+        rng = np.random.default_rng(3)
+        A, B = rng.integers(-3, 3, size=(2, 5, 4)).astype(float)
+        game = EmpiricalGame(5, 4)
+        game.add_samples(*sample_game(A, B, samples=2, noise=0.0))
+        assert game.find_pure_nash_equi() == sorted(
+            (int(j), int(i)) for i, j in np.argwhere((A == A.max(axis=0)) & (B == B.max(axis=1, keepdims=True)))
+        )
+        assert game.calculate_expected_payoffs(1, [0.25] * 4) == pytest.approx(
+            {f"A{i + 1}": v for i, v in enumerate(A.mean(axis=1))}
+        )
+
+    def test_analyze_reports_bounds(self):
+        """The mixed equilibrium of the means comes with payoff and regret bounds"""
+        A = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        game = EmpiricalGame(2, 2)
+        game.add_samples(*sample_game(A, -A, samples=400, noise=0.5))
+        result = game.analyze()
+        assert result["mixed_nash"]["error"] is None
+        bounds = result["confidence"]["mixed_nash"]
+        low, high = bounds["payoff_intervals"][0]
+        assert low < 0 < high
+        assert 0 < bounds["regret_bounds"][0] < 0.5
+        assert result["confidence"]["min_cell_samples"] == 400
+
+    def test_reanalysis_is_warm_started(self):
+        """After a new batch the mixed solver starts from the previous equilibrium"""
+        A = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        game = EmpiricalGame(2, 2)
+        game.add_samples(*sample_game(A, -A, samples=50, seed=1))
+        assert not game.analyze()["mixed_nash"]["warm_started"]
+        game.add_samples(*sample_game(A, -A, samples=50, seed=2))
+        assert game.analyze()["mixed_nash"]["warm_started"]
+
+    def test_robust_pure_nash(self):
+        """A pure equilibrium is robust only once the intervals separate the payoffs"""
+        A = np.array([[3.0, 0.0], [5.0, 1.0]])
+        game = EmpiricalGame(2, 2)
+        game.add_samples(*sample_game(A, A.T, samples=2, noise=2.0))
+        assert not game.is_robust_pure_nash(1, 1)
+        game.add_samples(*sample_game(A, A.T, samples=2000, noise=0.1, seed=1))
+        assert game.is_robust_pure_nash(1, 1)
+
+    def test_game_manager(self):
+        """Analyzing an empirical game through the manager adds the confidence report"""
+        manager = GameManager()
+        game_id, game = manager.create_empirical_game(2, 2)
+        A = np.array([[3.0, 0.0], [5.0, 1.0]])
+        game.add_samples(*sample_game(A, A.T, samples=100, noise=0.1))
+        result = manager.analyze_game(game_id, mixed_method="lemke_howson")
+        assert result["pure_nash"] == [(1, 1)]
+        assert result["confidence"]["robust_pure_nash"] == [(1, 1)]
+        assert result["confidence"]["total_samples"] == 400
@@ -0,0 +1,130 @@
+"""
+Tests for extensive form games and the sequence form solver
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.extensive_game import ChanceNode, DecisionNode, ExtensiveFormGame, TerminalNode
+
+
+def kuhn_poker():
+    """Build Kuhn poker: 3 cards, one bet, player 1 acts first."""
+    deals = []
+    for c1, c2 in itertools.permutations([1, 2, 3], 2):
+        win = 1 if c1 > c2 else -1
+
+        def leaf(value):
+            return TerminalNode((value, -value))
+
+        after_check = DecisionNode(
+            2,
+            f"P2 {c2} after check",
+            ["check", "bet"],
+            [leaf(win), DecisionNode(1, f"P1 {c1} after bet", ["fold", "call"], [leaf(-1), leaf(2 * win)])],
+        )
+        after_bet = DecisionNode(2, f"P2 {c2} after bet", ["fold", "call"], [leaf(1), leaf(2 * win)])
+        deals.append(DecisionNode(1, f"P1 {c1}", ["check", "bet"], [after_check, after_bet]))
+    return ExtensiveFormGame(ChanceNode([1 / 6] * 6, deals))
+
+
+@pytest.fixture
+def entry_game():
+    """Entry deterrence: the entrant enters or stays out, the incumbent fights or accommodates."""
+    return ExtensiveFormGame(
+        {
+            "player": 1,
+            "infoset": "entrant",
+            "actions": {
+                "out": {"payoffs": [0, 4]},
+                "enter": {
+                    "player": 2,
+                    "infoset": "incumbent",
+                    "actions": {"fight": {"payoffs": [-1, 1]}, "accommodate": {"payoffs": [2, 2]}},
+                },
+            },
+        }
+    )
+
+
+class TestSequenceForm:
+    """Tests for the sequence form representation."""
+
+    def test_sequence_form_is_linear_in_tree(self):
+        """Kuhn poker has 13 sequences per player, not the 64 x 27 reduced normal form"""
+        game = kuhn_poker()
+        assert len(game.sequences[0]) == 13
+        assert len(game.sequences[1]) == 13
+        assert game.count_reduced_strategies(1) == 27
+        assert game.count_reduced_strategies(2) == 64
+
+    def test_realization_plan_roundtrip(self):
+        """Behavior strategies and realization plans convert into each other"""
+        game = kuhn_poker()
+        behavior = {infoset["name"]: [0.25, 0.75] for infoset in game.infosets[0]}
+        plan = game.behavior_to_realization(1, behavior)
+        E, e = game.constraint_matrix(1)
+        assert np.allclose(E @ plan, e)
+        assert game.realization_to_behavior(1, plan) == behavior
+
+    def test_perfect_recall_violation(self):
+        """An information set reached after different own actions is rejected"""
+        with pytest.raises(ValueError, match="perfect recall"):
+            ExtensiveFormGame(
+                DecisionNode(
+                    1,
+                    "first",
+                    ["a", "b"],
+                    [
+                        DecisionNode(1, "forgetful", ["x"], [TerminalNode((0, 0))]),
+                        DecisionNode(1, "forgetful", ["x"], [TerminalNode((1, 1))]),
+                    ],
+                )
+            )
+
+
+class TestSequenceFormSolver:
+    """Tests for the sequence form LCP solver."""
+
+    def test_kuhn_poker_value(self):
+        """The value of Kuhn poker for player 1 is -1/18"""
+        result = kuhn_poker().solve()
+        assert result["error"] is None
+        assert result["expected_payoffs"][0] == pytest.approx(-1 / 18)
+        assert result["exploitability"] < 1e-9
+
+    def test_general_sum_game(self, entry_game):
+        """The solver finds an equilibrium of a general-sum game"""
+        result = entry_game.solve()
+        assert result["error"] is None
+        assert result["exploitability"] < 1e-9
+
+    def test_cancelled_solve(self):
+        """A zero time budget returns a partial result"""
+        result = kuhn_poker().solve(timeout=0)
+        assert result["status"] == "partial"
+
+
+class TestReducedNormalForm:
+    """Tests for the reduced normal form view."""
+
+    def test_reduced_normal_form(self, entry_game):
+        """The view is a StrategicGame with one row per reduced strategy"""
+        normal_form = entry_game.reduced_normal_form()
+        assert normal_form.rows == 2
+        assert normal_form.columns == 2
+        assert entry_game.get_reduced_strategies(1) == [{"entrant": "out"}, {"entrant": "enter"}]
+        assert entry_game.reduced_normal_form() is normal_form
+
+    def test_same_value_as_sequence_form(self):
+        """Solving the reduced normal form gives the same game value"""
+        normal_form = kuhn_poker().reduced_normal_form()
+        result = normal_form.find_mixed_nash(method="lemke_howson")
+        assert normal_form.ep_bpm(result["p1_strategy"], result["p2_strategy"])[0] == pytest.approx(-1 / 18)
+
+    def test_max_cells(self):
+        """Large reduced normal forms are refused"""
+        with pytest.raises(ValueError, match="max_cells"):
+            kuhn_poker().reduced_normal_form(max_cells=100)
@@ -178,3 +178,121 @@ def test_normal_form_get_formatted_normal_form():
     assert "A2" in formatted
     assert "B1" in formatted
     assert "B2" in formatted
+
+
+def test_game_manager_concurrent_creation():
+    """Games created from many threads at once get distinct IDs."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    game_manager = GameManager()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        created = list(executor.map(lambda _: game_manager.create_common_game("prisoners_dilemma"), range(400)))
+
+    ids = [game_id for game_id, _ in created]
+    assert len(set(ids)) == 400
+    assert sorted(ids, key=int) == [str(i) for i in range(1, 401)]
+    assert all(game_manager.get_game(game_id) is game for game_id, game in created)
+
+
+def test_game_manager_concurrent_analysis():
+    """Concurrent analyses of one game agree and leave the shared game unmarked."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    game_manager = GameManager()
+    rng = np.random.default_rng(0)
+    grid = [[tuple(rng.integers(-9, 9, 2).tolist()) for _ in range(6)] for _ in range(6)]
+    game_id, game = game_manager.create_game("d", payoff_matrix=grid)
+    unmarked = [list(row) for row in game.grid_pure_nash]
+
+    def analyze(_):
+        return game_manager.analyze_game(game_id, mixed_method="support_enumeration", find_security=True)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(analyze, range(32)))
+
+    assert all(result == results[0] for result in results)
+    assert game.grid_pure_nash == unmarked
+    assert game.p1_br == [] and game.p2_br == []
+
+
+def test_game_manager_deduplicates_identical_games():
+    """With deduplicate=True, games with identical content share one ID, object and analysis."""
+    game_manager = GameManager(deduplicate=True)
+    game_id, game = game_manager.create_common_game("prisoners_dilemma")
+    game.analyze_welfare()
+
+    same_id, same = game_manager.create_game("d", payoff_matrix=[list(row) for row in game.grid])
+    assert same_id == game_id and same is game
+    assert same._is_memoized("welfare")
+    assert game_manager.reference_count(game_id) == 2
+    assert game_manager.create_common_game("battle_of_sexes")[0] != game_id
+    assert len(game_manager.games) == 2
+
+
+def test_game_manager_deduplicated_delete_counts_references():
+    """A shared game is only removed from the store when its last reference is deleted."""
+    game_manager = GameManager(deduplicate=True)
+    game_id, _ = game_manager.create_common_game("prisoners_dilemma")
+    game_manager.create_common_game("prisoners_dilemma")
+
+    game_manager.delete_game(game_id)
+    assert game_manager.reference_count(game_id) == 1
+    game_manager.delete_game(game_id)
+    assert game_id not in game_manager.games
+    with pytest.raises(KeyError):
+        game_manager.delete_game(game_id)
+    assert game_manager.create_common_game("prisoners_dilemma")[0] != game_id
+
+
+def test_game_manager_deduplication_skips_changed_and_empirical_games():
+    """Games changed since they were stored, and empirical games, are not shared."""
+    game_manager = GameManager(deduplicate=True)
+    game_id, game = game_manager.create_common_game("prisoners_dilemma")
+    game.set_payoff(0, 0, 10, 10)
+    assert game_manager.create_common_game("prisoners_dilemma")[0] != game_id
+
+    first_id, _ = game_manager.create_empirical_game(2, 2)
+    assert game_manager.create_empirical_game(2, 2)[0] != first_id
+    assert GameManager().create_common_game("prisoners_dilemma")[1] is not game
+
+
+def test_game_manager_deduplicates_sqlite_games(tmp_path):
+    """Deduplication works with games decoded again by a SQLite store."""
+    from nash_equilibrium.storage import SQLiteStore
+
+    game_manager = GameManager(store=SQLiteStore(tmp_path / "games.db", cache_size=0), deduplicate=True)
+    game_id, _ = game_manager.create_n_player_game("d", payoffs=np.arange(24).reshape(3, 2, 2, 2))
+    same_id, same = game_manager.create_n_player_game("d", payoffs=np.arange(24).reshape(3, 2, 2, 2))
+    assert same_id == game_id
+    assert np.array_equal(same.payoffs, np.arange(24).reshape(3, 2, 2, 2))
+
+
+def test_game_manager_deduplicates_across_sqlite_processes(tmp_path):
+    """Managers sharing a SQLite store share the digests and reference counts of its games."""
+    from nash_equilibrium.storage import SQLiteStore
+
+    first = GameManager(store=SQLiteStore(tmp_path / "games.db"), deduplicate=True)
+    second = GameManager(store=SQLiteStore(tmp_path / "games.db"), deduplicate=True)
+    game_id, _ = first.create_common_game("prisoners_dilemma")
+    assert second.create_common_game("prisoners_dilemma")[0] == game_id
+    assert first.reference_count(game_id) == 2
+
+    second.delete_game(game_id)
+    assert game_id in first.games
+    first.delete_game(game_id)
+    assert game_id not in second.games
+
+
+def test_game_manager_deduplication_forgets_evicted_games():
+    """Games evicted from a bounded MemoryStore leave no content bookkeeping behind."""
+    from nash_equilibrium.storage import MemoryStore
+
+    store = MemoryStore(max_games=1)
+    game_manager = GameManager(store=store, deduplicate=True)
+    game_id, _ = game_manager.create_common_game("prisoners_dilemma")
+    game_manager.create_common_game("prisoners_dilemma")
+    game_manager.create_common_game("battle_of_sexes")
+
+    assert game_id not in store._digests and game_id not in store._references
+    assert len(store._content_ids) == 1
+    assert game_manager.create_common_game("prisoners_dilemma")[0] != game_id
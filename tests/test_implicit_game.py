@@ -0,0 +1,170 @@
+"""
+Tests for implicit games defined by a payoff function
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import solvers
+from nash_equilibrium.implicit_game import ImplicitGame
+
+
+class CountingPayoffs:
+    """Payoff function over fixed arrays that records every cell it evaluates."""
+
+    def __init__(self, A, B):
+        self.A = A
+        self.B = B
+        self.calls = []
+
+    def __call__(self, row, column):
+        self.calls.append((row, column))
+        return self.A[row, column], self.B[row, column]
+
+
+def small_support_game(size, seed=0):
+    """A large zero-sum game whose equilibrium mixes only the first two strategies of each player."""
+    rng = np.random.default_rng(seed)
+    A = rng.uniform(-1, 0, size=(size, size))
+    A[:2, :] += 1.0
+    A[:2, :2] = [[1.0, -1.0], [-1.0, 1.0]]
+    return A, -A
+
+
+class TestCellEvaluation:
+    """Tests for on demand evaluation and the cache."""
+
+    def test_cells_are_memoized(self):
+        """A cell is evaluated once and then read from the cache"""
+        A = np.arange(12.0).reshape(3, 4)
+        payoffs = CountingPayoffs(A, -A)
+        game = ImplicitGame(payoffs, 3, 4)
+        assert game.cell(1, 2) == (6.0, -6.0)
+        assert game.cell(1, 2) == (6.0, -6.0)
+        assert payoffs.calls == [(1, 2)]
+        assert game.cache_hits == 1
+
+    def test_payoff_block(self):
+        """Blocks match the payoff function and only evaluate missing cells"""
+        A = np.arange(12.0).reshape(3, 4)
+        payoffs = CountingPayoffs(A, 10 - A)
+        game = ImplicitGame(payoffs, 3, 4)
+        game.cell(0, 1)
+        block_A, block_B = game.payoff_block([0, 2], [1, 3, 1])
+        assert np.array_equal(block_A, A[np.ix_([0, 2], [1, 3, 1])])
+        assert np.array_equal(block_B, payoffs.B[np.ix_([0, 2], [1, 3, 1])])
+        assert len(payoffs.calls) == 4
+
+    def test_bounded_cache(self):
+        """The least recently used cells are evicted beyond cache_size"""
+        A = np.arange(9.0).reshape(3, 3)
+        payoffs = CountingPayoffs(A, A)
+        game = ImplicitGame(payoffs, 3, 3, cache_size=2)
+        game.cell(0, 0)
+        game.cell(0, 1)
+        game.cell(0, 0)
+        game.cell(0, 2)
+        assert game.cached_cells == 2
+        game.cell(0, 0)
+        game.cell(0, 1)
+        assert payoffs.calls == [(0, 0), (0, 1), (0, 2), (0, 1)]
+
+    def test_block_larger_than_cache(self):
+        """A block larger than the cache is still returned in full"""
+        A = np.arange(16.0).reshape(4, 4)
+        game = ImplicitGame(CountingPayoffs(A, A), 4, 4, cache_size=3)
+        assert np.array_equal(game.payoff_block(range(4), range(4))[0], A)
+        assert game.cached_cells == 3
+
+    def test_executor_batches(self):
+        """Missing cells are evaluated through the executor in batches"""
+        A = np.arange(20.0).reshape(4, 5)
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            batches = []
+
+            def map(self, fn, *iterables):
+                self.batches.append(len(iterables[0]))
+                return super().map(fn, *iterables)
+
+        with RecordingExecutor(max_workers=4) as executor:
+            game = ImplicitGame(lambda i, j: (A[i, j], -A[i, j]), 4, 5, executor=executor, batch_size=8)
+            block_A, block_B = game.payoff_block(range(4), range(5))
+        assert np.array_equal(block_A, A)
+        assert np.array_equal(block_B, -A)
+        assert RecordingExecutor.batches == [8, 8, 4]
+
+    def test_invalid_payoffs(self):
+        """A payoff function that does not return a pair is rejected"""
+        game = ImplicitGame(lambda i, j: 1.0, 2, 2)
+        with pytest.raises(ValueError):
+            game.cell(0, 0)
+
+    def test_index_out_of_range(self):
+        """Strategies outside the game are rejected"""
+        game = ImplicitGame(lambda i, j: (0, 0), 2, 2)
+        with pytest.raises(ValueError):
+            game.cell(2, 0)
+
+    def test_to_strategic_game(self):
+        """The equivalent StrategicGame has the same payoffs"""
+        A = np.array([[3.0, 0.0], [5.0, 1.0]])
+        game = ImplicitGame(lambda i, j: (A[i, j], A[j, i]), 2, 2).to_strategic_game()
+        assert game.find_pure_nash_equi() == [(1, 1)]
+
+
+class TestBestResponse:
+    """Tests for best responses that touch only the needed cells."""
+
+    def test_reads_only_support(self):
+        """Only the cells in the opponent's support are evaluated"""
+        A = np.arange(30.0).reshape(5, 6) % 7
+        payoffs = CountingPayoffs(A, A)
+        game = ImplicitGame(payoffs, 5, 6)
+        strategy, payoff = game.best_response(1, [0, 0.5, 0, 0, 0.5, 0])
+        expected = A[:, [1, 4]] @ [0.5, 0.5]
+        assert strategy == int(np.argmax(expected))
+        assert payoff == pytest.approx(expected.max())
+        assert {column for _, column in payoffs.calls} == {1, 4}
+
+    def test_candidates(self):
+        """Only the candidate strategies are searched"""
+        A = np.arange(12.0).reshape(3, 4)
+        payoffs = CountingPayoffs(A, A)
+        game = ImplicitGame(payoffs, 3, 4)
+        assert game.best_response(2, [1, 0, 0], candidates=[0, 2]) == (2, 2.0)
+        assert sorted(payoffs.calls) == [(0, 0), (0, 2)]
+
+
+class TestDoubleOracle:
+    """Tests for the double oracle on implicit games."""
+
+    def test_touches_few_cells(self):
+        """The equilibrium of a large game is found from a fraction of its cells"""
+        A, B = small_support_game(300)
+        game = ImplicitGame(CountingPayoffs(A, B), 300, 300)
+        result = game.find_double_oracle_equilibrium()
+        assert result["error"] is None
+        assert result["gain"] < 1e-9
+        assert solvers.exploitability(A, B, np.array(result["p1_strategy"]), np.array(result["p2_strategy"])) < 1e-9
+        assert result["expected_payoffs"][0] == pytest.approx(0.0)
+        assert result["evaluations"] < 0.05 * A.size
+
+    def test_sampled_search(self):
+        """Sampling best responses evaluates fewer cells per iteration"""
+        A, B = small_support_game(400, seed=1)
+        game = ImplicitGame(CountingPayoffs(A, B), 400, 400)
+        result = game.find_double_oracle_equilibrium(sample_size=20, seed=0)
+        assert result["sampled"]
+        assert result["error"] is None
+        assert result["evaluations"] < 0.01 * A.size
+
+    def test_cancelled(self):
+        """A zero time budget returns a partial result"""
+        A, B = small_support_game(50)
+        game = ImplicitGame(lambda i, j: (A[i, j], B[i, j]), 50, 50)
+        result = game.find_double_oracle_equilibrium(rows=(10,), columns=(10,), timeout=0)
+        assert result["status"] == "partial"
+        assert len(result["p1_strategy"]) == 50
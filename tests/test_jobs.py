@@ -0,0 +1,248 @@
+"""
+Tests for the analysis job queue
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.jobs import JobQueue, JobQueueFull
+from nash_equilibrium.storage import SQLiteStore
+
+
+def blocking_job(release, started=None):
+    """A job function that runs until release is set or it is cancelled."""
+
+    def run(value, cancel_token, progress):
+        if started is not None:
+            started.set()
+        progress({"step": 1})
+        while not release.wait(0.01):
+            if cancel_token.cancelled:
+                return {"value": value, "status": "partial"}
+        return {"value": value, "status": "complete"}
+
+    return run
+
+
+@pytest.fixture
+def queue():
+    """A job queue that cancels its jobs when the test ends."""
+    jobs = JobQueue(workers=1, max_queued=2)
+    yield jobs
+    jobs.shutdown(cancel=True)
+
+
+class TestJobQueue:
+    """Tests for JobQueue."""
+
+    def test_result(self, queue):
+        """Jobs run in the background and report their status and result"""
+        release, started = threading.Event(), threading.Event()
+        job_id = queue.submit(blocking_job(release, started), 7)
+        started.wait(5)
+        assert queue.status(job_id)["status"] == "running"
+        assert queue.status(job_id)["progress"] == {"step": 1}
+        release.set()
+        assert queue.result(job_id, timeout=5) == {"value": 7, "status": "complete"}
+        state = queue.status(job_id)
+        assert state["status"] == "done" and state["result"]["value"] == 7
+
+    def test_failed_job(self, queue):
+        """Exceptions of a job are reported and raised again by result"""
+
+        def fail(cancel_token, progress):
+            raise KeyError("Game with ID 9 not found")
+
+        job_id = queue.submit(fail)
+        with pytest.raises(KeyError):
+            queue.result(job_id, timeout=5)
+        state = queue.status(job_id)
+        assert state["status"] == "failed"
+        assert state["error"] == "Game with ID 9 not found"
+
+    def test_cancel_running_and_waiting_jobs(self, queue):
+        """Running jobs stop with their partial result; waiting jobs never start"""
+        release, started = threading.Event(), threading.Event()
+        running = queue.submit(blocking_job(release, started), 1)
+        waiting = queue.submit(blocking_job(release), 2)
+        started.wait(5)
+
+        assert queue.cancel(waiting)
+        assert queue.status(waiting)["status"] == "cancelled"
+        assert queue.result(waiting, timeout=5) is None
+        assert queue.cancel(running)
+        assert queue.result(running, timeout=5) == {"value": 1, "status": "partial"}
+        assert queue.status(running)["status"] == "cancelled"
+        assert not queue.cancel(running)
+
+    def test_bounded_queue(self, queue):
+        """Submitting beyond the queue depth raises JobQueueFull"""
+        release, started = threading.Event(), threading.Event()
+        queue.submit(blocking_job(release, started), 1)
+        started.wait(5)
+        queue.submit(blocking_job(release), 2)
+        queue.submit(blocking_job(release), 3)
+        with pytest.raises(JobQueueFull):
+            queue.submit(blocking_job(release), 4)
+        release.set()
+
+    def test_concurrency(self):
+        """Up to the configured number of workers run jobs at the same time"""
+        queue = JobQueue(workers=3)
+        release = threading.Event()
+        started = [threading.Event() for _ in range(3)]
+        job_ids = [queue.submit(blocking_job(release, event), index) for index, event in enumerate(started)]
+        assert all(event.wait(5) for event in started)
+        release.set()
+        assert [queue.result(job_id, timeout=5)["value"] for job_id in job_ids] == [0, 1, 2]
+        queue.shutdown()
+
+    def test_retention(self):
+        """Finished jobs are forgotten after the retention time"""
+        now = [0.0]
+        queue = JobQueue(retention=10, clock=lambda: now[0])
+        job_id = queue.submit(lambda cancel_token, progress: 1)
+        assert queue.result(job_id, timeout=5) == 1
+        now[0] = 5.0
+        assert queue.status(job_id)["status"] == "done"
+        now[0] = 20.0
+        with pytest.raises(KeyError):
+            queue.status(job_id)
+        assert queue.jobs() == []
+        queue.shutdown()
+
+
+class TestSharedJobs:
+    """Tests for jobs kept in a SQLite store shared by several processes."""
+
+    def test_poll_and_cancel_from_another_process(self, tmp_path):
+        """A queue sharing the store reports on and cancels the jobs of another one"""
+        # Two queues on two stores of one file stand for two server processes
+        runner = JobQueue(workers=1, store=SQLiteStore(tmp_path / "games.db"))
+        other = JobQueue(workers=1, store=SQLiteStore(tmp_path / "games.db"))
+
+        def reporting_job(cancel_token, progress):
+            for step in range(3000):
+                if cancel_token.cancelled:
+                    return {"status": "partial", "steps": step}
+                progress({"step": step})
+                time.sleep(0.001)
+            return {"status": "complete"}
+
+        try:
+            done_id = runner.submit(lambda cancel_token, progress: {"value": np.int64(3)})
+            state = other.wait(done_id, timeout=5)
+            assert state["status"] == "done"
+            assert state["result"] == {"value": 3}
+
+            job_id = runner.submit(reporting_job)
+            while other.status(job_id)["status"] == "queued":
+                time.sleep(0.01)
+            assert other.cancel(job_id) is True
+            state = other.wait(job_id, timeout=10)
+            assert state["status"] == "cancelled"
+            assert state["result"]["status"] == "partial"
+            assert other.cancel(job_id) is False
+            with pytest.raises(KeyError):
+                other.status("unknown")
+        finally:
+            runner.shutdown(cancel=True)
+            other.shutdown()
+
+
+class TestGameManagerJobs:
+    """Tests for the analysis jobs of GameManager."""
+
+    def test_submit_analysis(self):
+        """Submitted analyses return the results of analyze_game"""
+        manager = GameManager()
+        game_id, _ = manager.create_common_game("prisoners_dilemma")
+        job_id = manager.submit_analysis(game_id, find_welfare=True)
+        state = manager.get_job(job_id, wait=5)
+        assert state["status"] == "done"
+        assert state["result"]["pure_nash"] == [(1, 1)]
+        assert "welfare" in state["result"]
+
+    def test_cancel_analysis(self):
+        """Cancelled analyses stop their solver and keep a partial result"""
+        manager = GameManager()
+        # Rock-paper-scissors on 13 strategies: every support must be enumerated
+        cycle = np.roll(np.eye(13, dtype=int), 1, axis=1) - np.roll(np.eye(13, dtype=int), -1, axis=1)
+        grid = [[(int(payoff), int(-payoff)) for payoff in row] for row in cycle]
+        game_id, _ = manager.create_game("d", payoff_matrix=grid)
+        job_id = manager.submit_analysis(game_id, mixed_method="support_enumeration", find_nash=False)
+        while manager.get_job(job_id)["status"] == "queued":
+            time.sleep(0.001)
+        manager.cancel_job(job_id)
+        state = manager.get_job(job_id, wait=30)
+        assert state["status"] == "cancelled"
+        assert state["result"]["status"] == "partial"
+
+    def test_invalid_submissions(self):
+        """Unknown games and options are rejected when submitting"""
+        manager = GameManager()
+        game_id, _ = manager.create_common_game("prisoners_dilemma")
+        with pytest.raises(KeyError):
+            manager.submit_analysis("99")
+        with pytest.raises(TypeError):
+            manager.submit_analysis(game_id, find_everything=True)
+        with pytest.raises(KeyError):
+            manager.get_job("unknown")
+
+
+class TestWebAPI:
+    """Tests for the analysis job endpoints of the web API."""
+
+    def test_job_endpoints(self):
+        """Analyses are submitted, polled and cancelled over HTTP"""
+        web_api = pytest.importorskip("web_api")
+        client = web_api.app.test_client()
+        game_id = client.post("/api/common-games", json={"game_type": "prisoners_dilemma"}).get_json()["game_id"]
+
+        response = client.post(f"/api/games/{game_id}/analysis-jobs", json={"find_welfare": True})
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+        state = client.get(f"/api/jobs/{job_id}?wait=5").get_json()
+        assert state["status"] == "done"
+        assert state["result"]["pure_nash"] == [[1, 1]]
+        assert client.delete(f"/api/jobs/{job_id}").get_json()["cancelled"] is False
+
+        assert client.post("/api/games/99/analysis-jobs", json={}).status_code == 404
+        assert client.get("/api/jobs/unknown").status_code == 404
+
+    def test_boolean_options(self):
+        """Section options must be booleans or the strings true and false"""
+        web_api = pytest.importorskip("web_api")
+        client = web_api.app.test_client()
+        game_id = client.post("/api/common-games", json={"game_type": "prisoners_dilemma"}).get_json()["game_id"]
+
+        response = client.post(
+            f"/api/games/{game_id}/analysis-jobs", json={"find_nash": "false", "find_mixed": "FALSE"}
+        )
+        state = client.get(f"/api/jobs/{response.get_json()['job_id']}?wait=5").get_json()
+        assert "pure_nash" not in state["result"]
+        assert "mixed_nash" not in state["result"]
+        for value in ("no", 1, None, []):
+            response = client.post(f"/api/games/{game_id}/analysis-jobs", json={"find_welfare": value})
+            assert response.status_code == 400
+
+    def test_timeout_capped(self, monkeypatch):
+        """Requested time limits are capped by NASH_SOLVE_TIMEOUT, and malformed ones rejected"""
+        web_api = pytest.importorskip("web_api")
+        monkeypatch.setitem(web_api.config, "solve_timeout", 30.0)
+        assert web_api._solve_timeout(None) == 30.0
+        assert web_api._solve_timeout("5") == 5.0
+        assert web_api._solve_timeout(1e9) == 30.0
+        assert web_api._solve_timeout("inf") == 30.0
+
+        client = web_api.app.test_client()
+        game_id = client.post("/api/common-games", json={"game_type": "prisoners_dilemma"}).get_json()["game_id"]
+        for timeout in ("abc", "-1", "nan"):
+            assert client.get(f"/api/games/{game_id}/analyze?timeout={timeout}").status_code == 400
+            response = client.post(f"/api/games/{game_id}/analysis-jobs", json={"timeout": timeout})
+            assert response.status_code == 400
+        assert client.get(f"/api/games/{game_id}/analyze?timeout=1e9").status_code == 200
@@ -0,0 +1,130 @@
+"""
+Tests for the streaming JSON export
+"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import json_stream
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+
+
+def sample_games():
+    """One game of every type with a to_dict method."""
+    empirical = EmpiricalGame(2, 3)
+    empirical.add_samples([0, 0, 1], [2, 2, 1], [1.0, 3.0, -1.0], [0.5, 0.5, 2.0])
+    return [
+        create_prisoners_dilemma(),
+        StrategicGame(mode="r", rows=7, columns=5),
+        SparseStrategicGame(np.diag([1.0, 0.0, 2.0]), np.eye(3)),
+        empirical,
+        NPlayerGame(mode="r", strategies=(3, 4, 2)),
+    ]
+
+
+def plain(value):
+    """The numpy-free value that the JSON export encodes."""
+    return json.loads(json.dumps(value, default=lambda obj: obj.tolist()))
+
+
+class TestStreamedJSON:
+    """Tests for encoding games in chunks."""
+
+    def test_same_as_to_dict(self):
+        """The streamed JSON decodes to the same value as to_dict"""
+        for game in sample_games():
+            text = "".join(json_stream.iter_game_json(game))
+            assert json.loads(text) == plain(game.to_dict())
+
+    def test_chunked(self):
+        """Large payoff fields are produced in several chunks"""
+        game = StrategicGame(mode="r", rows=40, columns=30)
+        chunks = list(json_stream.iter_game_json(game, chunk_size=100))
+        assert len(chunks) > 3 * 12
+        assert json.loads("".join(chunks)) == plain(game.to_dict())
+
+        tensor = NPlayerGame(mode="r", strategies=(6, 5, 4))
+        chunks = list(json_stream.iter_game_json(tensor, chunk_size=10))
+        assert json.loads("".join(chunks))["payoffs"] == tensor.payoffs.tolist()
+
+    def test_numpy_scalar_payoffs(self):
+        """Grids holding numpy scalars are encoded like the plain values"""
+        grid = [[(np.int64(3), np.float64(1.5)), (np.int32(0), np.int64(-2))]]
+        game = StrategicGame(mode="d", payoff_matrix=grid)
+        data = json.loads("".join(json_stream.iter_game_json(game, chunk_size=1)))
+        assert data == plain(game.to_dict())
+        assert data["payoff_matrix"] == [[[3, 1.5], [0, -2]]]
+
+        manager = GameManager()
+        game_id, _ = manager.create_game("d", payoff_matrix=grid)
+        assert json.loads(manager.export_game(game_id, format="json"))["p1_payoffs"] == [[3, 0]]
+
+    def test_field_selection(self):
+        """Fields can be selected or excluded, keeping the order of to_dict"""
+        game = create_prisoners_dilemma()
+        data = json.loads("".join(json_stream.iter_game_json(game, fields=["payoff_matrix", "rows"])))
+        assert list(data) == ["rows", "payoff_matrix"]
+        data = json.loads("".join(json_stream.iter_game_json(game, exclude=json_stream.REDUNDANT_FIELDS)))
+        assert "p1_payoffs" not in data and "p2_payoffs" not in data
+        assert data["payoff_matrix"] == [[[3, 3], [0, 5]], [[5, 0], [1, 1]]]
+
+    def test_unknown_field(self):
+        """Unknown field names are rejected before any output"""
+        with pytest.raises(ValueError):
+            json_stream.iter_game_json(create_prisoners_dilemma(), fields=["payoff_matrix", "colour"])
+
+    def test_write_to_file(self):
+        """Games are written to text files chunk by chunk"""
+        game = StrategicGame(mode="r", rows=20, columns=20)
+        buffer = io.StringIO()
+        json_stream.write_game_json(game, buffer, chunk_size=50)
+        assert json.loads(buffer.getvalue()) == plain(game.to_dict())
+
+
+class TestGameManagerJSON:
+    """Tests for the JSON exports of GameManager."""
+
+    def test_export_fields(self):
+        """JSON and dictionary exports accept field selections"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        assert json.loads(manager.export_game(game_id)) == plain(game.to_dict())
+        exported = manager.export_game(game_id, format="dict", exclude=json_stream.REDUNDANT_FIELDS)
+        assert "p1_payoffs" not in exported
+        assert manager.export_game(game_id, format="dict", fields=["rows"]) == {"rows": 2}
+
+    def test_stream(self):
+        """Games are exported as an iterator over chunks"""
+        manager = GameManager()
+        game_id, game = manager.create_game("r", rows=30, columns=30)
+        chunks = manager.stream_game_json(game_id, chunk_size=60)
+        assert json.loads("".join(chunks)) == plain(game.to_dict())
+        with pytest.raises(KeyError):
+            manager.stream_game_json("missing")
+
+
+class TestWebAPI:
+    """Tests for the streamed game responses of the web API."""
+
+    def test_get_game(self):
+        """Games are returned with the fields selected by query parameters"""
+        web_api = pytest.importorskip("web_api")
+        client = web_api.app.test_client()
+        created = client.post("/api/common-games", json={"game_type": "prisoners_dilemma"}).get_json()
+        assert list(created["game"]) == ["rows", "columns", "mode"]
+        response = client.post("/api/games?fields=rows,payoff_matrix", json={"mode": "r", "rows": 2, "columns": 3})
+        assert list(response.get_json()["game"]) == ["rows", "payoff_matrix"]
+
+        url = f"/api/games/{created['game_id']}"
+        assert client.get(url).get_json()["payoff_matrix"] == [[[3, 3], [0, 5]], [[5, 0], [1, 1]]]
+        data = client.get(url + "?exclude=p1_payoffs,p2_payoffs").get_json()
+        assert "p1_payoffs" not in data and "payoff_matrix" in data
+        assert client.get(url + "?fields=rows,columns").get_json() == {"rows": 2, "columns": 2}
+        assert client.get(url + "?fields=colour").status_code == 400
@@ -0,0 +1,112 @@
+"""
+Tests for N-player normal form games
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.parser import GameFileParseError, GameFileParser
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+@pytest.fixture
+def market_entry():
+    """3-player market entry game: entering pays 6, 2 or -1 with 1, 2 or 3 entrants."""
+    profit = {1: 6, 2: 2, 3: -1}
+    payoffs = np.zeros((3, 2, 2, 2))
+    for profile in np.ndindex(2, 2, 2):
+        entrants = profile.count(0)
+        for p in range(3):
+            if profile[p] == 0:
+                payoffs[(p,) + profile] = profit[entrants]
+    return NPlayerGame(mode="d", payoffs=payoffs)
+
+
+class TestNPlayerGame:
+    """Tests for NPlayerGame."""
+
+    def test_init_random_mode(self):
+        """Random games have one payoff tensor per player"""
+        game = NPlayerGame(mode="r", strategies=(2, 3, 4), lower_limit=-5, upper_limit=5)
+        assert game.num_players == 3
+        assert game.payoffs.shape == (3, 2, 3, 4)
+        assert game.payoffs.min() >= -5 and game.payoffs.max() <= 5
+
+    def test_init_invalid_shape(self):
+        """The first axis must have one entry per player"""
+        with pytest.raises(ValueError):
+            NPlayerGame(mode="d", payoffs=np.zeros((2, 2, 2, 2)))
+
+    def test_pure_nash(self, market_entry):
+        """Exactly two entrants is an equilibrium"""
+        assert market_entry.find_pure_nash_equi() == [(0, 0, 1), (0, 1, 0), (1, 0, 0)]
+
+    def test_pure_nash_matches_strategic_game(self):
+        """For 2 players the vectorized search agrees with StrategicGame"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(3, 3), (0, 5)], [(5, 0), (1, 1)]])
+        n_player = NPlayerGame.from_strategic_game(game)
+        strategic = [(row, col) for col, row in game.find_pure_nash_equi()]
+        assert n_player.find_pure_nash_equi() == strategic
+        assert n_player.to_strategic_game() == game
+
+    def test_expected_payoffs(self, market_entry):
+        """Expected payoffs contract the tensor with every player's strategy"""
+        uniform = [[0.5, 0.5]] * 3
+        # An entrant faces 0, 1 or 2 other entrants with probability 1/4, 1/2, 1/4
+        expected_entry = 0.25 * 6 + 0.5 * 2 + 0.25 * -1
+        assert np.allclose(market_entry.ep_bpm(*uniform), [expected_entry / 2] * 3)
+        payoffs = market_entry.calculate_expected_payoffs(1, uniform)
+        assert payoffs == pytest.approx({"A1": expected_entry, "A2": 0.0})
+
+    def test_regret(self, market_entry):
+        """Pure equilibria have no regret"""
+        profile = [[1, 0], [1, 0], [0, 1]]
+        assert market_entry.calculate_regret(*profile) == (0.0, 0.0, 0.0)
+
+    def test_invalid_player(self, market_entry):
+        """Players are numbered from 1 to N"""
+        with pytest.raises(ValueError):
+            market_entry.get_payoffs(4)
+
+
+class TestNPlayerPlumbing:
+    """Tests for the manager and parser integration."""
+
+    def test_game_manager(self, market_entry):
+        """N-player games share the manager's IDs and analysis"""
+        manager = GameManager()
+        manager.create_game("d", payoff_matrix=[[(1, 1)]])
+        game_id, _ = manager.create_n_player_game("d", payoffs=market_entry.payoffs)
+
+        assert game_id == "2"
+        assert manager.analyze_game(game_id)["pure_nash"] == [(0, 0, 1), (0, 1, 0), (1, 0, 0)]
+        assert len(manager.calculate_expected_payoffs(game_id, [1, 0], [1, 0], [1, 0])) == 3
+
+    def test_parse_three_player_game(self):
+        """PLAYERS and STRATEGIES describe the payoff tuples"""
+        content = """
+GAME_TYPE: custom
+PLAYERS: 3
+STRATEGIES: 2 1 2
+PAYOFFS:
+  (1, 2, 3) (4, 5, 6)
+  (7, 8, 9) (0, 0, 0)
+"""
+        _, game = GameFileParser().parse_content(content)
+        assert isinstance(game, NPlayerGame)
+        assert game.payoffs.shape == (3, 2, 1, 2)
+        assert game.payoffs[:, 1, 0, 0].tolist() == [7, 8, 9]
+
+    def test_parse_wrong_tuple_size(self):
+        """Payoff tuples need one payoff per player"""
+        content = """
+GAME_TYPE: custom
+PLAYERS: 3
+STRATEGIES: 1 1 1
+PAYOFFS:
+  (1, 2)
+"""
+        with pytest.raises(GameFileParseError, match="exactly 3 elements"):
+            GameFileParser().parse_content(content)
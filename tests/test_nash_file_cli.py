@@ -145,6 +145,18 @@ DESCRIPTION: Test 2x2 game for mixed strategy testing
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
 
+    def test_analyze_compact_json(self, prisoners_dilemma_file, tmp_path):
+        """Test that compact JSON leaves out the per-player payoff copies."""
+        runner = CliRunner()
+        json_path = tmp_path / "game.json"
+        result = runner.invoke(
+            analyze, [prisoners_dilemma_file, "--output", "json", "--compact-json", "--save-json", str(json_path)]
+        )
+        assert result.exit_code == 0
+        data = json.loads(json_path.read_text())
+        assert "payoff_matrix" in data
+        assert "p1_payoffs" not in data and "p2_payoffs" not in data
+
     def test_analyze_mixed_strategy(self, battle_of_sexes_file):
         """Test analyze command with mixed strategy calculation."""
         runner = CliRunner()
@@ -144,6 +144,12 @@ class TestBestResponse:
         with pytest.raises(ValueError):
             prisoners_dilemma.find_br(player=3)
 
+    def test_find_br_ties_beaten_later(self):
+        """Cells tied for a value that a later cell beats are not best responses"""
+        game = NormalForm(mode="d", payoff_matrix=[[(1, 0), (0, 1)], [(1, 1), (0, 0)], [(2, 0), (0, 1)]])
+        assert sorted(game.find_br(player=1)) == [(0, 2), (1, 0), (1, 1), (1, 2)]
+        assert sorted(game.find_pure_nash_equi()) == [(1, 0), (1, 2)]
+
 
 class TestNashEquilibrium:
     """Tests for finding Nash equilibria"""
@@ -175,6 +181,29 @@ class TestNashEquilibrium:
         assert (1, 1) in nash_eq  # (A2, B2)
 
 
+class TestMemoizedResults:
+    """Tests for analysis results following the payoffs"""
+
+    def test_payoff_matrix_copied(self):
+        """Changing the caller's payoff matrix does not change the game or its results"""
+        pm = [[(1, 1), (0, 0)], [(0, 0), (1, 1)]]
+        game = NormalForm(mode="d", payoff_matrix=pm)
+        assert game.find_pure_nash_equi() == [(0, 0), (1, 1)]
+        pm[0][0] = (-5, -5)
+        assert game.grid[0][0] == (1, 1)
+        assert game.find_pure_nash_equi() == [(0, 0), (1, 1)]
+
+    def test_grid_edited_in_place(self):
+        """Replacing cells of grid in place drops the memoized results"""
+        game = NormalForm(mode="d", payoff_matrix=[[(1, 1), (0, 0)], [(0, 0), (1, 1)]])
+        assert game.find_pure_nash_equi() == [(0, 0), (1, 1)]
+        game.grid[0][0] = (-5, -5)
+        assert game.find_pure_nash_equi() == [(1, 1)]
+        assert game.payoff_arrays()[0][0, 0] == -5
+        game.set_payoff(0, 0, 2, 2)
+        assert game.find_pure_nash_equi() == [(0, 0), (1, 1)]
+
+
 class TestExpectedPayoff:
     """Tests for expected payoff calculations"""
 
@@ -558,3 +587,45 @@ class TestAdvancedGameTheoryMethods:
         game.grid = [[(1, 1)], [(0, 0), (1, 1)]]  # Inconsistent row lengths
         with pytest.raises(ValueError, match="Row 0 has 1 columns but should have 2"):
             game.validate_game_structure()
+
+
+class TestSerialization:
+    """Tests for field selection in to_dict"""
+
+    def test_selected_fields(self, prisoners_dilemma):
+        """Only the selected fields are returned, in the order of to_dict"""
+        assert prisoners_dilemma.to_dict(fields=["columns", "rows"]) == {"rows": 2, "columns": 2}
+        assert list(prisoners_dilemma.to_dict(fields=NormalForm.SUMMARY_FIELDS)) == ["rows", "columns", "mode"]
+        full = prisoners_dilemma.to_dict()
+        assert "mixed_strategy" in full
+        assert prisoners_dilemma.to_dict(exclude=["p1_payoffs", "p2_payoffs"]) == {
+            name: value for name, value in full.items() if name not in ("p1_payoffs", "p2_payoffs")
+        }
+
+    def test_unknown_field(self, prisoners_dilemma):
+        """Unknown field names raise ValueError"""
+        with pytest.raises(ValueError, match="colour"):
+            prisoners_dilemma.to_dict(fields=["rows", "colour"])
+
+    def test_mixed_strategy_only_for_2x2(self):
+        """mixed_strategy can be requested for any game but only 2x2 games have it"""
+        game = NormalForm(mode="r", rows=3, columns=2)
+        assert game.to_dict(fields=["rows", "mixed_strategy"]) == {"rows": 3}
+
+    def test_summary_is_lazy(self):
+        """Summary fields of a large game do not compute equilibria"""
+        game = NormalForm(mode="r", rows=300, columns=300)
+        assert game.to_dict(fields=NormalForm.SUMMARY_FIELDS)["rows"] == 300
+        assert not game._is_memoized("pure_nash")
+
+    def test_equilibria_memoized(self, coordination_game):
+        """Equilibrium fields are computed once and dropped when payoffs change"""
+        assert coordination_game.to_dict(fields=["nash_equilibria"])["nash_equilibria"] == [(0, 0), (1, 1)]
+        assert coordination_game._is_memoized("pure_nash")
+        assert coordination_game.find_pure_nash_equi(update_state=False) == [(0, 0), (1, 1)]
+        coordination_game.to_dict(fields=["mixed_strategy"])
+        assert coordination_game._is_memoized("indifference")
+
+        coordination_game.set_payoff(1, 1, -1, -1)
+        assert not coordination_game._is_memoized("pure_nash")
+        assert coordination_game.to_dict(fields=["nash_equilibria"])["nash_equilibria"] == [(0, 0)]
@@ -0,0 +1,180 @@
+"""
+Tests for the binary game format
+"""
+
+import json
+import zipfile
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import npz_format
+from nash_equilibrium.dense_game import DenseStrategicGame
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+
+
+def sample_games():
+    """One game of every savable type."""
+    empirical = EmpiricalGame(2, 3)
+    empirical.add_samples([0, 0, 1], [2, 2, 1], [1.0, 3.0, -1.0], [0.5, 0.5, 2.0])
+    return [
+        create_prisoners_dilemma(),
+        StrategicGame(mode="d", payoff_matrix=[[(1.5, -2), (0, 4)]]),
+        SparseStrategicGame(np.diag([1.0, 0.0, 2.0]), np.eye(3)),
+        empirical,
+        NPlayerGame(mode="d", payoffs=np.arange(24).reshape(3, 2, 2, 2)),
+    ]
+
+
+def same_payoffs(restored, game):
+    """Check that two games have the same payoffs."""
+    if isinstance(game, NPlayerGame):
+        return np.array_equal(restored.payoffs, game.payoffs)
+    return all(np.array_equal(a, b) for a, b in zip(restored.payoff_arrays(), game.payoff_arrays()))
+
+
+class TestRoundTrip:
+    """Tests for saving and loading games."""
+
+    def test_every_game_type(self, tmp_path):
+        """Every game type is rebuilt with the same payoffs from a file or bytes"""
+        for index, game in enumerate(sample_games()):
+            path = tmp_path / f"game{index}.npz"
+            npz_format.save_npz(game, path)
+            for restored in (npz_format.load_npz(path), npz_format.load_npz(npz_format.dumps_npz(game))):
+                assert type(restored) is (DenseStrategicGame if type(game) is StrategicGame else type(game))
+                assert same_payoffs(restored, game)
+
+    def test_integer_payoffs(self, tmp_path):
+        """Integer payoffs come back as ints"""
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(create_prisoners_dilemma(), path)
+        restored = npz_format.load_npz(path)
+        assert restored.grid == create_prisoners_dilemma().grid
+        assert all(isinstance(payoff, int) for payoff in restored.grid[0][0])
+        restored.set_payoff(0, 0, 0.5, 1)
+        assert restored.grid[0][0] == (0.5, 1.0)
+
+    def test_analysis_restored(self, tmp_path):
+        """Memoized analysis results and pure equilibria are returned without recomputing"""
+        game = create_prisoners_dilemma()
+        game.find_pure_nash_equi()
+        mixed = game.find_mixed_nash()
+        welfare = game.analyze_welfare()
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path)
+
+        restored = npz_format.load_npz(path)
+        assert restored.nash_equilibria == game.nash_equilibria
+        assert restored._is_memoized("welfare")
+        assert restored.analyze_welfare() == welfare
+        assert restored.find_mixed_nash() == mixed
+
+    def test_analysis_dropped_after_change(self, tmp_path):
+        """Restored results are forgotten when the loaded game's payoffs change"""
+        game = create_prisoners_dilemma()
+        game.analyze_welfare()
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path)
+        restored = npz_format.load_npz(path)
+        restored.set_payoff(0, 0, 10, 10)
+        assert not restored._is_memoized("welfare")
+        assert restored.analyze_welfare()["utilitarian"]["welfare"] == 20
+
+    def test_without_analysis(self, tmp_path):
+        """Analysis results can be left out"""
+        game = create_prisoners_dilemma()
+        game.analyze_welfare()
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path, analysis=False)
+        assert not npz_format.load_npz(path)._is_memoized("welfare")
+
+    def test_not_a_saved_game(self, tmp_path):
+        """Archives without a game header are rejected"""
+        path = tmp_path / "arrays.npz"
+        np.savez(path, a=np.arange(3))
+        with pytest.raises(ValueError):
+            npz_format.load_npz(path)
+
+
+class TestLayout:
+    """Tests for the archive layout and memory mapping."""
+
+    def test_payoffs_stored_once(self, tmp_path):
+        """Each payoff is stored once, uncompressed, next to a JSON header"""
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(create_prisoners_dilemma(), path)
+        with zipfile.ZipFile(path) as archive:
+            assert sorted(archive.namelist()) == ["__header__.npy", "grid.npy"]
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+        arrays = npz_format.map_npz(path)
+        assert arrays["grid"].shape == (2, 2, 2)
+        assert json.loads(str(arrays["__header__"][()]))["kind"] == "strategic"
+
+    def test_memory_mapped(self, tmp_path):
+        """Arrays are memory mapped copy-on-write, leaving the file unchanged"""
+        game = NPlayerGame(mode="d", payoffs=np.arange(24).reshape(3, 2, 2, 2))
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path)
+        restored = npz_format.load_npz(path)
+        # The game keeps a view of the map instead of a copy
+        assert not restored.payoffs.flags.owndata
+        restored.payoffs[0, 0, 0, 0] = 100
+        assert npz_format.load_npz(path).payoffs[0, 0, 0, 0] == 0
+        assert isinstance(npz_format.map_npz(path)["payoffs"], np.memmap)
+
+    def test_grid_built_lazily(self, tmp_path):
+        """Loaded 2-player games use the mapped payoffs without building their grid"""
+        payoffs = np.random.default_rng(0).normal(size=(30, 40, 2))
+        game = StrategicGame(mode="d", payoff_matrix=[[tuple(cell) for cell in row] for row in payoffs.tolist()])
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path, analysis=False)
+        restored = npz_format.load_npz(path)
+        assert isinstance(restored, DenseStrategicGame)
+        assert restored.find_pure_nash_equi() == game.find_pure_nash_equi()
+        assert not restored._is_memoized("grid")
+        assert np.shares_memory(restored.payoff_arrays()[0], restored.payoffs)
+
+        restored.set_payoff(0, 0, 1.5, -2)
+        assert restored.grid[0][0] == (1.5, -2.0)
+        assert restored.payoff_arrays()[0][0, 0] == 1.5
+        assert npz_format.load_npz(path).grid == game.grid
+
+    def test_loaded_empirical_game_accepts_samples(self, tmp_path):
+        """Samples can be added to an empirical game loaded from a mapped file"""
+        game = sample_games()[3]
+        path = tmp_path / "game.npz"
+        npz_format.save_npz(game, path)
+        restored = npz_format.load_npz(path)
+        restored.add_samples([1], [0], [2.0], [2.0])
+        assert restored.counts[1, 0] == game.counts[1, 0] + 1
+
+
+class TestGameManagerExport:
+    """Tests for the npz export format of GameManager."""
+
+    def test_export_and_import(self, tmp_path):
+        """Exported games are imported under a new ID"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        game.analyze_welfare()
+        data = manager.export_game(game_id, format="npz")
+        assert isinstance(data, bytes)
+
+        path = tmp_path / "game.npz"
+        path.write_bytes(data)
+        new_id, imported = manager.import_game(path)
+        assert new_id != game_id
+        assert imported.grid == game.grid
+        assert imported._is_memoized("welfare")
+        assert manager.import_game(data)[1].grid == game.grid
+
+    def test_smaller_than_json(self):
+        """The binary export of a large game is smaller than its JSON export"""
+        manager = GameManager()
+        game_id, _ = manager.create_game("r", rows=60, columns=60)
+        assert len(manager.export_game(game_id, format="npz")) < len(manager.export_game(game_id, format="json"))
@@ -0,0 +1,109 @@
+"""
+Tests for logit quantal response equilibria
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import qre, solvers
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+
+
+class TestTraceLogitQRE:
+    """Tests for following the QRE branch."""
+
+    def test_fixed_point(self):
+        """At the end of the branch each player logit responds to the other"""
+        A = np.array([[3.0, 0.0], [5.0, 1.0]])
+        trace = qre.trace_logit_qre(A, A.T, lam=2.0)
+        x, y = trace["p1_strategy"], trace["p2_strategy"]
+        assert trace["lambda"] == pytest.approx(2.0)
+        logit = np.exp(2.0 * (A @ y))
+        assert np.allclose(x, logit / logit.sum())
+
+    def test_path_starts_uniform(self):
+        """The recorded path starts at uniform play with lambda = 0"""
+        A = np.array([[1.0, -1.0, 0.5], [-1.0, 1.0, 0.0]])
+        trace = qre.trace_logit_qre(A, -A, lam=1.0, record_path=True)
+        start = trace["path"][0]
+        assert start["lambda"] == 0
+        assert np.allclose(start["p1_strategy"], [0.5, 0.5])
+        assert np.allclose(start["p2_strategy"], [1 / 3] * 3)
+        assert trace["path"][-1]["lambda"] == pytest.approx(1.0)
+
+    def test_jacobian(self):
+        """The vectorized Jacobian matches finite differences"""
+        rng = np.random.default_rng(0)
+        A, B = rng.normal(size=(2, 3, 4))
+        point = np.concatenate([np.log(rng.dirichlet(np.ones(3))), np.log(rng.dirichlet(np.ones(4))), [1.5]])
+        J = qre._jacobian(A, B, point)
+        eps = 1e-6
+        for k in range(len(point)):
+            shift = np.zeros(len(point))
+            shift[k] = eps
+            numeric = (qre._equations(A, B, point + shift) - qre._equations(A, B, point - shift)) / (2 * eps)
+            assert np.allclose(J[:, k], numeric, atol=1e-6)
+
+    def test_cancelled(self):
+        """A zero time budget stops the trace early"""
+        from nash_equilibrium.budget import SolveBudget
+
+        A = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        trace = qre.trace_logit_qre(A, -A, budget=SolveBudget(timeout=0))
+        assert trace["status"] == "partial"
+
+
+class TestLimitingNash:
+    """Tests for the Nash equilibrium selected by the QRE branch."""
+
+    def test_matching_pennies(self):
+        """The branch stays at the unique mixed equilibrium"""
+        A = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        result = solvers.solve(A, -A, method="logit_qre")
+        assert result["error"] is None
+        assert np.allclose(result["p1_strategy"], [0.5, 0.5])
+
+    def test_random_games(self):
+        """The limit of the branch is a Nash equilibrium"""
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            A, B = rng.normal(size=(2, 6, 5))
+            result = solvers.solve(A, B, method="logit_qre")
+            assert result["error"] is None
+            assert result["exploitability"] < 1e-9
+
+    def test_strategic_game(self):
+        """StrategicGame returns the QRE and its limiting equilibrium"""
+        game = create_prisoners_dilemma()
+        result = game.find_quantal_response_equilibrium()
+        assert result["nash"] == ([0.0, 1.0], [0.0, 1.0])
+        assert result["p1_strategy"][1] > 0.99
+        assert game.find_mixed_nash(method="logit_qre")["p1_strategy"] == [0.0, 1.0]
+
+    def test_selects_risk_dominant(self):
+        """In a stag hunt the branch selects the risk dominant equilibrium"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(4, 4), (0, 3)], [(3, 0), (3, 3)]])
+        result = game.find_quantal_response_equilibrium()
+        assert result["nash"] == ([0.0, 1.0], [0.0, 1.0])
+
+    def test_degenerate_game(self):
+        """Equilibria on supports of unequal sizes are read from the branch"""
+        A = np.array([[1, -1], [5, -3], [5, -5], [1, 1], [4, -2]], dtype=float)
+        B = np.array([[4, 2], [4, -3], [3, 5], [-5, -1], [2, -4]], dtype=float)
+        x, y = solvers.solve_on_support(A, B, (1, 2), (0,))
+        assert np.allclose(x, [0, 0.5, 0.5, 0, 0])
+        assert np.allclose(y, [1, 0])
+
+        result = solvers.solve(A, B, method="logit_qre")
+        assert result["error"] is None
+        assert result["status"] == "complete"
+        assert result["exploitability"] < 1e-9
+
+    def test_resume(self):
+        """A resumed trace continues from where the earlier trace stopped"""
+        A = np.array([[3.0, 0.0], [5.0, 1.0]])
+        first = qre.trace_logit_qre(A, A.T, lam=1.0)
+        resumed = qre.trace_logit_qre(A, A.T, lam=2.0, resume=first)
+        direct = qre.trace_logit_qre(A, A.T, lam=2.0)
+        assert resumed["lambda"] == pytest.approx(2.0)
+        assert np.allclose(resumed["p1_strategy"], direct["p1_strategy"])
@@ -0,0 +1,110 @@
+"""
+Tests for security (maxmin) strategies
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import solvers
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.security import maxmin_many, security_strategies, security_strategies_many
+from nash_equilibrium.strategic_game import StrategicGame, create_zero_sum_game
+
+
+class TestSecurityStrategies:
+    """Tests for the maxmin LPs on payoff arrays."""
+
+    def test_matching_pennies(self):
+        """Both players secure 0 by mixing evenly in matching pennies"""
+        A = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        result = security_strategies(A, -A)
+        assert result["error"] is None
+        assert result["p1_strategy"] == pytest.approx([0.5, 0.5])
+        assert result["p2_strategy"] == pytest.approx([0.5, 0.5])
+        assert result["security_values"] == pytest.approx((0.0, 0.0))
+
+    def test_zero_sum_values_match_nash(self):
+        """In zero-sum games the security values are the Nash equilibrium payoffs"""
+        rng = np.random.default_rng(0)
+        A = rng.normal(size=(6, 5))
+        result = security_strategies(A, -A)
+        nash = solvers.solve(A, -A, method="lemke_howson")
+        x, y = np.array(nash["p1_strategy"]), np.array(nash["p2_strategy"])
+        assert result["security_values"][0] == pytest.approx(x @ A @ y)
+        assert result["security_values"][1] == pytest.approx(-(x @ A @ y))
+
+    def test_guarantee(self):
+        """The security strategy guarantees the security value against every opponent strategy"""
+        rng = np.random.default_rng(1)
+        A = rng.normal(size=(4, 7))
+        B = rng.normal(size=(4, 7))
+        result = security_strategies(A, B)
+        v1, v2 = result["security_values"]
+        assert (np.array(result["p1_strategy"]) @ A).min() >= v1 - 1e-9
+        assert (B @ np.array(result["p2_strategy"])).min() >= v2 - 1e-9
+
+    def test_batched_matches_individual(self):
+        """One batched LP gives the values of solving every game on its own"""
+        rng = np.random.default_rng(2)
+        games = [(rng.normal(size=(m, n)), rng.normal(size=(m, n))) for m, n in rng.integers(1, 6, size=(40, 2))]
+        batched = security_strategies_many(games, chunk_size=16)
+        for (A, B), result in zip(games, batched):
+            assert result["security_values"] == pytest.approx(security_strategies(A, B)["security_values"])
+
+    def test_single_strategy(self):
+        """A player with one strategy secures its worst payoff"""
+        [(strategy, value, error)] = maxmin_many([[[3.0, -2.0, 5.0]]])
+        assert error is None
+        assert strategy.tolist() == [1.0]
+        assert value == pytest.approx(-2.0)
+
+
+class TestFindSecurityStrategies:
+    """Tests for StrategicGame and GameManager security strategies."""
+
+    def test_memoized(self):
+        """Repeated calls reuse the result until the payoffs change"""
+        game = create_zero_sum_game()
+        first = game.find_security_strategies()
+        assert game._is_memoized("security")
+        assert game.find_security_strategies() == first
+        game.set_payoff(0, 0, 10, -10)
+        assert not game._is_memoized("security")
+
+    def test_analyze_game(self):
+        """analyze_game reports security strategies when asked"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        result = manager.analyze_game(game_id, find_security=True)
+        assert result["security"] == game.find_security_strategies()
+        assert result["security"]["p1_strategy"] == pytest.approx([0.0, 1.0])
+
+    def test_batch_across_games(self):
+        """The manager solves many games together and memoizes each result"""
+        manager = GameManager()
+        rng = np.random.default_rng(3)
+        ids = []
+        for _ in range(20):
+            grid = [[tuple(rng.integers(-5, 5, 2).tolist()) for _ in range(3)] for _ in range(4)]
+            ids.append(manager.create_game("d", payoff_matrix=grid)[0])
+        results = manager.find_security_strategies(ids)
+        for game_id in ids:
+            game = manager.get_game(game_id)
+            assert game._is_memoized("security")
+            expected = security_strategies(*game.payoff_arrays())["security_values"]
+            assert results[game_id]["security_values"] == pytest.approx(expected)
+
+    def test_n_player_game(self):
+        """Security strategies are only computed for 2-player games"""
+        manager = GameManager()
+        game_id, _ = manager.create_n_player_game("r", strategies=[2, 2, 2])
+        with pytest.raises(ValueError):
+            manager.analyze_game(game_id, find_security=True)
+        with pytest.raises(ValueError):
+            manager.find_security_strategies([game_id])
+
+    def test_security_value_below_nash(self):
+        """No Nash equilibrium pays a player less than its security value"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(3, 3), (0, 5)], [(5, 0), (1, 1)]])
+        v1, v2 = game.find_security_strategies()["security_values"]
+        assert (v1, v2) == pytest.approx((1.0, 1.0))
@@ -0,0 +1,229 @@
+"""
+Tests for snapshots of all the games of a GameManager
+"""
+
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from nash_equilibrium import snapshot
+from nash_equilibrium.dense_game import DenseStrategicGame
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.storage import MemoryStore, SQLiteStore
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+from nash_file import cli
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def filled_manager():
+    """A GameManager holding one game of every savable type, one of them deleted."""
+    manager = GameManager()
+    manager.create_common_game("prisoners_dilemma")
+    manager.create_game("d", payoff_matrix=[[(1.5, -2), (0, 4)], [(2, 2), (3, -1)]])
+    manager.create_sparse_game(np.diag([1.0, 0.0, 2.0]), np.eye(3))
+    empirical_id, empirical = manager.create_empirical_game(2, 3)
+    empirical.add_samples([0, 0, 1], [2, 2, 1], [1.0, 3.0, -1.0], [0.5, 0.5, 2.0])
+    manager.create_n_player_game("d", payoffs=np.arange(24).reshape(3, 2, 2, 2))
+    manager.create_game("r", rows=4, columns=5)
+    manager.delete_game("2")
+    return manager
+
+
+def same_payoffs(restored, game):
+    """Check that two games have the same payoffs."""
+    if isinstance(game, NPlayerGame):
+        return np.array_equal(restored.payoffs, game.payoffs)
+    return all(np.array_equal(a, b) for a, b in zip(restored.payoff_arrays(), game.payoff_arrays()))
+
+
+class TestRoundTrip:
+    """Tests for saving and restoring snapshots."""
+
+    def test_every_game_type(self, tmp_path):
+        """Every game comes back under its ID with the same type and payoffs"""
+        manager = filled_manager()
+        path = tmp_path / "games.npz"
+        assert manager.save_snapshot(path) == 5
+
+        restored = GameManager()
+        assert restored.load_snapshot(path) == 5
+        assert restored.store.ids() == manager.store.ids() == ["1", "3", "4", "5", "6"]
+        for game_id in manager.store.ids():
+            game = manager.get_game(game_id)
+            expected = DenseStrategicGame if type(game) is StrategicGame else type(game)
+            assert type(restored.get_game(game_id)) is expected
+            assert same_payoffs(restored.get_game(game_id), game)
+
+    def test_new_ids_follow_restored_ones(self, tmp_path):
+        """Games created after a restore get IDs after the snapshot's"""
+        path = tmp_path / "games.npz"
+        filled_manager().save_snapshot(path)
+        manager = GameManager()
+        manager.load_snapshot(path)
+        assert manager.create_common_game("prisoners_dilemma")[0] == "7"
+
+    def test_analysis_restored(self, tmp_path):
+        """Cached analysis results and pure equilibria are restored with the games"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        game.find_pure_nash_equi()
+        welfare = game.analyze_welfare()
+        path = tmp_path / "games.npz"
+        manager.save_snapshot(path)
+
+        restored = GameManager()
+        restored.load_snapshot(path)
+        game = restored.get_game(game_id)
+        assert game.nash_equilibria == [(1, 1)]
+        assert game._is_memoized("welfare")
+        assert game.analyze_welfare() == welfare
+
+    def test_without_analysis(self, tmp_path):
+        """Analysis results can be left out"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        game.analyze_welfare()
+        path = tmp_path / "games.npz"
+        manager.save_snapshot(path, analysis=False)
+        restored = GameManager()
+        restored.load_snapshot(path)
+        assert not restored.get_game(game_id)._is_memoized("welfare")
+
+    def test_empty_manager(self, tmp_path):
+        """A snapshot of a manager without games restores no games"""
+        path = tmp_path / "games.npz"
+        assert GameManager().save_snapshot(path) == 0
+        manager = GameManager()
+        assert manager.load_snapshot(path) == 0
+        assert manager.store.ids() == []
+
+    def test_not_a_snapshot(self, tmp_path):
+        """Files that are not snapshots are rejected"""
+        path = tmp_path / "arrays.npz"
+        np.savez(path, a=np.arange(3))
+        with pytest.raises(ValueError):
+            GameManager().load_snapshot(path)
+
+
+class TestLayout:
+    """Tests for the archive layout."""
+
+    def test_games_share_columns(self, tmp_path):
+        """Arrays of games of the same kind are concatenated instead of stored per game"""
+        games = [(str(index), StrategicGame(mode="r", rows=3, columns=3)) for index in range(1, 51)]
+        path = tmp_path / "games.npz"
+        snapshot.write_snapshot(path, games)
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+        assert len([name for name in names if name.endswith("_data.npy")]) == 1
+
+        opened = snapshot.Snapshot(path)
+        assert len(opened) == 50 and "50" in opened
+        assert opened.load("17").grid == games[16][1].grid
+
+    def test_games_are_views_of_the_archive(self, tmp_path):
+        """Loaded arrays are copy-on-write views of the mapped archive"""
+        path = tmp_path / "games.npz"
+        snapshot.write_snapshot(path, [("1", NPlayerGame(mode="d", payoffs=np.arange(24).reshape(3, 2, 2, 2)))])
+        game = snapshot.Snapshot(path).load("1")
+        assert not game.payoffs.flags.owndata
+        game.payoffs[0, 0, 0, 0] = 100
+        assert snapshot.Snapshot(path).load("1").payoffs[0, 0, 0, 0] == 0
+
+    def test_unknown_game(self, tmp_path):
+        """Loading a game that is not in the snapshot raises KeyError"""
+        path = tmp_path / "games.npz"
+        snapshot.write_snapshot(path, [("1", create_prisoners_dilemma())])
+        with pytest.raises(KeyError):
+            snapshot.Snapshot(path).load("2")
+
+
+class TestLazyRestore:
+    """Tests for restoring snapshots into stores."""
+
+    def test_games_decoded_on_first_use(self, tmp_path):
+        """Restoring only reads the index; each game is decoded when it is used"""
+        path = tmp_path / "games.npz"
+        filled_manager().save_snapshot(path)
+        manager = GameManager()
+        manager.load_snapshot(path)
+        assert len(manager.store.games) == 0
+        assert len(manager.games) == 5
+
+        game = manager.get_game("4")
+        assert isinstance(game, EmpiricalGame)
+        assert list(manager.store.games) == ["4"]
+        assert manager.get_game("4") is game
+
+    def test_changes_and_deletes_before_use(self, tmp_path):
+        """Games of the snapshot can be replaced or deleted before they are decoded"""
+        path = tmp_path / "games.npz"
+        filled_manager().save_snapshot(path)
+        manager = GameManager()
+        manager.load_snapshot(path)
+        manager.delete_game("3")
+        manager.save_game("1", create_prisoners_dilemma())
+        assert "3" not in manager.games
+        with pytest.raises(KeyError):
+            manager.delete_game("3")
+        assert isinstance(manager.get_game("1"), StrategicGame)
+
+    def test_bounded_store(self, tmp_path):
+        """Games of the snapshot count against the limits of a bounded store once used"""
+        path = tmp_path / "games.npz"
+        filled_manager().save_snapshot(path)
+        manager = GameManager(store=MemoryStore(max_games=2))
+        manager.load_snapshot(path)
+        for game_id in ["1", "3", "4"]:
+            manager.get_game(game_id)
+        assert list(manager.store.games) == ["3", "4"]
+
+    def test_id_conflicts(self, tmp_path):
+        """Restoring games under IDs that are already used raises ValueError"""
+        path = tmp_path / "games.npz"
+        filled_manager().save_snapshot(path)
+        manager = GameManager()
+        manager.create_common_game("prisoners_dilemma")
+        with pytest.raises(ValueError):
+            manager.load_snapshot(path)
+        with pytest.raises(ValueError):
+            manager.load_snapshot(path, lazy=False)
+        assert manager.store.ids() == ["1"]
+
+    def test_sqlite_store(self, tmp_path):
+        """Stores other than MemoryStore receive every game at once under its ID"""
+        path = tmp_path / "games.npz"
+        source = filled_manager()
+        source.save_snapshot(path)
+        manager = GameManager(store=SQLiteStore(tmp_path / "games.db"))
+        assert manager.load_snapshot(path) == 5
+        assert manager.store.ids() == ["1", "3", "4", "5", "6"]
+        assert same_payoffs(manager.get_game("6"), source.get_game("6"))
+        assert manager.create_common_game("prisoners_dilemma")[0] == "7"
+        with pytest.raises(ValueError):
+            manager.load_snapshot(path)
+
+
+class TestSnapshotCommand:
+    """Tests for the snapshot command of the file CLI."""
+
+    def test_snapshot_game_files(self, tmp_path):
+        """Game files are parsed, analyzed and saved into one snapshot"""
+        path = tmp_path / "games.npz"
+        files = [str(EXAMPLES / "prisoners_dilemma.yml"), str(EXAMPLES / "battle_of_sexes.yml")]
+        result = CliRunner().invoke(cli, ["snapshot", *files, "--output", str(path), "--analyze"])
+        assert result.exit_code == 0
+        assert "Saved 2 games" in result.output
+
+        manager = GameManager()
+        manager.load_snapshot(path)
+        game = manager.get_game("1")
+        assert game._is_memoized("pure_nash")
+        assert game.find_pure_nash_equi() == [(1, 1)]
@@ -0,0 +1,113 @@
+"""
+Tests for the mixed strategy solvers and warm starts
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium import solvers
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.strategic_game import StrategicGame
+
+ROCK_PAPER_SCISSORS = [
+    [(0, 0), (-1, 1), (1, -1)],
+    [(1, -1), (0, 0), (-1, 1)],
+    [(-1, 1), (1, -1), (0, 0)],
+]
+
+
+class TestSolvers:
+    """Tests for the array-based solvers."""
+
+    @pytest.mark.parametrize("method", ["support_enumeration", "lemke_howson"])
+    def test_exact_solvers_find_equilibrium(self, method):
+        """Exact solvers should find the uniform equilibrium of rock-paper-scissors"""
+        game = StrategicGame(mode="d", payoff_matrix=ROCK_PAPER_SCISSORS)
+        result = game.find_mixed_nash(method=method)
+
+        assert result["error"] is None
+        assert np.allclose(result["p1_strategy"], [1 / 3] * 3)
+        assert np.allclose(result["p2_strategy"], [1 / 3] * 3)
+        assert result["exploitability"] < 1e-9
+
+    def test_fictitious_play_approximates_equilibrium(self):
+        """Fictitious play should converge towards the equilibrium"""
+        game = StrategicGame(mode="d", payoff_matrix=ROCK_PAPER_SCISSORS)
+        result = game.find_mixed_nash(method="fictitious_play", iterations=2000, tol=1e-2)
+
+        assert result["exploitability"] < 0.05
+
+    def test_random_games(self):
+        """Both exact solvers should find an equilibrium of random games"""
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            A = rng.normal(size=(4, 5))
+            B = rng.normal(size=(4, 5))
+            for method in ["support_enumeration", "lemke_howson"]:
+                result = solvers.solve(A, B, method=method)
+                assert result["error"] is None
+                assert result["exploitability"] < 1e-6
+
+    def test_invalid_method(self):
+        """Unknown methods raise ValueError"""
+        game = StrategicGame(mode="d", payoff_matrix=ROCK_PAPER_SCISSORS)
+        with pytest.raises(ValueError):
+            game.find_mixed_nash(method="invalid")
+
+
+class TestWarmStart:
+    """Tests for warm started re-solving after payoff edits."""
+
+    def test_results_are_memoized(self):
+        """Solving twice without edits reuses the memoized result"""
+        game = StrategicGame(mode="d", payoff_matrix=[row[:] for row in ROCK_PAPER_SCISSORS])
+        first = game.find_mixed_nash()
+        second = game.find_mixed_nash()
+        assert first == second
+        assert first["warm_started"] is False
+
+    def test_small_edit_uses_warm_start(self):
+        """After a small edit the previous support is checked first"""
+        game = StrategicGame(mode="d", payoff_matrix=[row[:] for row in ROCK_PAPER_SCISSORS])
+        cold = game.find_mixed_nash()
+
+        game.set_payoff(0, 1, -1.1, 1.1)
+        warm = game.find_mixed_nash()
+
+        assert warm["warm_started"] is True
+        assert warm["iterations"] == 1
+        assert warm["iterations"] < cold["iterations"]
+        assert warm["exploitability"] < 1e-9
+
+    def test_warm_start_falls_back_to_search(self):
+        """If the previous support is no longer an equilibrium the search continues"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(3, 3), (0, 0)], [(0, 0), (1, 1)]])
+        game.find_mixed_nash(warm_start=((0.25, 0.75), (0.25, 0.75)))
+        game.set_payoff(1, 1, 1, -1)
+        result = game.find_mixed_nash()
+
+        assert result["error"] is None
+        assert result["exploitability"] < 1e-9
+
+    def test_support_candidates_are_lazy(self):
+        """Supports near a prior come first without enumerating every combination"""
+        candidates = solvers._support_candidates(20, 60, solvers._split_prior(range(20), 60))
+        assert next(candidates) == tuple(range(20))
+        neighbours = [next(candidates) for _ in range(20 * 40)]
+        assert all(len(set(support) - set(range(20))) == 1 for support in neighbours)
+
+    def test_cold_solve(self):
+        """warm_start=False ignores the previous equilibrium"""
+        game = StrategicGame(mode="d", payoff_matrix=[row[:] for row in ROCK_PAPER_SCISSORS])
+        game.find_mixed_nash()
+        game.set_payoff(0, 1, -1.1, 1.1)
+        assert game.find_mixed_nash(warm_start=False)["warm_started"] is False
+
+    def test_game_manager_mixed_method(self):
+        """GameManager can run the solvers on games larger than 2x2"""
+        manager = GameManager()
+        game_id, _ = manager.create_game("d", payoff_matrix=ROCK_PAPER_SCISSORS)
+        analysis = manager.analyze_game(game_id, mixed_method="lemke_howson")
+
+        assert analysis["pure_nash"] == []
+        assert np.allclose(analysis["mixed_nash"]["p1_strategy"], [1 / 3] * 3)
@@ -0,0 +1,114 @@
+"""
+Tests for sparse strategic games
+"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.sparse_game import SparseStrategicGame, _row_max_difference
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def coordinates(mask):
+    """(column, row) coordinates of the True cells of a mask, sorted by column."""
+    return sorted((int(c), int(r)) for r, c in zip(*np.nonzero(mask)))
+
+
+@pytest.fixture
+def negative_column():
+    """Only negative payoffs are stored in player 1's column 0 and player 2's row 1."""
+    p1 = np.array([[-2, 1], [0, 3], [-1, 0]])
+    p2 = np.array([[0, 0], [0, -5], [0, 0]])
+    return SparseStrategicGame(p1, p2)
+
+
+class TestSparseKernels:
+    """Tests for the sparse analysis kernels."""
+
+    def test_implicit_zero_best_responses(self, negative_column):
+        """Rows that are not stored are best responses when the stored payoffs are negative"""
+        assert negative_column.calculate_best_responses(1) == [(0, 1), (1, 1)]
+        assert negative_column.calculate_best_responses(2) == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 2)]
+        assert negative_column.find_pure_nash_equi() == [(0, 1)]
+
+    def test_matches_dense_reference(self):
+        """Best responses and pure equilibria agree with a dense computation"""
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            m, n = rng.integers(1, 7, 2)
+            A = rng.integers(-2, 3, (m, n)) * (rng.random((m, n)) < 0.4)
+            B = rng.integers(-2, 3, (m, n)) * (rng.random((m, n)) < 0.4)
+            game = SparseStrategicGame(A, B)
+            p1_best = A == A.max(axis=0, keepdims=True)
+            p2_best = B == B.max(axis=1, keepdims=True)
+            assert game.calculate_best_responses(1) == coordinates(p1_best)
+            assert game.calculate_best_responses(2) == coordinates(p2_best)
+            assert game.find_pure_nash_equi() == coordinates(p1_best & p2_best)
+
+    def test_row_max_difference(self):
+        """The largest row difference counts implicit zeros"""
+        rng = np.random.default_rng(1)
+        M = rng.normal(size=(6, 8)) * (rng.random((6, 8)) < 0.3)
+        reference = rng.normal(size=8)
+        assert np.allclose(_row_max_difference(sparse.csr_matrix(M), reference), (M - reference).max(axis=1))
+
+    def test_dominance_matches_strategic_game(self):
+        """Dominance checks agree with StrategicGame"""
+        rng = np.random.default_rng(2)
+        for _ in range(50):
+            A = rng.integers(-2, 3, (4, 3)) * (rng.random((4, 3)) < 0.5)
+            B = rng.integers(-2, 3, (4, 3)) * (rng.random((4, 3)) < 0.5)
+            dense = StrategicGame(mode="d", payoff_matrix=[list(zip(a, b)) for a, b in zip(A.tolist(), B.tolist())])
+            game = SparseStrategicGame(A, B)
+            for player in (1, 2):
+                for strict in (True, False):
+                    assert game.get_dominated_strategies(player, strict) == dense.get_dominated_strategies(
+                        player, strict
+                    )
+                    assert game.is_dominant_strategy(0, player, strict) == dense.is_dominant_strategy(0, player, strict)
+
+    def test_expected_payoffs(self, negative_column):
+        """Expected payoffs use sparse matrix products"""
+        assert negative_column.ep_bpm([0, 1, 0], [0.5, 0.5]) == (1.5, -2.5)
+        assert negative_column.calculate_expected_payoffs(2, [0, 1, 0]) == {"B1": 0.0, "B2": -5.0}
+
+
+class TestSparseGame:
+    """Tests for SparseStrategicGame as a StrategicGame."""
+
+    def test_large_game(self):
+        """A large mostly-zero game is analyzed without building the grid"""
+        size = 100000
+        p1 = sparse.identity(size, format="csr")
+        game = SparseStrategicGame(p1, p1)
+        assert len(game.find_pure_nash_equi()) == size
+        assert "grid" not in game._memo
+
+    def test_set_payoff(self, negative_column):
+        """Editing a payoff updates the matrices and drops memoized results"""
+        negative_column.find_pure_nash_equi()
+        negative_column.set_payoff(2, 0, 4, 1)
+        assert negative_column.find_pure_nash_equi() == [(0, 2)]
+        assert negative_column.grid[2][0] == (4, 1)
+
+    def test_grid_pure_nash(self, negative_column):
+        """The highlighted grid marks best responses like StrategicGame"""
+        negative_column.find_pure_nash_equi()
+        assert negative_column.grid_pure_nash[1] == [("H", "H"), ("H", -5)]
+
+    def test_conversion_and_manager(self):
+        """Sparse games convert from dense games and are analyzed by the manager"""
+        dense = StrategicGame(mode="d", payoff_matrix=[[(1, 1), (0, 0)], [(0, 0), (1, 1)]])
+        game = SparseStrategicGame.from_strategic_game(dense)
+        assert game == dense
+        assert game.nnz == 4
+
+        manager = GameManager()
+        game_id, _ = manager.create_sparse_game(sparse.identity(3), sparse.identity(3))
+        assert manager.analyze_game(game_id, mixed_method="support_enumeration")["pure_nash"] == [
+            (0, 0),
+            (1, 1),
+            (2, 2),
+        ]
@@ -0,0 +1,161 @@
+"""
+Tests for the Stackelberg equilibrium solver
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from scipy.optimize import linprog
+
+from nash_equilibrium import stackelberg as stackelberg_module
+from nash_equilibrium.budget import SolveBudget
+from nash_equilibrium.stackelberg import stackelberg, strictly_dominated_columns
+from nash_equilibrium.strategic_game import StrategicGame
+
+
+def brute_force_value(L, F):
+    """Leader value of the strong Stackelberg equilibrium from one full LP per follower action."""
+    m, n = L.shape
+    best = -np.inf
+    for j in range(n):
+        result = linprog(
+            -L[:, j],
+            A_ub=(F - F[:, [j]]).T,
+            b_ub=np.zeros(n),
+            A_eq=np.ones((1, m)),
+            b_eq=[1.0],
+            bounds=(0, None),
+            method="highs",
+        )
+        if result.status == 0:
+            best = max(best, -result.fun)
+    return best
+
+
+@pytest.fixture
+def commitment_game():
+    """Leader 1 gains by committing to mix: the Nash payoff is 2 but commitment earns 11/3."""
+    return StrategicGame(mode="d", payoff_matrix=[[(2, 1), (4, 0)], [(1, 0), (3, 2)]])
+
+
+class TestStackelberg:
+    """Tests for the multiple LPs method on payoff arrays."""
+
+    def test_matches_brute_force(self):
+        """Pruning and constraint generation give the value of solving every full LP"""
+        rng = np.random.default_rng(0)
+        for _ in range(30):
+            m, n = rng.integers(2, 6, size=2)
+            L = rng.integers(-3, 4, size=(m, n)).astype(float)
+            F = rng.integers(-3, 4, size=(m, n)).astype(float)
+            result = stackelberg(L, F)
+            assert result["leader_payoff"] == pytest.approx(brute_force_value(L, F), abs=1e-6)
+
+    def test_follower_best_responds(self):
+        """The follower's action is a best response to the leader's commitment"""
+        rng = np.random.default_rng(1)
+        L = rng.normal(size=(10, 200))
+        F = rng.normal(size=(10, 200))
+        result = stackelberg(L, F)
+        values = result["leader_strategy"] @ F
+        assert values[result["follower_action"]] >= values.max() - 1e-7
+        assert result["lps_solved"] + result["dominated"] + result["bound_pruned"] == 200
+        assert result["bound_pruned"] > 0
+
+    def test_dominated_columns(self):
+        """Strictly dominated follower actions get no LP"""
+        F = np.array([[1.0, 0.0, 2.0], [0.0, 1.0, 0.0]])
+        assert strictly_dominated_columns(F).tolist() == [False, False, False]
+        F[:, 2] = [-1.0, -1.0]
+        assert strictly_dominated_columns(F).tolist() == [False, False, True]
+        result = stackelberg(np.ones((2, 3)), F)
+        assert result["dominated"] == 1
+
+    def test_parallel_matches_serial(self):
+        """Solving the LPs on worker processes gives the same equilibrium"""
+        rng = np.random.default_rng(2)
+        L = rng.normal(size=(4, 12))
+        F = rng.normal(size=(4, 12))
+        serial = stackelberg(L, F)
+        parallel = stackelberg(L, F, workers=2)
+        assert parallel["leader_payoff"] == pytest.approx(serial["leader_payoff"])
+        assert parallel["follower_action"] == serial["follower_action"]
+
+    def test_pool_reused(self):
+        """Parallel solves share one pool, and accept an executor of the caller"""
+        rng = np.random.default_rng(4)
+        L = rng.normal(size=(4, 12))
+        F = rng.normal(size=(4, 12))
+        first = stackelberg(L, F, workers=2)
+        pool = stackelberg_module._pools[2]
+        assert stackelberg(L, F, workers=2)["leader_payoff"] == pytest.approx(first["leader_payoff"])
+        assert stackelberg_module._pools[2] is pool
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            shared = stackelberg(L, F, workers=2, executor=executor)
+        assert shared["leader_payoff"] == pytest.approx(first["leader_payoff"])
+
+    def test_lps_bounded_by_deadline(self, monkeypatch):
+        """Every LP gets the remaining time of the budget as its time limit"""
+        limits = []
+        solve = stackelberg_module.linprog
+
+        def recording_linprog(*args, **kwargs):
+            limits.append(kwargs["options"].get("time_limit"))
+            return solve(*args, **kwargs)
+
+        monkeypatch.setattr(stackelberg_module, "linprog", recording_linprog)
+        rng = np.random.default_rng(5)
+        stackelberg(rng.normal(size=(3, 8)), rng.normal(size=(3, 8)), budget=SolveBudget(timeout=60))
+        assert limits and all(0 < limit <= 60 for limit in limits)
+
+
+class TestFindStackelbergEquilibrium:
+    """Tests for StrategicGame.find_stackelberg_equilibrium."""
+
+    def test_commitment_value(self, commitment_game):
+        """Player 1 commits to mixing just enough to make player 2 play B2"""
+        result = commitment_game.find_stackelberg_equilibrium()
+        assert result["error"] is None
+        assert result["p1_strategy"] == pytest.approx([2 / 3, 1 / 3])
+        assert result["p2_strategy"] == [0.0, 1.0]
+        assert result["expected_payoffs"] == pytest.approx((11 / 3, 2 / 3))
+
+    def test_leader_two(self):
+        """With player 2 leading the roles of the payoff arrays swap"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(1, 2), (0, 4)], [(0, 1), (2, 3)]])
+        result = game.find_stackelberg_equilibrium(leader=2)
+        transposed = StrategicGame(mode="d", payoff_matrix=[[(2, 1), (1, 0)], [(4, 0), (3, 2)]])
+        expected = transposed.find_stackelberg_equilibrium(leader=1)
+        assert result["p2_strategy"] == pytest.approx(expected["p1_strategy"])
+        assert result["expected_payoffs"] == pytest.approx(expected["expected_payoffs"][::-1])
+
+    def test_leader_gains_from_commitment(self):
+        """The leader earns at least its payoff in any Nash equilibrium"""
+        rng = np.random.default_rng(3)
+        for _ in range(10):
+            grid = [[tuple(rng.integers(0, 6, 2).tolist()) for _ in range(3)] for _ in range(3)]
+            game = StrategicGame(mode="d", payoff_matrix=grid)
+            value = game.find_stackelberg_equilibrium()["expected_payoffs"][0]
+            A, _ = game.payoff_arrays()
+            # Pure equilibria are (column, row) coordinates
+            for j, i in game.find_pure_nash_equi():
+                assert value >= A[i, j] - 1e-9
+
+    def test_memoized(self, commitment_game):
+        """Repeated calls reuse the result until the payoffs change"""
+        first = commitment_game.find_stackelberg_equilibrium()
+        assert commitment_game.find_stackelberg_equilibrium() == first
+        commitment_game.set_payoff(0, 0, 5, 1)
+        assert commitment_game.find_stackelberg_equilibrium()["expected_payoffs"] != first["expected_payoffs"]
+
+    def test_partial(self, commitment_game):
+        """A zero time budget returns a partial result that is not memoized"""
+        result = commitment_game.find_stackelberg_equilibrium(timeout=0)
+        assert result["status"] == "partial"
+        assert commitment_game.find_stackelberg_equilibrium()["status"] == "complete"
+
+    def test_invalid_leader(self, commitment_game):
+        """Only players 1 and 2 can lead"""
+        with pytest.raises(ValueError):
+            commitment_game.find_stackelberg_equilibrium(leader=3)
@@ -0,0 +1,328 @@
+"""
+Tests for the game storage backends
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.dense_game import DenseStrategicGame
+from nash_equilibrium.empirical_game import EmpiricalGame
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.n_player_game import NPlayerGame
+from nash_equilibrium.sparse_game import SparseStrategicGame
+from nash_equilibrium.storage import MemoryStore, SQLiteStore, decode_game, encode_game, open_store, payoff_bytes
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a fresh SQLite database file."""
+    return tmp_path / "games.db"
+
+
+def sample_games():
+    """One game of every storable type."""
+    empirical = EmpiricalGame(2, 3)
+    empirical.add_samples([0, 0, 1], [2, 2, 1], [1.0, 3.0, -1.0], [0.5, 0.5, 2.0])
+    return [
+        create_prisoners_dilemma(),
+        StrategicGame(mode="d", payoff_matrix=[[(1.5, -2), (0, 4)]]),
+        SparseStrategicGame(np.diag([1.0, 0.0, 2.0]), np.eye(3)),
+        empirical,
+        NPlayerGame(mode="d", payoffs=np.arange(24).reshape(3, 2, 2, 2)),
+    ]
+
+
+class TestEncoding:
+    """Tests for the binary serialization of games."""
+
+    def test_round_trip(self):
+        """Every game type is rebuilt with the same payoffs"""
+        for game in sample_games():
+            restored = decode_game(*encode_game(game))
+            assert type(restored) is (DenseStrategicGame if type(game) is StrategicGame else type(game))
+            if isinstance(game, NPlayerGame):
+                assert np.array_equal(restored.payoffs, game.payoffs)
+            else:
+                assert all(np.array_equal(a, b) for a, b in zip(restored.payoff_arrays(), game.payoff_arrays()))
+                assert restored.find_pure_nash_equi() == game.find_pure_nash_equi()
+
+    def test_integer_payoffs_stay_integers(self):
+        """Integer grids come back as ints, so formatting and JSON output do not change"""
+        restored = decode_game(*encode_game(create_prisoners_dilemma()))
+        assert restored.grid == [[(3, 3), (0, 5)], [(5, 0), (1, 1)]]
+        assert isinstance(restored.grid[0][0][0], int)
+
+    def test_empirical_statistics(self):
+        """Empirical games keep their counts and variances"""
+        game = sample_games()[3]
+        restored = decode_game(*encode_game(game))
+        assert np.array_equal(restored.counts, game.counts)
+        assert np.allclose(restored.variances(), game.variances(), equal_nan=True)
+
+
+class TestSQLiteStore:
+    """Tests for games shared through a SQLite file."""
+
+    def test_wal_mode(self, database):
+        """The database runs in write-ahead logging mode"""
+        store = SQLiteStore(database)
+        assert store._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_shared_between_stores(self, database):
+        """A game added through one store is visible to another store on the same file"""
+        first, second = SQLiteStore(database), SQLiteStore(database)
+        game_id = first.add(create_prisoners_dilemma())
+        assert game_id in second
+        assert second.get(game_id).grid == create_prisoners_dilemma().grid
+        assert second.ids() == [game_id]
+
+    def test_cached_until_changed(self, database):
+        """Lookups reuse the decoded game until another store saves a change"""
+        first, second = SQLiteStore(database), SQLiteStore(database)
+        game_id = first.add(create_prisoners_dilemma())
+        game = second.get(game_id)
+        assert second.get(game_id) is game
+
+        changed = first.get(game_id)
+        changed.set_payoff(0, 0, 9, 9)
+        first.put(game_id, changed)
+        reloaded = second.get(game_id)
+        assert reloaded is not game
+        assert reloaded.grid[0][0] == (9, 9)
+
+    def test_missing_games(self, database):
+        """Unknown and malformed IDs raise KeyError"""
+        store = SQLiteStore(database)
+        for game_id in ("1", "abc", None):
+            with pytest.raises(KeyError):
+                store.get(game_id)
+        with pytest.raises(KeyError):
+            store.put("1", create_prisoners_dilemma())
+        game_id = store.add(create_prisoners_dilemma())
+        store.delete(game_id)
+        assert game_id not in store
+
+    def test_concurrent_adds(self, database):
+        """Threads adding games at once get distinct IDs"""
+        store = SQLiteStore(database)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ids = list(executor.map(lambda _: store.add(create_prisoners_dilemma()), range(100)))
+        assert len(set(ids)) == 100
+        assert len(store) == 100
+
+    def test_add_payoffs_after_reload(self, database):
+        """Games of mode 'r' and 'm' reloaded from the store still take new payoffs"""
+        first, second = GameManager(store=SQLiteStore(database)), GameManager(store=SQLiteStore(database))
+        manual_id, _ = first.create_game("m", rows=1, columns=2)
+        random_id, _ = first.create_game("r", rows=2, columns=2, lower_limit=7, upper_limit=7)
+
+        manual = second.get_game(manual_id)
+        manual.find_pure_nash_equi()
+        manual.add_payoffs(input_function=lambda prompt: "3, 4")
+        assert manual.grid == [[(3, 4), (3, 4)]]
+        assert manual.payoff_arrays()[0].tolist() == [[3.0, 3.0]]
+        second.save_game(manual_id)
+        assert first.get_game(manual_id).grid == [[(3, 4), (3, 4)]]
+
+        reloaded = second.get_game(random_id)
+        reloaded.add_payoffs()
+        assert reloaded.grid == [[(7, 7), (7, 7)], [(7, 7), (7, 7)]]
+
+    def test_older_database(self, database):
+        """Databases without the content columns gain them when opened"""
+        import sqlite3
+
+        connection = sqlite3.connect(database)
+        connection.execute(
+            "CREATE TABLE games (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, payoffs BLOB NOT NULL, version INTEGER NOT NULL DEFAULT 1)"
+        )
+        connection.commit()
+        connection.close()
+        store = SQLiteStore(database)
+        game_id = store.add(create_prisoners_dilemma())
+        assert store.references(game_id) == 1
+        assert store.add_by_content(create_prisoners_dilemma())[0] != game_id
+
+
+class TestGameManagerStore:
+    """Tests for GameManager on top of a store."""
+
+    def test_default_memory_store(self):
+        """Managers keep games in memory unless given a store"""
+        manager = GameManager()
+        assert isinstance(manager.store, MemoryStore)
+        assert isinstance(open_store(None), MemoryStore)
+
+    def test_workers_share_games(self, database):
+        """Managers in different workers see each other's games and saved changes"""
+        worker1 = GameManager(store=open_store(str(database)))
+        worker2 = GameManager(store=open_store(str(database)))
+        game_id, game = worker1.create_empirical_game(2, 2)
+        game.add_samples([0], [0], [5.0], [1.0])
+        worker1.save_game(game_id)
+
+        assert worker2.get_game(game_id).means[0, 0].tolist() == [5.0, 1.0]
+        assert worker2.analyze_game(game_id)["pure_nash"] == worker1.analyze_game(game_id)["pure_nash"]
+        assert game_id in worker2.games
+
+        worker2.delete_game(game_id)
+        with pytest.raises(KeyError):
+            worker1.get_game(game_id)
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBoundedMemoryStore:
+    """Tests for the memory limits of MemoryStore."""
+
+    def test_evicts_least_recently_used(self):
+        """Beyond max_games the least recently used game is dropped"""
+        store = MemoryStore(max_games=2)
+        first = store.add(create_prisoners_dilemma())
+        second = store.add(create_prisoners_dilemma())
+        store.get(first)
+        store.add(create_prisoners_dilemma())
+        assert first in store
+        assert second not in store
+        assert store.evictions == 1
+
+    def test_byte_limit(self):
+        """The total estimated size of the payoffs stays under max_bytes"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(1.0, 2.0)] * 10] * 10)
+        size = payoff_bytes(game)
+        store = MemoryStore(max_bytes=2 * size)
+        for _ in range(10):
+            store.add(StrategicGame(mode="d", payoff_matrix=[[(1.0, 2.0)] * 10] * 10))
+        assert len(store) == 2
+        assert store.total_bytes == 2 * size
+
+    def test_payoff_bytes(self):
+        """Sizes follow the representation held in memory"""
+        grid = [[(float(row), float(column)) for column in range(50)] for row in range(40)]
+        game = StrategicGame(mode="d", payoff_matrix=grid)
+        # Tuples of floats in lists take several times the 8 bytes per payoff of an array
+        assert payoff_bytes(game) > 4 * 40 * 50 * 2 * 8
+        sparse_game = SparseStrategicGame(np.eye(40), np.eye(40))
+        assert payoff_bytes(sparse_game) < 40 * 40 * 8
+        assert payoff_bytes(game.edited({(0, 0): (1.0, 1.0)})) < payoff_bytes(game) / 100
+
+    def test_derived_game_bytes(self):
+        """Derived games count what they build and the base game they keep alive"""
+        game = StrategicGame(mode="d", payoff_matrix=[[(float(row), 1.0) for _ in range(50)] for row in range(40)])
+        negated = game.negated()
+        assert payoff_bytes(negated) < 1000
+        negated.find_pure_nash_equi()
+        negated.grid
+        assert payoff_bytes(negated) > 40 * 50 * 2 * 8
+        assert payoff_bytes(negated, stored=lambda other: False) > payoff_bytes(negated) + payoff_bytes(game) / 2
+
+    def test_sizes_follow_games(self):
+        """Games are sized again when looked up, and derived games when their base game leaves the store"""
+        store = MemoryStore(max_bytes=10**9)
+        dense = DenseStrategicGame(np.zeros((30, 30, 2)))
+        dense_id = store.add(dense)
+        before = store.total_bytes
+        dense.grid
+        store.get(dense_id)
+        assert store.total_bytes > before + 30 * 30 * 8
+
+        game = StrategicGame(mode="d", payoff_matrix=[[(1.0, 2.0)] * 30] * 30)
+        base_id = store.add(game)
+        derived_id = store.add(game.transposed())
+        derived_size = store._sizes[derived_id]
+        store.delete(base_id)
+        store.get(derived_id)
+        assert store._sizes[derived_id] >= derived_size + payoff_bytes(game)
+        assert store.total_bytes == sum(store._sizes.values())
+
+    def test_ttl(self):
+        """Games unused for longer than the TTL are evicted"""
+        clock = FakeClock()
+        store = MemoryStore(ttl=60, clock=clock)
+        old = store.add(create_prisoners_dilemma())
+        clock.now = 50
+        recent = store.add(create_prisoners_dilemma())
+        clock.now = 100
+        assert store.evict_expired() == 1
+        assert store.ids() == [recent]
+        with pytest.raises(KeyError):
+            store.get(old)
+
+    def test_expired_on_lookup(self):
+        """A lookup does not return a game that has expired"""
+        clock = FakeClock()
+        store = MemoryStore(ttl=10, clock=clock)
+        game_id = store.add(create_prisoners_dilemma())
+        clock.now = 11
+        assert game_id not in store
+
+    def test_spill_and_reload(self, tmp_path):
+        """Evicted games are spilled to disk and reloaded transparently by get_game"""
+        manager = GameManager(store=MemoryStore(max_games=2, spill_directory=tmp_path))
+        ids = [manager.create_game("d", payoff_matrix=[[(k, -k), (0, 1)]])[0] for k in range(5)]
+        assert len(manager.store.games) == 2
+        assert sorted(manager.store.spill.ids(), key=int) == ids[:3]
+        assert manager.games.ids() == ids
+
+        game = manager.get_game(ids[0])
+        assert game.grid == [[(0, 0), (0, 1)]]
+        assert ids[0] not in manager.store.spill
+        assert manager.analyze_game(ids[1])["pure_nash"] == [(1, 0)]
+
+        manager.delete_game(ids[2])
+        assert ids[2] not in manager.games
+
+    def test_spill_survives_restart(self, tmp_path):
+        """A new store on the same spill directory finds the spilled games and continues their IDs"""
+        store = MemoryStore(max_games=1, spill_directory=tmp_path)
+        spilled = store.add(create_prisoners_dilemma())
+        store.add(create_prisoners_dilemma())
+        restarted = MemoryStore(spill_directory=tmp_path)
+        assert restarted.get(spilled).grid == create_prisoners_dilemma().grid
+        assert restarted.add(create_prisoners_dilemma()) == "2"
+
+    def test_concurrent_use(self, tmp_path):
+        """Threads creating and reading games keep the limits and lose no game"""
+        store = MemoryStore(max_games=5, spill_directory=tmp_path)
+
+        def work(k):
+            game_id = store.add(StrategicGame(mode="d", payoff_matrix=[[(k, k)]]))
+            return game_id, store.get(game_id).grid[0][0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(60)))
+        assert len(store.games) <= 5
+        assert all(store.get(game_id).grid[0][0] == cell for game_id, cell in results)
+
+    def test_concurrent_reads_and_evictions(self):
+        """Lookups reordering games do not race with evictions"""
+        size = payoff_bytes(create_prisoners_dilemma())
+        store = MemoryStore(max_bytes=4 * size)
+        game_ids = [store.add(create_prisoners_dilemma()) for _ in range(4)]
+
+        def work(k):
+            if k % 3 == 0:
+                store.add(create_prisoners_dilemma())
+            else:
+                try:
+                    store.get(game_ids[k % 4])
+                except KeyError:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(600)))
+        assert len(store.games) <= 4
+        assert set(store._sizes) == set(store.games) == set(store._last_used)
+        assert store.total_bytes == sum(store._sizes.values())
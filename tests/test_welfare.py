@@ -0,0 +1,105 @@
+"""
+Tests for Pareto optimality and welfare analysis
+"""
+
+import numpy as np
+import pytest
+
+from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.strategic_game import StrategicGame, create_prisoners_dilemma
+from nash_equilibrium.welfare import pareto_optimal_mask, pure_nash_mask, welfare_analysis
+
+
+def pairwise_pareto(A, B):
+    """Pareto optimal cells found by comparing every pair of cells."""
+    a, b = A.ravel(), B.ravel()
+    optimal = [
+        not any(a[k] >= a[i] and b[k] >= b[i] and (a[k] > a[i] or b[k] > b[i]) for k in range(len(a)))
+        for i in range(len(a))
+    ]
+    return np.array(optimal).reshape(A.shape)
+
+
+class TestParetoOptimal:
+    """Tests for the sort-based skyline."""
+
+    def test_matches_pairwise(self):
+        """The skyline finds the same cells as pairwise comparison, ties included"""
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            A = rng.integers(0, 4, size=(4, 5)).astype(float)
+            B = rng.integers(0, 4, size=(4, 5)).astype(float)
+            assert (pareto_optimal_mask(A, B) == pairwise_pareto(A, B)).all()
+
+    def test_duplicates(self):
+        """Identical outcomes do not dominate each other"""
+        A = np.array([[2.0, 2.0], [1.0, 0.0]])
+        B = np.array([[1.0, 1.0], [3.0, 0.0]])
+        assert pareto_optimal_mask(A, B).tolist() == [[True, True], [True, False]]
+
+    def test_large_game(self):
+        """A 1000x1000 game is analyzed without pairwise comparisons"""
+        rng = np.random.default_rng(1)
+        A = rng.normal(size=(1000, 1000))
+        B = rng.normal(size=(1000, 1000))
+        mask = pareto_optimal_mask(A, B)
+        a, b = A[mask], B[mask]
+        order = np.argsort(-a)
+        # Along the front, payoffs for player 2 increase as those for player 1 decrease
+        assert (np.diff(b[order]) > 0).all()
+        assert mask[np.unravel_index(np.argmax(A), A.shape)]
+
+
+class TestWelfareAnalysis:
+    """Tests for welfare maxima and the prices of anarchy and stability."""
+
+    def test_prisoners_dilemma(self):
+        """Mutual defection is the only equilibrium and the only outcome that is not Pareto optimal"""
+        result = create_prisoners_dilemma().analyze_welfare()
+        assert sorted(result["pareto_optimal"]) == [(0, 0), (0, 1), (1, 0)]
+        assert result["utilitarian"] == {"welfare": 6.0, "cells": [(0, 0)]}
+        assert result["nash_welfare"] == (2.0, 2.0)
+        assert result["price_of_anarchy"] == pytest.approx(3.0)
+
+    def test_undefined_prices(self):
+        """The prices are undefined when an equilibrium has no positive welfare"""
+        A = np.array([[1.0, -3.0], [2.0, -1.0]])
+        result = welfare_analysis(A, A.T)
+        assert result["nash_welfare"] == (-2.0, -2.0)
+        assert result["price_of_anarchy"] is None
+        assert result["price_of_stability"] is None
+
+    def test_prices(self):
+        """The prices compare the best outcome with the worst and best equilibria"""
+        # Coordination with a payoff-dominant equilibrium, plus a better non-equilibrium outcome for both
+        A = np.array([[4.0, 0.0, 9.0], [0.0, 2.0, 0.0], [0.0, 0.0, 1.0]])
+        B = np.array([[4.0, 0.0, 0.0], [0.0, 2.0, 0.0], [5.0, 0.0, 1.0]])
+        result = welfare_analysis(A, B)
+        assert result["nash_welfare"] == (4.0, 8.0)
+        assert result["utilitarian"]["welfare"] == 9.0
+        assert result["price_of_anarchy"] == pytest.approx(9.0 / 4.0)
+        assert result["price_of_stability"] == pytest.approx(9.0 / 8.0)
+        assert result["egalitarian"] == {"welfare": 4.0, "cells": [(0, 0)]}
+
+    def test_pure_nash_matches_game(self):
+        """Pure equilibria found from the arrays match find_pure_nash_equi, ties included"""
+        rng = np.random.default_rng(2)
+        for _ in range(50):
+            grid = [[tuple(rng.integers(0, 3, 2).tolist()) for _ in range(5)] for _ in range(4)]
+            game = StrategicGame(mode="d", payoff_matrix=grid)
+            rows, columns = np.nonzero(pure_nash_mask(*game.payoff_arrays()))
+            assert sorted(zip(columns.tolist(), rows.tolist())) == sorted(game.find_pure_nash_equi())
+
+    def test_memoized(self):
+        """The analysis is memoized until the payoffs change"""
+        game = create_prisoners_dilemma()
+        game.analyze_welfare()
+        assert game._is_memoized("welfare")
+        game.set_payoff(0, 0, 6, 6)
+        assert game.analyze_welfare()["nash_welfare"] == (2.0, 12.0)
+
+    def test_analyze_game(self):
+        """analyze_game reports the welfare analysis when asked"""
+        manager = GameManager()
+        game_id, game = manager.create_common_game("prisoners_dilemma")
+        assert manager.analyze_game(game_id, find_welfare=True)["welfare"] == game.analyze_welfare()
@@ -5,14 +5,106 @@ This is a simple Flask-based web API that demonstrates how
 the refactored Nash Equilibrium Finder can be used in a web context.
 """
 
-from flask import Flask, jsonify, request
+import itertools
+import json
+import os
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
+from nash_equilibrium import json_stream
+from nash_equilibrium.config import get_config
 from nash_equilibrium.game_manager import GameManager
+from nash_equilibrium.jobs import JobQueue, JobQueueFull
+from nash_equilibrium.storage import SQLiteStore, open_store
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
-game_manager = GameManager()
+config = get_config()
+# Set NASH_GAME_STORE to a SQLite file so that every server process sees every game,
+# NASH_MAX_GAMES, NASH_MAX_GAME_BYTES, NASH_GAME_TTL or NASH_SPILL_DIR to bound memory,
+# and NASH_DEDUPLICATE_GAMES to share one stored game between requests creating the same game.
+# Analysis jobs run on NASH_JOB_WORKERS threads of the process that received them. With a SQLite
+# game store their states are kept in it too, so any server process can poll and cancel any job.
+game_store = open_store(
+    config["game_store"],
+    max_games=config["max_games"],
+    max_bytes=config["max_game_bytes"],
+    ttl=config["game_ttl"],
+    spill_directory=config["spill_directory"],
+)
+game_manager = GameManager(
+    store=game_store,
+    deduplicate=config["deduplicate_games"],
+    jobs=JobQueue(
+        workers=config["job_workers"],
+        max_queued=config["job_queue_size"],
+        retention=config["job_retention"],
+        store=game_store if isinstance(game_store, SQLiteStore) else None,
+    ),
+)
+# Set NASH_SNAPSHOT to a file written by GameManager.save_snapshot to start with its games;
+# the games are decoded as they are requested, so the restart is fast even with many games
+if config["snapshot"] and os.path.exists(config["snapshot"]) and not len(game_manager.store):
+    game_manager.load_snapshot(config["snapshot"])
+
+
+def _field_list(name):
+    """Parse a comma separated list of field names from a query parameter."""
+    value = request.args.get(name)
+    return [field for field in value.split(",") if field] if value else None
+
+
+def _solve_timeout(value):
+    """Parse a requested time limit, capped by NASH_SOLVE_TIMEOUT if it is set.
+
+    Arguments:
+        value: The requested limit in seconds, or None for the configured limit
+
+    Raises:
+        ValueError: If the value is not a non-negative number
+    """
+    limit = config["solve_timeout"]
+    if value is None:
+        return limit
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"timeout must be a number of seconds, not {value!r}")
+    if not timeout >= 0:
+        raise ValueError("timeout must be a non-negative number of seconds")
+    return timeout if limit is None else min(timeout, limit)
+
+
+def _flag(name, value):
+    """Parse a boolean option given as a JSON boolean or as "true"/"false" like the query parameters.
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise ValueError(f"{name} must be true or false, not {value!r}")
+
+
+def _game_response(game, game_id=None, default_fields=None):
+    """Stream a game's JSON, with fields selected by the 'fields' and 'exclude' query parameters.
+
+    Arguments:
+        game: The game
+        game_id: ID wrapping the game as {"game_id": ..., "game": ...}, if given
+        default_fields: Fields returned without a 'fields' parameter (defaults to all)
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    fields = _field_list("fields") or default_fields
+    chunks = json_stream.iter_game_json(game, fields=fields, exclude=_field_list("exclude") or ())
+    if game_id is not None:
+        chunks = itertools.chain([f'{{"game_id": {json.dumps(game_id)}, "game": '], chunks, ["}"])
+    return Response(chunks, mimetype="application/json")
 
 
 @app.route("/api/games", methods=["POST"])
@@ -25,6 +117,12 @@ def create_game():
     - rows: Number of rows (if mode is 'r')
     - columns: Number of columns (if mode is 'r')
     - payoff_matrix: Payoff matrix (if mode is 'd')
+    - strategies: Number of strategies per player, for N-player games (if mode is 'r')
+    - payoffs: Payoff tensor of shape (N, s1, ..., sN), for N-player games (if mode is 'd')
+
+    Query parameters:
+    - fields: Comma separated game fields to return (default: rows, columns and mode,
+      or players, strategies and mode for N-player games)
 
     Returns:
     - game_id: ID of the created game - game: Game data in JSON format
@@ -32,7 +130,12 @@ def create_game():
     data = request.json
 
     try:
-        if data["mode"] == "d":
+        if "payoffs" in data or "strategies" in data:
+            # N-player game from a payoff tensor or strategy counts
+            game_id, game = game_manager.create_n_player_game(
+                mode=data["mode"], strategies=data.get("strategies"), payoffs=data.get("payoffs")
+            )
+        elif data["mode"] == "d":
             # Direct payoff matrix mode
             game_id, game = game_manager.create_game(mode="d", payoff_matrix=data["payoff_matrix"])
         elif data["mode"] == "r":
@@ -41,8 +144,8 @@ def create_game():
         else:
             return jsonify({"error": "Invalid mode"}), 400
 
-        # Return the game data
-        return jsonify({"game_id": game_id, "game": game.to_dict()})
+        # Return the game summary, whose fields are cheap for games of any size
+        return _game_response(game, game_id, default_fields=game.SUMMARY_FIELDS)
 
     except (ValueError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
@@ -57,6 +160,10 @@ def create_common_game():
     - game_type: Type of game ('prisoners_dilemma', 'coordination', etc.)
     - Additional parameters specific to the game type
 
+    Query parameters:
+    - fields: Comma separated game fields to return (default: rows, columns and mode,
+      or players, strategies and mode for N-player games)
+
     Returns:
     - game_id: ID of the created game - game: Game data in JSON format
     """
@@ -67,8 +174,8 @@ def create_common_game():
             game_type=data["game_type"], **{k: v for k, v in data.items() if k != "game_type"}
         )
 
-        # Return the game data
-        return jsonify({"game_id": game_id, "game": game.to_dict()})
+        # Return the game summary, whose fields are cheap for games of any size
+        return _game_response(game, game_id, default_fields=game.SUMMARY_FIELDS)
 
     except (ValueError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
@@ -82,16 +189,23 @@ def get_game(game_id):
     URL parameters:
     - game_id: ID of the game
 
+    Query parameters:
+    - fields: Comma separated game fields to return (default: all)
+    - exclude: Comma separated game fields to leave out, e.g. p1_payoffs,p2_payoffs
+
     Returns:
-    - game: Game data in JSON format
+    - game: Game data in JSON format, streamed in chunks
     """
     try:
         game = game_manager.get_game(game_id)
-        return jsonify(game.to_dict())
+        return _game_response(game)
 
     except KeyError:
         return jsonify({"error": f"Game with ID {game_id} not found"}), 404
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 
 @app.route("/api/games/<game_id>/analyze", methods=["GET"])
 def analyze_game(game_id):
@@ -104,21 +218,110 @@ def analyze_game(game_id):
     Query parameters:
     - find_nash: Whether to find pure Nash equilibria (default: true)
     - find_mixed: Whether to calculate mixed strategy Nash equilibrium (default: true)
+    - method: Mixed strategy solver for games of any size (optional)
+    - timeout: Time limit in seconds, at most NASH_SOLVE_TIMEOUT if it is set (default: NASH_SOLVE_TIMEOUT)
 
     Returns:
-    - analysis: Analysis results
+    - analysis: Analysis results, with status 'partial' if the time limit was reached
     """
     try:
         find_nash = request.args.get("find_nash", "true").lower() == "true"
         find_mixed = request.args.get("find_mixed", "true").lower() == "true"
+        method = request.args.get("method")
+        timeout = _solve_timeout(request.args.get("timeout"))
 
-        analysis = game_manager.analyze_game(game_id, find_nash=find_nash, find_mixed=find_mixed)
+        analysis = game_manager.analyze_game(
+            game_id, find_nash=find_nash, find_mixed=find_mixed, mixed_method=method, timeout=timeout
+        )
 
         return jsonify(analysis)
 
     except KeyError:
         return jsonify({"error": f"Game with ID {game_id} not found"}), 404
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/api/games/<game_id>/analysis-jobs", methods=["POST"])
+def submit_analysis_job(game_id):
+    """
+    Start analyzing a game in the background.
+
+    URL parameters:
+    - game_id: ID of the game
+
+    POST body parameters (all optional):
+    - find_nash, find_mixed, find_correlated, find_security, find_welfare: As for analyze_game,
+      as JSON booleans or the strings "true" and "false"
+    - method: Mixed strategy solver for games of any size
+    - timeout: Time limit in seconds, at most NASH_SOLVE_TIMEOUT if it is set (default: NASH_SOLVE_TIMEOUT)
+
+    Returns:
+    - job_id: ID to poll with GET /api/jobs/<job_id>, with status 202
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        options = {
+            name: _flag(name, data[name])
+            for name in ("find_nash", "find_mixed", "find_correlated", "find_security", "find_welfare")
+            if name in data
+        }
+        job_id = game_manager.submit_analysis(
+            game_id,
+            mixed_method=data.get("method"),
+            timeout=_solve_timeout(data.get("timeout")),
+            **options,
+        )
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    except KeyError:
+        return jsonify({"error": f"Game with ID {game_id} not found"}), 404
+
+    except JobQueueFull as e:
+        return jsonify({"error": f"Too many analyses waiting: {e}"}), 503
+
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Get the status of an analysis job.
+
+    Query parameters:
+    - wait: Seconds to wait for the job to finish before answering (default: 0)
+
+    Returns:
+    - status: 'queued', 'running', 'done', 'failed' or 'cancelled'
+    - result: Analysis results of a finished job (partial if it was cancelled)
+    - error: Error of a failed job
+    """
+    try:
+        wait = request.args.get("wait", type=float)
+        # Bounded, so a long poll never holds a server thread for long
+        return jsonify(game_manager.get_job(job_id, wait=min(wait, 30.0) if wait is not None else None))
+
+    except KeyError:
+        return jsonify({"error": f"Job with ID {job_id} not found"}), 404
+
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    """
+    Cancel an analysis job. A running analysis stops early with a partial result.
+
+    Returns:
+    - cancelled: Whether the job was still waiting or running
+    """
+    try:
+        return jsonify({"job_id": job_id, "cancelled": game_manager.cancel_job(job_id)})
+
+    except KeyError:
+        return jsonify({"error": f"Job with ID {job_id} not found"}), 404
+
 
 @app.route("/api/games/<game_id>/expected-payoffs", methods=["POST"])
 def calculate_expected_payoffs(game_id):
@@ -131,18 +334,22 @@ def calculate_expected_payoffs(game_id):
     POST body parameters:
     - p1_strategy: Player 1's mixed strategy (list of probabilities)
     - p2_strategy: Player 2's mixed strategy (list of probabilities)
+    - strategies: List with every player's mixed strategy (instead of p1/p2_strategy, for N-player games)
 
     Returns:
-    - expected_payoffs: [p1_payoff, p2_payoff]
+    - expected_payoffs: [p1_payoff, p2_payoff, ...]
     """
     data = request.json
 
     try:
-        eps = game_manager.calculate_expected_payoffs(
-            game_id, p1_strategy=data["p1_strategy"], p2_strategy=data["p2_strategy"]
-        )
+        if "strategies" in data:
+            eps = game_manager.calculate_expected_payoffs(game_id, *data["strategies"])
+        else:
+            eps = game_manager.calculate_expected_payoffs(
+                game_id, p1_strategy=data["p1_strategy"], p2_strategy=data["p2_strategy"]
+            )
 
-        return jsonify({"expected_payoffs": [float(eps[0]), float(eps[1])]})
+        return jsonify({"expected_payoffs": [float(ep) for ep in eps]})
 
     except KeyError as e:
         if str(e) == f"'{game_id}'":
@@ -172,7 +379,7 @@ def generate_random_beliefs(game_id):
 
         beliefs = game_manager.generate_random_beliefs(game_id, mode=mode)
 
-        return jsonify({"beliefs": [beliefs[0], beliefs[1]]})
+        return jsonify({"beliefs": list(beliefs)})
 
     except KeyError:
         return jsonify({"error": f"Game with ID {game_id} not found"}), 404